@@ -0,0 +1,334 @@
+"""Benchmark suite for the task store, services and CLI.
+
+Every size runs in a fresh worker process against its own temporary store
+(nothing in the working directory is touched), so peak RSS is reported per
+size. Each case is timed `--iterations` times and summarized as median, p95
+and p99 (nearest rank) in milliseconds.
+
+Cases:
+  cold_load     new repository instance + load_all_tasks
+  warm_load     load_all_tasks on an instance that already loaded once
+  cached_load   load_all_tasks with the in-process task cache on (json store only)
+  create        create_task latency (the store grows by one task per iteration)
+  create_none   create_task with durability `none` (no fsync)
+  create_batch  create_task with durability `batch` (group commit: one fsync per 50 ms / 64 writes)
+  create_full   create_task with durability `full` (fsync data and directory on every write)
+  list_all      list_tasks()
+  list_status   list_tasks("done")
+  search_hit    search_tasks for a word present in ~1% of tasks
+  search_miss   search_tasks for a word present in no task
+  json_output   format_tasks_json over all tasks
+  human_output  format_tasks_human over all tasks
+  parse_stdlib  decode tasks.json with the stdlib codec
+  parse_fast    decode tasks.json with the fastest installed codec (orjson, msgspec)
+  serialize_stdlib  encode the decoded document with the stdlib codec
+  serialize_fast    encode it with the fastest installed codec
+  cli_list      `python -m src.cli.main list --json` subprocess wall time
+  cli_search    `python -m src.cli.main search <hit>` subprocess wall time
+
+Usage:
+  python scripts/benchmark.py --sizes 1000,10000 --output results.json
+  python scripts/benchmark.py --sizes 1000 --save-baseline baseline.json
+  python scripts/benchmark.py --sizes 1000 --baseline baseline.json   # exit 1 on regression
+  python scripts/benchmark.py --sizes 1000000 --cases parse_stdlib,parse_fast,serialize_stdlib,serialize_fast
+  python scripts/benchmark.py --sizes 1000 --store journal --cases create_none,create_batch,create_full
+"""
+from __future__ import annotations
+import argparse
+import json
+import math
+import os
+import pathlib
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+DEFAULT_SIZES = (1_000, 10_000)
+MAX_SIZE = 1_000_000
+STORES = ("json", "journal", "sqlite", "binary")
+CLI_CASES = ("cli_list", "cli_search")
+CASES = (
+    "cold_load", "warm_load", "cached_load", "create", "create_none", "create_batch", "create_full", "list_all", "list_status", "search_hit",
+    "search_miss", "json_output", "human_output", "parse_stdlib", "parse_fast", "serialize_stdlib",
+    "serialize_fast",
+) + CLI_CASES
+HIT_WORD = "kestrel"  # planted in ~1% of tasks
+MISS_WORD = "zzqxjv"
+_WORDS = (
+    "deploy", "review", "write", "spec", "fix", "bug", "update", "docs", "refactor", "parser",
+    "release", "notes", "migrate", "schema", "cache", "index", "search", "report", "meeting", "plan",
+)
+_STATUSES = ("todo", "todo", "in-progress", "done")
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of `samples` (non-empty)."""
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(samples_ms: List[float]) -> dict:
+    return {
+        "n": len(samples_ms),
+        "median_ms": round(statistics.median(samples_ms), 4),
+        "p95_ms": round(percentile(samples_ms, 95), 4),
+        "p99_ms": round(percentile(samples_ms, 99), 4),
+        "min_ms": round(min(samples_ms), 4),
+        "max_ms": round(max(samples_ms), 4),
+    }
+
+
+def peak_rss_kb() -> Optional[int]:
+    if resource is None:  # pragma: no cover - Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss  # macOS reports bytes
+
+
+def synthetic_records(size: int, seed: int = 1) -> List[dict]:
+    """Deterministic task records; every 100th task mentions HIT_WORD."""
+    rng = random.Random(seed)
+    records = []
+    for i in range(1, size + 1):
+        title = " ".join(rng.choice(_WORDS) for _ in range(3)) + f" {i}"
+        description = " ".join(rng.choice(_WORDS) for _ in range(6)) if i % 3 else None
+        if i % 100 == 50:
+            title += f" {HIT_WORD}"
+        records.append({"id": i, "title": title, "description": description, "status": rng.choice(_STATUSES)})
+    return records
+
+
+def build_store(directory: pathlib.Path, store: str, size: int) -> str:
+    """Write a `size`-task store of kind `store` under `directory`; returns its URI."""
+    from src.repository.migration import migrate_json_to_binary, migrate_json_to_sqlite
+    from src.repository.schema import with_header
+
+    json_path = directory / "tasks.json"
+    records = synthetic_records(size)
+    doc = with_header({}, records, size + 1)
+    json_path.write_text(json.dumps(doc, ensure_ascii=False), encoding="utf-8")
+    if store == "sqlite":
+        db_path = directory / "tasks.db"
+        migrate_json_to_sqlite(json_path, db_path)
+        return f"sqlite:///{db_path}"
+    if store == "binary":
+        bin_path = directory / "tasks.bin"
+        migrate_json_to_binary(json_path, bin_path)
+        return f"binary:///{bin_path}"
+    return f"{store}:///{json_path}"
+
+
+def _time(fn: Callable[[], object], iterations: int) -> List[float]:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def _cli(uri: str, *argv: str) -> Callable[[], None]:
+    cmd = [sys.executable, "-m", "src.cli.main", "--store", uri, "--no-daemon", *argv]
+
+    def run() -> None:
+        subprocess.run(cmd, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+    return run
+
+
+def case_functions(uri: str) -> Dict[str, Callable[[], object]]:
+    """Callables for every case against the store at `uri`."""
+    from src.cli.formatting import format_tasks_human, format_tasks_json
+    from src.repository import codec
+    from src.repository.json_repository import JsonTaskRepository
+    from src.repository.registry import open_repository, store_key
+    from src.repository.task_cache import TaskCache
+
+    repo = open_repository(uri)
+    repo.load_all_tasks()  # warm the instance used by the warm cases
+    tasks = repo.load_all_tasks()
+    counter = iter(range(1 << 62))
+
+    def cold_load() -> None:
+        fresh = open_repository(uri)
+        fresh.load_all_tasks()
+        getattr(fresh, "close", lambda: None)()
+
+    functions = {
+        "cold_load": cold_load,
+        "warm_load": repo.load_all_tasks,
+        "create": lambda: repo.create_task(f"bench task {next(counter)}", "created by benchmark"),
+        "list_all": lambda: repo.list_tasks(None),
+        "list_status": lambda: repo.list_tasks("done"),
+        "search_hit": lambda: repo.search_tasks(HIT_WORD),
+        "search_miss": lambda: repo.search_tasks(MISS_WORD),
+        "json_output": lambda: format_tasks_json(tasks),
+        "human_output": lambda: format_tasks_human(tasks),
+        "cli_list": _cli(uri, "--json", "list"),
+        "cli_search": _cli(uri, "--json", "search", HIT_WORD),
+    }
+    for level in ("none", "batch", "full"):
+        leveled = open_repository(f"{uri}?durability={level}")
+        functions[f"create_{level}"] = lambda leveled=leveled: leveled.create_task(
+            f"bench task {next(counter)}", "created by benchmark"
+        )
+    scheme, path = store_key(uri)
+    raw = pathlib.Path(path).with_name("tasks.json").read_bytes()  # written by build_store for every kind
+    document = json.loads(raw)
+    for label, name in (("stdlib", "json"), ("fast", codec.use())):
+        _, loads, dumps = codec.load_backend(name)
+        functions[f"parse_{label}"] = lambda loads=loads: loads(raw)
+        functions[f"serialize_{label}"] = lambda dumps=dumps: dumps(document)
+    if scheme == "json":
+        cached = JsonTaskRepository(path, cache=TaskCache(max_bytes=1 << 40))
+        functions["cached_load"] = cached.load_all_tasks
+    return functions
+
+
+def run_size(size: int, store: str, cases: Iterable[str], iterations: int, cli_iterations: int) -> dict:
+    """Run the selected cases for one store size (in the current process)."""
+    with tempfile.TemporaryDirectory(prefix="tasks-bench-") as tmp:
+        uri = build_store(pathlib.Path(tmp), store, size)
+        functions = case_functions(uri)
+        results = []
+        for case in (c for c in cases if c in functions):
+            n = cli_iterations if case in CLI_CASES else iterations
+            functions[case]()  # warm-up, not timed
+            row = {"size": size, "store": store, "case": case}
+            row.update(summarize(_time(functions[case], n)))
+            results.append(row)
+        from src.repository import registry
+        registry.clear_cache()
+    return {"size": size, "store": store, "peak_rss_kb": peak_rss_kb(), "results": results}
+
+
+def run_in_worker(size: int, args: argparse.Namespace) -> dict:
+    """Run one size in a fresh interpreter so its peak RSS is isolated."""
+    cmd = [
+        sys.executable, __file__, "--worker", "--sizes", str(size), "--store", args.store,
+        "--cases", ",".join(args.cases), "--iterations", str(args.iterations),
+        "--cli-iterations", str(args.cli_iterations),
+    ]
+    proc = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    return json.loads(proc.stdout)
+
+
+def compare(results: List[dict], baseline: dict, tolerance: float, min_delta_ms: float) -> List[str]:
+    """Regressions of `results` against `baseline` (a previous report).
+
+    A case regresses when its median is more than `tolerance` (fraction)
+    slower than the baseline median and by at least `min_delta_ms`.
+    """
+    previous = {(r["store"], r["size"], r["case"]): r for r in baseline.get("results", [])}
+    regressions = []
+    for row in results:
+        base = previous.get((row["store"], row["size"], row["case"]))
+        if base is None:
+            continue
+        delta = row["median_ms"] - base["median_ms"]
+        if delta > base["median_ms"] * tolerance and delta >= min_delta_ms:
+            regressions.append(
+                f"{row['store']}/{row['size']}/{row['case']}: median {row['median_ms']:.2f} ms "
+                f"vs baseline {base['median_ms']:.2f} ms (+{delta / base['median_ms']:.0%})"
+            )
+    return regressions
+
+
+def format_table(report: dict) -> str:
+    lines = [f"{'store':<8}{'size':>9}  {'case':<17}{'median':>10}{'p95':>10}{'p99':>10}  (ms)"]
+    for row in report["results"]:
+        lines.append(
+            f"{row['store']:<8}{row['size']:>9}  {row['case']:<17}"
+            f"{row['median_ms']:>10.2f}{row['p95_ms']:>10.2f}{row['p99_ms']:>10.2f}"
+        )
+    for size, rss in report["peak_rss_kb"].items():
+        lines.append(f"peak RSS at {size} tasks: {rss} KiB")
+    return "\n".join(lines)
+
+
+def _parse_sizes(value: str) -> List[int]:
+    sizes = [int(part) for part in value.split(",") if part]
+    if not sizes or any(s < 1 or s > MAX_SIZE for s in sizes):
+        raise argparse.ArgumentTypeError(f"sizes must be between 1 and {MAX_SIZE}")
+    return sizes
+
+
+def _parse_cases(value: str) -> List[str]:
+    cases = [part for part in value.split(",") if part]
+    unknown = sorted(set(cases) - set(CASES))
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown cases: {', '.join(unknown)}")
+    return cases
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Benchmark the task store, services and CLI")
+    p.add_argument("--sizes", type=_parse_sizes, default=list(DEFAULT_SIZES), help="Comma-separated task counts (1..1000000)")
+    p.add_argument("--store", choices=STORES, default="json", help="Backend to benchmark")
+    p.add_argument("--cases", type=_parse_cases, default=list(CASES), help="Comma-separated subset of cases")
+    p.add_argument("--iterations", type=int, default=20, help="Timed iterations per in-process case")
+    p.add_argument("--cli-iterations", type=int, default=5, help="Timed iterations per CLI subprocess case")
+    p.add_argument("--output", type=pathlib.Path, help="Write the JSON report here")
+    p.add_argument("--baseline", type=pathlib.Path, help="Fail (exit 1) on regressions against this report")
+    p.add_argument("--save-baseline", type=pathlib.Path, help="Also write the report as a new baseline")
+    p.add_argument("--tolerance", type=float, default=0.25, help="Allowed median slowdown vs baseline (fraction)")
+    p.add_argument("--min-delta-ms", type=float, default=0.5, help="Ignore slowdowns smaller than this")
+    p.add_argument("--in-process", action="store_true", help="Run all sizes in this process (shared peak RSS)")
+    p.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    return p.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    if args.worker:
+        print(json.dumps(run_size(args.sizes[0], args.store, args.cases, args.iterations, args.cli_iterations)))
+        return 0
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "store": args.store,
+            "iterations": args.iterations,
+            "cli_iterations": args.cli_iterations,
+        },
+        "results": [],
+        "peak_rss_kb": {},
+    }
+    for size in args.sizes:
+        if args.in_process:
+            run = run_size(size, args.store, args.cases, args.iterations, args.cli_iterations)
+        else:
+            run = run_in_worker(size, args)
+        report["results"].extend(run["results"])
+        report["peak_rss_kb"][str(size)] = run["peak_rss_kb"]
+    print(format_table(report))
+    for path in (args.output, args.save_baseline):
+        if path is not None:
+            path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if args.baseline is not None:
+        regressions = compare(report["results"], json.loads(args.baseline.read_text(encoding="utf-8")),
+                              args.tolerance, args.min_delta_ms)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"No regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    sys.exit(main())
@@ -0,0 +1,43 @@
+"""Migrate the task store between JSON and SQLite or a binary snapshot.
+
+Usage:
+  python scripts/migrate_store.py to-sqlite --json tasks.json --db tasks.db
+  python scripts/migrate_store.py to-json --db tasks.db --json tasks.json   # rollback
+  python scripts/migrate_store.py to-binary --json tasks.json --bin tasks.bin
+  python scripts/migrate_store.py from-binary --bin tasks.bin --json tasks.json
+"""
+from __future__ import annotations
+import argparse
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from src.repository.migration import (  # noqa: E402
+    export_binary_to_json, export_sqlite_to_json, migrate_json_to_binary, migrate_json_to_sqlite,
+)
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Migrate tasks between JSON, SQLite and binary snapshot stores")
+    p.add_argument("direction", choices=["to-sqlite", "to-json", "to-binary", "from-binary"])
+    p.add_argument("--json", dest="json_path", default="tasks.json", help="JSON store path")
+    p.add_argument("--db", dest="db_path", default="tasks.db", help="SQLite database path")
+    p.add_argument("--bin", dest="bin_path", default="tasks.bin", help="Binary snapshot path")
+    return p.parse_args()
+
+
+if __name__ == "__main__":  # pragma: no cover
+    args = parse_args()
+    if args.direction == "to-sqlite":
+        count = migrate_json_to_sqlite(args.json_path, args.db_path)
+        print(f"Migrated {count} tasks from {args.json_path} to {args.db_path}")
+    elif args.direction == "to-json":
+        count = export_sqlite_to_json(args.db_path, args.json_path)
+        print(f"Exported {count} tasks from {args.db_path} to {args.json_path}")
+    elif args.direction == "to-binary":
+        count = migrate_json_to_binary(args.json_path, args.bin_path)
+        print(f"Migrated {count} tasks from {args.json_path} to {args.bin_path}")
+    else:
+        count = export_binary_to_json(args.bin_path, args.json_path)
+        print(f"Exported {count} tasks from {args.bin_path} to {args.json_path}")
@@ -1,9 +1,81 @@
 """Base argparse setup with global flags."""
 from __future__ import annotations
 import argparse
+import os
+import sys
+
+
+def _terminal_columns() -> int:
+    """Same answer as `shutil.get_terminal_size().columns` without importing shutil."""
+    try:
+        return int(os.environ["COLUMNS"])
+    except (KeyError, ValueError):
+        pass
+    try:
+        return os.get_terminal_size(sys.__stdout__.fileno()).columns
+    except (AttributeError, ValueError, OSError):
+        return 80
+
+
+def durability_level(spec: str) -> str:
+    """argparse type for `--durability`: the normalized level spec."""
+    from src.repository import durability
+
+    try:
+        return str(durability.parse(spec))
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+class HelpFormatter(argparse.HelpFormatter):
+    """Default argparse formatter, minus the `shutil` import (and its compression
+    modules) that argparse performs for every parser it builds."""
+
+    def __init__(self, prog: str, indent_increment: int = 2, max_help_position: int = 24, width: int | None = None) -> None:
+        if width is None:
+            width = _terminal_columns() - 2
+        super().__init__(prog, indent_increment, max_help_position, width)
+
+
+class ArgumentParser(argparse.ArgumentParser):
+    """ArgumentParser using `HelpFormatter`; subparsers inherit the class."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        kwargs.setdefault("formatter_class", HelpFormatter)
+        super().__init__(*args, **kwargs)
 
 
 def build_base_parser() -> argparse.ArgumentParser:
-    parser = argparse.ArgumentParser(prog="tasks", description="Task manager CLI")
+    parser = ArgumentParser(prog="tasks", description="Task manager CLI")
     parser.add_argument("--json", action="store_true", help="Output JSON instead of human-readable format")
-    return parser
\ No newline at end of file
+    parser.add_argument(
+        "--store",
+        default=None,
+        help="Store URI, e.g. json://tasks.json, journal://tasks.json, sqlite:///tasks.db, memory:// "
+        "(default: $TASKS_STORE or json://tasks.json)",
+    )
+    parser.add_argument(
+        "--no-daemon",
+        action="store_true",
+        help="Run locally even if a daemon (tasks serve) is listening",
+    )
+    parser.add_argument(
+        "--durability",
+        metavar="LEVEL",
+        type=durability_level,
+        default=None,
+        help="When this command's writes are fsynced: none, batch[:MS[,WRITES]] (group commit) or full "
+        "(default: the store URI's ?durability=, then $TASKS_DURABILITY, then full)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print a per-phase timing breakdown to stderr (JSON with --json); also enabled by $TASKS_PROFILE=1",
+    )
+    parser.add_argument(
+        "--profile-dump",
+        metavar="PATH",
+        default=None,
+        help="With --profile, also write cProfile statistics to PATH (read with `python -m pstats PATH`)",
+    )
+    return parser
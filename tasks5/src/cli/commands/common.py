@@ -1,27 +1,184 @@
 """Common CLI command utilities to reduce duplication."""
 from __future__ import annotations
+import argparse
+import json
 import sys
-from typing import Iterable
+from itertools import chain
+from typing import Callable, Iterable, Optional
 
-from src.repository.json_repository import JsonTaskRepository
-from src.cli.formatting import format_tasks_human, format_tasks_json, format_error_json
+from src.repository.base import TaskRepository
+from src.repository import registry
+from src.cli.formatting import (
+    iter_tasks_human,
+    iter_tasks_json,
+    iter_tasks_jsonl,
+    format_error_json,
+    format_created_human,
+    format_created_json,
+    format_count_json,
+    task_to_json_dict,
+    tasks_payload,
+    error_payload,
+)
 from src.models.task import Task
+from src.services.pagination import Page, Paged, decode_cursor
+from src.services.profiling import span
 
 
-def get_repository() -> JsonTaskRepository:
-    return JsonTaskRepository()
+class CommandResult:
+    """Outcome of a command, independent of how it is rendered.
 
+    Exactly one of `tasks` (list/search/import), `task` (create/update/delete),
+    `count` (bulk update), `document` (a report of the command's own shape,
+    such as verify's) or `error` is set. `tasks` may be a lazy iterator
+    straight from the repository; it is consumed once, by whichever of
+    rendering or `to_payload` runs. `to_payload` is the document printed in
+    `--json` mode; `message`, when set, replaces the task listing in human
+    mode. (A plain class rather than a dataclass to keep `dataclasses` out of
+    CLI start-up.)
+    """
 
-def load_tasks() -> list[Task]:
-    repo = get_repository()
+    __slots__ = ("exit_code", "tasks", "task", "error", "message", "count", "document")
+
+    def __init__(
+        self,
+        exit_code: int = 0,
+        tasks: Optional[Iterable[Task]] = None,
+        task: Optional[Task] = None,
+        error: Optional[str] = None,
+        message: Optional[str] = None,
+        count: Optional[int] = None,
+        document: Optional[dict] = None,
+    ) -> None:
+        self.exit_code = exit_code
+        self.tasks = tasks
+        self.task = task
+        self.error = error
+        self.message = message
+        self.count = count
+        self.document = document
+
+    def to_payload(self) -> dict:
+        if self.error is not None:
+            return error_payload(self.error)
+        if self.task is not None:
+            return {"task": task_to_json_dict(self.task)}
+        if self.count is not None:
+            return {"count": self.count}
+        if self.document is not None:
+            return self.document
+        payload = tasks_payload(self.tasks or [])
+        if isinstance(self.tasks, Paged):
+            payload["next_cursor"] = self.tasks.next_cursor
+        return payload
+
+    @classmethod
+    def from_payload(cls, payload: dict, exit_code: int) -> "CommandResult":
+        """Inverse of `to_payload`.
+
+        Raises ValueError (or TypeError) if the payload does not describe valid tasks.
+        """
+        if "error" in payload:
+            return cls(exit_code=exit_code, error=payload["error"]["message"])
+        if "task" in payload:
+            return cls(exit_code=exit_code, task=Task(**payload["task"]))
+        if "count" in payload:
+            return cls(exit_code=exit_code, count=payload["count"])
+        if "tasks" not in payload:
+            return cls(exit_code=exit_code, document=payload)
+        tasks = [Task(**t) for t in payload["tasks"]]
+        if "next_cursor" in payload:
+            tasks = Paged(tasks, next_cursor=payload["next_cursor"])
+        return cls(exit_code=exit_code, tasks=tasks)
+
+
+def get_repository(store: str | None = None) -> TaskRepository:
+    with span("store.open"):
+        return registry.get_repository(store)
+
+
+def load_tasks(store: str | None = None) -> list[Task]:
+    repo = get_repository(store)
     return repo.load_all_tasks()
 
 
-def print_tasks(tasks: Iterable[Task], json_mode: bool) -> None:
-    if json_mode:
-        print(format_tasks_json(tasks), end="")
+def count_arg(minimum: int):
+    """argparse `type` accepting integers >= `minimum`."""
+    def parse(text: str) -> int:
+        try:
+            value = int(text)
+        except ValueError:
+            value = minimum - 1
+        if value < minimum:
+            raise argparse.ArgumentTypeError(f"expected an integer >= {minimum}, got '{text}'")
+        return value
+
+    return parse
+
+
+def add_listing_args(parser) -> None:
+    """Register the output and paging options of a subcommand that prints a task listing."""
+    parser.add_argument("--jsonl", action="store_true", help="Output one JSON object per task per line")
+    parser.add_argument("--limit", type=count_arg(1), default=None, help="Return at most this many tasks")
+    parser.add_argument("--offset", type=count_arg(0), default=0, help="Skip this many matches first")
+    parser.add_argument("--cursor", default=None, help="Continue after a previous page (its next_cursor)")
+
+
+def page_from_args(args) -> Optional[Page]:
+    """The `Page` requested by `add_listing_args` options, or None for everything.
+
+    Raises ValueError for a malformed cursor.
+    """
+    limit, offset, cursor = (getattr(args, name, None) for name in ("limit", "offset", "cursor"))
+    if limit is None and not offset and cursor is None:
+        return None
+    return Page(limit, offset or 0, None if cursor is None else decode_cursor(cursor))
+
+
+def paged_result(args, fetch: Callable[[Optional[Page]], Iterable[Task]]) -> CommandResult:
+    """Listing result for the page requested in `args`.
+
+    `fetch(page)` queries the repository; it is asked for one task beyond the
+    limit so the result can tell whether a next page exists.
+    """
+    try:
+        page = page_from_args(args)
+    except ValueError as e:
+        return CommandResult(exit_code=1, error=str(e))
+    if page is None:
+        return CommandResult(tasks=Paged(fetch(None)))
+    return CommandResult(tasks=Paged(fetch(page.with_lookahead()), page.limit))
+
+
+def print_tasks(tasks: Iterable[Task], json_mode: bool, jsonl: bool = False) -> None:
+    """Write tasks to stdout chunk by chunk as `tasks` yields them.
+
+    `jsonl` (one object per line) takes precedence over `json_mode` (the
+    `{"tasks": [...]}` envelope). The first task is read before anything is
+    written, so a store that cannot be opened yields a clean error instead
+    of a truncated document.
+
+    A `Paged` listing adds `next_cursor` to the JSON envelope; in the other
+    modes the cursor for the next page is reported on stderr.
+    """
+    paged = tasks if isinstance(tasks, Paged) else None
+    tasks = iter(tasks)
+    with span("output.fetch"):
+        first = next(tasks, None)
+    tasks = () if first is None else chain((first,), tasks)
+    if jsonl:
+        chunks = iter_tasks_jsonl(tasks)
+    elif json_mode:
+        footer = None if paged is None else (lambda: {"next_cursor": paged.next_cursor})
+        chunks = iter_tasks_json(tasks, footer)
     else:
-        print(format_tasks_human(tasks))
+        chunks = iter_tasks_human(tasks)
+    write = sys.stdout.write
+    for chunk in chunks:
+        with span("output.write"):
+            write(chunk)
+    if paged is not None and paged.next_cursor is not None and (jsonl or not json_mode):
+        print(f"More tasks: --cursor {paged.next_cursor}", file=sys.stderr)
 
 
 def print_error(message: str, json_mode: bool) -> None:
@@ -30,4 +187,42 @@ def print_error(message: str, json_mode: bool) -> None:
     else:
         print(message, file=sys.stderr)
 
-__all__ = ["load_tasks", "print_tasks", "print_error", "get_repository"]
+
+def render_result(result: CommandResult, json_mode: bool, jsonl: bool = False) -> int:
+    """Print `result` in the requested mode and return its exit code.
+
+    `jsonl` only changes how task listings are printed; errors use JSON.
+    """
+    json_mode = json_mode or jsonl
+    if result.error is not None:
+        print_error(result.error, json_mode)
+    elif result.message is not None and not json_mode:
+        print(result.message)
+    elif result.document is not None:
+        print(json.dumps(result.document))
+    elif result.count is not None:
+        if json_mode:
+            print(format_count_json(result.count), end="")
+        else:
+            print(result.count)
+    elif result.task is not None:
+        if json_mode:
+            print(format_created_json(result.task), end="")
+        else:
+            print(format_created_human(result.task))
+    else:
+        print_tasks(result.tasks or [], json_mode, jsonl)
+    return result.exit_code
+
+__all__ = [
+    "CommandResult",
+    "load_tasks",
+    "add_listing_args",
+    "count_arg",
+    "page_from_args",
+    "paged_result",
+    "print_tasks",
+    "print_error",
+    "render_result",
+    "get_repository",
+]
@@ -0,0 +1,22 @@
+"""Delete command implementation."""
+from __future__ import annotations
+import argparse
+
+from src.repository.base import TaskRepository
+from src.cli.formatting import format_task_human
+from .common import CommandResult, get_repository, render_result
+
+
+def build_parser(subparsers) -> argparse.ArgumentParser:
+    p = subparsers.add_parser("delete", help="Delete a task")
+    p.add_argument("id", type=int, help="Id of the task to delete")
+    return p
+
+
+def execute(args: argparse.Namespace, repo: TaskRepository) -> CommandResult:
+    task = repo.delete_task(args.id)
+    return CommandResult(task=task, message=f"Deleted {format_task_human(task)}")
+
+
+def run(args: argparse.Namespace, json_mode: bool) -> int:
+    return render_result(execute(args, get_repository(args.store)), json_mode)
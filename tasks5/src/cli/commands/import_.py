@@ -0,0 +1,63 @@
+"""Import command: bulk-create tasks from JSON lines or CSV."""
+from __future__ import annotations
+import argparse
+import io
+import pathlib
+import sys
+
+from src.repository.base import TaskRepository
+from src.services.importer import FORMATS, build_drafts, parse_rows
+from .common import CommandResult, get_repository, render_result
+
+MAX_REPORTED_ERRORS = 20
+
+
+def build_parser(subparsers) -> argparse.ArgumentParser:
+    p = subparsers.add_parser("import", help="Bulk-create tasks from a JSON-lines or CSV file (or stdin)")
+    p.add_argument("file", nargs="?", default="-", help="Input file, '-' for stdin (default)")
+    p.add_argument("--format", choices=FORMATS, default=None,
+                   help="Input format (default: from file extension, else jsonl)")
+    return p
+
+
+def _detect_format(path: str) -> str:
+    return "csv" if pathlib.Path(path).suffix.lower() == ".csv" else "jsonl"
+
+
+def read_input(args: argparse.Namespace) -> str:
+    """The whole input named by `args.file` ('-' for stdin).
+
+    Raises OSError if it cannot be read and ValueError if it is not UTF-8.
+    """
+    if args.file == "-":
+        return sys.stdin.read()
+    with open(args.file, encoding="utf-8", newline="") as fh:
+        return fh.read()
+
+
+def execute(args: argparse.Namespace, repo: TaskRepository) -> CommandResult:
+    """Import `args.file`, or `args.text` when the client already read it (daemon requests)."""
+    fmt = args.format or _detect_format(args.file)
+    try:
+        text = getattr(args, "text", None)
+        if text is not None:
+            rows = list(parse_rows(io.StringIO(text, newline=""), fmt))
+        elif args.file == "-":
+            rows = list(parse_rows(sys.stdin, fmt))
+        else:
+            with open(args.file, encoding="utf-8", newline="") as fh:
+                rows = list(parse_rows(fh, fmt))
+    except (OSError, ValueError) as e:
+        return CommandResult(exit_code=1, error=f"Cannot read import: {e}")
+    drafts, errors = build_drafts(rows)
+    if errors:
+        shown = "; ".join(errors[:MAX_REPORTED_ERRORS])
+        more = f" (and {len(errors) - MAX_REPORTED_ERRORS} more)" if len(errors) > MAX_REPORTED_ERRORS else ""
+        return CommandResult(exit_code=1, error=f"Import rejected, nothing saved: {shown}{more}")
+    tasks = repo.create_many(drafts)
+    span = f" (ids {tasks[0].id}-{tasks[-1].id})" if tasks else ""
+    return CommandResult(tasks=tasks, message=f"Imported {len(tasks)} tasks{span}")
+
+
+def run(args: argparse.Namespace, json_mode: bool) -> int:
+    return render_result(execute(args, get_repository(args.store)), json_mode)
@@ -1,18 +1,21 @@
 """List command implementation."""
 from __future__ import annotations
 import argparse
-from src.services.filtering import filter_by_status
-from .common import load_tasks, print_tasks
+
+from src.repository.base import TaskRepository
+from .common import CommandResult, add_listing_args, get_repository, paged_result, render_result
 
 
 def build_parser(subparsers) -> argparse.ArgumentParser:
     p = subparsers.add_parser("list", help="List tasks optionally filtered by status")
     p.add_argument("--status", required=False, help="Filter by status")
+    add_listing_args(p)
     return p
 
 
+def execute(args: argparse.Namespace, repo: TaskRepository) -> CommandResult:
+    return paged_result(args, lambda page: repo.iter_tasks(args.status, page))
+
+
 def run(args: argparse.Namespace, json_mode: bool) -> int:
-    tasks = load_tasks()
-    filtered = filter_by_status(tasks, args.status)
-    print_tasks(filtered, json_mode)
-    return 0
\ No newline at end of file
+    return render_result(execute(args, get_repository(args.store)), json_mode, getattr(args, "jsonl", False))
@@ -1,24 +1,63 @@
 """Search command implementation."""
 from __future__ import annotations
-import sys
 import argparse
+from typing import Iterable
 
-from src.services.search import search_tasks
-from .common import load_tasks, print_tasks, print_error
+from src.models.task import Task
+from src.repository.base import TaskRepository
+from .common import CommandResult, add_listing_args, count_arg, get_repository, paged_result, render_result
 
 
 def build_parser(subparsers) -> argparse.ArgumentParser:
     p = subparsers.add_parser("search", help="Search tasks by substring (title or description)")
-    p.add_argument("query", help="Substring to search (case-insensitive)")
+    p.add_argument("query", help="Substring to search (case-insensitive), or a query with --expr")
+    p.add_argument(
+        "--expr", action="store_true",
+        help='Treat QUERY as a query expression, e.g. \'status:todo AND (title:"deploy" OR desc:urgent) -blocked\'',
+    )
+    add_listing_args(p)
+    p.add_argument(
+        "--jobs", type=count_arg(1), default=1,
+        help="Worker processes for stores of at least 32 MiB (default: 1 = serial)",
+    )
+    p.add_argument(
+        "--top", type=count_arg(1), default=None,
+        help="Return the N most relevant matches, best first (BM25; title matches weigh more)",
+    )
     return p
 
 
-def run(args: argparse.Namespace, json_mode: bool) -> int:
+def execute(args: argparse.Namespace, repo: TaskRepository) -> CommandResult:
     query = args.query
     if not isinstance(query, str) or not query.strip():
-        print_error("Search query cannot be blank", json_mode)
-        return 1
-    tasks = load_tasks()
-    matches = search_tasks(tasks, query)
-    print_tasks(matches, json_mode)
-    return 0
+        return CommandResult(exit_code=1, error="Search query cannot be blank")
+    top = getattr(args, "top", None)
+    if top is not None and (getattr(args, "limit", None) is not None or getattr(args, "offset", 0)
+                            or getattr(args, "cursor", None) is not None):
+        return CommandResult(exit_code=1, error="--top cannot be combined with --limit, --offset or --cursor")
+    if getattr(args, "expr", False):
+        from src.services.query import QueryError, parse_query
+
+        try:
+            parsed = parse_query(query)
+        except QueryError as e:
+            return CommandResult(exit_code=1, error=str(e))
+        if top is not None:
+            return ranked_result(repo, repo.iter_query(parsed), " ".join(parsed.positive_text()), top)
+        return paged_result(args, lambda page: repo.iter_query(parsed, page))
+    jobs = getattr(args, "jobs", 1)
+    if top is not None:
+        return ranked_result(repo, repo.iter_search(query, None, jobs), query, top)
+    return paged_result(args, lambda page: repo.iter_search(query, page, jobs))
+
+
+def ranked_result(repo: TaskRepository, matches: Iterable[Task], text: str, top: int) -> CommandResult:
+    """The `top` best of `matches` for the words of `text`, scored with the store's term statistics."""
+    from src.services.ranking import query_terms, top_tasks
+
+    terms = query_terms(text)
+    return CommandResult(tasks=top_tasks(matches, terms, repo.term_stats(terms), top))
+
+
+def run(args: argparse.Namespace, json_mode: bool) -> int:
+    return render_result(execute(args, get_repository(args.store)), json_mode, getattr(args, "jsonl", False))
@@ -0,0 +1,48 @@
+"""Serve command: run the task daemon in the foreground."""
+from __future__ import annotations
+import argparse
+import os
+import signal
+
+from src.cli import daemon_client
+from src.repository import registry
+from src.repository.resident_repository import ResidentTaskRepository
+from .common import get_repository, print_error
+
+
+def build_parser(subparsers) -> argparse.ArgumentParser:
+    p = subparsers.add_parser("serve", help="Run a daemon answering create/list/search over a Unix socket")
+    p.add_argument("--socket", required=False, help="Socket path (default: $TASKS_SOCKET or .tasks.sock)")
+    return p
+
+
+def _raise_interrupt(signum, frame):  # pragma: no cover - signal delivery
+    raise KeyboardInterrupt
+
+
+def run(args: argparse.Namespace, json_mode: bool) -> int:
+    if not daemon_client.unix_sockets_supported():  # pragma: no cover - platform specific
+        print_error("Unix domain sockets are not supported on this platform", json_mode)
+        return 1
+    from src.cli.daemon_server import DaemonServer
+
+    path = daemon_client.socket_path(args.socket)
+    if os.path.exists(path):
+        if daemon_client.daemon_alive(path):
+            print_error(f"A daemon is already listening on {path}", json_mode)
+            return 1
+        os.unlink(path)  # stale socket left by a crashed daemon
+    key = registry.store_key(args.store)
+    server = DaemonServer(path, key, ResidentTaskRepository(get_repository(args.store)))
+    previous_handler = signal.signal(signal.SIGTERM, _raise_interrupt)
+    print(f"Serving {registry.store_uri(*key)} on {path}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        signal.signal(signal.SIGTERM, previous_handler)
+        server.server_close()
+        if os.path.exists(path):
+            os.unlink(path)
+    return 0
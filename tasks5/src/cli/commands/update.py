@@ -0,0 +1,43 @@
+"""Update command implementation."""
+from __future__ import annotations
+import argparse
+
+from src.repository.base import TaskRepository
+from src.cli.formatting import format_task_human
+from .common import CommandResult, get_repository, render_result
+
+
+def build_parser(subparsers) -> argparse.ArgumentParser:
+    p = subparsers.add_parser("update", help="Change one task, or every task matching --where-status/--where")
+    p.add_argument("id", nargs="?", type=int, help="Id of the task to change")
+    p.add_argument("--title", required=False, help="New title")
+    p.add_argument("--description", required=False, help="New description")
+    p.add_argument("--status", required=False, help="New status")
+    p.add_argument("--where-status", default=None, help="Bulk: change every task with this status")
+    p.add_argument("--where", default=None, help="Bulk: change every task matching this query expression")
+    return p
+
+
+def execute(args: argparse.Namespace, repo: TaskRepository) -> CommandResult:
+    changes = {name: getattr(args, name) for name in ("title", "description", "status") if getattr(args, name, None) is not None}
+    where_status, where = getattr(args, "where_status", None), getattr(args, "where", None)
+    bulk = where_status is not None or where is not None
+    if (args.id is None) == (not bulk):
+        return CommandResult(exit_code=1, error="Give either a task id or --where-status/--where")
+    try:
+        if not bulk:
+            task = repo.update_task(args.id, **changes)
+            return CommandResult(task=task, message=f"Updated {format_task_human(task)}")
+        query = None
+        if where is not None:
+            from src.services.query import parse_query
+
+            query = parse_query(where)
+        count = repo.update_where(changes, where_status, query)
+    except ValueError as e:  # includes QueryError
+        return CommandResult(exit_code=1, error=str(e))
+    return CommandResult(count=count, message=f"Updated {count} tasks")
+
+
+def run(args: argparse.Namespace, json_mode: bool) -> int:
+    return render_result(execute(args, get_repository(args.store)), json_mode)
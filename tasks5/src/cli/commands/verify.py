@@ -0,0 +1,45 @@
+"""Verify command: fully validate the stored records and report invalid ones."""
+from __future__ import annotations
+import argparse
+
+from src.repository.base import TaskRepository, Verification
+from .common import CommandResult, get_repository, render_result
+
+
+def build_parser(subparsers) -> argparse.ArgumentParser:
+    p = subparsers.add_parser("verify", help="Check every stored record and report the invalid ones")
+    p.add_argument("--fix", action="store_true", help="Delete the invalid records (reads skip them anyway)")
+    return p
+
+
+def verification_payload(result: Verification) -> dict:
+    return {
+        "checked": result.checked,
+        "invalid": [{"position": bad.position, "id": bad.id, "reason": bad.reason} for bad in result.invalid],
+        "removed": result.removed,
+    }
+
+
+def format_verification_human(result: Verification) -> str:
+    lines = [f"record {bad.position} (id {bad.id!r}): {bad.reason}" for bad in result.invalid]
+    if not result.invalid:
+        lines.append(f"Checked {result.checked} records: all valid")
+    elif result.removed:
+        lines.append(f"Removed {len(result.invalid)} invalid of {result.checked} records")
+    else:
+        lines.append(f"{len(result.invalid)} invalid of {result.checked} records (run with --fix to remove them)")
+    return "\n".join(lines)
+
+
+def execute(args: argparse.Namespace, repo: TaskRepository) -> CommandResult:
+    """Exit code 1 while invalid records remain."""
+    result = repo.verify(args.fix)
+    return CommandResult(
+        exit_code=1 if result.invalid and not result.removed else 0,
+        document=verification_payload(result),
+        message=format_verification_human(result),
+    )
+
+
+def run(args: argparse.Namespace, json_mode: bool) -> int:
+    return render_result(execute(args, get_repository(args.store)), json_mode)
@@ -0,0 +1,152 @@
+"""Client side of the task daemon: forwards CLI commands over a Unix domain socket.
+
+Protocol (one JSON document per line in each direction):
+
+    request:  {"command": "list", "args": {"status": "done"}, "store": ["json", "/abs/tasks.json"]}
+    response: {"exit_code": 0, "result": {"tasks": [...]}}
+
+`result` is exactly the document the command prints in `--json` mode
+(`{"tasks": [...]}`, `{"task": {...}}` or `{"error": {...}}`). A daemon serving
+a different store answers `{"handled": false}` and the CLI runs locally.
+Scripts may speak the protocol directly (e.g. with `socat`/`nc -U`).
+
+Commands are only forwarded to a daemon run by the same user: the socket
+file must be owned by us and, where the platform reports it (`SO_PEERCRED`),
+so must the process that accepted the connection. Anyone else's socket (say,
+one planted in a shared directory) would see every command, so the CLI runs
+locally instead.
+
+Every CLI run imports this module, so `socket`, `json` and the registry are
+only imported once a socket file actually exists.
+"""
+from __future__ import annotations
+import argparse
+import os
+import stat
+from typing import Optional
+
+SOCKET_ENV_VAR = "TASKS_SOCKET"
+DEFAULT_SOCKET = ".tasks.sock"
+FORWARDED_COMMANDS = ("create", "list", "search", "update", "delete", "import", "verify")
+# Namespace attributes that select how/where to run rather than what to run
+_LOCAL_ARGS = ("command", "json", "jsonl", "store", "no_daemon", "profile", "profile_dump")
+
+
+def unix_sockets_supported() -> bool:
+    import socket
+
+    return hasattr(socket, "AF_UNIX")
+
+
+def socket_path(path: str | None = None) -> str:
+    return path or os.environ.get(SOCKET_ENV_VAR) or DEFAULT_SOCKET
+
+
+def owned_socket(path: str) -> bool:
+    """Whether `path` is a socket file owned by the current user (never where
+    ownership cannot be checked)."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return False
+    getuid = getattr(os, "getuid", None)
+    return getuid is not None and stat.S_ISSOCK(st.st_mode) and st.st_uid == getuid()
+
+
+def check_peer(sock) -> None:
+    """Raise PermissionError unless the process at the other end of the
+    connected Unix socket `sock` runs as the current user (no-op where
+    `SO_PEERCRED` is unavailable: the socket file's owner was checked)."""
+    import socket
+    import struct
+
+    if not hasattr(socket, "SO_PEERCRED"):  # pragma: no cover - Linux has it
+        return
+    creds = struct.Struct("3i")  # pid, uid, gid
+    _pid, uid, _gid = creds.unpack(sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, creds.size))
+    if uid != os.getuid():
+        raise PermissionError(f"Daemon socket is served by uid {uid}")
+
+
+def build_request(args: argparse.Namespace) -> dict:
+    """Request document for a parsed CLI invocation.
+
+    Raises RepositoryError for an unknown store scheme.
+    """
+    from src.repository import registry
+
+    return {
+        "command": args.command,
+        "args": {k: v for k, v in vars(args).items() if k not in _LOCAL_ARGS},
+        "store": list(registry.store_key(args.store)),
+    }
+
+
+def roundtrip(path: str, request: dict, timeout: float = 30.0) -> dict:
+    """Send one request and return the decoded response.
+
+    Raises OSError if the daemon is unreachable, PermissionError (an
+    OSError) if it runs as another user, and ValueError on a malformed reply.
+    """
+    import json
+    import socket
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(path)
+        check_peer(sock)
+        sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as reader:
+            line = reader.readline()
+    if not line:
+        raise ValueError("Daemon closed the connection without a response")
+    return json.loads(line)
+
+
+def daemon_alive(path: str) -> bool:
+    import socket
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(path)
+        return True
+    except OSError:
+        return False
+
+
+def forward(args: argparse.Namespace) -> Optional[int]:
+    """Run the command on a running daemon and print its output.
+
+    Returns the exit code, or None when no daemon handled the command (no
+    socket, stale socket, a socket or daemon of another user, or a daemon
+    serving another store) and the caller should run it locally.
+    """
+    if args.command not in FORWARDED_COMMANDS:
+        return None
+    path = socket_path()
+    if not owned_socket(path) or not unix_sockets_supported():
+        return None
+    if args.command == "import" and getattr(args, "text", None) is None:
+        # The daemon cannot read our stdin or paths relative to our directory
+        from src.cli.commands.import_ import read_input
+
+        try:
+            args.text = read_input(args)
+        except (OSError, ValueError):
+            return None  # the local run reports it
+    try:
+        response = roundtrip(path, build_request(args))
+    except (OSError, ValueError):
+        return None
+    if not response.get("handled", True):
+        return None
+    import json
+    from src.cli.commands.common import CommandResult, render_result
+
+    jsonl = getattr(args, "jsonl", False)
+    if args.json and not jsonl and "tasks" in response["result"]:
+        print(json.dumps(response["result"]), end="")  # listings need no re-validation
+        return response["exit_code"]
+    result = CommandResult.from_payload(response["result"], response["exit_code"])
+    result.message = response.get("message")
+    return render_result(result, args.json, jsonl)
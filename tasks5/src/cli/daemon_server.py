@@ -0,0 +1,88 @@
+"""Task daemon: serves the task commands (all but `serve`) for one store over a Unix domain socket.
+
+The store is kept resident in memory (`ResidentTaskRepository`), so requests
+skip interpreter startup, argument parsing, JSON parsing and per-record
+validation. See `daemon_client` for the wire protocol.
+"""
+from __future__ import annotations
+import argparse
+import json
+import socketserver
+from typing import Tuple
+
+from src.cli.commands import create as create_cmd
+from src.cli.commands import delete as delete_cmd
+from src.cli.commands import import_ as import_cmd
+from src.cli.commands import list as list_cmd
+from src.cli.commands import search as search_cmd
+from src.cli.commands import update as update_cmd
+from src.cli.commands import verify as verify_cmd
+from src.cli.commands.common import CommandResult
+from src.repository import durability
+from src.repository.base import TaskRepository
+from src.repository.errors import RepositoryError
+
+COMMANDS = {
+    "create": create_cmd, "list": list_cmd, "search": search_cmd, "update": update_cmd, "delete": delete_cmd,
+    "import": import_cmd, "verify": verify_cmd,
+}
+
+
+def handle_request(request: dict, store_key: Tuple[str, str], repo: TaskRepository) -> dict:
+    """Execute one protocol request against `repo` and build the response document."""
+    if not isinstance(request, dict) or tuple(request.get("store") or ()) != tuple(store_key):
+        return {"handled": False}
+    command = COMMANDS.get(request.get("command"))
+    if command is None:
+        result = CommandResult(exit_code=1, error=f"Unknown command '{request.get('command')}'")
+    else:
+        try:
+            args = request.get("args", {})
+            with durability.requested(_durability(args.get("durability"))):
+                result = command.execute(argparse.Namespace(**args), repo)
+            # Listings are lazy; build the payload here so read errors are reported
+            response = {"exit_code": result.exit_code, "result": result.to_payload()}
+            if result.message is not None:
+                response["message"] = result.message  # human-mode text the payload cannot carry
+            return response
+        except RepositoryError as e:
+            result = CommandResult(exit_code=1, error=str(e))
+        except (AttributeError, TypeError) as e:
+            result = CommandResult(exit_code=1, error=f"Malformed request: {e}")
+    return {"exit_code": result.exit_code, "result": result.to_payload()}
+
+
+def _durability(spec: object) -> object:
+    """`spec` if it is a valid durability level (None for none requested).
+
+    Raises TypeError for an invalid level, so the request is reported as malformed.
+    """
+    try:
+        durability.parse(spec)
+    except (ValueError, AttributeError) as e:
+        raise TypeError(f"invalid durability: {e}")
+    return spec
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+            except ValueError:
+                response = {"exit_code": 1, "result": CommandResult(error="Malformed request").to_payload()}
+            else:
+                response = handle_request(request, self.server.store_key, self.server.repo)
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Threaded Unix socket server bound to one store; the repository serializes access."""
+
+    daemon_threads = True
+
+    def __init__(self, path: str, store_key: Tuple[str, str], repo: TaskRepository) -> None:
+        self.store_key = tuple(store_key)
+        self.repo = repo
+        super().__init__(path, _RequestHandler)
@@ -1,35 +1,120 @@
-"""Formatting helpers for human and JSON outputs."""
+"""Formatting helpers for human and JSON outputs.
+
+The `iter_tasks_*` variants produce the same text in chunks of
+`STREAM_BATCH` tasks, so listings can be written while the repository is
+still reading and never exist as one string.
+"""
 from __future__ import annotations
 import json
-from typing import Iterable
+from json.encoder import encode_basestring_ascii
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Optional
 
 from src.models.task import Task
+from src.services.profiling import span
+
+
+def task_to_json_dict(t: Task) -> dict:
+    return {
+        "id": t.id,
+        "title": t.title,
+        "description": t.description,
+        "status": t.status,
+    }
+
+
+def task_to_json(t: Task) -> str:
+    """`json.dumps(task_to_json_dict(t))`, spelled out for the streaming hot path.
+
+    `Task` validation guarantees the field types (int id, str title and
+    status, str or None description), so this is byte-identical.
+    """
+    desc = "null" if t.description is None else encode_basestring_ascii(t.description)
+    return (
+        f'{{"id": {t.id}, "title": {encode_basestring_ascii(t.title)}, '
+        f'"description": {desc}, "status": {encode_basestring_ascii(t.status)}}}'
+    )
+
+
+def format_task_human(t: Task) -> str:
+    desc = f" - {t.description}" if t.description else ""
+    return f"[{t.id}] {t.title} ({t.status}){desc}"
 
 
 def format_tasks_human(tasks: Iterable[Task]) -> str:
     if not tasks:
         return "No tasks"
-    lines = []
-    for t in tasks:
-        desc = f" - {t.description}" if t.description else ""
-        lines.append(f"[{t.id}] {t.title} ({t.status}){desc}")
-    return "\n".join(lines)
+    return "\n".join(format_task_human(t) for t in tasks)
+
+
+def tasks_payload(tasks: Iterable[Task]) -> dict:
+    return {"tasks": [task_to_json_dict(t) for t in tasks]}
 
 
 def format_tasks_json(tasks: Iterable[Task]) -> str:
-    payload = {
-        "tasks": [
-            {
-                "id": t.id,
-                "title": t.title,
-                "description": t.description,
-                "status": t.status,
-            }
-            for t in tasks
-        ]
-    }
-    return json.dumps(payload)
+    """`json.dumps(tasks_payload(tasks))`, built from `task_to_json` without the per-task dicts."""
+    return "".join(iter_tasks_json(tasks))
+
+
+STREAM_BATCH = 512  # tasks formatted per chunk when streaming
+
+
+def _batches(tasks: Iterable[Task], size: int = STREAM_BATCH) -> Iterator[List[Task]]:
+    it = iter(tasks)
+    while True:
+        with span("output.fetch"):
+            batch = list(islice(it, size))
+        if not batch:
+            return
+        yield batch
+
+
+def iter_tasks_human(tasks: Iterable[Task]) -> Iterator[str]:
+    """Chunks of `format_tasks_human(tasks)` followed by a newline."""
+    empty = True
+    for batch in _batches(tasks):
+        empty = False
+        yield "".join(format_task_human(t) + "\n" for t in batch)
+    if empty:
+        yield "No tasks\n"
+
+
+def iter_tasks_json(tasks: Iterable[Task], footer: Optional[Callable[[], dict]] = None) -> Iterator[str]:
+    """Chunks of `format_tasks_json(tasks)`: the envelope is written around the rows.
+
+    `footer`, called once the rows are written, supplies extra envelope keys
+    (such as `next_cursor`, known only after iterating).
+    """
+    yield '{"tasks": ['
+    separator = ""
+    for batch in _batches(tasks):
+        yield separator + ", ".join(task_to_json(t) for t in batch)
+        separator = ", "
+    extra = footer() if footer is not None else {}
+    yield "]" + "".join(f", {json.dumps(key)}: {json.dumps(value)}" for key, value in extra.items()) + "}"
+
+
+def iter_tasks_jsonl(tasks: Iterable[Task]) -> Iterator[str]:
+    """One JSON object per task per line (JSON Lines), no envelope."""
+    for batch in _batches(tasks):
+        yield "".join(task_to_json(t) + "\n" for t in batch)
+
+
+def format_created_human(task: Task) -> str:
+    return f"Created {format_task_human(task)}"
+
+
+def format_created_json(task: Task) -> str:
+    return json.dumps({"task": task_to_json_dict(task)})
+
+
+def format_count_json(count: int) -> str:
+    return json.dumps({"count": count})
+
+
+def error_payload(message: str, error_type: str = "error") -> dict:
+    return {"error": {"type": error_type, "message": message}}
 
 
 def format_error_json(message: str, error_type: str = "error") -> str:
-    return json.dumps({"error": {"type": error_type, "message": message}})
\ No newline at end of file
+    return json.dumps(error_payload(message, error_type))
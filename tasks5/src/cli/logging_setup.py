@@ -1,5 +1,25 @@
-"""Minimal logging setup."""
-import logging
+"""Minimal logging setup.
 
-def configure_logging(level: int = logging.INFO) -> None:
-    logging.basicConfig(level=level, format="%(levelname)s %(message)s")
\ No newline at end of file
+Logging is configured on first use (`get_logger`), so CLI runs that never log
+do not pay for importing and configuring `logging`.
+"""
+from __future__ import annotations
+
+_configured = False
+
+
+def configure_logging(level: int | None = None) -> None:
+    import logging
+
+    logging.basicConfig(level=logging.INFO if level is None else level, format="%(levelname)s %(message)s")
+
+
+def get_logger(name: str):
+    """Return the logger for `name`, configuring logging on the first call."""
+    global _configured
+    import logging
+
+    if not _configured:
+        configure_logging()
+        _configured = True
+    return logging.getLogger(name)
@@ -1,42 +1,155 @@
-"""CLI entrypoint wiring subcommands."""
+"""CLI entrypoint wiring subcommands.
+
+Startup cost matters for scripted use, so command modules are imported
+lazily: only the subcommand being run is imported and gets its full argument
+parser. The others are registered as stubs only when top-level help or the
+"invalid choice" error may list them (building a parser costs ~0.7 ms); the
+usage line names every command either way.
+"""
 from __future__ import annotations
 import argparse
+import importlib
+import os
 import sys
+import time
+from typing import Iterable, Optional
 
 from src.cli.args_base import build_base_parser
-from src.cli.logging_setup import configure_logging
-from src.cli.commands import create as create_cmd
-from src.cli.commands import list as list_cmd
-from src.cli.commands import search as search_cmd
+from src.cli import daemon_client
+from src.repository.errors import RepositoryError
+from src.services import profiling
+
+# Subcommand name -> (module providing build_parser/run, help shown in the stub)
+COMMANDS = {
+    "create": ("src.cli.commands.create", "Create a new task"),
+    "list": ("src.cli.commands.list", "List tasks optionally filtered by status"),
+    "search": ("src.cli.commands.search", "Search tasks by substring (title or description)"),
+    "update": ("src.cli.commands.update", "Change one task, or every task matching --where-status/--where"),
+    "delete": ("src.cli.commands.delete", "Delete a task"),
+    "import": ("src.cli.commands.import_", "Bulk-create tasks from a JSON-lines or CSV file (or stdin)"),
+    "verify": ("src.cli.commands.verify", "Check every stored record and report the invalid ones"),
+    "serve": ("src.cli.commands.serve", "Run a daemon answering create/list/search over a Unix socket"),
+}
+# Global options that take their value as the next token
+VALUE_OPTIONS = ("--store", "--durability", "--profile-dump")
+COMMANDS_METAVAR = "{" + ",".join(COMMANDS) + "}"
+
+
+def _command_module(name: str):
+    return importlib.import_module(COMMANDS[name][0])
+
 
+def requested_command(argv: Iterable[str]) -> Optional[str]:
+    """The subcommand named in `argv` (first positional token), if it is known
+    and no top-level `-h`/`--help` (or an abbreviation of it) comes before it."""
+    skip_value = False
+    for token in argv:
+        if skip_value:
+            skip_value = False
+        elif token in VALUE_OPTIONS:
+            skip_value = True
+        elif token == "-h" or (len(token) > 2 and "--help".startswith(token)):
+            return None
+        elif not token.startswith("-"):
+            return token if token in COMMANDS else None
+    return None
 
-def build_parser() -> argparse.ArgumentParser:
+
+def build_parser(selected: Optional[Iterable[str]] = None, stubs: bool = True) -> argparse.ArgumentParser:
+    """Parser with full subparsers for `selected` commands (default: all) and,
+    with `stubs`, placeholder subparsers for the rest."""
     parser = build_base_parser()
-    subparsers = parser.add_subparsers(dest="command", required=True)
-    create_cmd.build_parser(subparsers)
-    list_cmd.build_parser(subparsers)
-    search_cmd.build_parser(subparsers)
+    # Without stubs the usage line would list `selected` only
+    subparsers = parser.add_subparsers(dest="command", required=True, metavar=None if stubs else COMMANDS_METAVAR)
+    selected = set(COMMANDS if selected is None else selected)
+    for name, (_, help_text) in COMMANDS.items():
+        if name in selected:
+            _command_module(name).build_parser(subparsers)
+        elif stubs:
+            subparsers.add_parser(name, help=help_text)
     return parser
 
 
 def dispatch(args: argparse.Namespace) -> int:
     json_mode = getattr(args, "json", False)
-    if args.command == "create":
-        return create_cmd.run(args, json_mode=json_mode)
-    if args.command == "list":
-        return list_cmd.run(args, json_mode=json_mode)
-    if args.command == "search":
-        return search_cmd.run(args, json_mode=json_mode)
+    if args.command in COMMANDS:
+        return _command_module(args.command).run(args, json_mode=json_mode)
     print("Unknown command", file=sys.stderr)
     return 1
 
 
+def profile_requested(args: argparse.Namespace) -> bool:
+    """Whether `--profile` was given or `$TASKS_PROFILE` is set (to anything but "" or "0")."""
+    return args.profile or os.environ.get(profiling.ENV_VAR, "") not in ("", "0")
+
+
 def main(argv: list[str] | None = None) -> int:
-    configure_logging()
-    parser = build_parser()
+    started = time.perf_counter()
+    argv = sys.argv[1:] if argv is None else argv
+    command = requested_command(argv)
+    parser = build_parser([command], stubs=False) if command else build_parser([])
     args = parser.parse_args(argv)
-    return dispatch(args)
+    if profile_requested(args):
+        return run_profiled(args, started)
+    return run(args)
+
+
+def run_profiled(args: argparse.Namespace, started: float) -> int:
+    """`run(args)` with profiling spans on; the breakdown goes to stderr afterwards.
+
+    `started` (a `time.perf_counter()` value) marks the start of argument
+    parsing, which is recorded as the `cli.parse` phase.
+    """
+    profiling.enable(started)
+    profiling.record("cli.parse", time.perf_counter() - started)
+    profiler = None
+    if args.profile_dump:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        with profiling.span("command"):
+            return run(args)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.profile_dump)
+        data = profiling.report()
+        profiling.disable()
+        if args.json or getattr(args, "jsonl", False):
+            import json
+
+            print(json.dumps({"profile": data}), file=sys.stderr)
+        else:
+            print(profiling.format_report(data), file=sys.stderr)
+
+
+def run(args: argparse.Namespace) -> int:
+    """Execute parsed `args` (through the daemon when one is listening); returns the exit code."""
+    try:
+        if not args.no_daemon:
+            with profiling.span("daemon.forward"):
+                forwarded = daemon_client.forward(args)
+            if forwarded is not None:
+                return forwarded
+        if args.durability is None:
+            return dispatch(args)
+        from src.repository import durability
+
+        with durability.requested(args.durability):
+            return dispatch(args)
+    except RepositoryError as e:
+        from src.cli.commands.common import print_error
+
+        print_error(str(e), getattr(args, "json", False) or getattr(args, "jsonl", False))
+        return 1
+    except BrokenPipeError:
+        # Output is streamed, so a reader that quits early (`| head`) is normal;
+        # point stdout at devnull so the interpreter's final flush stays quiet.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
 
 
 if __name__ == "__main__":  # pragma: no cover
-    raise SystemExit(main())
\ No newline at end of file
+    raise SystemExit(main())
@@ -0,0 +1,265 @@
+"""Columnar in-memory task table.
+
+`list[Task]` costs a Python object per task, per string and per id. A
+`TaskTable` keeps the same tasks in a handful of flat buffers:
+
+- `ids`: `array('I')` of task ids (row order = insertion order);
+- `codes`: `bytearray` with one byte per row, the index of the status in
+  `ALLOWED_STATUSES`, plus `NO_DESCRIPTION` when the description is None;
+- `text`: UTF-8 titles and descriptions, each followed by a NUL byte; row
+  i's title is `text[starts[i]:splits[i] - 1]` and its description
+  `text[splits[i]:starts[i + 1] - 1]`.
+
+Rows can be changed in place: a status change rewrites one code byte; new
+text is spliced into `text` and the offsets of later rows are shifted, as is
+removing a row.
+
+Status filters and substring scans run over the buffers (`re`, `str.find`,
+`str.split` in C) and yield row numbers; `Task` objects are only built for
+the rows a caller actually reads, via `task(row)` or iteration.
+
+Substring scans decode and lowercase a chunk of rows at a time (one C call
+per chunk when it is ASCII) and skip chunks without a hit; hits in the rest
+are mapped to rows by offset (few hits) or by splitting the chunk on the NUL
+separators (many hits). Chunks with non-ASCII bytes (or NULs inside a field)
+are checked row by row, so results always match
+`services.search.search_tasks`.
+"""
+from __future__ import annotations
+import re
+from bisect import bisect_left, bisect_right
+from array import array
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from .status import ALLOWED_STATUSES
+from .task import Task, trusted_task
+
+NO_DESCRIPTION = len(ALLOWED_STATUSES)  # added to the status code
+_STATUS_CODES = {status: code for code, status in enumerate(ALLOWED_STATUSES)}
+SCAN_CHUNK = 1024  # rows lowercased per step of a substring scan
+
+
+class TaskTable:
+    """Columnar store of validated tasks.
+
+    Rows are appended or replaced from `Task` objects (already validated), so reading a
+    row back always yields a valid task. Ids are 32-bit until one needs more,
+    offsets until the text passes 4 GiB; both widen to 64-bit after.
+    """
+
+    __slots__ = ("ids", "codes", "text", "starts", "splits")
+
+    def __init__(self, tasks: Iterable[Task] = ()) -> None:
+        self.ids = array("I")
+        self.codes = bytearray()
+        self.text = bytearray()
+        self.starts = array("I", [0])
+        self.splits = array("I")
+        self.extend(tasks)
+
+    def append(self, task: Task) -> None:
+        """Add `task` as the last row.
+
+        Raises OverflowError if its id does not fit in 64 bits.
+        """
+        self.extend((task,))
+
+    def extend(self, tasks: Iterable[Task]) -> None:
+        """Append `tasks` in order, a batch of rows per buffer update.
+
+        Raises OverflowError if an id does not fit in 64 bits (rows of the
+        failing batch are not added).
+        """
+        it = iter(tasks)
+        while True:
+            batch = list(islice(it, SCAN_CHUNK))
+            if not batch:
+                return
+            self._extend_batch(batch)
+
+    def _extend_batch(self, batch: List[Task]) -> None:
+        ids = [t.id for t in batch]
+        try:
+            ids = array(self.ids.typecode, ids)
+        except OverflowError:
+            ids = array("Q", ids)
+            self.ids = array("Q", self.ids)
+        codes, parts, splits, starts = bytearray(), [], [], []
+        end = len(self.text)
+        for t in batch:
+            title = t.title.encode("utf-8")
+            code = _STATUS_CODES[t.status]
+            if t.description is None:
+                code += NO_DESCRIPTION
+                description = b""
+            else:
+                description = t.description.encode("utf-8")
+            codes.append(code)
+            parts.append(title)
+            parts.append(description)
+            end += len(title) + 1
+            splits.append(end)
+            end += len(description) + 1
+            starts.append(end)
+        parts.append(b"")  # terminator after the last description
+        if end > 0xFFFFFFFF and self.starts.typecode == "I":
+            self.starts = array("Q", self.starts)
+            self.splits = array("Q", self.splits)
+        self.ids += ids
+        self.codes += codes
+        self.text += b"\0".join(parts)
+        self.splits.extend(splits)
+        self.starts.extend(starts)
+
+    def replace(self, row: int, task: Task) -> None:
+        """Store `task` in `row`. Changing only the status rewrites one byte;
+        changed text costs O(rows after `row`) to shift their offsets.
+
+        Raises OverflowError if the new id does not fit the id column.
+        """
+        title = task.title.encode("utf-8")
+        code = _STATUS_CODES[task.status]
+        if task.description is None:
+            code += NO_DESCRIPTION
+            description = b""
+        else:
+            description = task.description.encode("utf-8")
+        self.ids[row] = task.id
+        self.codes[row] = code
+        start, end = self.starts[row], self.starts[row + 1]
+        packed = title + b"\0" + description + b"\0"
+        if self.text[start:end] == packed:
+            return
+        self.text[start:end] = packed
+        self.splits[row] = start + len(title) + 1
+        self._shift(row + 1, len(packed) - (end - start))
+
+    def delete(self, row: int) -> None:
+        """Remove `row`; later rows move up by one (O(rows after `row`))."""
+        start, end = self.starts[row], self.starts[row + 1]
+        del self.text[start:end]
+        del self.ids[row]
+        del self.codes[row]
+        del self.splits[row]
+        del self.starts[row]  # row's old end, moved down below, becomes its start
+        self._shift(row, start - end)
+
+    def _shift(self, row: int, delta: int) -> None:
+        """Move the text offsets of rows from `row` on by `delta` bytes."""
+        if not delta:
+            return
+        if len(self.text) > 0xFFFFFFFF and self.starts.typecode == "I":
+            self.starts = array("Q", self.starts)
+            self.splits = array("Q", self.splits)
+        for column in (self.starts, self.splits):
+            column[row:] = array(column.typecode, [offset + delta for offset in column[row:]])
+
+    def row_of(self, task_id: int) -> Optional[int]:
+        """Row holding `task_id`: a binary search when rows are in id order, else a scan."""
+        row = bisect_left(self.ids, task_id)
+        if row < len(self.ids) and self.ids[row] == task_id:
+            return row
+        try:
+            return self.ids.index(task_id)
+        except ValueError:
+            return None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __iter__(self) -> Iterator[Task]:
+        return self.tasks(range(len(self)))
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the buffers (excluding over-allocation)."""
+        return sum(len(buf) * buf.itemsize for buf in (self.ids, self.starts, self.splits)) + len(self.codes) + len(self.text)
+
+    def task(self, row: int) -> Task:
+        """Materialize the `Task` stored in `row` (rows hold validated tasks: not re-checked)."""
+        return trusted_task(*self.fields(row))
+
+    def fields(self, row: int) -> Tuple[int, str, Optional[str], str]:
+        """(id, title, description, status) of `row`, without building a `Task`."""
+        start, split = self.starts[row], self.splits[row]
+        code = self.codes[row]
+        if code >= NO_DESCRIPTION:
+            description, code = None, code - NO_DESCRIPTION
+        else:
+            description = self.text[split:self.starts[row + 1] - 1].decode("utf-8")
+        return self.ids[row], self.text[start:split - 1].decode("utf-8"), description, ALLOWED_STATUSES[code]
+
+    def tasks(self, rows: Iterable[int]) -> Iterator[Task]:
+        """Materialize `rows` lazily, in the given order."""
+        task = self.task
+        return (task(row) for row in rows)
+
+    def rows_with_status(self, status: str, start: int = 0) -> Iterator[int]:
+        """Rows from `start` on whose status is `status` (none for an unknown status), in row order."""
+        code = _STATUS_CODES.get(status)
+        if code is None:
+            return iter(())
+        pattern = re.compile(b"[" + re.escape(bytes([code, code + NO_DESCRIPTION])) + b"]")
+        # Snapshot the codes so rows appended meanwhile do not shift the scan
+        return (m.start() for m in pattern.finditer(bytes(self.codes), start))
+
+    def rows_matching(self, needle: str, start: int = 0) -> Iterator[int]:
+        """Rows from `start` on whose title or description contains `needle`
+        (already lowercased), in row order."""
+        if not needle:
+            return iter(range(start, len(self)))
+        return self._scan(needle, start, len(self))
+
+    def first_row_after(self, task_id: int) -> int:
+        """First row whose id is greater than `task_id` (rows must be in id order)."""
+        return bisect_right(self.ids, task_id)
+
+    def _scan(self, needle: str, start: int, count: int) -> Iterator[int]:
+        ascii_needle = needle.isascii()
+        no_nul = "\0" not in needle  # otherwise a match could span the separators
+        starts = self.starts
+        for lo in range(start, count, SCAN_CHUNK):
+            hi = min(lo + SCAN_CHUNK, count)
+            chunk = self.text[starts[lo]:starts[hi]]
+            if chunk.isascii():
+                if not ascii_needle:
+                    continue  # lowercased ASCII text never contains non-ASCII characters
+                # str offsets equal byte offsets on ASCII text
+                lowered = chunk.decode("ascii").lower()
+                hits = lowered.count(needle)
+                if not hits:
+                    continue
+                if no_nul and 4 * hits < hi - lo:
+                    # Few hits: map each match offset to its row. The needle has
+                    # no NUL, so a match never spans a field separator.
+                    yield from _rows_of_offsets(lowered, needle, starts, lo, hi)
+                    continue
+                fields = lowered.split("\0") if no_nul else ()
+                if len(fields) == 2 * (hi - lo) + 1:
+                    yield from _rows_of_fields(fields, needle, lo)
+                    continue
+            yield from (row for row in range(lo, hi) if self._row_contains(row, needle))
+
+    def _row_contains(self, row: int, needle: str) -> bool:
+        start, split, end = self.starts[row], self.splits[row], self.starts[row + 1]
+        text = self.text
+        return needle in text[start:split - 1].decode("utf-8").lower() or needle in text[split:end - 1].decode("utf-8").lower()
+
+
+def _rows_of_offsets(lowered: str, needle: str, starts: array, lo: int, hi: int) -> Iterator[int]:
+    """Rows `lo..hi` whose text (`lowered`, starting at row `lo`) contains `needle`."""
+    base = starts[lo]
+    pos = lowered.find(needle)
+    while pos != -1:
+        row = bisect_right(starts, base + pos, lo, hi) - 1
+        yield row
+        pos = lowered.find(needle, starts[row + 1] - base)
+
+
+def _rows_of_fields(fields: List[str], needle: str, first_row: int) -> Iterator[int]:
+    """Rows owning a field that contains `needle` (fields alternate title, description)."""
+    return iter(dict.fromkeys([first_row + (i >> 1) for i, field in enumerate(fields) if needle in field]))
+
+
+__all__ = ["TaskTable", "NO_DESCRIPTION", "SCAN_CHUNK"]
@@ -0,0 +1,326 @@
+"""Async repository API for embedding the stores in asyncio services.
+
+`AsyncTaskRepository` mirrors `TaskRepository` with coroutines (and async
+iterators for the streaming `iter_*` calls). `ExecutorTaskRepository`
+implements it over any synchronous repository by running the blocking calls
+on a bounded thread pool, so file and SQLite I/O never block the event loop:
+
+- Writes are coalesced. While one write is in flight, creates and saves
+  issued meanwhile queue up and go to the store as one `create_many` /
+  `save_many` once it finishes (a JSON store rewrites its document once for
+  all of them). Each caller still gets its own result or error: if a
+  combined write fails, its requests are retried one by one.
+- Identical concurrent reads share one pending call: ten coroutines awaiting
+  `load_all_tasks()` cause one parse, not ten. Every caller gets its own
+  list. A read issued after a write has completed never joins a call that
+  started before it.
+- `iter_*` pull results from the store's streaming iterators in batches, on
+  the pool, so large listings are not materialized.
+
+The SQLite backend already shares one connection behind a lock (the model
+aiosqlite uses), so it is wrapped the same way as the file stores.
+"""
+from __future__ import annotations
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import (
+    TYPE_CHECKING, AsyncIterator, Callable, Dict, Hashable, Iterator, List, Mapping, Optional, Sequence, Tuple,
+    TypeVar,
+)
+
+from src.models.task import Task, TaskDraft
+from src.services import id_allocator
+from src.services.filtering import filter_by_status
+from src.services.pagination import Page
+from src.services.search import search_tasks
+
+from .base import TaskRepository
+
+if TYPE_CHECKING:
+    from src.services.query import Query
+
+T = TypeVar("T")
+
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+ITER_BATCH = 512  # tasks fetched per executor round trip by the async iterators
+
+_CREATE, _SAVE = "create", "save"
+
+
+class AsyncTaskRepository:
+    """Asynchronous counterpart of `TaskRepository`.
+
+    Implementations must provide `load_all_tasks` and `save_new_task`; the
+    other calls default to the same services-layer fallbacks as the
+    synchronous contract. Errors are those of the matching `TaskRepository`
+    method.
+    """
+
+    async def load_all_tasks(self) -> List[Task]:  # pragma: no cover - interface
+        raise NotImplementedError
+
+    async def save_new_task(self, task: Task) -> None:  # pragma: no cover - interface
+        raise NotImplementedError
+
+    async def save_many(self, tasks: Sequence[Task]) -> None:
+        for task in tasks:
+            await self.save_new_task(task)
+
+    async def next_id(self) -> int:
+        return id_allocator.next_id(await self.load_all_tasks())
+
+    async def create_task(self, title: str, description: Optional[str] = None, status: str = "todo") -> Task:
+        """Create and persist one task with the next free id.
+
+        Raises ValueError if the task fails validation.
+        """
+        return (await self.create_many([TaskDraft(title, description, status)]))[0]
+
+    async def create_many(self, drafts: Sequence[TaskDraft]) -> List[Task]:
+        """Allocate consecutive ids for `drafts`, persist them and return the tasks.
+
+        Raises ValueError if a draft fails validation (nothing is saved).
+        """
+        first = await self.next_id()
+        tasks = [draft.to_task(first + i) for i, draft in enumerate(drafts)]
+        await self.save_many(tasks)
+        return tasks
+
+    async def get_task(self, task_id: int) -> Optional[Task]:
+        return next((t for t in await self.load_all_tasks() if t.id == task_id), None)
+
+    async def list_tasks(self, status: str | None = None, page: Optional[Page] = None) -> List[Task]:
+        return filter_by_status(await self.load_all_tasks(), status, page)
+
+    async def search_tasks(self, query: str, page: Optional[Page] = None) -> List[Task]:
+        """Raises ValueError if query is blank."""
+        return search_tasks(await self.load_all_tasks(), query, page=page)
+
+    async def query_tasks(self, query: "Query", page: Optional[Page] = None) -> List[Task]:
+        from src.services.query import select_tasks
+
+        return select_tasks(await self.load_all_tasks(), query, page=page)
+
+    async def iter_tasks(self, status: str | None = None, page: Optional[Page] = None) -> AsyncIterator[Task]:
+        """`list_tasks` as an async iterator; implementations that can stream override it."""
+        for task in await self.list_tasks(status, page):
+            yield task
+
+    async def iter_search(self, query: str, page: Optional[Page] = None) -> AsyncIterator[Task]:
+        """`search_tasks` as an async iterator.
+
+        Raises ValueError if query is blank (before anything is yielded).
+        """
+        for task in await self.search_tasks(query, page):
+            yield task
+
+    async def iter_query(self, query: "Query", page: Optional[Page] = None) -> AsyncIterator[Task]:
+        for task in await self.query_tasks(query, page):
+            yield task
+
+    async def update_task(self, task_id: int, **changes: object) -> Task:  # pragma: no cover - interface
+        raise NotImplementedError
+
+    async def delete_task(self, task_id: int) -> Task:  # pragma: no cover - interface
+        raise NotImplementedError
+
+    async def update_where(
+        self, changes: Mapping[str, object], status: str | None = None, query: Optional["Query"] = None
+    ) -> int:  # pragma: no cover - interface
+        raise NotImplementedError
+
+    async def aclose(self) -> None:
+        """Release resources held by the implementation (default: none)."""
+
+    async def __aenter__(self) -> "AsyncTaskRepository":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
+
+
+class ExecutorTaskRepository(AsyncTaskRepository):
+    """`AsyncTaskRepository` running a synchronous `repo` on a pool of at most
+    `max_workers` threads (see the module docstring for write coalescing and
+    shared reads).
+
+    Use one instance per event loop. `aclose()` (or `async with`) waits for
+    queued writes and shuts the pool down; the wrapped repository stays open.
+    Raises ValueError if `max_workers` is below 1.
+    """
+
+    def __init__(self, repo: TaskRepository, max_workers: int = DEFAULT_WORKERS) -> None:
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.repo = repo
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._reads: Dict[Hashable, asyncio.Future] = {}
+        self._queue: List[Tuple[str, list, asyncio.Future]] = []
+        self._writer: Optional[asyncio.Task] = None
+
+    async def _run(self, fn: Callable[..., T], *args: object, **kwargs: object) -> T:
+        """`fn(*args, **kwargs)` on the pool."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="tasks-async")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
+    async def _shared(self, fn: Callable[..., List[Task]], *args: object) -> List[Task]:
+        """`fn(*args)` on the pool, joining an identical call still pending (the result is copied per caller)."""
+        key = (fn.__name__,) + args
+        pending = self._reads.get(key)
+        if pending is None:
+            pending = self._reads[key] = asyncio.ensure_future(self._run(fn, *args))
+            pending.add_done_callback(lambda done: self._reads.pop(key, None) if self._reads.get(key) is done else None)
+        return list(await asyncio.shield(pending))
+
+    def _written(self) -> None:
+        """Forget pending reads, so reads issued from now on see the write that just completed."""
+        self._reads = {}
+
+    async def load_all_tasks(self) -> List[Task]:
+        return await self._shared(self.repo.load_all_tasks)
+
+    async def list_tasks(self, status: str | None = None, page: Optional[Page] = None) -> List[Task]:
+        return await self._shared(self.repo.list_tasks, status, page)
+
+    async def search_tasks(self, query: str, page: Optional[Page] = None) -> List[Task]:
+        return await self._shared(self.repo.search_tasks, query, page)
+
+    async def query_tasks(self, query: "Query", page: Optional[Page] = None) -> List[Task]:
+        return await self._shared(self.repo.query_tasks, query, page)
+
+    async def get_task(self, task_id: int) -> Optional[Task]:
+        return await self._run(self.repo.get_task, task_id)
+
+    async def next_id(self) -> int:
+        return await self._run(self.repo.next_id)
+
+    async def iter_tasks(self, status: str | None = None, page: Optional[Page] = None) -> AsyncIterator[Task]:
+        async for task in self._stream(self.repo.iter_tasks, status, page):
+            yield task
+
+    async def iter_search(self, query: str, page: Optional[Page] = None) -> AsyncIterator[Task]:
+        async for task in self._stream(self.repo.iter_search, query, page):
+            yield task
+
+    async def iter_query(self, query: "Query", page: Optional[Page] = None) -> AsyncIterator[Task]:
+        async for task in self._stream(self.repo.iter_query, query, page):
+            yield task
+
+    async def _stream(self, open_iter: Callable[..., Iterator[Task]], *args: object) -> AsyncIterator[Task]:
+        """Tasks of `open_iter(*args)`, fetched `ITER_BATCH` at a time on the pool."""
+        tasks = await self._run(lambda: iter(open_iter(*args)))
+        try:
+            while True:
+                batch = await self._run(lambda: list(islice(tasks, ITER_BATCH)))
+                for task in batch:
+                    yield task
+                if len(batch) < ITER_BATCH:
+                    return
+        finally:
+            close = getattr(tasks, "close", None)
+            if close is not None:  # release what the store holds open (e.g. a mapped snapshot)
+                await self._run(close)
+
+    async def save_new_task(self, task: Task) -> None:
+        await self._write(_SAVE, [task])
+
+    async def save_many(self, tasks: Sequence[Task]) -> None:
+        """Raises ValueError (or the backend's RepositoryError) if an id is already stored."""
+        if tasks:
+            await self._write(_SAVE, list(tasks))
+
+    async def create_many(self, drafts: Sequence[TaskDraft]) -> List[Task]:
+        for draft in drafts:
+            draft.to_task(1)  # validate here, so an invalid draft never joins a combined write
+        if not drafts:
+            return []
+        return await self._write(_CREATE, list(drafts))
+
+    async def update_task(self, task_id: int, **changes: object) -> Task:
+        try:
+            return await self._run(self.repo.update_task, task_id, **changes)
+        finally:
+            self._written()
+
+    async def delete_task(self, task_id: int) -> Task:
+        try:
+            return await self._run(self.repo.delete_task, task_id)
+        finally:
+            self._written()
+
+    async def update_where(
+        self, changes: Mapping[str, object], status: str | None = None, query: Optional["Query"] = None
+    ) -> int:
+        try:
+            return await self._run(self.repo.update_where, changes, status, query)
+        finally:
+            self._written()
+
+    async def _write(self, kind: str, items: list):
+        """Queue a create or save of `items` and wait for the write that carries it."""
+        done = asyncio.get_running_loop().create_future()
+        self._queue.append((kind, items, done))
+        if self._writer is None:
+            self._writer = asyncio.ensure_future(self._drain())
+        return await done
+
+    async def _drain(self) -> None:
+        """Write queued requests until none are left, consecutive ones of a kind together."""
+        try:
+            while self._queue:
+                queued, self._queue = self._queue, []
+                start = 0
+                for end in range(1, len(queued) + 1):
+                    if end == len(queued) or queued[end][0] != queued[start][0]:
+                        await self._commit(queued[start:end])
+                        start = end
+        finally:
+            self._writer = None
+
+    async def _commit(self, requests: List[Tuple[str, list, asyncio.Future]]) -> None:
+        """One `create_many`/`save_many` for all `requests`, retried one by one if it fails."""
+        kind = requests[0][0]
+        write = self.repo.create_many if kind == _CREATE else self.repo.save_many
+        try:
+            result = await self._run(write, [item for _, items, _ in requests for item in items])
+        except Exception as e:
+            if len(requests) > 1:
+                for request in requests:
+                    await self._commit([request])
+            elif not requests[0][2].done():
+                requests[0][2].set_exception(e)
+            return
+        finally:
+            self._written()
+        offset = 0
+        for _, items, done in requests:
+            if not done.done():  # the caller may have been cancelled
+                done.set_result(result[offset:offset + len(items)] if kind == _CREATE else None)
+            offset += len(items)
+
+    async def aclose(self) -> None:
+        """Wait for queued writes, then shut the thread pool down."""
+        while self._writer is not None:
+            await asyncio.shield(self._writer)
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            await asyncio.get_running_loop().run_in_executor(None, executor.shutdown)
+
+
+def open_async_repository(store: str | None = None, max_workers: int = DEFAULT_WORKERS) -> ExecutorTaskRepository:
+    """`ExecutorTaskRepository` over the registry's cached repository for `store`.
+
+    Raises RepositoryError for an unknown store scheme or option.
+    """
+    from .registry import get_repository
+
+    return ExecutorTaskRepository(get_repository(store), max_workers)
+
+
+__all__ = ["AsyncTaskRepository", "DEFAULT_WORKERS", "ExecutorTaskRepository", "ITER_BATCH", "open_async_repository"]
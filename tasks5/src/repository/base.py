@@ -0,0 +1,186 @@
+"""Base repository interface shared by all storage backends."""
+from __future__ import annotations
+from typing import TYPE_CHECKING, Hashable, Iterator, List, Mapping, NamedTuple, Optional, Sequence
+
+from src.models.task import Task, TaskDraft
+
+if TYPE_CHECKING:
+    from src.services.pagination import Page
+    from src.services.query import Query
+    from src.services.ranking import TermStats
+
+
+class BadRecord(NamedTuple):
+    """A stored record that is not a valid task (reads skip it)."""
+
+    position: int  # 0-based place in the store's own order
+    id: object  # the stored id, whatever its type (None when missing)
+    reason: str
+
+
+class Verification(NamedTuple):
+    """Outcome of `TaskRepository.verify`."""
+
+    checked: int  # records examined
+    invalid: List[BadRecord]
+    removed: bool = False  # whether `invalid` were deleted (`fix`)
+
+
+class TaskRepository:
+    """Persistence contract used by the CLI and services.
+
+    Backends must implement `load_all_tasks` and `save_new_task`, and
+    `update_task` / `delete_task` / `update_where` if they support changing
+    tasks (each writes only the affected records). The query helpers default
+    to a full load followed by the services layer; backends with native
+    indexes override them, and those that can read incrementally override the
+    `iter_*` variants used by the CLI to stream output.
+    """
+
+    def load_all_tasks(self) -> List[Task]:  # pragma: no cover - interface
+        raise NotImplementedError
+
+    def save_new_task(self, task: Task) -> None:  # pragma: no cover - interface
+        raise NotImplementedError
+
+    def next_id(self) -> int:
+        """Next free task id (default: scan of all tasks)."""
+        from src.services.id_allocator import next_id
+
+        return next_id(self.load_all_tasks())
+
+    def create_task(self, title: str, description: Optional[str] = None, status: str = "todo") -> Task:
+        """Create and persist one task with the next free id.
+
+        Raises ValueError if the task fails validation.
+        """
+        return self.create_many([TaskDraft(title, description, status)])[0]
+
+    def create_many(self, drafts: Sequence[TaskDraft]) -> List[Task]:
+        """Allocate consecutive ids for `drafts`, persist them and return the tasks.
+
+        Backends with a persisted counter override this to reserve the ids in
+        the same write as the insert.
+        Raises ValueError if a draft fails validation (nothing is saved).
+        """
+        first = self.next_id()
+        tasks = [draft.to_task(first + i) for i, draft in enumerate(drafts)]
+        self.save_many(tasks)
+        return tasks
+
+    def save_many(self, tasks: Sequence[Task]) -> None:
+        """Persist several new tasks; backends override this to write once."""
+        for task in tasks:
+            self.save_new_task(task)
+
+    def get_task(self, task_id: int) -> Optional[Task]:
+        """The task with `task_id`, or None (default: scan of a full load)."""
+        return next((t for t in self.load_all_tasks() if t.id == task_id), None)
+
+    def update_task(self, task_id: int, **changes: object) -> Task:
+        """Set `changes` (any of `title`, `description`, `status`) on one task
+        and return the updated task.
+
+        Raises TaskNotFoundError if no task has `task_id` and ValueError if a
+        change is invalid (nothing is written then).
+        """
+        raise NotImplementedError  # pragma: no cover - interface
+
+    def delete_task(self, task_id: int) -> Task:
+        """Remove one task and return it. Its id is never handed out again.
+
+        Raises TaskNotFoundError if no task has `task_id`.
+        """
+        raise NotImplementedError  # pragma: no cover - interface
+
+    def update_where(
+        self, changes: Mapping[str, object], status: str | None = None, query: Optional["Query"] = None
+    ) -> int:
+        """Apply `changes` to every task with `status` (any status when None)
+        that also matches `query` (if given); returns the number of tasks updated.
+
+        Raises ValueError if a change is invalid (nothing is written then).
+        """
+        raise NotImplementedError  # pragma: no cover - interface
+
+    def verify(self, fix: bool = False) -> Verification:
+        """Fully validate every stored record and report those that are not
+        valid tasks; with `fix`, delete them.
+
+        Backends that read records without re-validating them (see
+        `JsonTaskRepository`) mark the store as validated once it passes or
+        is fixed. The default covers backends that only hold `Task` objects.
+        """
+        return Verification(len(self.load_all_tasks()), [])
+
+    def change_stamp(self) -> Optional[Hashable]:
+        """A value that changes whenever the stored tasks change, in this
+        process or any other; callers keeping tasks between requests (see
+        `ResidentTaskRepository`) compare it to notice outside writes.
+
+        None when the backend cannot tell (only its own writes are then seen).
+        """
+        return None
+
+    def _where(self, status: str | None, query: Optional["Query"]) -> Iterator[Task]:
+        """Tasks selected by `update_where`'s filters, in id order."""
+        if query is None:
+            return self.iter_tasks(status)
+        matches = self.iter_query(query)
+        return matches if status is None else (t for t in matches if t.status == status)
+
+    def list_tasks(self, status: str | None = None, page: Optional[Page] = None) -> List[Task]:
+        """Tasks with the given status (all tasks when status is None), in id order.
+
+        `page` selects a slice of them (see `services.pagination`); backends
+        should stop reading once it is full.
+        """
+        from src.services.filtering import filter_by_status
+
+        return filter_by_status(self.load_all_tasks(), status, page)
+
+    def search_tasks(self, query: str, page: Optional[Page] = None, jobs: int = 1) -> List[Task]:
+        """Tasks whose title or description contains `query` (case-insensitive), in id order.
+
+        Backends that can split a large scan use up to `jobs` workers; the
+        results are the same either way.
+        Raises ValueError if query is blank.
+        """
+        from src.services.search import search_tasks
+
+        return search_tasks(self.load_all_tasks(), query, page=page)
+
+    def query_tasks(self, query: "Query", page: Optional[Page] = None) -> List[Task]:
+        """Tasks matching a parsed `services.query.Query`, in id order, in one pass.
+
+        Backends with indexes use the query's plan (statuses, id range,
+        required substrings) to narrow the candidates before its predicate runs.
+        """
+        from src.services.query import select_tasks
+
+        return select_tasks(self.load_all_tasks(), query, page=page)
+
+    def term_stats(self, terms: Sequence[str] = ()) -> "TermStats":
+        """BM25 statistics (see `services.ranking`) covering at least `terms`.
+
+        The default counts a full load; backends keep a table that is updated
+        as tasks are saved.
+        """
+        from src.services.ranking import TermStats
+
+        return TermStats.build((t.title, t.description) for t in self.load_all_tasks())
+
+    def iter_tasks(self, status: str | None = None, page: Optional[Page] = None) -> Iterator[Task]:
+        """`list_tasks` as an iterator; backends that can stream override it."""
+        return iter(self.list_tasks(status, page))
+
+    def iter_search(self, query: str, page: Optional[Page] = None, jobs: int = 1) -> Iterator[Task]:
+        """`search_tasks` as an iterator; backends that can stream override it.
+
+        Raises ValueError if query is blank (before anything is yielded).
+        """
+        return iter(self.search_tasks(query, page, jobs))
+
+    def iter_query(self, query: "Query", page: Optional[Page] = None) -> Iterator[Task]:
+        """`query_tasks` as an iterator; backends that can stream override it."""
+        return iter(self.query_tasks(query, page))
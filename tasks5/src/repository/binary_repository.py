@@ -0,0 +1,256 @@
+"""Binary snapshot repository: tasks in a memory-mapped `repository.snapshot` file."""
+from __future__ import annotations
+import pathlib
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Callable, Iterator, List, Mapping, Optional, Sequence, TypeVar
+
+from .base import BadRecord, TaskRepository, Verification
+from .durability import Durability, atomic_write, resolve
+from .durability import parse as parse_durability
+from .errors import AtomicWriteError, CorruptDataError, TaskNotFoundError
+from .locking import FileLock
+from .snapshot import Snapshot, SnapshotEditor, SnapshotFormatError
+from .task_cache import FileIdentity, file_identity
+from src.models.task import Task, TaskDraft, record_error, validate_changes
+from src.services.pagination import Page, table_page
+from src.services.profiling import span
+
+if TYPE_CHECKING:
+    from src.services.query import Query
+
+T = TypeVar("T")
+
+
+class BinaryTaskRepository(TaskRepository):
+    """Repository keeping tasks in a binary snapshot (header, fixed-width
+    record index, string heap; see `repository.snapshot`).
+
+    Reads map the file and touch only what they need: opening costs one
+    header unpack, `get_task` finds its row directly (or by binary search when
+    ids have gaps), status filters read only the index, and only returned
+    tasks are decoded. Nothing is parsed up front.
+
+    Writes hold an exclusive `flock` on `<name>.lock`, copy the index and heap
+    once, apply the change (appended rows, patched entries, new text at the
+    heap's end) and replace the file atomically, so readers never see a
+    partial write; `durability` sets when they are fsynced (see
+    `repository.durability`). A missing file is an empty store.
+    """
+
+    def __init__(
+        self, path: pathlib.Path | str = pathlib.Path("tasks.bin"), durability: Durability | str | None = None
+    ) -> None:
+        self.path = pathlib.Path(path)
+        self.durability = parse_durability(durability)
+        self._file_lock = FileLock(self.path.with_name(self.path.name + ".lock"))
+
+    @contextmanager
+    def _snapshot(self) -> Iterator[Optional[Snapshot]]:
+        """The mapped snapshot (None while the store does not exist), unmapped on exit.
+
+        Raises CorruptDataError if the file is not a snapshot; it is renamed
+        to `<name>.bak-<timestamp>` first, leaving an empty store.
+        """
+        try:
+            snapshot = Snapshot.open(self.path)
+        except FileNotFoundError:
+            yield None
+            return
+        except SnapshotFormatError:
+            backup = self.path.parent / f"{self.path.name}.bak-{int(time.time())}"
+            with self._file_lock:
+                try:
+                    self.path.rename(backup)
+                except OSError:
+                    backup = None
+            raise CorruptDataError(f"Corrupt snapshot backed up to {backup}")
+        with snapshot:
+            yield snapshot
+
+    def change_stamp(self) -> Optional[FileIdentity]:
+        """The file's identity: every write replaces it."""
+        return file_identity(self.path)
+
+    def load_all_tasks(self) -> List[Task]:
+        try:
+            with self._snapshot() as snapshot:
+                if snapshot is None:
+                    return []
+                with span("tasks.build"):
+                    return snapshot.all_tasks()
+        except CorruptDataError:
+            return []
+
+    def get_task(self, task_id: int) -> Optional[Task]:
+        with self._snapshot() as snapshot:
+            row = snapshot.row_of(task_id) if snapshot is not None else None
+            return snapshot.task(row) if row is not None else None
+
+    def next_id(self) -> int:
+        with self._snapshot() as snapshot:
+            return snapshot.next_id if snapshot is not None else 1
+
+    def list_tasks(self, status: str | None = None, page: Optional[Page] = None) -> List[Task]:
+        return list(self.iter_tasks(status, page))
+
+    def iter_tasks(self, status: str | None = None, page: Optional[Page] = None) -> Iterator[Task]:
+        if status is None:
+            return self._rows(lambda snapshot, start: range(start, len(snapshot)), page)
+        return self._rows(lambda snapshot, start: snapshot.rows_with_status(status, start), page)
+
+    def search_tasks(self, query: str, page: Optional[Page] = None, jobs: int = 1) -> List[Task]:
+        return list(self.iter_search(query, page, jobs))
+
+    def iter_search(self, query: str, page: Optional[Page] = None, jobs: int = 1) -> Iterator[Task]:
+        if not isinstance(query, str) or not query.strip():
+            raise ValueError("Search query cannot be blank")
+        needle = query.lower()
+        return self._rows(lambda snapshot, start: snapshot.rows_matching(needle, start), page)
+
+    def query_tasks(self, query: "Query", page: Optional[Page] = None) -> List[Task]:
+        return list(self.iter_query(query, page))
+
+    def iter_query(self, query: "Query", page: Optional[Page] = None) -> Iterator[Task]:
+        from src.services.query import table_rows
+
+        return self._rows(lambda snapshot, start: table_rows(snapshot, query, start), page)
+
+    def _rows(self, select: Callable[[Snapshot, int], Iterator[int]], page: Optional[Page]) -> Iterator[Task]:
+        """Tasks of the rows `select` picks, restricted to `page`; the file stays mapped while iterating."""
+        with self._snapshot() as snapshot:
+            if snapshot is not None:
+                yield from table_page(snapshot, lambda start: select(snapshot, start), page)
+
+    def save_new_task(self, task: Task) -> None:
+        self.save_many([task])
+
+    def save_many(self, tasks: Sequence[Task]) -> None:
+        """Add `tasks` in one write: appended to the index when their ids come
+        after the stored ones, else merged into a re-encoded snapshot.
+
+        Raises ValueError if an id is already stored and AtomicWriteError if
+        the snapshot cannot be written.
+        """
+        if tasks:
+            self._edit(lambda editor, snapshot: editor.insert(tasks))
+
+    def create_many(self, drafts: Sequence[TaskDraft]) -> List[Task]:
+        """Reserve ids from the header counter and append the tasks in one write.
+
+        Raises ValueError if a draft is invalid and AtomicWriteError if the
+        snapshot cannot be written.
+        """
+        for draft in drafts:
+            draft.to_task(1)  # validate before taking the lock
+        if not drafts:
+            return []
+
+        def create(editor: SnapshotEditor, snapshot: Optional[Snapshot]) -> List[Task]:
+            tasks = [draft.to_task(editor.next_id + i) for i, draft in enumerate(drafts)]
+            editor.append(tasks)
+            return tasks
+        return self._edit(create)
+
+    def update_task(self, task_id: int, **changes: object) -> Task:
+        def update(editor: SnapshotEditor, snapshot: Optional[Snapshot]) -> Task:
+            row = _row(snapshot, task_id)
+            old = snapshot.task(row)
+            task = old.replace(**changes)
+            editor.replace(row, old, task)
+            return task
+        return self._edit(update)
+
+    def delete_task(self, task_id: int) -> Task:
+        def delete(editor: SnapshotEditor, snapshot: Optional[Snapshot]) -> Task:
+            row = _row(snapshot, task_id)
+            editor.delete(row)
+            return snapshot.task(row)
+        return self._edit(delete)
+
+    def update_where(
+        self, changes: Mapping[str, object], status: str | None = None, query: Optional["Query"] = None
+    ) -> int:
+        changes = validate_changes(changes)
+
+        def update(editor: SnapshotEditor, snapshot: Optional[Snapshot]) -> int:
+            rows = list(_selected_rows(snapshot, status, query)) if snapshot is not None else []
+            for row in rows:
+                old = snapshot.task(row)
+                editor.replace(row, old, old.replace(**changes))
+            return len(rows)
+        return self._edit(update)
+
+    def verify(self, fix: bool = False) -> Verification:
+        """Validate every record of the snapshot (text, status code and task
+        rules); with `fix`, delete the invalid ones in one write.
+
+        Raises CorruptDataError if the file is not a snapshot and
+        AtomicWriteError if it cannot be rewritten.
+        """
+        with self._snapshot() as snapshot:
+            if snapshot is None:
+                return Verification(0, [])
+            result = Verification(len(snapshot), _invalid_rows(snapshot))
+        if not (fix and result.invalid):
+            return result
+
+        def remove(editor: SnapshotEditor, snapshot: Optional[Snapshot]) -> Verification:
+            invalid = _invalid_rows(snapshot)  # again, under the lock
+            for bad in reversed(invalid):
+                editor.delete(bad.position)
+            return Verification(len(snapshot), invalid, True)
+        return self._edit(remove)
+
+    def _edit(self, change: Callable[[SnapshotEditor, Optional[Snapshot]], T]) -> T:
+        """Apply `change` to an editor over the current snapshot and write the
+        result, all under the store lock.
+
+        Raises AtomicWriteError if the snapshot cannot be written; nothing is
+        written if `change` raises.
+        """
+        with self._file_lock:
+            with self._snapshot() as snapshot:
+                editor = SnapshotEditor(snapshot)
+                result = change(editor, snapshot)
+            editor.generation += 1
+            with span("store.write"):
+                self._write_atomic(editor.encode())
+        return result
+
+    def _write_atomic(self, data: bytes) -> None:
+        try:
+            atomic_write(self.path, data, resolve(self.durability))
+        except OSError as e:  # pragma: no cover - rare failure path
+            raise AtomicWriteError(f"Atomic write failed: {e}")
+
+
+def _row(snapshot: Optional[Snapshot], task_id: int) -> int:
+    row = snapshot.row_of(task_id) if snapshot is not None else None
+    if row is None:
+        raise TaskNotFoundError(f"Task {task_id} not found")
+    return row
+
+
+def _selected_rows(snapshot: Snapshot, status: str | None, query: Optional["Query"]) -> Iterator[int]:
+    """Rows `update_where` changes, in row order."""
+    if query is None:
+        return iter(range(len(snapshot))) if status is None else snapshot.rows_with_status(status)
+    from src.services.query import table_rows
+
+    rows = table_rows(snapshot, query, 0)
+    return rows if status is None else (row for row in rows if snapshot.fields(row)[3] == status)
+
+
+def _invalid_rows(snapshot: Snapshot) -> List[BadRecord]:
+    invalid = []
+    for row in range(len(snapshot)):
+        try:
+            task_id, title, description, status = snapshot.fields(row)
+        except (UnicodeDecodeError, IndexError) as e:
+            invalid.append(BadRecord(row, snapshot.ids[row], f"undecodable record: {e}"))
+            continue
+        reason = record_error({"id": task_id, "title": title, "description": description, "status": status})
+        if reason is not None:
+            invalid.append(BadRecord(row, task_id, reason))
+    return invalid
@@ -0,0 +1,149 @@
+"""JSON encoding and decoding for the stores.
+
+Every document, journal line and sidecar the repositories read or write goes
+through `loads` / `dumps`. They use `orjson` when it is installed, else
+`msgspec`, else the standard library with a precompiled encoder
+(`json.dumps(..., ensure_ascii=False)` builds a new `JSONEncoder` per call).
+Set `TASKS_JSON_CODEC=json|orjson|msgspec` to force one.
+
+Importing a fast backend costs ~25 ms (orjson pulls in `dataclasses` and
+`zoneinfo`), more than the stdlib spends on a small store. Unless a backend is
+forced, the stdlib therefore codes the first `FAST_AFTER_BYTES` of a process
+and the fast one is only loaded once the work repays its import.
+
+The backends accept and produce the same documents: `dumps` returns compact
+UTF-8 bytes, which every reader here (including the byte-level scanners in
+`streaming`) parses like the stdlib's spaced output. Input a fast backend
+rejects (lone surrogates, NaN, integers past 64 bits when encoding) is
+retried with the stdlib. orjson reads integers past 64 bits as floats; ids
+are allocated from 1 and `TaskTable` caps them at 64 bits, so stores written
+here never hold one.
+"""
+from __future__ import annotations
+import json
+import os
+from typing import Callable, Optional, Tuple
+
+from src.services.profiling import span
+
+CODEC_ENV_VAR = "TASKS_JSON_CODEC"
+BACKENDS = ("orjson", "msgspec", "json")
+FAST_AFTER_BYTES = 4 << 20  # coded with the stdlib before a fast backend is loaded
+
+_DECODER = json.JSONDecoder()
+_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+Codec = Tuple[str, Callable[[bytes | str], object], Callable[[object], bytes]]
+_codec: Optional[Codec] = None
+_stdlib_bytes_left = FAST_AFTER_BYTES
+
+
+def _std_loads(data: bytes | str) -> object:
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        data = bytes(data).decode("utf-8")
+    return _DECODER.decode(data)
+
+
+def _std_dumps(obj: object) -> bytes:
+    return _ENCODER.encode(obj).encode("utf-8")
+
+
+def load_backend(name: str) -> Codec:
+    """(name, loads, dumps) for backend `name`.
+
+    Raises ImportError if its module is not installed and ValueError for an
+    unknown name.
+    """
+    if name == "json":
+        return ("json", _std_loads, _std_dumps)
+    if name == "orjson":
+        import orjson
+
+        return ("orjson", _guarded(orjson.loads, (orjson.JSONDecodeError,), _std_loads),
+                _guarded(orjson.dumps, (orjson.JSONEncodeError,), _std_dumps))
+    if name == "msgspec":  # pragma: no cover - msgspec is not installed in CI
+        import msgspec
+
+        return ("msgspec", _guarded(msgspec.json.decode, (msgspec.DecodeError,), _std_loads),
+                _guarded(msgspec.json.encode, (msgspec.EncodeError, OverflowError), _std_dumps))
+    raise ValueError(f"Unknown JSON codec '{name}'. Allowed: {', '.join(BACKENDS)}")
+
+
+def _guarded(fast: Callable, errors: tuple, fallback: Callable) -> Callable:
+    """`fast`, retried with `fallback` when it rejects its input with `errors`."""
+    def call(arg):
+        try:
+            return fast(arg)
+        except errors:
+            return fallback(arg)
+    return call
+
+
+def use(name: Optional[str] = None) -> str:
+    """Select backend `name` (default: the fastest installed); returns the name in use.
+
+    Raises ImportError if a named backend is not installed and ValueError for
+    an unknown name.
+    """
+    global _codec
+    if name:
+        _codec = load_backend(name)
+        return _codec[0]
+    for candidate in BACKENDS:
+        try:
+            _codec = load_backend(candidate)
+        except ImportError:
+            continue
+        return _codec[0]
+    raise AssertionError("unreachable: the stdlib backend always loads")  # pragma: no cover
+
+
+def _active() -> Codec:
+    if _codec is None:
+        use(os.environ.get(CODEC_ENV_VAR))
+    return _codec
+
+
+def _selected() -> Optional[Codec]:
+    """The backend in use, or None while the stdlib is still coding the first `FAST_AFTER_BYTES`."""
+    if _codec is None and _stdlib_bytes_left >= 0 and not os.environ.get(CODEC_ENV_VAR):
+        return None
+    return _active()
+
+
+def _spend(nbytes: int) -> None:
+    global _stdlib_bytes_left
+    _stdlib_bytes_left -= nbytes
+
+
+def backend() -> str:
+    """Name of the backend in use (selecting it if needed)."""
+    return _active()[0]
+
+
+def loads(data: bytes | str) -> object:
+    """Decode one JSON document (UTF-8 bytes or str).
+
+    Raises ValueError if it is not valid JSON.
+    """
+    _spend(len(data))  # counted first, so one large document gets the fast backend
+    codec = _selected()
+    with span("json.decode"):
+        return _std_loads(data) if codec is None else codec[1](data)
+
+
+def dumps(obj: object) -> bytes:
+    """Encode `obj` as compact UTF-8 JSON bytes.
+
+    Raises TypeError if it holds values JSON cannot represent.
+    """
+    codec = _selected()
+    with span("json.encode"):
+        if codec is not None:
+            return codec[2](obj)
+        encoded = _std_dumps(obj)
+    _spend(len(encoded))
+    return encoded
+
+
+__all__ = ["BACKENDS", "CODEC_ENV_VAR", "FAST_AFTER_BYTES", "backend", "dumps", "load_backend", "loads", "use"]
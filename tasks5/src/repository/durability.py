@@ -0,0 +1,218 @@
+"""Durability levels: when the file-backed stores fsync what they write.
+
+- `none`: never fsync. Writes are atomic for readers (temporary file plus
+  `os.replace`) and survive a crash of the process, but an OS crash or power
+  loss can lose recent writes and, on some filesystems, leave the store empty.
+- `batch[:MS[,WRITES]]` (default 50 ms, 64 writes): group commit. A whole-file
+  rewrite still fsyncs its data before it replaces the store (so the store is
+  never left empty), but the directory sync and the fsync of journal appends
+  are queued: every queued file and directory is synced once MS have passed
+  since the first of them or WRITES have accumulated, and at exit. A power
+  loss can lose the last MS (the previous store comes back).
+- `full` (default): the data is fsynced before it replaces the store and
+  the directory after, so a write that returned survives power loss.
+
+The level comes from, in order: `requested()` (the CLI's `--durability`,
+applied to one command), the repository's own setting (constructor argument or
+the store URI's `?durability=`), `$TASKS_DURABILITY`, then `full`. SQLite maps
+the levels to `PRAGMA synchronous` OFF / NORMAL / FULL, since it batches its
+own WAL syncs. Writes merged into another thread's group commit (see
+`repository.group_commit`) are synced at that thread's level.
+"""
+from __future__ import annotations
+import atexit
+import os
+import pathlib
+import threading
+from contextlib import contextmanager
+from typing import Iterator, NamedTuple, Optional, Set
+
+NONE, BATCH, FULL = "none", "batch", "full"
+LEVELS = (NONE, BATCH, FULL)
+ENV_VAR = "TASKS_DURABILITY"
+DEFAULT_LEVEL = FULL
+BATCH_INTERVAL = 0.05  # seconds a batched write may stay unsynced
+BATCH_WRITES = 64  # batched writes that trigger a sync before the interval ends
+
+
+class Durability(NamedTuple):
+    level: str = DEFAULT_LEVEL
+    interval: float = BATCH_INTERVAL  # `batch` only
+    writes: int = BATCH_WRITES  # `batch` only
+
+    def __str__(self) -> str:
+        if self.level != BATCH:
+            return self.level
+        return f"{BATCH}:{self.interval * 1000:g},{self.writes}"
+
+
+def parse(spec: "Durability | str | None") -> Optional[Durability]:
+    """`Durability` for a spec such as `full`, `batch` or `batch:20,100` (None stays None).
+
+    Raises ValueError for an unknown level or malformed batch parameters.
+    """
+    if spec is None or isinstance(spec, Durability):
+        return spec
+    level, _, params = spec.strip().lower().partition(":")
+    if level not in LEVELS or (params and level != BATCH):
+        raise ValueError(f"Invalid durability '{spec}'. Expected one of: none, batch[:MS[,WRITES]], full")
+    if not params:
+        return Durability(level)
+    ms, _, writes = params.partition(",")
+    try:
+        interval, count = float(ms) / 1000, int(writes) if writes else BATCH_WRITES
+    except ValueError:
+        interval = count = -1
+    if not interval >= 0 or count < 1:
+        raise ValueError(f"Invalid durability '{spec}': expected batch:MS,WRITES with MS >= 0 and WRITES >= 1")
+    return Durability(BATCH, interval, count)
+
+
+_local = threading.local()
+
+
+@contextmanager
+def requested(spec: "Durability | str | None") -> Iterator[None]:
+    """Use `spec` for every write made by this thread inside the block (None: no override).
+
+    Raises ValueError if `spec` is invalid.
+    """
+    policy = parse(spec)
+    previous = getattr(_local, "policy", None)
+    _local.policy = policy or previous
+    try:
+        yield
+    finally:
+        _local.policy = previous
+
+
+def resolve(own: Optional[Durability] = None) -> Durability:
+    """Level for a write by a repository configured with `own` (see the module docstring)."""
+    policy = getattr(_local, "policy", None) or own
+    if policy is not None:
+        return policy
+    try:
+        return parse(os.environ.get(ENV_VAR) or DEFAULT_LEVEL)
+    except ValueError:
+        return Durability()
+
+
+def atomic_write(path: pathlib.Path, data: bytes, policy: Durability) -> None:
+    """Replace `path` with `data` via `<path>.tmp` and `os.replace`, synced per `policy`.
+
+    Raises OSError if the file cannot be written.
+    """
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "wb") as fh:
+        fh.write(data)
+        if policy.level != NONE:
+            os.fsync(fh.fileno())
+    os.replace(tmp, path)
+    if policy.level == FULL:
+        sync_directory(path.parent)
+    elif policy.level == BATCH:
+        _batch.add(path, policy, synced=True)
+
+
+def appended(fd: int, path: pathlib.Path, policy: Durability, created: bool = False) -> None:
+    """Sync an append just written to `fd` (open on `path`); `created` if the file was new.
+
+    Raises OSError if the sync fails.
+    """
+    if policy.level == FULL:
+        os.fsync(fd)
+        if created:
+            sync_directory(path.parent)
+    elif policy.level == BATCH:
+        _batch.add(path, policy)
+
+
+def sqlite_synchronous(policy: Durability) -> str:
+    """`PRAGMA synchronous` value for `policy`."""
+    return {NONE: "OFF", BATCH: "NORMAL", FULL: "FULL"}[policy.level]
+
+
+def sync_directory(directory: pathlib.Path) -> None:
+    """fsync `directory`, making renames and new entries in it durable (no-op where unsupported)."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:  # pragma: no cover - e.g. Windows cannot open directories
+        return
+    try:
+        os.fsync(fd)
+    except OSError:  # pragma: no cover - some filesystems reject directory fsync
+        pass
+    finally:
+        os.close(fd)
+
+
+def flush() -> None:
+    """Sync every batched write now."""
+    _batch.flush()
+
+
+class _Batch:
+    """Files and directories written under `batch` that still need an fsync
+    (shared by the whole process)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()  # guards the pending state
+        self._flush_lock = threading.Lock()  # held for a whole flush, syncs included
+        self._paths: Set[pathlib.Path] = set()
+        self._directories: Set[pathlib.Path] = set()
+        self._writes = 0
+        self._timer: Optional[threading.Timer] = None
+        self._registered = False
+
+    def add(self, path: pathlib.Path, policy: Durability, synced: bool = False) -> None:
+        """Queue `path` and its directory (only the directory if `synced`)."""
+        with self._lock:
+            if not synced:
+                self._paths.add(path)
+            self._directories.add(path.parent)
+            self._writes += 1
+            if not self._registered:
+                atexit.register(self.flush)
+                self._registered = True
+            due = self._writes >= policy.writes or policy.interval <= 0
+            if not due and self._timer is None:
+                self._timer = threading.Timer(policy.interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        """Sync every pending file and directory. Returns only once they are
+        synced, including those a concurrent flush (e.g. the timer's) took."""
+        with self._flush_lock:
+            with self._lock:
+                paths, self._paths, self._writes = self._paths, set(), 0
+                directories, self._directories = self._directories, set()
+                timer, self._timer = self._timer, None
+            if timer is not None:
+                timer.cancel()
+            for path in paths:
+                _sync_file(path)
+            for directory in directories:
+                sync_directory(directory)
+
+
+def _sync_file(path: pathlib.Path) -> None:
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:  # removed since (e.g. a compacted journal): nothing left to sync
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+_batch = _Batch()
+
+__all__ = [
+    "BATCH", "BATCH_INTERVAL", "BATCH_WRITES", "DEFAULT_LEVEL", "Durability", "ENV_VAR", "FULL", "LEVELS",
+    "NONE", "appended", "atomic_write", "flush", "parse", "requested", "resolve", "sqlite_synchronous",
+    "sync_directory",
+]
@@ -8,5 +8,9 @@ class CorruptDataError(RepositoryError):
     """Raised when underlying JSON data is corrupt and has been reset."""
 
 
+class TaskNotFoundError(RepositoryError):
+    """Raised when an update or delete names a task id that does not exist."""
+
+
 class AtomicWriteError(RepositoryError):
     """Raised when atomic write sequence fails."""
\ No newline at end of file
@@ -0,0 +1,135 @@
+"""Cross-process group commit for the JSON document store.
+
+A writer that finds the store lock taken appends its request to
+`<store>.pending` and then waits for the lock. Whoever holds the lock drains
+every queued request and applies them all in one document rewrite, recording
+each request's task ids in `<store>.done` under the generation it is about to
+write. A waiter that gets the lock afterwards finds its ids there and returns
+without rewriting the document.
+
+Crash safety: waiters keep their request in memory. If a leader dies after
+draining the queue, its waiters find no result (or a result for a generation
+the document never reached) and commit their own request. Results with a
+generation above the document's are discarded by the next leader, so a
+result is only ever trusted once the document write that carries it exists.
+"""
+from __future__ import annotations
+import json
+import os
+import pathlib
+from typing import Dict, List, Optional
+
+from .errors import AtomicWriteError
+from .locking import fcntl
+
+# Unclaimed results (left by waiters that died) are dropped after this many commits
+DONE_RETENTION = 1 << 16
+
+
+class CommitQueue:
+    """Pending requests and published results next to the store at `store_path`.
+
+    `enqueue` and `drain` may be called without the store lock; `settle` and
+    `take` must be called while holding it.
+    """
+
+    def __init__(self, store_path: pathlib.Path | str) -> None:
+        store_path = pathlib.Path(store_path)
+        self.pending_path = store_path.with_name(store_path.name + ".pending")
+        self.done_path = store_path.with_name(store_path.name + ".done")
+
+    def enqueue(self, request: dict) -> None:
+        """Append `request` (a dict with a unique `ticket`) to the pending queue.
+
+        Raises AtomicWriteError if the queue cannot be written.
+        """
+        line = (json.dumps(request, ensure_ascii=False) + "\n").encode("utf-8")
+        try:
+            fd = os.open(self.pending_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        except OSError as e:
+            raise AtomicWriteError(f"Cannot queue write: {e}")
+        try:
+            _flock(fd)
+            os.write(fd, line)
+        except OSError as e:  # pragma: no cover - rare failure path
+            raise AtomicWriteError(f"Cannot queue write: {e}")
+        finally:
+            os.close(fd)
+
+    def drain(self) -> List[dict]:
+        """Remove and return all queued requests in arrival order (garbled lines are skipped)."""
+        try:
+            fd = os.open(self.pending_path, os.O_RDWR)
+        except FileNotFoundError:
+            return []
+        try:
+            _flock(fd)
+            raw = _read_all(fd)
+            if raw:
+                os.ftruncate(fd, 0)
+        finally:
+            os.close(fd)
+        requests = []
+        for line in raw.splitlines():
+            try:
+                request = json.loads(line)
+            except ValueError:
+                continue  # torn line from a writer that died mid-append
+            if isinstance(request, dict) and isinstance(request.get("ticket"), str):
+                requests.append(request)
+        return requests
+
+    def settle(self, results: Dict[str, List[int]], generation: int) -> None:
+        """Publish `results` for the commit that will write `generation + 1`.
+
+        Results newer than `generation` (the document's current one) belong to
+        a commit that never landed and are dropped first.
+        """
+        done = self._read()
+        kept = {
+            ticket: entry for ticket, entry in done.items()
+            if generation - DONE_RETENTION < entry.get("generation", 0) <= generation
+        }
+        kept.update((ticket, {"generation": generation + 1, "ids": ids}) for ticket, ids in results.items())
+        if kept != done:
+            self._write(kept)
+
+    def take(self, ticket: str, generation: int) -> Optional[List[int]]:
+        """Claim the ids committed for `ticket`, if its commit reached `generation`."""
+        done = self._read()
+        entry = done.get(ticket)
+        if entry is None or entry.get("generation", generation + 1) > generation:
+            return None
+        del done[ticket]
+        self._write(done)
+        return entry.get("ids")
+
+    def _read(self) -> dict:
+        try:
+            done = json.loads(self.done_path.read_bytes())
+        except (OSError, ValueError):
+            return {}
+        return done if isinstance(done, dict) else {}
+
+    def _write(self, done: dict) -> None:
+        tmp = self.done_path.with_suffix(self.done_path.suffix + ".tmp")
+        try:
+            tmp.write_text(json.dumps(done), encoding="utf-8")
+            tmp.replace(self.done_path)
+        except OSError as e:  # pragma: no cover - rare failure path
+            raise AtomicWriteError(f"Cannot publish commit results: {e}")
+
+
+def _read_all(fd: int) -> bytes:
+    os.lseek(fd, 0, os.SEEK_SET)
+    chunks = []
+    while True:
+        chunk = os.read(fd, 1 << 16)
+        if not chunk:
+            return b"".join(chunks)
+        chunks.append(chunk)
+
+
+def _flock(fd: int) -> None:
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_EX)
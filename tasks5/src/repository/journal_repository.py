@@ -0,0 +1,401 @@
+"""Journal repository: append-only JSON-lines log layered over the JSON snapshot.
+
+New tasks are appended (and fsynced, per `repository.durability`) to
+`<snapshot>.journal` instead of rewriting `tasks.json`, so a create costs O(1)
+bytes written. Reads merge the snapshot with the journal. Once the journal
+passes `compact_threshold` bytes it is folded into the snapshot through the
+regular atomic write, on a background thread by default.
+
+Updates and deletes are journal entries too: `{"op": "patch", "id": N, <fields>}`
+sets fields of task N and `{"op": "delete", "id": N}` is a tombstone. Readers
+replay them over the task's record (from the snapshot or the journal), and
+compaction applies them to the snapshot. The task being changed is read with a
+binary search of the snapshot, so a status change costs O(log n) reads and one
+small append, whatever the store size.
+
+Crash safety:
+- A torn final journal line (crash mid-append) is ignored on read and fenced off
+  with a newline before the next append.
+- Journal entries whose id is already present in the snapshot are skipped, so a
+  crash between the snapshot replace and the journal removal loses nothing and
+  duplicates nothing. Replaying patches and tombstones a second time is
+  harmless: they set the same fields, or delete the same task, again.
+"""
+from __future__ import annotations
+import os
+import pathlib
+import re
+import threading
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from . import codec
+from .base import Verification
+from .durability import Durability, appended, requested, resolve
+from .json_repository import JsonTaskRepository
+from .schema import task_record, with_header
+from .errors import AtomicWriteError, TaskNotFoundError
+from .streaming import ByteFilter, iter_task_records, substring_prefilter
+from .task_cache import FileIdentity, file_identity
+from src.models.task import EDITABLE_FIELDS, Task, TaskDraft, validate_changes
+from src.services.id_allocator import next_id_from_document
+from src.services.search import text_matches
+
+if TYPE_CHECKING:
+    from src.services.query import Query
+
+DEFAULT_COMPACT_THRESHOLD = 1 << 20  # 1 MiB of journal before folding into the snapshot
+PATCH, DELETE = "patch", "delete"  # `op` of change entries; task records have no `op`
+# `"id":` only occurs as a key: quotes inside strings are escaped
+_RECORD_ID = re.compile(rb'"id"\s*:\s*(\d+)')
+
+
+class JournalTaskRepository(JsonTaskRepository):
+    """JsonTaskRepository variant whose `save_new_task` appends to a journal.
+
+    Public interface (`load_all_tasks`, `save_new_task`) is unchanged. Appends,
+    id allocation and compaction hold the store's file lock, so instances are
+    safe to share between threads and processes.
+    """
+
+    def __init__(
+        self,
+        path: pathlib.Path | str = pathlib.Path("tasks.json"),
+        compact_threshold: int = DEFAULT_COMPACT_THRESHOLD,
+        background: bool = True,
+        durability: Durability | str | None = None,
+    ) -> None:
+        super().__init__(path, durability=durability)
+        self.journal_path = self.path.with_name(self.path.name + ".journal")
+        self.compact_threshold = compact_threshold
+        self.background = background
+        self._lock = threading.RLock()
+        self._compactor: threading.Thread | None = None
+
+    def change_stamp(self) -> Tuple[Optional[FileIdentity], Optional[FileIdentity]]:
+        """Identities of the snapshot and the journal (appends grow it in place)."""
+        return super().change_stamp(), file_identity(self.journal_path)
+
+    def load_all_tasks(self) -> List[Task]:
+        # Journal before snapshot, for the same reason as `_iter_raw_records`
+        entries = self._read_journal()
+        changes = _changes_by_id(entries)
+        tasks = super().load_all_tasks()
+        fresh = self._tasks_from_records(_replayed(self._unseen(entries, {t.id for t in tasks}), changes))
+        if changes:
+            tasks = self._tasks_from_records(_replayed(map(task_record, tasks), changes))
+        tasks.extend(fresh)
+        return tasks
+
+    def _iter_raw_records(self, prefilter: Optional[ByteFilter] = None) -> Iterator[dict]:
+        # Journal first: a compaction between the two reads then only duplicates
+        # entries (dropped by id below) instead of losing them. Snapshot records
+        # screened out by `prefilter` are not tracked; their journal duplicates
+        # are identical records, so the caller's predicate rejects them too.
+        entries = self._read_journal()
+        changes = _changes_by_id(entries)
+        if changes and prefilter is not None:
+            # A patch can make a record the screen rejects match: let changed ones through
+            screen = prefilter
+            prefilter = lambda raw: screen(raw) or _raw_id(raw) in changes  # noqa: E731
+        known = set()
+        for record in _replayed(iter_task_records(self.path, prefilter), changes, known):
+            yield record
+        yield from _replayed(self._unseen(entries, known), changes)
+
+    def get_task(self, task_id: int) -> Optional[Task]:
+        """Journal entry or binary search of the snapshot, with the journal's changes replayed."""
+        entries = self._read_journal()
+        record = next((e for e in entries if "op" not in e and e.get("id") == task_id), None)
+        if record is None:
+            record = self._find_record(task_id)
+        if record is not None:
+            record = _replay(record, [e for e in entries if "op" in e and e.get("id") == task_id])
+        return None if record is None else self._task_from_record(record)
+
+    def update_task(self, task_id: int, **changes: object) -> Task:
+        """Append a patch entry with the changed fields (and fsync it).
+
+        Raises TaskNotFoundError if no task has `task_id`, ValueError if a
+        change is invalid and AtomicWriteError if the journal cannot be written.
+        """
+        with self._file_lock:
+            current = self.get_task(task_id)
+            if current is None:
+                raise TaskNotFoundError(f"Task {task_id} not found")
+            task = current.replace(**changes)
+            self._log([_patch_entry(current, task)], [task], [current])
+        return task
+
+    def delete_task(self, task_id: int) -> Task:
+        """Append a tombstone for the task (and fsync it).
+
+        Raises TaskNotFoundError if no task has `task_id` and AtomicWriteError
+        if the journal cannot be written.
+        """
+        with self._file_lock:
+            current = self.get_task(task_id)
+            if current is None:
+                raise TaskNotFoundError(f"Task {task_id} not found")
+            self._log([{"op": DELETE, "id": task_id}], [], [current])
+        return current
+
+    def update_where(
+        self, changes: Mapping[str, object], status: str | None = None, query: Optional["Query"] = None
+    ) -> int:
+        """Select the matches with one streaming pass and append a patch per
+        match in one write (the snapshot is not rewritten).
+
+        Raises ValueError if a change is invalid and AtomicWriteError if the
+        journal cannot be written.
+        """
+        changes = validate_changes(changes)
+        with self._file_lock:
+            matches = list(self._where(status, query))
+            updated = [task.replace(**changes) for task in matches]
+            self._log([_patch_entry(old, new) for old, new in zip(matches, updated)], updated, matches)
+        return len(matches)
+
+    def _records_trusted(self) -> bool:
+        """Journal entries are not covered by the snapshot's validation stamp."""
+        return not self.journal_path.exists() and self._document_trusted()
+
+    def verify(self, fix: bool = False) -> Verification:
+        """Compact (so journal entries are checked too), then verify the snapshot.
+
+        Raises CorruptDataError if the snapshot cannot be parsed and
+        AtomicWriteError if it cannot be rewritten.
+        """
+        self.compact()
+        return super().verify(fix)
+
+    def _index_candidates(self, needle: str, build: bool) -> None:
+        """No trigram index: it covers the snapshot only, while journal
+        entries add tasks and patch or delete snapshot records it cannot see.
+        Searches scan the snapshot and journal instead (behind the byte
+        prefilter), and appends do not touch the index log; a compaction
+        rewrites the snapshot, leaving any index of it stale."""
+        return None
+
+    def _stats_stamp(self) -> Optional[Tuple[int, ...]]:
+        """Snapshot stamp plus the journal's (size, mtime_ns): appends change the tasks too."""
+        snapshot = self._stamp()
+        if snapshot is None:
+            return None
+        try:
+            st = self.journal_path.stat()
+        except FileNotFoundError:
+            return snapshot
+        return snapshot + (st.st_size, st.st_mtime_ns)
+
+    def _parallel_search_records(self, needle: str, jobs: int) -> List[dict]:
+        # Journal first, as in `_iter_raw_records`; snapshot matches cover the
+        # journal duplicates that can match
+        entries = self._read_journal()
+        if _changes_by_id(entries):
+            # Workers read the snapshot alone; changed records need the serial replay
+            return [
+                r for r in self._iter_raw_records(substring_prefilter(needle))
+                if text_matches(r.get("title"), r.get("description"), needle)
+            ]
+        records = super()._parallel_search_records(needle, jobs)
+        unseen = self._unseen(entries, {record.get("id") for record in records})
+        return records + [r for r in unseen if text_matches(r.get("title"), r.get("description"), needle)]
+
+    def save_new_task(self, task: Task) -> None:
+        """Append `task` to the journal and fsync it.
+
+        Raises AtomicWriteError if the journal cannot be written.
+        """
+        self.save_many([task])
+
+    def save_many(self, tasks: Sequence[Task]) -> None:
+        """Append all `tasks` to the journal with one write and one fsync.
+
+        Raises AtomicWriteError if the journal cannot be written.
+        """
+        self._log([task_record(t) for t in tasks], tasks)
+
+    def _log(self, entries: List[dict], saved: Sequence[Task], removed: Sequence[Task] = ()) -> None:
+        """Append `entries` with one write and one fsync, then account for the
+        tasks they add (`saved`) and replace or delete (`removed`).
+
+        Raises AtomicWriteError if the journal cannot be written.
+        """
+        if not entries:
+            return
+        lines = b"".join(codec.dumps(entry) + b"\n" for entry in entries)
+        with self._file_lock:
+            previous_stats = self._stats_stamp()
+            size = self._append(lines)
+            self._count_saved_tasks(saved, previous_stats, removed)
+        if size >= self.compact_threshold:
+            self._schedule_compaction()
+
+    def next_id(self) -> int:
+        """Next free id: the snapshot's `next_id` header bumped past journal entries."""
+        with self._file_lock:
+            return self._next_free_id()
+
+    def create_many(self, drafts: Sequence[TaskDraft]) -> List[Task]:
+        """Reserve consecutive ids and append the tasks to the journal in one write.
+
+        Raises ValueError if a draft is invalid and AtomicWriteError if the
+        journal cannot be written.
+        """
+        with self._file_lock:
+            first = self._next_free_id()
+            tasks = [draft.to_task(first + i) for i, draft in enumerate(drafts)]
+            self.save_many(tasks)
+        return tasks
+
+    def _next_free_id(self) -> int:
+        mark = self._snapshot_next_id()
+        for entry in self._read_journal():
+            entry_id = entry.get("id")
+            if isinstance(entry_id, int) and entry_id >= mark:
+                mark = entry_id + 1
+        return mark
+
+    def compact(self) -> None:
+        """Fold the journal into the snapshot and remove it.
+
+        Raises AtomicWriteError if the snapshot cannot be rewritten; the journal is
+        left untouched in that case.
+        """
+        with self._file_lock:
+            entries = self._read_journal()
+            if not entries:
+                return
+            stats = self._stored_stats(self._stats_stamp())
+            data = self._load_for_write()
+            mark = next_id_from_document(data)
+            records = data.get("tasks", [])
+            fresh = self._unseen(entries, {item.get("id") for item in records})
+            records.extend(fresh)
+            for entry in fresh:
+                if isinstance(entry.get("id"), int) and entry["id"] >= mark:
+                    mark = entry["id"] + 1
+            changes = _changes_by_id(entries)
+            if changes:
+                records = list(_replayed(records, changes))
+            # Journal lines are not covered by the validation stamp: check what they touched
+            journaled = {entry.get("id") for entry in entries}
+            touched = (r for r in records if isinstance(r, dict) and r.get("id") in journaled)
+            validated = None if all(self._task_from_record(r) is not None for r in touched) else False
+            self._write_atomic(with_header(data, records, mark), validated)
+            self.journal_path.unlink(missing_ok=True)
+            if stats is not None:
+                # Same tasks, new files: the statistics still hold
+                stats.stamp = self._stats_stamp()
+                self._persist_stats(stats)
+
+    def wait_for_compaction(self, timeout: float | None = None) -> None:
+        """Block until a running background compaction (if any) has finished."""
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join(timeout)
+
+    def _schedule_compaction(self) -> None:
+        if not self.background:
+            self.compact()
+            return
+        with self._lock:
+            if self._compactor is not None and self._compactor.is_alive():
+                return
+            # Non-daemon: interpreter shutdown waits for the snapshot write to finish.
+            # The thread would not see a level `requested` by this one: pass it on.
+            self._compactor = threading.Thread(
+                target=self._compact_at, args=(resolve(self.durability),), name="tasks-journal-compactor"
+            )
+            self._compactor.start()
+
+    def _compact_at(self, policy: Durability) -> None:
+        with requested(policy):
+            self.compact()
+
+    def _append(self, line: bytes) -> int:
+        try:
+            fd = os.open(self.journal_path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o644)
+        except OSError as e:  # pragma: no cover - rare failure path
+            raise AtomicWriteError(f"Journal append failed: {e}")
+        try:
+            size = os.fstat(fd).st_size
+            if size:
+                os.lseek(fd, size - 1, os.SEEK_SET)
+                if os.read(fd, 1) != b"\n":
+                    line = b"\n" + line  # fence off a torn line left by a crashed writer
+            os.write(fd, line)
+            appended(fd, self.journal_path, resolve(self.durability), created=not size)
+            return size + len(line)
+        except OSError as e:  # pragma: no cover - rare failure path
+            raise AtomicWriteError(f"Journal append failed: {e}")
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def _unseen(entries: List[dict], known: set) -> List[dict]:
+        """Task entries whose id is not in `known` (first occurrence wins); updates `known`."""
+        fresh = []
+        for entry in entries:
+            if "op" not in entry and entry.get("id") not in known:
+                known.add(entry.get("id"))
+                fresh.append(entry)
+        return fresh
+
+    def _read_journal(self) -> List[dict]:
+        try:
+            raw = self.journal_path.read_bytes()
+        except FileNotFoundError:
+            return []
+        entries = []
+        for line in raw.splitlines():
+            try:
+                entry = codec.loads(line)
+            except ValueError:
+                continue  # torn or garbled line
+            if isinstance(entry, dict):
+                entries.append(entry)
+        return entries
+
+
+def _changes_by_id(entries: Iterable[dict]) -> Dict[object, List[dict]]:
+    """Patch and delete entries grouped by task id, in journal order."""
+    changes: Dict[object, List[dict]] = {}
+    for entry in entries:
+        if "op" in entry:
+            changes.setdefault(entry.get("id"), []).append(entry)
+    return changes
+
+
+def _replay(record: dict, changes: List[dict]) -> Optional[dict]:
+    """`record` after `changes` (None once deleted); the input is not modified."""
+    for change in changes:
+        if change.get("op") == DELETE:
+            return None
+        if change.get("op") == PATCH:
+            record = {**record, **{k: v for k, v in change.items() if k in EDITABLE_FIELDS}}
+    return record
+
+
+def _replayed(records: Iterable[dict], changes: Dict[object, List[dict]], known: Optional[set] = None) -> Iterator[dict]:
+    """`records` with `changes` replayed (deleted ones dropped); adds each id to `known`."""
+    for record in records:
+        task_id = record.get("id") if isinstance(record, dict) else None
+        if known is not None:
+            known.add(task_id)
+        if task_id is not None and task_id in changes:
+            record = _replay(record, changes[task_id])
+            if record is None:
+                continue
+        yield record
+
+
+def _raw_id(raw: bytes) -> Optional[int]:
+    match = _RECORD_ID.search(raw)
+    return int(match.group(1)) if match else None
+
+
+def _patch_entry(old: Task, new: Task) -> dict:
+    entry = {"op": PATCH, "id": new.id}
+    entry.update((name, getattr(new, name)) for name in EDITABLE_FIELDS if getattr(old, name) != getattr(new, name))
+    return entry
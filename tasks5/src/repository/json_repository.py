@@ -1,76 +1,944 @@
 """JSON repository handling persistence with atomic writes & backup on corruption."""
 from __future__ import annotations
-import json
 import pathlib
+import os
 import time
-from typing import List
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, List, Mapping, Optional, Sequence, Set, Tuple
 
-from .schema import SCHEMA_VERSION, base_document
-from .errors import CorruptDataError, AtomicWriteError
-from src.models.task import Task
+from . import codec
+from .schema import base_document, document_generation, task_record, with_header
+from .base import BadRecord, TaskRepository, Verification
+from .errors import CorruptDataError, AtomicWriteError, TaskNotFoundError
+from .group_commit import CommitQueue
+from .locking import FileLock
+from .task_cache import FileIdentity, TaskCache, file_identity
+from .streaming import ByteFilter, find_record, find_records, iter_task_records, read_header, status_prefilter, substring_prefilter
+from src.models.task import (
+    VALIDATION_VERSION, Task, TaskDraft, check_fields, record_error, trusted_task, validate_changes,
+)
+from src.models.status import ALLOWED_STATUSES
+from src.services.id_allocator import next_id_from_document
+from src.services.pagination import Page, paginate
+from src.services.profiling import span
 
+if TYPE_CHECKING:
+    from src.services.trigram_index import MappedTrigramIndex, TrigramIndex
+    from src.services.query import Query
+    from .durability import Durability
+    from src.services.ranking import TermStats
 
-class JsonTaskRepository:
-    def __init__(self, path: pathlib.Path | str = pathlib.Path("tasks.json")) -> None:
+# Candidates are fetched by id while there are at most 1 per INDEX_FETCH_RATIO
+# records (+ INDEX_FETCH_MIN); past that a scan of the document is cheaper.
+INDEX_FETCH_RATIO = 64
+INDEX_FETCH_MIN = 8
+INDEX_LOG_MAX_BYTES = 1 << 20  # an index log past this is dropped with its index
+
+
+def _fetch_limit(records: int) -> int:
+    return records // INDEX_FETCH_RATIO + INDEX_FETCH_MIN
+
+
+class JsonTaskRepository(TaskRepository):
+    """Repository persisting tasks in a single JSON document.
+
+    With `trigram_index` (default) searches for needles of at least three
+    characters use a trigram index stored next to the document as
+    `<name>.trigram` (binary, memory-mapped; see `services.trigram_index`).
+    It is built by the first unpaged search, not by saves (a build is a pass
+    over the whole document, which a create must not pay), and stamped with
+    the document's (size, mtime_ns). Saves do not rewrite it: each appends
+    the ids it wrote and the stamps before and after to `<name>.trigram-log`,
+    and searches treat those ids as candidates too. An unbroken chain of stamps from the
+    index to the current document keeps it usable; any other write, or a log
+    holding more ids than half the fetch limit, leaves it stale until the
+    next unpaged search rebuilds it. When the candidates are few enough
+    (`INDEX_FETCH_RATIO`), their records are fetched by binary search
+    (`streaming.find_records`) instead of scanning the document. Journal
+    stores do not use the index (see `JournalTaskRepository._index_candidates`).
+
+    `list_tasks` and `search_tasks` stream the memory-mapped document and only
+    build `Task` objects for matching records.
+
+    Writes hold an exclusive `flock` on `<name>.lock` for the whole
+    read-modify-write, so concurrent processes cannot lose each other's tasks
+    or reuse ids. With `group_commit` (default), writers queued behind the lock
+    are merged into the holder's rewrite (see `group_commit`). The header's
+    `generation` counter, bumped on every write, lets a writer reuse its last
+    written document instead of re-parsing the file when nobody else wrote.
+
+    Records are validated when written and trusted when read: every write
+    made from a document known to be valid records the new file's
+    (size, mtime_ns) in `<name>.verified`, and while that stamp matches,
+    reads build tasks without re-checking them (`trusted_task`). A document
+    without a current stamp (older, or edited by hand) is validated record
+    by record, skipping invalid ones; `verify` reports them and, with `fix`,
+    removes them and stamps the document.
+
+    `durability` (a level such as "full" or "batch:20,100"; see
+    `repository.durability`) sets when writes are fsynced; by default the
+    command's `--durability`, then `$TASKS_DURABILITY`, else `full`. An
+    invalid level raises ValueError.
+
+    With `cache` (a `TaskCache`, or True for a private one with the default
+    cap) parsed tasks are kept in memory and reused while the file's
+    (inode, mtime_ns, size) is unchanged; this instance's own writes extend
+    the cached tuple instead of invalidating it. While the document fits
+    the cache, list and search are answered from memory instead of streamed.
+
+    Updates and deletes rewrite the document once under the lock (a single
+    JSON document cannot be patched in place); only the affected records are
+    decoded into tasks, and the trigram index and in-memory term statistics
+    are adjusted rather than rebuilt. `JournalTaskRepository` appends patches
+    instead, for writes that do not depend on the store size.
+    """
+
+    def __init__(
+        self,
+        path: pathlib.Path | str = pathlib.Path("tasks.json"),
+        trigram_index: bool = True,
+        group_commit: bool = True,
+        cache: TaskCache | bool = False,
+        durability: Durability | str | None = None,
+    ) -> None:
         self.path = pathlib.Path(path)
+        if durability is not None:  # `repository.durability` is only imported by writes otherwise
+            from .durability import parse
+
+            durability = parse(durability)
+        self.durability = durability
+        self.index_path = self.path.with_name(self.path.name + ".trigram")
+        self.index_log_path = self.path.with_name(self.path.name + ".trigram-log")
+        self.stats_path = self.path.with_name(self.path.name + ".stats")
+        self.verified_path = self.path.with_name(self.path.name + ".verified")
+        self.trigram_index = trigram_index
+        self.group_commit = group_commit
+        self._index: Optional[TrigramIndex] = None  # for tasks held by the cache
+        self._stats: Optional["TermStats"] = None
+        self._stats_unsaved = False  # `_stats` moved past `<store>.stats` by own writes
+        self._file_lock = FileLock(self.path.with_name(self.path.name + ".lock"))
+        self._queue = CommitQueue(self.path)
+        self._written: Optional[Tuple[Optional[Tuple[int, int]], dict]] = None
+        self._snapshot_mark: Optional[Tuple[Tuple[int, int], int]] = None
+        self._cache: Optional[TaskCache] = TaskCache() if cache is True else (cache or None)
 
     def _ensure_loaded(self) -> dict:
         if not self.path.exists():
-            doc = base_document()
-            self._write_atomic(doc)
-            return doc
-        raw = self.path.read_text(encoding="utf-8")
+            with self._file_lock:
+                if not self.path.exists():
+                    doc = base_document()
+                    self._write_atomic(doc)
+                    return doc
+        with span("store.read"):
+            raw = self.path.read_bytes()
         try:
-            data = json.loads(raw)
+            data = codec.loads(raw)
             if "schema_version" not in data or "tasks" not in data:
                 raise ValueError("Missing required keys")
             return data
         except Exception:
             # Backup corrupt file named original.json.bak-<timestamp>
             backup = self.path.parent / f"{self.path.name}.bak-{int(time.time())}"
-            try:
-                self.path.rename(backup)
-            except Exception:
-                backup = None  # ignore backup failure
-            doc = base_document()
-            self._write_atomic(doc)
+            with self._file_lock:
+                try:
+                    self.path.rename(backup)
+                except Exception:
+                    backup = None  # ignore backup failure
+                doc = base_document()
+                self._write_atomic(doc)
             raise CorruptDataError(f"Corrupt JSON file backed up to {backup}")
 
+    def change_stamp(self) -> Optional[FileIdentity]:
+        """The file's identity: every write replaces it."""
+        return file_identity(self.path)
+
     def load_all_tasks(self) -> List[Task]:
+        identity = file_identity(self.path) if self._cache is not None else None
+        if identity is not None:
+            cached = self._cache.get(self.path, identity)
+            if cached is not None:
+                return list(cached)
+        trusted = self._document_trusted()
         try:
             data = self._ensure_loaded()
         except CorruptDataError:
             # After corruption reset we return empty list
             return []
+        tasks = self._tasks_from_records(data.get("tasks", []), trusted)
+        if identity is not None:
+            # Stamped with the identity seen before reading: if the file was
+            # replaced meanwhile, the next lookup misses instead of going stale
+            self._cache.put(self.path, identity, tasks)
+        return tasks
+
+    def _use_cache(self) -> bool:
+        """Whether queries should be answered from `load_all_tasks` (cache on and the document fits)."""
+        if self._cache is None:
+            return False
+        identity = file_identity(self.path)
+        return identity is None or self._cache.admits(identity[2])
+
+    @staticmethod
+    def _tasks_from_records(items, trusted: bool = False) -> List[Task]:
+        """Tasks of the valid records among `items`; `trusted` records are not re-validated."""
         tasks = []
-        for item in data.get("tasks", []):
-            try:
-                tasks.append(Task(**item))
-            except Exception:
-                # Skip invalid entries silently; could log
-                continue
+        with span("tasks.build"):
+            if trusted:
+                try:
+                    return [trusted_task(r["id"], r["title"], r["description"], r["status"]) for r in items]
+                except (KeyError, TypeError):  # not the shape we write after all: check each record
+                    pass
+            for item in items:
+                try:
+                    tasks.append(Task(**item))
+                except Exception:
+                    # Skip invalid entries silently; could log
+                    continue
         return tasks
 
+    @staticmethod
+    def _task_from_record(record: dict) -> Optional[Task]:
+        """`Task` for one raw record, or None if it is invalid (skipped like above)."""
+        try:
+            return Task(**record)
+        except Exception:
+            return None
+
+    @staticmethod
+    def _trusted_task_from_record(record: dict) -> Optional[Task]:
+        """`_task_from_record` for a record of a validated document."""
+        try:
+            return trusted_task(record["id"], record["title"], record["description"], record["status"])
+        except (KeyError, TypeError):
+            return None
+
+    def _document_trusted(self) -> bool:
+        """Whether the document's records passed validation when written (its
+        `<name>.verified` stamp matches the file)."""
+        stamp = self._stamp()
+        return stamp is not None and stamp == self._verified_stamp()
+
+    def _records_trusted(self) -> bool:
+        """Whether every record `_iter_raw_records` yields can be trusted."""
+        return self._document_trusted()
+
+    def _verified_stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            data = codec.loads(self.verified_path.read_bytes())
+            stamp = data["stamp"]
+            if data.get("rules") != VALIDATION_VERSION:
+                return None  # validated under older, looser rules
+            return (stamp[0], stamp[1])
+        except (OSError, ValueError, KeyError, TypeError, IndexError):
+            return None
+
     def save_new_task(self, task: Task) -> None:
+        self.save_many([task])
+
+    def save_many(self, tasks: Sequence[Task]) -> None:
+        """Append all `tasks` with a single locked read-modify-write.
+
+        Concurrent writers (threads or processes) may be folded into the same
+        write; see `_submit`.
+        Raises AtomicWriteError if the document cannot be written.
+        """
+        if tasks:
+            self._submit("save", [task_record(t) for t in tasks])
+
+    def next_id(self) -> int:
+        """Next free id from the document header (scan fallback for older stores)."""
+        return self._snapshot_next_id()
+
+    def create_many(self, drafts: Sequence[TaskDraft]) -> List[Task]:
+        """Reserve ids from the header counter and append the tasks in one write.
+
+        Raises ValueError if a draft is invalid and AtomicWriteError if the
+        document cannot be written.
+        """
+        for draft in drafts:
+            draft.to_task(1)  # validate before the request can be queued for another writer
+        ids = self._submit("create", [list(draft) for draft in drafts]) if drafts else []
+        return [draft.to_task(task_id) for draft, task_id in zip(drafts, ids)]
+
+    def _submit(self, kind: str, items: list) -> List[int]:
+        """Commit one write request under the store lock; returns its task ids.
+
+        With `group_commit`, a writer that finds the lock taken queues its
+        request instead: the current holder (or whoever takes the lock next)
+        applies every queued request in its own rewrite.
+        Raises AtomicWriteError if the document cannot be written.
+        """
+        request = {"ticket": os.urandom(16).hex(), "kind": kind, "items": items}
+        if not self.group_commit:
+            with self._file_lock:
+                return self._lead(request)
+        if self._file_lock.acquire(blocking=False):
+            try:
+                return self._lead(request)
+            finally:
+                self._file_lock.release()
+        self._queue.enqueue(request)
+        with self._file_lock:
+            ids = self._queue.take(request["ticket"], self._generation())
+            return ids if ids is not None else self._lead(request)
+
+    def _lead(self, own: dict) -> List[int]:
+        """Apply `own` plus every queued request in one rewrite (lock held)."""
+        batch = self._queue.drain() if self.group_commit else []
+        if all(request["ticket"] != own["ticket"] for request in batch):
+            batch.append(own)
+        data = self._load_for_write()
+        mark = next_id_from_document(data)
+        results, tasks = {}, []
+        for request in batch:
+            try:
+                new = self._request_tasks(request, mark)
+            except (TypeError, ValueError):
+                continue  # unusable queued request; its writer finds no result and retries
+            results[request["ticket"]] = [t.id for t in new]
+            tasks.extend(new)
+            mark = max([mark] + [t.id + 1 for t in new])
+        generation = document_generation(data)
+        if self.group_commit:
+            self._queue.settle({t: ids for t, ids in results.items() if t != own["ticket"]}, generation)
+        self._commit(data, tasks, mark)
+        return results[own["ticket"]]
+
+    @staticmethod
+    def _request_tasks(request: dict, first_id: int) -> List[Task]:
+        if request.get("kind") == "create":
+            return [TaskDraft(*item).to_task(first_id + i) for i, item in enumerate(request["items"])]
+        return [Task(**item) for item in request["items"]]
+
+    def _load_for_write(self) -> dict:
+        """Document to modify, with the store lock held.
+
+        The document from this instance's last write is reused when the file
+        still carries its stamp and generation (nobody else wrote since);
+        otherwise it is re-read.
+        """
+        if self._written is not None:
+            stamp, doc = self._written
+            self._written = None
+            if stamp == self._stamp() and self._generation() == doc["generation"]:
+                return doc
         try:
-            data = self._ensure_loaded()
+            return self._ensure_loaded()
         except CorruptDataError:
-            data = base_document()
-        data_tasks = data.get("tasks", [])
-        data_tasks.append({
-            "id": task.id,
-            "title": task.title,
-            "description": task.description,
-            "status": task.status,
-        })
-        data["tasks"] = data_tasks
-        data["schema_version"] = SCHEMA_VERSION
-        self._write_atomic(data)
-
-    def _write_atomic(self, data: dict) -> None:
-        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
-        try:
-            tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
-            tmp.replace(self.path)
+            return base_document()
+
+    def _commit(self, data: dict, tasks: Sequence[Task], mark: int) -> None:
+        """Append `tasks` to the loaded `data` and write it with the new header."""
+        previous = self._stamp()
+        previous_stats = self._stats_stamp()
+        before = file_identity(self.path) if self._cache is not None else None
+        records = data.get("tasks", [])
+        last = records[-1].get("id") if records and isinstance(records[-1], dict) else 0
+        ids = [t.id for t in tasks]
+        ordered = isinstance(last, int) and all(a < b for a, b in zip([last] + ids, ids))
+        records.extend(task_record(t) for t in tasks)
+        doc = with_header(data, records, mark)
+        self._write_atomic(doc)
+        if self._cache is not None:
+            self._cache.extend(self.path, before, file_identity(self.path), tasks)
+        self._written = (self._stamp(), doc)
+        self._log_indexed_write(previous, ids if ordered else None)
+        self._index_saved_tasks(tasks, previous)
+        self._count_saved_tasks(tasks, previous_stats)
+
+    def get_task(self, task_id: int) -> Optional[Task]:
+        """Binary search of the memory-mapped document (see `streaming.find_record`)."""
+        if self._use_cache():
+            return super().get_task(task_id)
+        record = self._find_record(task_id)
+        return None if record is None else self._task_from_record(record)
+
+    def _find_record(self, task_id: int) -> Optional[dict]:
+        """Raw record with `task_id`: binary search, then a scan for documents not in id order."""
+        try:
+            record = find_record(self.path, task_id)
+            if record is None:
+                digits = str(task_id).encode("ascii")
+                scan = iter_task_records(self.path, lambda raw: digits in raw)
+                record = next((r for r in scan if r.get("id") == task_id), None)
+            return record
+        except (OSError, ValueError):
+            return next((task_record(t) for t in self.load_all_tasks() if t.id == task_id), None)
+
+    def update_task(self, task_id: int, **changes: object) -> Task:
+        """Rewrite the document with one record changed.
+
+        Raises TaskNotFoundError if no task has `task_id`, ValueError if a
+        change is invalid and AtomicWriteError if the document cannot be written.
+        """
+        check_fields(changes)
+        changed = self._rewrite(lambda record: record.get("id") == task_id, lambda task: task.replace(**changes))
+        if not changed:
+            raise TaskNotFoundError(f"Task {task_id} not found")
+        return changed[0][1]
+
+    def delete_task(self, task_id: int) -> Task:
+        """Rewrite the document without one record.
+
+        Raises TaskNotFoundError if no task has `task_id` and AtomicWriteError
+        if the document cannot be written.
+        """
+        changed = self._rewrite(lambda record: record.get("id") == task_id, lambda task: None)
+        if not changed:
+            raise TaskNotFoundError(f"Task {task_id} not found")
+        return changed[0][0]
+
+    def update_where(
+        self, changes: Mapping[str, object], status: str | None = None, query: Optional["Query"] = None
+    ) -> int:
+        """One rewrite applying `changes` to the records the filters select
+        (checked on raw records, so only those are decoded into tasks).
+
+        Raises ValueError if a change is invalid and AtomicWriteError if the
+        document cannot be written.
+        """
+        changes = validate_changes(changes)
+        record_matches = query.record_matches if query is not None else (lambda record: True)
+
+        def selected(record: dict) -> bool:
+            return (status is None or record.get("status") == status) and record_matches(record)
+
+        return len(self._rewrite(selected, lambda task: task.replace(**changes)))
+
+    def _rewrite(
+        self, selected: Callable[[dict], bool], change: Callable[[Task], Optional[Task]]
+    ) -> List[Tuple[Task, Optional[Task]]]:
+        """Replace each valid record `selected` accepts by `change(task)` (None
+        deletes it) in one locked write; returns the (old, new) pairs.
+
+        Nothing is written if no record is selected or `change` raises.
+        Raises AtomicWriteError if the document cannot be written.
+        """
+        with self._file_lock:
+            data = self._load_for_write()
+            previous, previous_stats = self._stamp(), self._stats_stamp()
+            records = data.get("tasks", [])
+            kept, changed = [], []
+            for record in records:
+                task = self._task_from_record(record) if isinstance(record, dict) and selected(record) else None
+                if task is not None:
+                    new = change(task)
+                    changed.append((task, new))
+                    if new is None:
+                        continue
+                    record = task_record(new)
+                kept.append(record)
+            if not changed:
+                return []
+            # The mark comes from the original records: deleting the newest task keeps its id used
+            doc = with_header(data, kept, next_id_from_document(data))
+            self._write_atomic(doc)
+            if self._cache is not None:
+                self._cache.discard(self.path)
+            self._written = (self._stamp(), doc)
+            updated = [new for _, new in changed if new is not None]
+            # Deleted tasks need no entry: fetching them finds nothing
+            self._log_indexed_write(previous, [t.id for t in updated])
+            self._index_saved_tasks(updated, previous)
+            self._count_saved_tasks(updated, previous_stats, [old for old, _ in changed])
+            return changed
+
+    def _generation(self) -> int:
+        """Generation in the document header; -1 if it cannot be read."""
+        try:
+            return document_generation(read_header(self.path))
+        except (OSError, ValueError):
+            return -1
+
+    def _snapshot_next_id(self) -> int:
+        """High-water mark read from the header without touching records.
+
+        Documents written before the header existed are scanned once per
+        document version; the result is cached against the file stamp.
+        """
+        stamp = self._stamp()
+        if stamp is None:
+            return 1
+        if self._snapshot_mark is not None and self._snapshot_mark[0] == stamp:
+            return self._snapshot_mark[1]
+        try:
+            mark = read_header(self.path).get("next_id")
+        except (OSError, ValueError):
+            mark = None
+        if not isinstance(mark, int) or isinstance(mark, bool) or mark < 1:
+            try:
+                mark = next_id_from_document(self._ensure_loaded())
+            except CorruptDataError:
+                mark = 1
+        self._snapshot_mark = (stamp, mark)
+        return mark
+
+    def list_tasks(self, status: str | None = None, page: Optional[Page] = None) -> List[Task]:
+        if self._use_cache():
+            from src.services.filtering import filter_by_status
+
+            return filter_by_status(self.load_all_tasks(), status, page)
+        if status is None and page is None:
+            return self.load_all_tasks()
+        if status is not None and status not in ALLOWED_STATUSES:
+            return []
+        return self._select(*self._status_filter(status), page)
+
+    def iter_tasks(self, status: str | None = None, page: Optional[Page] = None) -> Iterator[Task]:
+        """Yield `list_tasks(status, page)` one task at a time straight off the memory map
+        (or from the cache, when it is in use)."""
+        if self._use_cache():
+            return iter(self.list_tasks(status, page))
+        if status is not None and status not in ALLOWED_STATUSES:
+            return iter(())
+        return self._iter_select(*self._status_filter(status), page)
+
+    @staticmethod
+    def _status_filter(status: str | None) -> Tuple[Optional[Callable[[dict], bool]], Optional[ByteFilter]]:
+        if status is None:
+            return None, None
+        return (lambda record: record.get("status") == status), status_prefilter(status)
+
+    def search_tasks(self, query: str, page: Optional[Page] = None, jobs: int = 1) -> List[Task]:
+        """Substring search over streamed records, narrowed by the trigram index.
+
+        With `jobs` > 1, a document of at least `parallel_scan.PARALLEL_MIN_BYTES`
+        searched without a page limit is scanned by that many workers instead
+        (see `parallel_scan`). Results are identical to
+        `services.search.search_tasks` over all tasks.
+        Raises ValueError if query is blank.
+        """
+        return list(self._search(query, self._select, page, jobs))
+
+    def iter_search(self, query: str, page: Optional[Page] = None, jobs: int = 1) -> Iterator[Task]:
+        """`search_tasks` yielding matches as the scan reaches them (a parallel
+        scan yields once all workers are done).
+
+        Raises ValueError if query is blank (before anything is yielded).
+        """
+        return iter(self._search(query, self._iter_select, page, jobs))
+
+    def _search(
+        self, query: str, select: Callable[..., Iterable[Task]], page: Optional[Page], jobs: int = 1
+    ) -> Iterable[Task]:
+        if not isinstance(query, str) or not query.strip():
+            raise ValueError("Search query cannot be blank")
+        from src.services.search import search_tasks, text_matches
+        from src.services.trigram_index import GRAM
+        from . import parallel_scan
+
+        if self._use_cache():
+            tasks = self.load_all_tasks()
+            index = self._index_for(self._stamp(), tasks) if self.trigram_index and len(query) >= GRAM else None
+            return search_tasks(tasks, query, index=index, page=page)
+        needle = query.lower()
+        # A limited page stops the serial scan early; only full scans are split
+        if (page is None or page.limit is None) and parallel_scan.wants_parallel(self.path, jobs):
+            try:
+                records = self._parallel_search_records(needle, jobs)
+            except (OSError, ValueError):
+                pass  # not streamable: the serial path owns the fallback
+            else:
+                return paginate((t for t in map(self._task_from_record, records) if t is not None), page)
+
+        def matches(record: dict) -> bool:
+            return text_matches(record.get("title"), record.get("description"), needle)
+
+        if self.trigram_index and len(query) >= GRAM:
+            found = self._fetch_candidates(needle, matches, page)
+            if found is not None:
+                return found
+        return select(matches, substring_prefilter(needle), page)
+
+    def query_tasks(self, query: "Query", page: Optional[Page] = None) -> List[Task]:
+        """Parsed query over streamed records in one pass.
+
+        When the trigram index narrows the query's longest required substring
+        to few tasks, only their records are fetched. Otherwise raw record
+        bytes are screened for the query's status (when it allows a single
+        one) and that substring (if ASCII) before decoding. The compiled
+        predicate then checks each remaining record.
+        """
+        return list(self._query(query, self._select, page))
+
+    def iter_query(self, query: "Query", page: Optional[Page] = None) -> Iterator[Task]:
+        """`query_tasks` yielding matches as the scan reaches them."""
+        return iter(self._query(query, self._iter_select, page))
+
+    def _query(self, query: "Query", select: Callable[..., Iterable[Task]], page: Optional[Page]) -> Iterable[Task]:
+        from src.services.query import select_tasks
+        from src.services.trigram_index import GRAM
+
+        needle = query.best_needle()
+        indexed = self.trigram_index and needle is not None and len(needle) >= GRAM
+        if self._use_cache():
+            tasks = self.load_all_tasks()
+            return select_tasks(tasks, query, index=self._index_for(self._stamp(), tasks) if indexed else None, page=page)
+        screens = []
+        if query.statuses is not None and len(query.statuses) == 1:
+            screens.append(status_prefilter(next(iter(query.statuses))))
+        ascii_needle = query.best_needle(ascii_only=True)
+        if ascii_needle is not None:
+            screens.append(substring_prefilter(ascii_needle))
+
+        def screened(raw: bytes) -> bool:
+            return all(screen(raw) for screen in screens)
+
+        prefilter = (screens[0] if len(screens) == 1 else screened) if screens else None
+        if indexed:
+            found = self._fetch_candidates(needle, query.record_matches, page)
+            if found is not None:
+                return found
+        return select(query.record_matches, prefilter, page)
+
+    def _iter_raw_records(self, prefilter: Optional[ByteFilter] = None) -> Iterator[dict]:
+        """Stream raw records of the store (see `streaming.iter_task_records`)."""
+        return iter_task_records(self.path, prefilter)
+
+    def _fetch_candidates(
+        self, needle: str, predicate: Callable[[dict], bool], page: Optional[Page]
+    ) -> Optional[List[Task]]:
+        """Tasks matching `predicate` (which requires `needle`), read by id
+        from the candidates of the trigram index.
+
+        None when there is no usable index, it cannot narrow `needle` to few
+        enough tasks, or the records cannot be fetched: the caller scans.
+        """
+        # A limited page does not build a missing index: that costs O(store),
+        # while its scan stops once the page fills
+        ids = self._index_candidates(needle, build=page is None or page.limit is None)
+        if ids is None:
+            return None
+        build = self._trusted_task_from_record if self._records_trusted() else self._task_from_record
+        try:
+            records = [r for r in find_records(self.path, sorted(ids)) if predicate(r)]
+        except (OSError, ValueError):
+            return None
+        return list(paginate((t for t in map(build, records) if t is not None), page))
+
+    def _index_candidates(self, needle: str, build: bool) -> Optional[Set[int]]:
+        """Ids that may contain `needle`: the index's candidates plus the ids
+        logged since it was built.
+
+        None if the index is missing or stale (unless `build` rebuilds it),
+        was built from a document not in id order, or leaves more candidates
+        than fetching one by one beats a scan.
+        """
+        from src.services.trigram_index import MappedTrigramIndex
+
+        stamp = self._stamp()
+        if stamp is None:
+            return None
+        try:
+            with MappedTrigramIndex.open(self.index_path) as index:
+                logged = self._logged_ids(index, stamp)
+                if logged is not None:
+                    if not index.ordered:
+                        return None  # records cannot be found by id
+                    candidates = index.candidates(needle)
+                    if candidates is None:
+                        return None
+                    candidates |= logged
+                    return candidates if len(candidates) <= _fetch_limit(index.records) else None
+        except (OSError, ValueError):
+            pass
+        if not build or not self._build_index(stamp):
+            return None
+        return self._index_candidates(needle, build=False)
+
+    def _logged_ids(self, index: MappedTrigramIndex, stamp: Tuple[int, int]) -> Optional[Set[int]]:
+        """Ids written since `index` was built, if the log chains its stamp to
+        `stamp` (None: the index is stale)."""
+        ids, current = set(), index.stamp
+        try:
+            lines = self.index_log_path.read_bytes().splitlines()
+        except FileNotFoundError:
+            lines = []
+        try:
+            for line in lines:
+                entry = codec.loads(line)
+                if tuple(entry["from"]) != current:
+                    return None
+                current = tuple(entry["to"])
+                ids.update(entry["ids"])
+        except (ValueError, KeyError, TypeError):  # e.g. a line torn by a crash
+            return None
+        # A long log would use up the fetch budget: rebuild instead
+        if current != stamp or len(ids) > _fetch_limit(index.records) // 2:
+            return None
+        return ids
+
+    def _build_index(self, stamp: Tuple[int, int]) -> bool:
+        """Index the document in one streaming pass and persist it for `stamp`
+        (read before the pass: a write landing meanwhile leaves it stale).
+
+        Returns False if the document cannot be streamed or the index written.
+        """
+        from src.services.trigram_index import TrigramIndex
+
+        index, records, previous, ordered = TrigramIndex(), 0, 0, True
+        try:
+            for record in self._iter_raw_records():
+                records += 1
+                task_id, title, description = record.get("id"), record.get("title"), record.get("description")
+                if not isinstance(task_id, int) or isinstance(task_id, bool) or task_id <= previous:
+                    ordered = False  # `find_records` would miss records
+                if isinstance(task_id, int) and not isinstance(task_id, bool):
+                    previous = max(previous, task_id)
+                    if isinstance(title, str):
+                        index.add(task_id, title, description if isinstance(description, str) else None)
+            data = index.encode(stamp, records, ordered)
+        except (OSError, ValueError, AttributeError):
+            return False
+        tmp = self.index_path.with_suffix(self.index_path.suffix + ".tmp")
+        try:
+            self.index_log_path.unlink(missing_ok=True)
+            tmp.write_bytes(data)
+            tmp.replace(self.index_path)
+        except OSError:  # pragma: no cover - derived data; searches scan instead
+            return False
+        return True
+
+    def _log_indexed_write(self, previous: Optional[Tuple[int, int]], ids: Optional[List[int]]) -> None:
+        """Record a write from `previous` to the current stamp that changed
+        `ids` (None: it broke id order) in the index log, if there is an index.
+
+        An index whose log would pass `INDEX_LOG_MAX_BYTES` is dropped instead.
+        """
+        if not self.trigram_index or previous is None or not self.index_path.exists():
+            return
+        try:
+            size = self.index_log_path.stat().st_size
+        except FileNotFoundError:
+            size = 0
+        try:
+            if ids is None or size > INDEX_LOG_MAX_BYTES:
+                self.index_path.unlink(missing_ok=True)
+                self.index_log_path.unlink(missing_ok=True)
+                return
+            entry = {"from": list(previous), "to": list(self._stamp()), "ids": ids}
+            with open(self.index_log_path, "ab") as fh:
+                fh.write(codec.dumps(entry) + b"\n")
+        except OSError:  # pragma: no cover - derived data; a broken chain makes it stale
+            pass
+
+    def _parallel_search_records(self, needle: str, jobs: int) -> List[dict]:
+        """Raw records matching `needle`, in store order, from a parallel scan.
+
+        Raises OSError or StreamFormatError if the document cannot be streamed.
+        """
+        from . import parallel_scan
+
+        return parallel_scan.search_records(self.path, needle, jobs)
+
+    def _select(
+        self,
+        predicate: Optional[Callable[[dict], bool]],
+        prefilter: Optional[ByteFilter] = None,
+        page: Optional[Page] = None,
+    ) -> List[Task]:
+        """Tasks whose raw record satisfies `predicate` (all when None), in store order.
+
+        `prefilter` may screen raw record bytes before decoding; reading stops
+        once `page` is full. Falls back to a full load (with its corruption
+        handling) when the document cannot be streamed.
+        """
+        try:
+            return list(paginate(self._stream(predicate, prefilter), page))
+        except (OSError, ValueError):
+            return list(paginate(self._loaded(predicate), page))
+
+    def _iter_select(
+        self,
+        predicate: Optional[Callable[[dict], bool]],
+        prefilter: Optional[ByteFilter] = None,
+        page: Optional[Page] = None,
+    ) -> Iterator[Task]:
+        """Streaming `_select`.
+
+        Falls back to a full load only while nothing has been yielded; once
+        output has started a read failure raises CorruptDataError instead.
+        """
+        yielded = False
+        try:
+            for task in paginate(self._stream(predicate, prefilter), page):
+                yielded = True
+                yield task
+        except (OSError, ValueError) as e:
+            if yielded:
+                raise CorruptDataError(f"Cannot finish reading {self.path}: {e}")
+            yield from paginate(self._loaded(predicate), page)
+
+    def _stream(self, predicate: Optional[Callable[[dict], bool]], prefilter: Optional[ByteFilter]) -> Iterator[Task]:
+        build = self._trusted_task_from_record if self._records_trusted() else self._task_from_record
+        for record in self._iter_raw_records(prefilter):
+            if predicate is None or predicate(record):
+                task = build(record)
+                if task is not None:
+                    yield task
+
+    def _loaded(self, predicate: Optional[Callable[[dict], bool]]) -> Iterator[Task]:
+        tasks = self.load_all_tasks()
+        return iter(tasks) if predicate is None else (t for t in tasks if predicate(task_record(t)))
+
+    def _stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return (st.st_size, st.st_mtime_ns)
+
+    def term_stats(self, terms: Sequence[str] = ()) -> "TermStats":
+        """BM25 statistics of the whole store, kept in `<store>.stats`.
+
+        Saves do not touch the file (a create should not pay for rewriting a
+        table the size of the vocabulary); it goes stale and is rebuilt here,
+        by one streaming pass, when a ranked search next needs it. Statistics
+        this instance holds in memory are kept current by its own saves and
+        written out here instead of being rebuilt.
+        """
+        from src.services.ranking import TermStats
+
+        stamp = self._stats_stamp()
+        stats = self._stored_stats(stamp)
+        if stats is None:
+            try:
+                items = [(r.get("title"), r.get("description")) for r in self._iter_raw_records()]
+            except (OSError, ValueError):
+                items = [(t.title, t.description) for t in self.load_all_tasks()]
+            stats = TermStats.build(items, stamp=stamp)
+            self._persist_stats(stats)
+        elif self._stats_unsaved:
+            self._persist_stats(stats)
+        return stats
+
+    def _stats_stamp(self) -> Optional[Tuple[int, ...]]:
+        """Store state the term statistics must match."""
+        return self._stamp()
+
+    def _stored_stats(self, stamp: Optional[Tuple[int, ...]]) -> Optional["TermStats"]:
+        """In-memory or persisted statistics for `stamp`, if any."""
+        from src.services.ranking import TermStats
+
+        if stamp is None:
+            return None
+        if self._stats is not None and self._stats.stamp == stamp:
+            return self._stats
+        try:
+            stats = TermStats.from_dict(codec.loads(self.stats_path.read_bytes()))
+        except (OSError, ValueError):
+            return None
+        if stats.stamp != stamp:
+            return None
+        self._stats, self._stats_unsaved = stats, False
+        return stats
+
+    def _count_saved_tasks(
+        self, saved: Sequence[Task], previous: Optional[Tuple[int, ...]], removed: Sequence[Task] = ()
+    ) -> None:
+        """Apply a write (`removed` tasks gone, `saved` ones added) to the
+        in-memory statistics if they were current before it; the file is left
+        to go stale (see `term_stats`)."""
+        stats = self._stats
+        if stats is None or previous is None or stats.stamp != previous:
+            return
+        for task in removed:
+            stats.remove(task.title, task.description)
+        for task in saved:
+            stats.add(task.title, task.description)
+        stats.stamp = self._stats_stamp()
+        self._stats_unsaved = True
+
+    def _persist_stats(self, stats: "TermStats") -> None:
+        self._stats = stats
+        self._stats_unsaved = False
+        tmp = self.stats_path.with_suffix(self.stats_path.suffix + ".tmp")
+        try:
+            tmp.write_bytes(codec.dumps(stats.to_dict()))
+            tmp.replace(self.stats_path)
+        except OSError:  # pragma: no cover - derived data; a stale stamp forces a rebuild
+            pass
+
+    def _index_for(self, stamp: Optional[Tuple[int, int]], tasks: List[Task]) -> Optional[TrigramIndex]:
+        """In-memory index of the cached `tasks` (built once per stamp, kept by own saves)."""
+        from src.services.trigram_index import TrigramIndex
+
+        if stamp is None:
+            return None
+        if self._index is None or self._index.stamp != stamp:
+            self._index = TrigramIndex.build(((t.id, t.title, t.description) for t in tasks), stamp=stamp)
+        return self._index
+
+    def _index_saved_tasks(self, saved: Sequence[Task], previous: Optional[Tuple[int, int]]) -> None:
+        """Add `saved` to the in-memory index if it was current before the write
+        (old trigrams of updated tasks stay as harmless extra candidates)."""
+        index = self._index
+        if index is None or index.stamp != previous:
+            return
+        for task in saved:
+            index.add(task.id, task.title, task.description)
+        index.stamp = self._stamp()
+
+    def _write_atomic(self, data: dict, validated: Optional[bool] = None) -> None:
+        """Replace the document with `data` and keep its validation stamp in step.
+
+        `validated` says whether every record of `data` is a valid task; None
+        (the default, for writes that only add or change validated records)
+        means "if the document being replaced was". The stamp is dropped
+        before the write, so a crash cannot leave a stale one vouching for it.
+        Raises AtomicWriteError if the document cannot be written.
+        """
+        from .durability import atomic_write, resolve
+
+        if validated is None:
+            validated = not self.path.exists() or self._document_trusted()
+        try:
+            with span("store.write"):
+                self.verified_path.unlink(missing_ok=True)
+                atomic_write(self.path, codec.dumps(data), resolve(self.durability))
         except Exception as e:  # pragma: no cover - rare failure path
-            raise AtomicWriteError(f"Atomic write failed: {e}")
\ No newline at end of file
+            raise AtomicWriteError(f"Atomic write failed: {e}")
+        if validated:
+            self._persist_verified()
+
+    def _persist_verified(self) -> None:
+        tmp = self.verified_path.with_suffix(self.verified_path.suffix + ".tmp")
+        try:
+            tmp.write_bytes(codec.dumps({"stamp": list(self._stamp()), "rules": VALIDATION_VERSION}))
+            tmp.replace(self.verified_path)
+        except OSError:  # pragma: no cover - a missing stamp only costs validation on read
+            pass
+
+    def verify(self, fix: bool = False) -> Verification:
+        """Validate every record of the document.
+
+        A document that passes gets its validation stamp; with `fix`, invalid
+        records are removed in one locked rewrite (which stamps it). Raises
+        CorruptDataError if the document cannot be parsed and AtomicWriteError
+        if it cannot be rewritten.
+        """
+        with self._file_lock:
+            trusted = self._document_trusted()
+            data = self._ensure_loaded()
+            records = data.get("tasks", [])
+            invalid = _invalid_records(records)
+            if invalid and fix:
+                bad = {bad.position for bad in invalid}
+                kept = [record for position, record in enumerate(records) if position not in bad]
+                doc = with_header(data, kept, next_id_from_document(data))
+                self._write_atomic(doc, validated=True)
+                if self._cache is not None:
+                    self._cache.discard(self.path)
+                self._written = (self._stamp(), doc)
+            elif not invalid and not trusted:
+                self._persist_verified()
+        return Verification(len(records), invalid, bool(invalid and fix))
+
+
+def _invalid_records(records: Iterable[object]) -> List[BadRecord]:
+    invalid = []
+    for position, record in enumerate(records):
+        reason = record_error(record)
+        if reason is not None:
+            record_id = record.get("id") if isinstance(record, dict) else None
+            invalid.append(BadRecord(position, record_id, reason))
+    return invalid
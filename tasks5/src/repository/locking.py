@@ -0,0 +1,106 @@
+"""Cross-process advisory file lock used to serialize store writers.
+
+POSIX systems use `fcntl.flock` on a sidecar `<store>.lock` file; where
+`fcntl` is unavailable (Windows) only threads of the owning instance are
+serialized.
+"""
+from __future__ import annotations
+import os
+import pathlib
+import threading
+
+from .errors import AtomicWriteError
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+_HELD: "set[FileLock]" = set()  # instances currently holding their flock
+
+
+class FileLock:
+    """Exclusive lock on `path`, reentrant for the thread holding it.
+
+    Threads sharing one instance are serialized by an internal RLock; separate
+    instances and processes are serialized by `flock` on the lock file.
+    """
+
+    def __init__(self, path: pathlib.Path | str) -> None:
+        self.path = pathlib.Path(path)
+        self._thread_lock = threading.RLock()
+        self._fd: int | None = None
+        self._depth = 0
+
+    def acquire(self, blocking: bool = True) -> bool:
+        """Take the lock; returns False if `blocking` is off and it is held elsewhere.
+
+        Raises AtomicWriteError if the lock file cannot be opened.
+        """
+        if not self._thread_lock.acquire(blocking):
+            return False
+        if self._depth == 0:
+            try:
+                self._fd = self._lock_fd(blocking)
+            except BaseException:
+                self._thread_lock.release()
+                raise
+            if self._fd is None:
+                self._thread_lock.release()
+                return False
+            _HELD.add(self)
+        self._depth += 1
+        return True
+
+    def release(self) -> None:
+        if self._depth == 0:
+            return  # dropped by `_forget_after_fork` in a forked child
+        self._depth -= 1
+        if self._depth == 0:
+            os.close(self._fd)  # closing the descriptor drops the flock
+            self._fd = None
+            _HELD.discard(self)
+        self._thread_lock.release()
+
+    def _forget_after_fork(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+        self._fd = None
+        self._depth = 0
+        self._thread_lock = threading.RLock()
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+    def _lock_fd(self, blocking: bool) -> int | None:
+        try:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        except OSError as e:
+            raise AtomicWriteError(f"Cannot open lock file {self.path}: {e}")
+        if fcntl is None:  # pragma: no cover - non-POSIX platforms
+            return fd
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return None
+        except BaseException:  # pragma: no cover - interrupted wait
+            os.close(fd)
+            raise
+        return fd
+
+
+def _forget_inherited_locks() -> None:
+    # A forked child shares the parent's open lock file descriptions; keeping
+    # them open would keep the lock held after the parent releases it.
+    for lock in list(_HELD):
+        lock._forget_after_fork()
+    _HELD.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_inherited_locks)
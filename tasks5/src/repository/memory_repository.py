@@ -0,0 +1,71 @@
+"""In-memory repository for tests, benchmarks and embedding (nothing is persisted)."""
+from __future__ import annotations
+import threading
+from typing import TYPE_CHECKING, Iterable, List, Mapping, Optional, Sequence
+
+from .base import TaskRepository
+from .errors import TaskNotFoundError
+from src.models.task import Task, TaskDraft, validate_changes
+from src.services.id_allocator import next_id
+
+if TYPE_CHECKING:
+    from src.services.query import Query
+
+
+class InMemoryTaskRepository(TaskRepository):
+    """Process-local repository keeping tasks in insertion order."""
+
+    def __init__(self, tasks: Iterable[Task] = ()) -> None:
+        self._tasks: List[Task] = list(tasks)
+        self._next_id = next_id(self._tasks)
+        self._lock = threading.RLock()
+
+    def load_all_tasks(self) -> List[Task]:
+        with self._lock:
+            return list(self._tasks)
+
+    def save_new_task(self, task: Task) -> None:
+        self.save_many([task])
+
+    def save_many(self, tasks: Sequence[Task]) -> None:
+        with self._lock:
+            self._tasks.extend(tasks)
+            self._next_id = max([self._next_id] + [t.id + 1 for t in tasks])
+
+    def next_id(self) -> int:
+        with self._lock:
+            return self._next_id
+
+    def create_many(self, drafts: Sequence[TaskDraft]) -> List[Task]:
+        with self._lock:
+            tasks = [draft.to_task(self._next_id + i) for i, draft in enumerate(drafts)]
+            self._tasks.extend(tasks)
+            self._next_id += len(tasks)
+        return tasks
+
+    def update_task(self, task_id: int, **changes: object) -> Task:
+        with self._lock:
+            pos = self._position(task_id)
+            task = self._tasks[pos] = self._tasks[pos].replace(**changes)
+        return task
+
+    def delete_task(self, task_id: int) -> Task:
+        with self._lock:
+            return self._tasks.pop(self._position(task_id))
+
+    def update_where(
+        self, changes: Mapping[str, object], status: str | None = None, query: Optional["Query"] = None
+    ) -> int:
+        changes = validate_changes(changes)
+        with self._lock:
+            selected = set(t.id for t in self._where(status, query))
+            for pos, task in enumerate(self._tasks):
+                if task.id in selected:
+                    self._tasks[pos] = task.replace(**changes)
+        return len(selected)
+
+    def _position(self, task_id: int) -> int:
+        for pos, task in enumerate(self._tasks):
+            if task.id == task_id:
+                return pos
+        raise TaskNotFoundError(f"Task {task_id} not found")
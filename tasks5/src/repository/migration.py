@@ -0,0 +1,72 @@
+"""Store migration between the JSON document and the SQLite database or a
+binary snapshot.
+
+`migrate_json_to_sqlite` implements the migration script from
+`docs/migration.md`; `export_sqlite_to_json` is the rollback path that
+rehydrates `tasks.json` from the database. `migrate_json_to_binary` and
+`export_binary_to_json` do the same for binary snapshots.
+"""
+from __future__ import annotations
+import pathlib
+
+from .binary_repository import BinaryTaskRepository
+from .json_repository import JsonTaskRepository
+from .sql_repository import SqlTaskRepository
+from .schema import document_to_snapshot, snapshot_to_document, task_record, with_header
+from .snapshot import Snapshot
+
+
+def migrate_json_to_sqlite(json_path: pathlib.Path | str, db_path: pathlib.Path | str) -> int:
+    """Copy every valid task from `json_path` into `db_path`; returns the task count.
+
+    Re-running is idempotent: rows with an existing id are replaced. The
+    document's `next_id` carries over, so ids of deleted tasks stay used.
+    Raises RepositoryError if the database cannot be written.
+    """
+    source = JsonTaskRepository(json_path)
+    tasks = source.load_all_tasks()
+    repo = SqlTaskRepository(db_path)
+    try:
+        return repo._insert_many(tasks, replace=True, next_id=source.next_id())
+    finally:
+        repo.close()
+
+
+def export_sqlite_to_json(db_path: pathlib.Path | str, json_path: pathlib.Path | str) -> int:
+    """Write every task in `db_path` to `json_path` atomically; returns the task count.
+
+    The database's `next_id` becomes the document's.
+    Raises AtomicWriteError if the JSON document cannot be written.
+    """
+    repo = SqlTaskRepository(db_path)
+    try:
+        tasks = repo.load_all_tasks()
+        next_id = repo.next_id()
+    finally:
+        repo.close()
+    doc = with_header({}, [task_record(t) for t in tasks], next_id)
+    JsonTaskRepository(json_path)._write_atomic(doc)
+    return len(tasks)
+
+
+def migrate_json_to_binary(json_path: pathlib.Path | str, bin_path: pathlib.Path | str) -> int:
+    """Write every valid task from `json_path` to the binary snapshot `bin_path`
+    atomically (replacing it); returns the task count.
+
+    Raises CorruptDataError if the JSON document is corrupt and
+    AtomicWriteError if the snapshot cannot be written.
+    """
+    raw = document_to_snapshot(JsonTaskRepository(json_path)._ensure_loaded())
+    BinaryTaskRepository(bin_path)._write_atomic(raw)
+    return len(Snapshot(raw))
+
+
+def export_binary_to_json(bin_path: pathlib.Path | str, json_path: pathlib.Path | str) -> int:
+    """Write every task in the snapshot `bin_path` to `json_path` atomically; returns the task count.
+
+    Raises ValueError if `bin_path` is not a snapshot and AtomicWriteError if
+    the JSON document cannot be written.
+    """
+    doc = snapshot_to_document(pathlib.Path(bin_path).read_bytes())
+    JsonTaskRepository(json_path)._write_atomic(doc)
+    return len(doc["tasks"])
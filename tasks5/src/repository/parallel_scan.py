@@ -0,0 +1,71 @@
+"""Substring search over a JSON task document, split across worker processes.
+
+The document's `tasks` array is cut into contiguous byte ranges at record
+boundaries (`streaming.record_spans`); each worker memory-maps the file and
+scans one range with the same byte prefilter and predicate as the serial
+search. Results come back in range order, so their concatenation is in file
+(= id) order and identical to a serial scan.
+
+Workers are processes, or threads on free-threaded builds where they run in
+parallel without the pickling round trip. Below `PARALLEL_MIN_BYTES` the
+pool start-up costs more than it saves, so callers stay serial. The CLI
+only scans in parallel when asked to (`search --jobs N`): a pool per
+invocation would cost every search its start-up time.
+"""
+from __future__ import annotations
+import os
+import pathlib
+import sys
+from typing import List, Optional
+
+from .streaming import Span, iter_task_records, record_spans, substring_prefilter
+from src.services.search import text_matches
+
+PARALLEL_MIN_BYTES = 32 << 20  # documents smaller than this are searched serially
+
+
+def wants_parallel(path: pathlib.Path | str, jobs: int) -> bool:
+    """Whether a search of `path` with `jobs` workers should run in parallel."""
+    if jobs < 2:
+        return False
+    try:
+        return os.path.getsize(path) >= PARALLEL_MIN_BYTES
+    except OSError:
+        return False
+
+
+def search_records(path: pathlib.Path | str, needle: str, jobs: int) -> List[dict]:
+    """Raw records of `path` whose title or description contains `needle`
+    (already lowercased), in file order, scanned by up to `jobs` workers.
+
+    Raises OSError if the file cannot be read and StreamFormatError if it
+    cannot be streamed (callers fall back to the serial path).
+    """
+    spans = record_spans(path, jobs)
+    if len(spans) < 2:
+        return _search_span(str(path), needle, spans[0] if spans else None)
+    executor = _executor(min(jobs, len(spans)))
+    with executor:
+        parts = executor.map(_search_span, [str(path)] * len(spans), [needle] * len(spans), spans)
+        return [record for part in parts for record in part]
+
+
+def _executor(workers: int):
+    if not getattr(sys, "_is_gil_enabled", lambda: True)():
+        from concurrent.futures import ThreadPoolExecutor
+
+        return ThreadPoolExecutor(max_workers=workers)
+    from concurrent.futures import ProcessPoolExecutor
+
+    return ProcessPoolExecutor(max_workers=workers)
+
+
+def _search_span(path: str, needle: str, span: Optional[Span]) -> List[dict]:
+    return [
+        record
+        for record in iter_task_records(path, substring_prefilter(needle), span)
+        if text_matches(record.get("title"), record.get("description"), needle)
+    ]
+
+
+__all__ = ["PARALLEL_MIN_BYTES", "wants_parallel", "search_records"]
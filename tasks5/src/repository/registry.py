@@ -0,0 +1,176 @@
+"""Repository registry: selects a storage backend from a store URI.
+
+Store URIs have the form `<scheme>://<path>`. As in SQLAlchemy, `sqlite:///tasks.db`
+is relative to the working directory and `sqlite:////var/tasks.db` is absolute.
+A bare path is accepted too: `.db`/`.sqlite` files map to SQLite, anything else
+to JSON. The URI comes from the `--store` flag, then the `TASKS_STORE`
+environment variable, then `DEFAULT_STORE`.
+
+A store URI may end in options: `?durability=batch` sets the repository's
+durability level (see `repository.durability`). Options configure the
+instance; they are not part of the store's identity (`store_key`).
+
+Backends are imported and constructed lazily, and one instance is cached per
+(scheme, absolute path, options) for the lifetime of the process.
+"""
+from __future__ import annotations
+import os
+import pathlib
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+from .base import TaskRepository
+from .errors import RepositoryError
+
+STORE_ENV_VAR = "TASKS_STORE"
+DEFAULT_STORE = "json://tasks.json"
+
+BackendFactory = Callable[[str], TaskRepository]
+
+
+def _json_backend(path: str) -> TaskRepository:
+    from .json_repository import JsonTaskRepository
+    return JsonTaskRepository(path or "tasks.json")
+
+
+def _journal_backend(path: str) -> TaskRepository:
+    from .journal_repository import JournalTaskRepository
+    return JournalTaskRepository(path or "tasks.json")
+
+
+def _sqlite_backend(path: str) -> TaskRepository:
+    from .sql_repository import SqlTaskRepository
+    return SqlTaskRepository(path or "tasks.db")
+
+
+def _binary_backend(path: str) -> TaskRepository:
+    from .binary_repository import BinaryTaskRepository
+    return BinaryTaskRepository(path or "tasks.bin")
+
+
+def _memory_backend(path: str) -> TaskRepository:
+    from .memory_repository import InMemoryTaskRepository
+    return InMemoryTaskRepository()
+
+
+_BACKENDS: Dict[str, BackendFactory] = {
+    "json": _json_backend,
+    "journal": _journal_backend,
+    "sqlite": _sqlite_backend,
+    "binary": _binary_backend,
+    "memory": _memory_backend,
+}
+_SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+_OPTIONS = ("durability",)
+_INSTANCES: Dict[Tuple[str, str, Optional[str]], TaskRepository] = {}
+_LOCK = threading.Lock()
+
+
+def register_backend(scheme: str, factory: BackendFactory) -> None:
+    """Register (or replace) the factory building repositories for `scheme`."""
+    _BACKENDS[scheme] = factory
+
+
+def parse_store_uri(uri: str) -> Tuple[str, str]:
+    """Split a store URI into (scheme, path).
+
+    Raises RepositoryError if the scheme has no registered backend or an
+    option is invalid.
+    """
+    uri, _ = split_options(uri)
+    if "://" in uri:
+        scheme, path = uri.split("://", 1)
+        if path.startswith("/"):
+            path = path[1:]
+    else:
+        path = uri
+        scheme = "sqlite" if pathlib.Path(uri).suffix in _SQLITE_SUFFIXES else "json"
+    if scheme not in _BACKENDS:
+        raise RepositoryError(f"Unknown store scheme '{scheme}'. Known: {', '.join(sorted(_BACKENDS))}")
+    return scheme, path
+
+
+def store_uri(scheme: str, path: str) -> str:
+    """URI that `parse_store_uri` maps back to (`scheme`, `path`), e.g. `json:////abs/tasks.json`."""
+    return f"{scheme}:///{path}" if path else f"{scheme}://"
+
+
+def split_options(uri: str) -> Tuple[str, Dict[str, str]]:
+    """Split `?name=value&...` options off a store URI: (uri without them, options).
+
+    Raises RepositoryError for an unknown option or an invalid durability level.
+    """
+    uri, _, query = uri.partition("?")
+    options: Dict[str, str] = {}
+    for item in filter(None, query.split("&")):
+        name, _, value = item.partition("=")
+        if name not in _OPTIONS:
+            raise RepositoryError(f"Unknown store option '{name}'. Known: {', '.join(_OPTIONS)}")
+        options[name] = value
+    if "durability" in options:
+        from . import durability
+
+        try:
+            options["durability"] = str(durability.parse(options["durability"]))
+        except ValueError as e:
+            raise RepositoryError(str(e))
+    return uri, options
+
+
+def _store(store: str | None) -> str:
+    return store or os.environ.get(STORE_ENV_VAR) or DEFAULT_STORE
+
+
+def store_key(store: str | None = None) -> Tuple[str, str]:
+    """Canonical (scheme, absolute path) identifying `store` (or the env/default store).
+
+    Raises RepositoryError for an unknown store scheme or option.
+    """
+    scheme, path = parse_store_uri(_store(store))
+    if path and scheme != "memory":
+        path = str(pathlib.Path(path).absolute())
+    return scheme, path
+
+
+def get_repository(store: str | None = None) -> TaskRepository:
+    """Return the cached repository for `store` (or the env/default store).
+
+    Raises RepositoryError for an unknown store scheme or option.
+    """
+    scheme, path = store_key(store)
+    level = split_options(_store(store))[1].get("durability")
+    key = (scheme, path, level)
+    with _LOCK:
+        repo = _INSTANCES.get(key)
+        if repo is None:
+            repo = _INSTANCES[key] = _build(scheme, path, level)
+        return repo
+
+
+def open_repository(store: str | None = None) -> TaskRepository:
+    """Build a new, uncached repository for `store` (e.g. to measure a cold start).
+
+    Raises RepositoryError for an unknown store scheme or option.
+    """
+    scheme, path = store_key(store)
+    return _build(scheme, path, split_options(_store(store))[1].get("durability"))
+
+
+def _build(scheme: str, path: str, level: Optional[str]) -> TaskRepository:
+    repo = _BACKENDS[scheme](path)
+    if level is not None:
+        from . import durability
+
+        repo.durability = durability.parse(level)  # backends without fsyncs ignore it
+    return repo
+
+
+def clear_cache() -> None:
+    """Drop cached instances (closing those that hold resources)."""
+    with _LOCK:
+        instances = list(_INSTANCES.values())
+        _INSTANCES.clear()
+    for repo in instances:
+        close = getattr(repo, "close", None)
+        if close is not None:
+            close()
@@ -0,0 +1,160 @@
+"""Resident repository: keeps a backing store's tasks in memory (used by the daemon)."""
+from __future__ import annotations
+import threading
+from typing import Hashable, List, Mapping, Optional, Sequence
+
+from .base import TaskRepository, Verification
+from src.models.task import Task, TaskDraft, validate_changes
+from src.models.task_table import TaskTable
+from src.services.filtering import filter_by_status
+from src.services.pagination import Page
+from src.services.query import Query, select_tasks
+from src.services.ranking import TermStats
+from src.services.search import search_tasks
+
+
+class ResidentTaskRepository(TaskRepository):
+    """Loads the backing repository once and answers reads from memory.
+
+    Writes go through to the backing repository first, so persistence and its
+    crash-safety guarantees are unchanged. Every request compares the backing
+    store's `change_stamp` with the one the copy was loaded at and reloads when
+    it moved, so writes by other processes (or by this one, bypassing the
+    daemon) are seen by the next request. Own writes adopt the stamp they
+    leave; an outside write landing in the instant between that write and
+    reading its stamp is only seen once the store changes again. Stores
+    without a stamp are only reloaded by `refresh`.
+
+    Tasks are held in a columnar `TaskTable`: filters and searches scan its
+    buffers and only the tasks returned are materialized. Updates and deletes
+    change the affected rows in place after the backing store has applied them.
+    """
+
+    def __init__(self, backing: TaskRepository) -> None:
+        self.backing = backing
+        self._tasks: Optional[TaskTable] = None
+        self._stats: Optional[TermStats] = None
+        self._stamp: Optional[Hashable] = None
+        self._lock = threading.RLock()
+
+    def _resident(self) -> TaskTable:
+        """The in-memory copy, (re)loaded if the backing store changed since."""
+        stamp = self.backing.change_stamp()
+        if self._tasks is None or stamp != self._stamp:
+            # Stamp taken before loading: a write landing meanwhile reloads again
+            self._tasks = TaskTable(self.backing.load_all_tasks())
+            self._stats = None
+            self._stamp = stamp
+        return self._tasks
+
+    def _adopt_stamp(self) -> None:
+        """Record the stamp of a write this instance applied to its copy itself."""
+        self._stamp = self.backing.change_stamp()
+
+    def refresh(self) -> None:
+        """Drop the in-memory copy; the next read reloads from the backing store."""
+        with self._lock:
+            self._tasks = None
+            self._stats = None
+
+    def load_all_tasks(self) -> List[Task]:
+        with self._lock:
+            return list(self._resident())
+
+    def verify(self, fix: bool = False) -> Verification:
+        """The backing store's `verify` (the records it reports were skipped when loading, so the copy stays valid)."""
+        with self._lock:
+            return self.backing.verify(fix)
+
+    def save_new_task(self, task: Task) -> None:
+        self.save_many([task])
+
+    def save_many(self, tasks: Sequence[Task]) -> None:
+        with self._lock:
+            resident = self._resident()
+            self.backing.save_many(tasks)
+            self._adopt_stamp()
+            self._remember(resident, tasks)
+
+    def next_id(self) -> int:
+        return self.backing.next_id()
+
+    def create_many(self, drafts: Sequence[TaskDraft]) -> List[Task]:
+        """Let the backing store allocate ids and persist, then add the tasks in memory."""
+        with self._lock:
+            resident = self._resident()
+            tasks = self.backing.create_many(drafts)
+            self._adopt_stamp()
+            self._remember(resident, tasks)
+        return tasks
+
+    def _remember(self, resident: TaskTable, tasks: Sequence[Task]) -> None:
+        resident.extend(tasks)
+        if self._stats is not None:
+            for task in tasks:
+                self._stats.add(task.title, task.description)
+
+    def update_task(self, task_id: int, **changes: object) -> Task:
+        with self._lock:
+            resident = self._resident()
+            task = self.backing.update_task(task_id, **changes)
+            self._adopt_stamp()
+            self._replace(resident, resident.row_of(task_id), task)
+        return task
+
+    def delete_task(self, task_id: int) -> Task:
+        with self._lock:
+            resident = self._resident()
+            task = self.backing.delete_task(task_id)
+            self._adopt_stamp()
+            row = resident.row_of(task_id)
+            if row is not None:
+                self._uncount(resident, row)
+                resident.delete(row)
+        return task
+
+    def update_where(
+        self, changes: Mapping[str, object], status: str | None = None, query: Optional[Query] = None
+    ) -> int:
+        """The backing store applies the update; the rows it selects here are then changed in place."""
+        changes = validate_changes(changes)
+        with self._lock:
+            resident = self._resident()
+            matches = list(self._where(status, query))
+            count = self.backing.update_where(changes, status, query)
+            self._adopt_stamp()
+            for task in matches:
+                self._replace(resident, resident.row_of(task.id), task.replace(**changes))
+        return count
+
+    def _replace(self, resident: TaskTable, row: Optional[int], task: Task) -> None:
+        if row is None:
+            return
+        self._uncount(resident, row)
+        resident.replace(row, task)
+        if self._stats is not None:
+            self._stats.add(task.title, task.description)
+
+    def _uncount(self, resident: TaskTable, row: int) -> None:
+        if self._stats is not None:
+            self._stats.remove(*resident.fields(row)[1:3])
+
+    def term_stats(self, terms: Sequence[str] = ()) -> TermStats:
+        """Statistics of the resident tasks, counted once and kept current by saves."""
+        with self._lock:
+            table = self._resident()
+            if self._stats is None:
+                self._stats = TermStats.build(table.fields(row)[1:3] for row in range(len(table)))
+            return self._stats
+
+    def list_tasks(self, status: str | None = None, page: Optional[Page] = None) -> List[Task]:
+        with self._lock:
+            return filter_by_status(self._resident(), status, page)
+
+    def search_tasks(self, query: str, page: Optional[Page] = None, jobs: int = 1) -> List[Task]:
+        with self._lock:
+            return search_tasks(self._resident(), query, page=page)
+
+    def query_tasks(self, query: Query, page: Optional[Page] = None) -> List[Task]:
+        with self._lock:
+            return select_tasks(self._resident(), query, page=page)
@@ -1,6 +1,74 @@
-"""Schema metadata for JSON persistence."""
+"""Schema metadata for JSON persistence, and conversion to and from binary snapshots."""
 
 SCHEMA_VERSION = 1
 
 def base_document() -> dict:
-    return {"schema_version": SCHEMA_VERSION, "tasks": []}
\ No newline at end of file
+    return {"schema_version": SCHEMA_VERSION, "next_id": 1, "generation": 0, "tasks": []}
+
+
+def document_generation(data: dict) -> int:
+    """Write counter of a document (0 for documents written before it existed)."""
+    generation = data.get("generation")
+    if isinstance(generation, int) and not isinstance(generation, bool) and generation >= 0:
+        return generation
+    return 0
+
+
+def with_header(data: dict, records: list, next_id: int) -> dict:
+    """Rebuild `data` around `records` with the header keys placed first.
+
+    `next_id` is the id high-water mark and `generation` counts writes (it is
+    bumped here, so every rewrite is distinguishable); both are written ahead
+    of the `tasks` array so streaming readers can fetch them without scanning
+    the records. Other top-level keys are preserved.
+    """
+    doc = {
+        "schema_version": SCHEMA_VERSION,
+        "next_id": next_id,
+        "generation": document_generation(data) + 1,
+        "tasks": records,
+    }
+    doc.update((k, v) for k, v in data.items() if k not in doc)
+    return doc
+
+
+def task_record(task) -> dict:
+    """Serialize a Task into the dict stored under the document's `tasks` key."""
+    return {
+        "id": task.id,
+        "title": task.title,
+        "description": task.description,
+        "status": task.status,
+    }
+
+
+def document_to_snapshot(data: dict) -> bytes:
+    """Encode a JSON store document as a binary snapshot (see `repository.snapshot`).
+
+    Invalid task records are skipped, as when the document is loaded; the
+    id counter and generation carry over.
+    Raises ValueError if two records share an id.
+    """
+    from src.models.task import Task
+    from src.services.id_allocator import next_id_from_document
+    from .snapshot import encode_snapshot
+
+    tasks = []
+    for record in data.get("tasks") or []:
+        try:
+            tasks.append(Task(**record))
+        except Exception:
+            continue
+    return encode_snapshot(tasks, next_id_from_document(data), document_generation(data))
+
+
+def snapshot_to_document(raw) -> dict:
+    """The JSON store document holding the tasks of an encoded snapshot (bytes or a buffer).
+
+    Raises ValueError if `raw` is not a snapshot.
+    """
+    from .snapshot import Snapshot
+
+    snapshot = Snapshot(raw)
+    records = [task_record(task) for task in snapshot.all_tasks()]
+    return with_header({"generation": snapshot.generation}, records, snapshot.next_id)
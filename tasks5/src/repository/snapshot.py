@@ -0,0 +1,331 @@
+"""Binary task snapshot: fixed-width record index plus a string heap.
+
+Layout (little-endian):
+
+- header (`HEADER`): magic `TASKSNAP`, schema_version, a reserved word,
+  generation, count, next_id, and `dead` (heap bytes no longer referenced);
+- index (`ENTRY` x count, rows in id order): task id, heap offset of the
+  title, title length, description length (`NO_DESCRIPTION` for None) and
+  status code (index in `ALLOWED_STATUSES`);
+- heap: UTF-8 text; a row's description follows its title.
+
+A `Snapshot` reads the format in place from a memory map (or any buffer):
+opening one parses the 48-byte header only, a task is one `unpack_from` and
+two slices, the task with a given id is found by its expected row (ids
+without gaps) or a binary search of the index, and status filters read the
+status column as one strided slice of the index.
+
+Edits go through `SnapshotEditor`, which copies the index and heap once,
+changes entries in place and appends new text to the heap; replaced text
+becomes dead bytes until the snapshot is re-encoded without them.
+"""
+from __future__ import annotations
+import mmap
+import pathlib
+import re
+import struct
+from bisect import bisect_left, bisect_right
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from src.models.status import ALLOWED_STATUSES
+from src.models.task import Task
+from .schema import SCHEMA_VERSION
+
+MAGIC = b"TASKSNAP"
+HEADER = struct.Struct("<8sIIQQQQ")  # magic, schema_version, reserved, generation, count, next_id, dead
+ENTRY = struct.Struct("<QQIIB3x")  # id, offset, title length, description length, status code
+NO_DESCRIPTION = 0xFFFFFFFF  # description length of a task without one
+STATUS_FIELD = 24  # offset of the status code within an entry
+SCAN_CHUNK = 1024  # rows per heap range checked at once by substring scans
+_STATUS_CODES = {status: code for code, status in enumerate(ALLOWED_STATUSES)}
+
+
+class SnapshotFormatError(ValueError):
+    """Raised when a buffer is not a snapshot this version can read."""
+
+
+class _Ids:
+    """Sequence view of the index's id column, for `bisect`."""
+
+    __slots__ = ("_buffer", "_count")
+
+    def __init__(self, buffer, count: int) -> None:
+        self._buffer = buffer
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, row: int) -> int:
+        return struct.unpack_from("<Q", self._buffer, HEADER.size + row * ENTRY.size)[0]
+
+
+class Snapshot:
+    """Read-only view of an encoded snapshot, with `TaskTable`'s row interface.
+
+    Raises SnapshotFormatError (from the constructor) if `buffer` has the
+    wrong magic or version, or is shorter than its header and index claim.
+    """
+
+    __slots__ = ("buffer", "generation", "count", "next_id", "dead", "heap_start", "ids", "_map")
+
+    def __init__(self, buffer, _map: Optional[mmap.mmap] = None) -> None:
+        if len(buffer) < HEADER.size:
+            raise SnapshotFormatError("Truncated snapshot header")
+        magic, version, _, self.generation, self.count, self.next_id, self.dead = HEADER.unpack_from(buffer)
+        if magic != MAGIC:
+            raise SnapshotFormatError("Not a task snapshot")
+        if version != SCHEMA_VERSION:
+            raise SnapshotFormatError(f"Unsupported snapshot version {version}")
+        self.heap_start = HEADER.size + self.count * ENTRY.size
+        if len(buffer) < self.heap_start:
+            raise SnapshotFormatError("Truncated snapshot index")
+        self.buffer = buffer
+        self.ids = _Ids(buffer, self.count)
+        self._map = _map
+
+    @classmethod
+    def open(cls, path: pathlib.Path | str) -> "Snapshot":
+        """Memory-map the snapshot at `path` (close it, or use it as a context manager).
+
+        Raises OSError if the file cannot be opened and SnapshotFormatError if
+        it is not a snapshot.
+        """
+        with open(path, "rb") as fh:
+            try:
+                mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise SnapshotFormatError("Empty snapshot")
+        try:
+            return cls(mm, mm)
+        except SnapshotFormatError:
+            mm.close()
+            raise
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+
+    def __enter__(self) -> "Snapshot":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[Task]:
+        return self.tasks(range(self.count))
+
+    def entry(self, row: int) -> Tuple[int, int, int, int, int]:
+        """(id, offset, title length, description length, status code) of `row`."""
+        return ENTRY.unpack_from(self.buffer, HEADER.size + row * ENTRY.size)
+
+    def task(self, row: int) -> Task:
+        """Materialize the `Task` stored in `row`."""
+        return _task(self.buffer, self.heap_start, self.entry(row))
+
+    def fields(self, row: int) -> Tuple[int, str, Optional[str], str]:
+        """(id, title, description, status) of `row`, without building a `Task`."""
+        return _fields(self.buffer, self.heap_start, self.entry(row))
+
+    def tasks(self, rows: Iterable[int]) -> Iterator[Task]:
+        """Materialize `rows` lazily, in the given order."""
+        task = self.task
+        return (task(row) for row in rows)
+
+    def all_tasks(self) -> List[Task]:
+        """Every task, decoding the index in one pass."""
+        buffer, heap = self.buffer, self.heap_start
+        return [_task(buffer, heap, entry) for entry in ENTRY.iter_unpack(buffer[HEADER.size:heap])]
+
+    def row_of(self, task_id: int) -> Optional[int]:
+        """Row holding `task_id`: its expected row when ids have no gaps, else a binary search."""
+        ids = self.ids
+        if not self.count:
+            return None
+        guess = task_id - ids[0]
+        if 0 <= guess < self.count and ids[guess] == task_id:
+            return guess
+        row = bisect_left(ids, task_id)
+        return row if row < self.count and ids[row] == task_id else None
+
+    def first_row_after(self, task_id: int) -> int:
+        """First row whose id is greater than `task_id`."""
+        return bisect_right(self.ids, task_id)
+
+    def status_codes(self) -> bytes:
+        """The status code of every row, read as one strided slice of the index."""
+        return self.buffer[HEADER.size + STATUS_FIELD:self.heap_start:ENTRY.size]
+
+    def rows_with_status(self, status: str, start: int = 0) -> Iterator[int]:
+        """Rows from `start` on whose status is `status` (none for an unknown status), in row order."""
+        code = _STATUS_CODES.get(status)
+        if code is None:
+            return iter(())
+        pattern = re.compile(re.escape(bytes([code])))
+        return (m.start() for m in pattern.finditer(self.status_codes(), start))
+
+    def rows_matching(self, needle: str, start: int = 0) -> Iterator[int]:
+        """Rows from `start` on whose title or description contains `needle`
+        (already lowercased), in row order.
+
+        Each chunk of rows is first screened on the heap range its text lies
+        in (when that range is ASCII); rows of chunks that may match are
+        checked one by one, so results match `services.search`.
+        """
+        if not needle:
+            return iter(range(start, self.count))
+        return self._scan(needle, start)
+
+    def _scan(self, needle: str, start: int) -> Iterator[int]:
+        buffer, heap = self.buffer, self.heap_start
+        screen = needle.isascii()
+        for lo in range(start, self.count, SCAN_CHUNK):
+            hi = min(lo + SCAN_CHUNK, self.count)
+            entries = list(ENTRY.iter_unpack(buffer[HEADER.size + lo * ENTRY.size:HEADER.size + hi * ENTRY.size]))
+            if screen:
+                first = heap + min(e[1] for e in entries)
+                last = heap + max(e[1] + e[2] + (0 if e[3] == NO_DESCRIPTION else e[3]) for e in entries)
+                text = buffer[first:last]
+                if text.isascii() and needle not in text.decode("ascii").lower():
+                    continue
+            for row, entry in enumerate(entries, lo):
+                if _contains(buffer, heap, entry, needle):
+                    yield row
+
+
+def _fields(buffer, heap: int, entry: Tuple[int, int, int, int, int]) -> Tuple[int, str, Optional[str], str]:
+    task_id, offset, title_len, desc_len, code = entry
+    start = heap + offset
+    split = start + title_len
+    title = buffer[start:split].decode("utf-8")
+    description = None if desc_len == NO_DESCRIPTION else buffer[split:split + desc_len].decode("utf-8")
+    return task_id, title, description, ALLOWED_STATUSES[code]
+
+
+def _task(buffer, heap: int, entry: Tuple[int, int, int, int, int]) -> Task:
+    return Task(*_fields(buffer, heap, entry))
+
+
+def _contains(buffer, heap: int, entry: Tuple[int, int, int, int, int], needle: str) -> bool:
+    _, offset, title_len, desc_len, _ = entry
+    start = heap + offset
+    split = start + title_len
+    if needle in buffer[start:split].decode("utf-8").lower():
+        return True
+    return desc_len != NO_DESCRIPTION and needle in buffer[split:split + desc_len].decode("utf-8").lower()
+
+
+def _text(task: Task) -> Tuple[bytes, int, int]:
+    """(heap bytes, title length, description length) of `task`."""
+    title = task.title.encode("utf-8")
+    if task.description is None:
+        return title, len(title), NO_DESCRIPTION
+    description = task.description.encode("utf-8")
+    return title + description, len(title), len(description)
+
+
+class SnapshotEditor:
+    """Mutable copy of a snapshot's index and heap, encoded back with `encode`.
+
+    Rows must stay in id order: `append` only accepts ids above the last one.
+    """
+
+    def __init__(self, snapshot: Optional[Snapshot] = None) -> None:
+        if snapshot is None:
+            self.index, self.heap = bytearray(), bytearray()
+            self.generation, self.next_id, self.dead = 0, 1, 0
+            return
+        buffer = snapshot.buffer
+        self.index = bytearray(buffer[HEADER.size:snapshot.heap_start])
+        self.heap = bytearray(buffer[snapshot.heap_start:])
+        self.generation, self.next_id, self.dead = snapshot.generation, snapshot.next_id, snapshot.dead
+
+    def __len__(self) -> int:
+        return len(self.index) // ENTRY.size
+
+    @property
+    def last_id(self) -> int:
+        return struct.unpack_from("<Q", self.index, len(self.index) - ENTRY.size)[0] if self.index else 0
+
+    def append(self, tasks: Iterable[Task]) -> None:
+        """Add `tasks` as the last rows.
+
+        Raises ValueError if their ids are not increasing past the last row's.
+        """
+        last = self.last_id
+        for task in tasks:
+            if task.id <= last:
+                raise ValueError(f"Task id {task.id} is not above {last}")
+            last = task.id
+            text, title_len, desc_len = _text(task)
+            self.index += ENTRY.pack(task.id, len(self.heap), title_len, desc_len, _STATUS_CODES[task.status])
+            self.heap += text
+        self.next_id = max(self.next_id, last + 1)
+
+    def insert(self, tasks: Iterable[Task]) -> None:
+        """Add `tasks` in any order: appended when their ids follow the last
+        row's, else merged with the stored rows in id order (re-encoding them).
+
+        Raises ValueError if an id is already present.
+        """
+        ordered = sorted(tasks, key=lambda t: t.id)
+        if ordered and ordered[0].id <= self.last_id:
+            ordered = sorted(self._live() + ordered, key=lambda t: t.id)
+            self.index, self.heap, self.dead = bytearray(), bytearray(), 0
+        self.append(ordered)
+
+    def replace(self, row: int, old: Task, task: Task) -> None:
+        """Store `task` (same id) in `row`, which holds `old`. A status
+        change only rewrites the code; new text is appended to the heap."""
+        pos = row * ENTRY.size
+        _, offset, title_len, desc_len, _ = ENTRY.unpack_from(self.index, pos)
+        if (task.title, task.description) != (old.title, old.description):
+            self.dead += title_len + (0 if desc_len == NO_DESCRIPTION else desc_len)
+            text, title_len, desc_len = _text(task)
+            offset = len(self.heap)
+            self.heap += text
+        ENTRY.pack_into(self.index, pos, task.id, offset, title_len, desc_len, _STATUS_CODES[task.status])
+
+    def delete(self, row: int) -> None:
+        """Remove `row`; its text becomes dead heap bytes."""
+        pos = row * ENTRY.size
+        _, _, title_len, desc_len, _ = ENTRY.unpack_from(self.index, pos)
+        self.dead += title_len + (0 if desc_len == NO_DESCRIPTION else desc_len)
+        del self.index[pos:pos + ENTRY.size]
+
+    def encode(self) -> bytes:
+        """The edited snapshot. The heap is rewritten without dead bytes once
+        they outnumber the live ones."""
+        if self.dead and 2 * self.dead > len(self.heap):
+            live = self._live()
+            self.index, self.heap, self.dead = bytearray(), bytearray(), 0
+            self.append(live)
+        return self._pack()
+
+    def _live(self) -> List[Task]:
+        return Snapshot(self._pack()).all_tasks()
+
+    def _pack(self) -> bytes:
+        header = HEADER.pack(MAGIC, SCHEMA_VERSION, 0, self.generation, len(self), self.next_id, self.dead)
+        return b"".join((header, self.index, self.heap))
+
+
+def encode_snapshot(tasks: Iterable[Task], next_id: int = 1, generation: int = 0) -> bytes:
+    """Snapshot holding `tasks` (sorted by id) with the given counters.
+
+    Raises ValueError if two tasks share an id.
+    """
+    editor = SnapshotEditor()
+    editor.insert(tasks)
+    editor.next_id = max(editor.next_id, next_id)
+    editor.generation = generation
+    return editor.encode()
+
+
+__all__ = [
+    "ENTRY", "HEADER", "MAGIC", "NO_DESCRIPTION", "Snapshot", "SnapshotEditor", "SnapshotFormatError",
+    "encode_snapshot",
+]
@@ -0,0 +1,472 @@
+"""SQLite repository (stdlib sqlite3, WAL mode) with indexed status and FTS5 search.
+
+Schema mirrors the JSON document: one `tasks` row per task plus a `meta` table
+holding `schema_version`. `idx_tasks_status` turns status filters into index
+lookups; `tasks_fts` is an external-content FTS5 table using the trigram
+tokenizer, kept in sync by triggers, so substring search reads posting lists
+instead of scanning every row. For ranked search, `tasks_words` (a word-level
+FTS5 index read through the `tasks_words_vocab` view) holds per-word document
+frequencies and `stats` the document count and text lengths; triggers keep both
+current on every insert, update and delete. The update triggers only fire
+when the title or description changes, so status transitions touch the row
+and `idx_tasks_status` alone.
+"""
+from __future__ import annotations
+import pathlib
+import sqlite3
+import threading
+from typing import TYPE_CHECKING, Callable, List, Mapping, Optional, Sequence, TypeVar
+
+from .base import BadRecord, TaskRepository, Verification
+from .durability import Durability, resolve, sqlite_synchronous
+from .durability import parse as parse_durability
+from .errors import RepositoryError, TaskNotFoundError
+from .schema import SCHEMA_VERSION
+from src.models.task import Task, TaskDraft, record_error, validate_changes
+from src.models.status import ALLOWED_STATUSES
+from src.services.pagination import Page
+from src.services.profiling import span
+from src.services.search import search_tasks
+
+if TYPE_CHECKING:
+    from src.services.query import Query
+    from src.services.ranking import TermStats
+
+T = TypeVar("T")
+
+# Trigram FTS cannot answer needles shorter than this; those fall back to a scan.
+FTS_MIN_QUERY = 3
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    description TEXT NULL,
+    status TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status, id);
+CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+    title, description, content='tasks', content_rowid='id', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+    INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+    INSERT INTO tasks_fts(tasks_fts, rowid, title, description)
+    VALUES ('delete', old.id, old.title, old.description);
+END;
+DROP TRIGGER IF EXISTS tasks_fts_update;
+CREATE TRIGGER IF NOT EXISTS tasks_fts_update_text AFTER UPDATE OF title, description ON tasks BEGIN
+    INSERT INTO tasks_fts(tasks_fts, rowid, title, description)
+    VALUES ('delete', old.id, old.title, old.description);
+    INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+END;
+CREATE TABLE IF NOT EXISTS stats (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+CREATE VIRTUAL TABLE IF NOT EXISTS tasks_words USING fts5(
+    title, description, content='tasks', content_rowid='id', tokenize='unicode61 remove_diacritics 0'
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS tasks_words_vocab USING fts5vocab(tasks_words, row);
+CREATE TRIGGER IF NOT EXISTS tasks_words_insert AFTER INSERT ON tasks BEGIN
+    INSERT INTO tasks_words(rowid, title, description) VALUES (new.id, new.title, new.description);
+    UPDATE stats SET value = value + CASE key
+        WHEN 'docs' THEN 1 WHEN 'title_chars' THEN length(new.title) ELSE coalesce(length(new.description), 0) END;
+END;
+CREATE TRIGGER IF NOT EXISTS tasks_words_delete AFTER DELETE ON tasks BEGIN
+    INSERT INTO tasks_words(tasks_words, rowid, title, description)
+    VALUES ('delete', old.id, old.title, old.description);
+    UPDATE stats SET value = value - CASE key
+        WHEN 'docs' THEN 1 WHEN 'title_chars' THEN length(old.title) ELSE coalesce(length(old.description), 0) END;
+END;
+CREATE TRIGGER IF NOT EXISTS tasks_words_update AFTER UPDATE OF title, description ON tasks BEGIN
+    INSERT INTO tasks_words(tasks_words, rowid, title, description)
+    VALUES ('delete', old.id, old.title, old.description);
+    INSERT INTO tasks_words(rowid, title, description) VALUES (new.id, new.title, new.description);
+    UPDATE stats SET value = value + CASE key
+        WHEN 'docs' THEN 0
+        WHEN 'title_chars' THEN length(new.title) - length(old.title)
+        ELSE coalesce(length(new.description), 0) - coalesce(length(old.description), 0) END;
+END;
+"""
+
+# Seeds `stats` (and the word index) for a database created before they existed
+STATS_BACKFILL_SQL = """
+INSERT INTO stats(key, value)
+    SELECT 'docs', COUNT(*) FROM tasks
+    UNION ALL SELECT 'title_chars', COALESCE(SUM(length(title)), 0) FROM tasks
+    UNION ALL SELECT 'desc_chars', COALESCE(SUM(length(description)), 0) FROM tasks;
+INSERT INTO tasks_words(tasks_words) VALUES ('rebuild');
+"""
+
+_COLUMNS = "id, title, description, status"
+# Deleting the newest task must not hand its id out again: `meta.next_id`
+# keeps the high-water mark past deleted ids
+_NEXT_ID_SQL = (
+    "SELECT MAX(COALESCE(MAX(id), 0) + 1, "
+    "COALESCE((SELECT CAST(value AS INTEGER) FROM meta WHERE key = 'next_id'), 1)) FROM tasks"
+)
+
+
+class SqlTaskRepository(TaskRepository):
+    """Repository storing tasks in a SQLite database (default `tasks.db`).
+
+    The connection is opened lazily and shared by all threads using this
+    instance (access is serialized by an internal lock). `durability` picks
+    `PRAGMA synchronous` for each write transaction (see
+    `repository.durability`).
+    """
+
+    def __init__(
+        self, path: pathlib.Path | str = pathlib.Path("tasks.db"), durability: Durability | str | None = None
+    ) -> None:
+        self.path = pathlib.Path(path)
+        self.durability = parse_durability(durability)
+        self._conn: sqlite3.Connection | None = None
+        self._synchronous: Optional[str] = None
+        self._lock = threading.RLock()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Open (once) and return the database connection, creating the schema.
+
+        Raises RepositoryError if the database cannot be opened or initialized.
+        """
+        with self._lock:
+            if self._conn is None:
+                try:
+                    conn = sqlite3.connect(str(self.path), check_same_thread=False)
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    self._synchronous = sqlite_synchronous(resolve(self.durability))
+                    conn.execute(f"PRAGMA synchronous={self._synchronous}")
+                    # REPLACE then fires the delete triggers, keeping FTS and stats exact
+                    conn.execute("PRAGMA recursive_triggers=ON")
+                    with conn:
+                        conn.executescript(SCHEMA_SQL)
+                        conn.execute(
+                            "INSERT OR IGNORE INTO meta(key, value) VALUES ('schema_version', ?)",
+                            (str(SCHEMA_VERSION),),
+                        )
+                    if conn.execute("SELECT 1 FROM stats WHERE key = 'docs'").fetchone() is None:
+                        conn.executescript("BEGIN IMMEDIATE;" + STATS_BACKFILL_SQL + "COMMIT;")
+                except sqlite3.Error as e:
+                    raise RepositoryError(f"Cannot open SQLite store: {e}")
+                self._conn = conn
+            return self._conn
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def change_stamp(self) -> int:
+        """`PRAGMA data_version`: it changes when another connection commits
+        (this instance's own writes leave it as it is)."""
+        conn = self._connection()
+        with self._lock:
+            return conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def load_all_tasks(self) -> List[Task]:
+        return self._query(f"SELECT {_COLUMNS} FROM tasks ORDER BY id")
+
+    def save_new_task(self, task: Task) -> None:
+        """Insert `task`.
+
+        Raises RepositoryError if a task with the same id already exists.
+        """
+        self._insert_many([task])
+
+    def save_many(self, tasks: Sequence[Task]) -> None:
+        """Insert all `tasks` in one transaction.
+
+        Raises RepositoryError if any id already exists (nothing is inserted).
+        """
+        self._insert_many(tasks)
+
+    def next_id(self) -> int:
+        """One past the largest id (a primary-key lookup, not a scan)."""
+        conn = self._connection()
+        with self._lock:
+            return conn.execute(_NEXT_ID_SQL).fetchone()[0]
+
+    def create_many(self, drafts: Sequence[TaskDraft]) -> List[Task]:
+        """Allocate ids and insert the tasks inside one write transaction.
+
+        `BEGIN IMMEDIATE` takes the database write lock before reading the
+        next free id, so concurrent writers (other processes included) cannot
+        reserve the same ids.
+        Raises ValueError if a draft is invalid and RepositoryError if the
+        insert fails.
+        """
+        def insert(conn: sqlite3.Connection) -> List[Task]:
+            first = conn.execute(_NEXT_ID_SQL).fetchone()[0]
+            tasks = [draft.to_task(first + i) for i, draft in enumerate(drafts)]
+            conn.executemany(
+                f"INSERT INTO tasks({_COLUMNS}) VALUES (?, ?, ?, ?)",
+                [(t.id, t.title, t.description, t.status) for t in tasks],
+            )
+            return tasks
+
+        return self._write("Cannot save tasks", insert)
+
+    def get_task(self, task_id: int) -> Optional[Task]:
+        """Primary-key lookup."""
+        found = self._query(f"SELECT {_COLUMNS} FROM tasks WHERE id = ?", (task_id,))
+        return found[0] if found else None
+
+    def update_task(self, task_id: int, **changes: object) -> Task:
+        """One `UPDATE` by primary key; the triggers keep FTS and statistics current.
+
+        Raises TaskNotFoundError if no task has `task_id`, ValueError if a
+        change is invalid and RepositoryError if the write fails.
+        """
+        def update(conn: sqlite3.Connection) -> Task:
+            task = self._locked_task(conn, task_id).replace(**changes)
+            conn.execute(
+                "UPDATE tasks SET title = ?, description = ?, status = ? WHERE id = ?",
+                (task.title, task.description, task.status, task.id),
+            )
+            return task
+
+        return self._write("Cannot update task", update)
+
+    def delete_task(self, task_id: int) -> Task:
+        """One `DELETE` by primary key, recording the id high-water mark first.
+
+        Raises TaskNotFoundError if no task has `task_id` and RepositoryError
+        if the write fails.
+        """
+        def delete(conn: sqlite3.Connection) -> Task:
+            task = self._locked_task(conn, task_id)
+            _record_next_id(conn)
+            conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+            return task
+
+        return self._write("Cannot delete task", delete)
+
+    def verify(self, fix: bool = False) -> Verification:
+        """Validate every row (the schema only enforces NOT NULL); with `fix`,
+        delete the invalid ones in one transaction, keeping their ids used.
+
+        Raises RepositoryError if the rows cannot be deleted.
+        """
+        conn = self._connection()
+        with self._lock:
+            rows = conn.execute("SELECT id, title, description, status FROM tasks ORDER BY id").fetchall()
+        invalid = _invalid_rows(rows)
+        if invalid and fix:
+            def delete(conn: sqlite3.Connection) -> None:
+                _record_next_id(conn)
+                conn.executemany("DELETE FROM tasks WHERE id = ?", [(bad.id,) for bad in invalid])
+
+            self._write("Cannot delete invalid tasks", delete)
+        return Verification(len(rows), invalid, bool(invalid and fix))
+
+    def update_where(
+        self, changes: Mapping[str, object], status: str | None = None, query: Optional["Query"] = None
+    ) -> int:
+        """A status filter alone becomes one `UPDATE ... WHERE status = ?` on
+        `idx_tasks_status`; with a query, the matches are selected by
+        `query_tasks` and updated by primary key, in the same transaction.
+
+        Raises ValueError if a change is invalid and RepositoryError if the
+        write fails.
+        """
+        changes = validate_changes(changes)
+        assignments = ", ".join(f"{name} = ?" for name in changes)
+        values = list(changes.values())
+
+        def update(conn: sqlite3.Connection) -> int:
+            if query is None:
+                if status is None:
+                    return conn.execute(f"UPDATE tasks SET {assignments}", values).rowcount
+                return conn.execute(f"UPDATE tasks SET {assignments} WHERE status = ?", values + [status]).rowcount
+            ids = [t.id for t in self.query_tasks(query) if status is None or t.status == status]
+            conn.executemany(f"UPDATE tasks SET {assignments} WHERE id = ?", [values + [i] for i in ids])
+            return len(ids)
+
+        return self._write("Cannot update tasks", update)
+
+    @staticmethod
+    def _locked_task(conn: sqlite3.Connection, task_id: int) -> Task:
+        row = conn.execute(f"SELECT {_COLUMNS} FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        if row is None:
+            raise TaskNotFoundError(f"Task {task_id} not found")
+        return Task(*row)
+
+    def _write(self, action: str, work: Callable[[sqlite3.Connection], T]) -> T:
+        """Run `work` inside one write transaction and commit it.
+
+        `BEGIN IMMEDIATE` takes the database write lock before `work` reads
+        anything, so concurrent writers (other processes included) see each
+        other's changes. Exceptions from `work` roll the transaction back.
+        Raises RepositoryError (prefixed with `action`) if SQLite fails.
+        """
+        conn = self._connection()
+        with self._lock:
+            try:
+                self._apply_durability(conn)
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    result = work(conn)
+                except BaseException:
+                    conn.rollback()
+                    raise
+                conn.commit()
+            except sqlite3.Error as e:
+                raise RepositoryError(f"{action}: {e}")
+        return result
+
+    def _apply_durability(self, conn: sqlite3.Connection) -> None:
+        """Set `PRAGMA synchronous` for the next write (it cannot change inside a transaction)."""
+        synchronous = sqlite_synchronous(resolve(self.durability))
+        if synchronous != self._synchronous:
+            conn.execute(f"PRAGMA synchronous={synchronous}")
+            self._synchronous = synchronous
+
+    def _insert_many(self, tasks: Sequence[Task], replace: bool = False, next_id: int = 1) -> int:
+        """Insert tasks in a single transaction; returns the number of rows written.
+
+        A `next_id` above the store's own is recorded as its id high-water
+        mark in the same transaction (migrations carry the source's over).
+        Raises RepositoryError on duplicate ids unless `replace` is set.
+        """
+        verb = "INSERT OR REPLACE" if replace else "INSERT"
+        conn = self._connection()
+        with self._lock:
+            try:
+                self._apply_durability(conn)
+                with conn:
+                    conn.executemany(
+                        f"{verb} INTO tasks({_COLUMNS}) VALUES (?, ?, ?, ?)",
+                        [(t.id, t.title, t.description, t.status) for t in tasks],
+                    )
+                    if next_id > conn.execute(_NEXT_ID_SQL).fetchone()[0]:
+                        _record_next_id(conn, next_id)
+            except sqlite3.IntegrityError as e:
+                raise RepositoryError(f"Cannot save tasks: {e}")
+        return len(tasks)
+
+    def list_tasks(self, status: str | None = None, page: Optional[Page] = None) -> List[Task]:
+        """Status filter answered by `idx_tasks_status`; `page` becomes `id > ?`/LIMIT/OFFSET."""
+        if status is not None and status not in ALLOWED_STATUSES:
+            return []
+        where, params = [], []
+        if status is not None:
+            where.append("status = ?")
+            params.append(status)
+        if page is not None and page.after_id is not None:
+            where.append("id > ?")
+            params.append(page.after_id)
+        sql = f"SELECT {_COLUMNS} FROM tasks"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY id"
+        if page is not None and (page.limit is not None or page.offset):
+            sql += " LIMIT ? OFFSET ?"
+            params += [-1 if page.limit is None else page.limit, page.offset]
+        return self._query(sql, tuple(params))
+
+    def search_tasks(self, query: str, page: Optional[Page] = None, jobs: int = 1) -> List[Task]:
+        """Substring search answered by the trigram FTS index (`jobs` is not used).
+
+        FTS5 case folding differs from `str.lower` outside ASCII, so the index is
+        only used for ASCII needles; every candidate is re-checked with the
+        services-layer predicate so results match `services.search` exactly.
+
+        Raises ValueError if query is blank.
+        """
+        if not isinstance(query, str) or not query.strip():
+            raise ValueError("Search query cannot be blank")
+        after_id = None if page is None else page.after_id
+        if len(query) < FTS_MIN_QUERY or not query.isascii():
+            scan = self.load_all_tasks() if after_id is None else self._query(
+                f"SELECT {_COLUMNS} FROM tasks WHERE id > ? ORDER BY id", (after_id,)
+            )
+            return search_tasks(scan, query, page=page)
+        phrase = '"' + query.replace('"', '""') + '"'
+        candidates = self._query(
+            f"SELECT {_COLUMNS} FROM tasks WHERE id IN "
+            "(SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH ?) AND id > ? ORDER BY id",
+            (phrase, -1 if after_id is None else after_id),
+        )
+        # Candidates are re-checked, so offset/limit can only apply afterwards
+        return search_tasks(candidates, query, page=page)
+
+    def query_tasks(self, query: "Query", page: Optional[Page] = None) -> List[Task]:
+        """Parsed query: statuses and id range become `WHERE` terms on the primary
+        key and `idx_tasks_status`, the longest required ASCII substring of at
+        least `FTS_MIN_QUERY` characters an FTS match; the compiled predicate
+        re-checks the candidates."""
+        from src.services.query import select_tasks
+
+        where, params = [], []
+        if query.statuses is not None:
+            where.append(f"status IN ({', '.join('?' * len(query.statuses))})")
+            params.extend(sorted(query.statuses))
+        low = query.id_low
+        if page is not None and page.after_id is not None:
+            low = page.after_id + 1 if low is None else max(low, page.after_id + 1)
+        if low is not None:
+            where.append("id >= ?")
+            params.append(low)
+        if query.id_high is not None:
+            where.append("id <= ?")
+            params.append(query.id_high)
+        needle = query.best_needle(ascii_only=True)
+        if needle is not None and len(needle) >= FTS_MIN_QUERY:
+            where.append("id IN (SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH ?)")
+            params.append('"' + needle.replace('"', '""') + '"')
+        sql = f"SELECT {_COLUMNS} FROM tasks"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        candidates = self._query(sql + " ORDER BY id", tuple(params))
+        # after_id is already applied in SQL; offset/limit apply after the re-check
+        return select_tasks(candidates, query, page=None if page is None else page._replace(after_id=None))
+
+    def term_stats(self, terms: Sequence[str] = ()) -> "TermStats":
+        """Totals from `stats` plus the document frequencies of `terms` from
+        `tasks_words_vocab` (only those terms are read)."""
+        from src.services.ranking import TermStats
+
+        conn = self._connection()
+        terms = list(terms)
+        with self._lock:
+            totals = dict(conn.execute("SELECT key, value FROM stats").fetchall())
+            df = dict(conn.execute(
+                f"SELECT term, doc FROM tasks_words_vocab WHERE term IN ({', '.join('?' * len(terms))})", terms
+            ).fetchall()) if terms else {}
+        return TermStats(totals.get("docs", 0), totals.get("title_chars", 0), totals.get("desc_chars", 0), df=df)
+
+    def _query(self, sql: str, params: tuple = ()) -> List[Task]:
+        conn = self._connection()
+        with self._lock, span("sql.query"):
+            rows = conn.execute(sql, params).fetchall()
+        tasks = []
+        with span("tasks.build"):
+            for row in rows:
+                try:
+                    tasks.append(Task(*row))
+                except Exception:
+                    # Mirror JsonTaskRepository: skip invalid rows
+                    continue
+        return tasks
+
+
+def _record_next_id(conn: sqlite3.Connection, next_id: Optional[int] = None) -> None:
+    """Store `next_id` (default: the current one) as `meta.next_id`."""
+    if next_id is None:
+        next_id = conn.execute(_NEXT_ID_SQL).fetchone()[0]
+    conn.execute(
+        "INSERT INTO meta(key, value) VALUES ('next_id', ?) "
+        "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+        (str(next_id),),
+    )
+
+
+def _invalid_rows(rows: Sequence[tuple]) -> List[BadRecord]:
+    invalid = []
+    for position, (task_id, title, description, status) in enumerate(rows):
+        reason = record_error({"id": task_id, "title": title, "description": description, "status": status})
+        if reason is not None:
+            invalid.append(BadRecord(position, task_id, reason))
+    return invalid
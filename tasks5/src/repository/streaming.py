@@ -0,0 +1,250 @@
+"""Streaming reader for the JSON task document.
+
+Memory-maps `tasks.json` and yields one raw task record (dict) at a time, so
+callers can filter on raw fields and only build `Task` objects for the
+survivors. Peak memory is the current record plus whatever the caller keeps.
+
+Records are located with a regex over the map, optionally screened by a
+cheap byte-level `prefilter`, and decoded in batches with one `codec.loads`
+call per batch.
+
+The reader only accepts the shape this repository writes: a top-level object
+whose `tasks` array holds flat objects. Anything else raises StreamFormatError
+and callers fall back to decoding the whole document (which also owns corruption
+recovery).
+"""
+from __future__ import annotations
+import json
+import mmap
+import pathlib
+import re
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from . import codec
+from src.services import profiling
+
+_TASKS_KEY = re.compile(rb'"tasks"\s*:\s*\[')
+_EMPTY_ARRAY = re.compile(rb"\s*\]")
+# One flat JSON object (strings may contain braces/escapes) followed by `,` or `]`
+_RECORD = re.compile(rb'\s*+(\{[^{}"]*+(?:"[^"\\]*+(?:\\.[^"\\]*+)*+"[^{}"]*+)*+\})\s*+(,|\])', re.S)
+# `{"key":` only occurs at an object start: a `{` inside a string can only be
+# followed by an unescaped `"` that closes the string, and the next `"` then
+# opens a string rather than being followed by `:`
+_RECORD_START = re.compile(rb'\{\s*"[^"\\]*"\s*:')
+DECODE_BATCH = 512
+
+ByteFilter = Callable[[bytes], bool]
+Span = Tuple[int, int]
+
+
+class StreamFormatError(ValueError):
+    """Raised when the document cannot be streamed record by record."""
+
+
+def iter_task_records(
+    path: pathlib.Path | str, prefilter: Optional[ByteFilter] = None, span: Optional[Span] = None
+) -> Iterator[dict]:
+    """Yield each record of the document's `tasks` array in file order.
+
+    `prefilter` receives the raw bytes of each record; records it rejects are
+    never decoded. It must only reject records that cannot match (see
+    `status_prefilter` / `substring_prefilter`). With `span` (from
+    `record_spans`), only the records starting inside that byte range are read.
+
+    Raises OSError if the file cannot be opened and StreamFormatError if the
+    document is not in the expected shape (possibly after yielding records).
+    """
+    with open(path, "rb") as fh:
+        try:
+            mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file cannot be mapped
+            raise StreamFormatError("Empty document")
+        with mm:
+            raws = _iter_raw(mm, span)
+            kept = raws if prefilter is None else filter(prefilter, raws)
+            try:
+                while True:
+                    with profiling.span("store.scan"):
+                        batch = list(islice(kept, DECODE_BATCH))
+                    yield from _decode(batch)
+                    if len(batch) < DECODE_BATCH:
+                        return
+            finally:
+                # The regex scanner inside `raws` holds a buffer export of the
+                # map; a stream abandoned early must release it before unmapping
+                raws.close()
+                del kept, raws
+
+
+def read_header(path: pathlib.Path | str) -> dict:
+    """Top-level keys written before the `tasks` array (e.g. `next_id`).
+
+    Only the header bytes are read and decoded, so the cost does not depend
+    on the number of records.
+    Raises OSError if the file cannot be opened and StreamFormatError if the
+    header cannot be located or decoded.
+    """
+    with open(path, "rb") as fh:
+        try:
+            mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise StreamFormatError("Empty document")
+        with mm:
+            key = _TASKS_KEY.search(mm)
+            if key is None:
+                raise StreamFormatError("Missing tasks array")
+            header = mm[:key.start()]
+    try:
+        data = codec.loads(header + b'"tasks": []}')
+    except ValueError as e:
+        raise StreamFormatError(f"Invalid header: {e}")
+    if not isinstance(data, dict):  # pragma: no cover - `{` prefix makes this unreachable
+        raise StreamFormatError("Invalid header")
+    data.pop("tasks")
+    return data
+
+
+def record_spans(path: pathlib.Path | str, count: int) -> List[Span]:
+    """Split the `tasks` array into at most `count` contiguous byte ranges of
+    similar size, each starting at a record boundary.
+
+    Reading every span with `iter_task_records` and concatenating the results
+    in order yields the same records as one full read.
+    Raises OSError if the file cannot be opened and StreamFormatError if the
+    tasks array cannot be located.
+    """
+    with open(path, "rb") as fh:
+        try:
+            mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise StreamFormatError("Empty document")
+        with mm:
+            key = _TASKS_KEY.search(mm)
+            if key is None:
+                raise StreamFormatError("Missing tasks array")
+            start, end = key.end(), len(mm)
+            bounds = [start]
+            for i in range(1, count):
+                boundary = _RECORD_START.search(mm, max(bounds[-1] + 1, start + (end - start) * i // count))
+                if boundary is None:
+                    break
+                bounds.append(boundary.start())
+    bounds.append(end)
+    return list(zip(bounds, bounds[1:]))
+
+
+def find_record(path: pathlib.Path | str, task_id: int) -> Optional[dict]:
+    """The record with id `task_id`, found by binary search over the `tasks`
+    array in O(log n) record decodes.
+
+    Stores written by this repository keep records in id order; the search
+    assumes so, so None means "not found that way" and callers that cannot
+    rule out an unordered document fall back to a scan.
+    Raises OSError if the file cannot be opened and StreamFormatError if the
+    tasks array cannot be located or a probed record cannot be decoded.
+    """
+    return next(find_records(path, [task_id]), None)
+
+
+def find_records(path: pathlib.Path | str, task_ids: Iterable[int]) -> Iterator[dict]:
+    """`find_record` for each of `task_ids` (ascending), yielding the records
+    found in id order from one mapping of the document.
+
+    Each search starts after the previous match, so the ids are read in one
+    forward sweep. Raises like `find_record`.
+    """
+    with open(path, "rb") as fh:
+        try:
+            mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise StreamFormatError("Empty document")
+        with mm:
+            key = _TASKS_KEY.search(mm)
+            if key is None:
+                raise StreamFormatError("Missing tasks array")
+            start = key.end()
+            for task_id in task_ids:
+                record, end = _bisect_record(mm, start, task_id)
+                if record is not None:
+                    start = end
+                    yield record
+
+
+def _bisect_record(mm: mmap.mmap, lo: int, task_id: int) -> Tuple[Optional[dict], int]:
+    """Binary search of the records starting at or after `lo` for `task_id`:
+    (the record or None, the offset just past it).
+
+    Raises StreamFormatError if a probed record cannot be decoded.
+    """
+    hi = len(mm)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        start = _RECORD_START.search(mm, mid)
+        record = _RECORD.match(mm, start.start()) if start is not None and start.start() < hi else None
+        if record is None:
+            hi = mid  # no record starts in [mid, hi)
+            continue
+        found = _decode([record.group(1)])[0]
+        found_id = found.get("id") if isinstance(found, dict) else None
+        if not isinstance(found_id, int):
+            return None, lo
+        if found_id == task_id:
+            return found, record.end()
+        if found_id < task_id:
+            lo = record.end()
+        else:
+            hi = mid
+    return None, lo
+
+
+def status_prefilter(status: str) -> ByteFilter:
+    """Reject records whose bytes cannot hold `"status": "<status>"`."""
+    literal = json.dumps(status).encode("utf-8")
+    return lambda raw: literal in raw or b"\\u" in raw
+
+
+def substring_prefilter(needle: str) -> Optional[ByteFilter]:
+    """Reject records that cannot contain `needle` (lowercased) case-insensitively.
+
+    Only ASCII needles can be screened: `bytes.lower` folds ASCII exactly like
+    `str.lower`, and records with escapes or non-ASCII text (where `str.lower`
+    may produce ASCII) are always kept. Returns None when no screen applies.
+    """
+    if not needle.isascii():
+        return None
+    literal = needle.encode("ascii")
+    return lambda raw: literal in raw.lower() or not raw.isascii() or b"\\" in raw
+
+
+def _decode(batch: List[bytes]) -> List[dict]:
+    if not batch:
+        return []
+    try:
+        return codec.loads(b"[" + b",".join(batch) + b"]")
+    except ValueError as e:
+        raise StreamFormatError(f"Invalid record: {e}")
+
+
+def _iter_raw(mm: mmap.mmap, span: Optional[Span] = None) -> Iterator[bytes]:
+    key = _TASKS_KEY.search(mm)
+    header = mm[:key.start()] if key else b""
+    if key is None or not header.lstrip().startswith(b"{") or header.endswith(b"\\"):
+        raise StreamFormatError("Missing tasks array")
+    if b'"schema_version"' not in header or not mm[-64:].rstrip().endswith(b"}"):
+        raise StreamFormatError("Missing schema_version or truncated document")
+    pos, stop = key.end(), len(mm)
+    if span is not None:
+        pos, stop = max(pos, span[0]), span[1]
+    if pos == key.end() and _EMPTY_ARRAY.match(mm, pos):
+        return
+    for match in _RECORD.finditer(mm, pos):
+        if match.start() != pos:
+            break
+        if match.start(1) >= stop:
+            return
+        yield match.group(1)
+        if match.group(2) == b"]":
+            return
+        pos = match.end()
+    raise StreamFormatError(f"Unexpected content at byte {pos}")
@@ -0,0 +1,118 @@
+"""In-process cache of parsed task documents, validated by file identity.
+
+Entries map a store path to the tuple of `Task`s parsed from it, stamped with
+the file's (inode, mtime_ns, size) at read time. A lookup with a different
+identity misses, so writes by other processes (which replace the file, and
+therefore change its inode) are never served stale. `Task` is immutable, so
+the tuples are shared freely between callers.
+
+Memory use is estimated per task and capped by `max_bytes`; the least
+recently used documents are evicted first, and a document whose estimate
+alone exceeds the cap is not cached at all.
+"""
+from __future__ import annotations
+import os
+import pathlib
+import threading
+from collections import OrderedDict
+from typing import Iterable, Optional, Sequence, Tuple
+
+from src.models.task import Task
+
+DEFAULT_MAX_BYTES = 128 << 20
+# Rough resident size of one Task: the object, its title/description strings,
+# its id and the tuple slot (status strings are shared). Text is added per task.
+TASK_OVERHEAD = 208
+
+FileIdentity = Tuple[int, int, int]
+
+
+def file_identity(path: pathlib.Path | str) -> Optional[FileIdentity]:
+    """(inode, mtime_ns, size) of `path`, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def estimate_bytes(tasks: Iterable[Task]) -> int:
+    total = 0
+    for t in tasks:
+        total += TASK_OVERHEAD + len(t.title) + len(t.description or "")
+    return total
+
+
+class TaskCache:
+    """LRU of parsed task tuples per store path, bounded by estimated bytes.
+
+    Thread-safe; one instance may be shared by several repositories.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self.bytes_used = 0
+        self._entries: "OrderedDict[str, Tuple[FileIdentity, Tuple[Task, ...], int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def admits(self, nbytes: int) -> bool:
+        """Whether a document of (at least) `nbytes` could be cached at all."""
+        return nbytes <= self.max_bytes
+
+    def get(self, path: pathlib.Path | str, identity: FileIdentity) -> Optional[Tuple[Task, ...]]:
+        """Cached tasks for `path` if they were read from the file with `identity`."""
+        key = str(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != identity:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, path: pathlib.Path | str, identity: FileIdentity, tasks: Sequence[Task]) -> None:
+        """Cache `tasks` as the content of `path` at `identity` (skipped if over the cap)."""
+        tasks = tuple(tasks)
+        self._store(str(path), identity, tasks, estimate_bytes(tasks))
+
+    def extend(
+        self, path: pathlib.Path | str, before: Optional[FileIdentity], after: Optional[FileIdentity], added: Sequence[Task]
+    ) -> bool:
+        """Follow a write that appended `added` to `path`, changing it from `before` to `after`.
+
+        Returns False (and drops the entry) if the cache did not hold the
+        `before` version, since the new content is then unknown.
+        """
+        key = str(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or before is None or after is None or entry[0] != before:
+                self._drop(key)
+                return False
+        tasks = entry[1] + tuple(added)
+        self._store(key, after, tasks, entry[2] + estimate_bytes(added))
+        return True
+
+    def discard(self, path: pathlib.Path | str) -> None:
+        with self._lock:
+            self._drop(str(path))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.bytes_used = 0
+
+    def _store(self, key: str, identity: FileIdentity, tasks: Tuple[Task, ...], nbytes: int) -> None:
+        with self._lock:
+            self._drop(key)
+            if not self.admits(nbytes):
+                return
+            self._entries[key] = (identity, tasks, nbytes)
+            self.bytes_used += nbytes
+            while self.bytes_used > self.max_bytes:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self.bytes_used -= evicted
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes_used -= entry[2]
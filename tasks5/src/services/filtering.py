@@ -1,14 +1,26 @@
 """Filtering services for tasks."""
 from __future__ import annotations
-from typing import Iterable, List
+from typing import Iterable, List, Optional
 
 from src.models.task import Task
 from src.models.status import ALLOWED_STATUSES
+from src.models.task_table import TaskTable
+from src.services.pagination import Page, paginate, table_page
+from src.services.profiling import span
 
 
-def filter_by_status(tasks: Iterable[Task], status: str | None) -> List[Task]:
-    if status is None:
-        return list(tasks)
-    if status not in ALLOWED_STATUSES:
-        return []
-    return [t for t in tasks if t.status == status]
\ No newline at end of file
+def filter_by_status(tasks: Iterable[Task], status: str | None, page: Optional[Page] = None) -> List[Task]:
+    """Tasks with `status` (all when None), restricted to `page`; stops reading once the page is full.
+
+    A `TaskTable` is filtered on its status codes; only the returned tasks are materialized.
+    """
+    with span("filter"):
+        if isinstance(tasks, TaskTable):
+            if status is None:
+                return list(table_page(tasks, lambda start: range(start, len(tasks)), page))
+            return list(table_page(tasks, lambda start: tasks.rows_with_status(status, start), page))
+        if status is None:
+            return list(paginate(tasks, page))
+        if status not in ALLOWED_STATUSES:
+            return []
+        return list(paginate((t for t in tasks if t.status == status), page))
@@ -10,4 +10,28 @@ def next_id(existing: Iterable[Task]) -> int:
     for t in existing:
         if t.id > max_id:
             max_id = t.id
-    return max_id + 1
\ No newline at end of file
+    return max_id + 1
+
+
+def _is_id(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 1
+
+
+def next_id_from_document(doc: dict) -> int:
+    """Next free id for a JSON store document.
+
+    Uses the persisted `next_id` high-water mark (O(1)), bumped past the last
+    record in case an external writer appended without updating it. Documents
+    written before the counter existed fall back to a scan of their records.
+    """
+    records = doc.get("tasks") or []
+    mark = doc.get("next_id")
+    if _is_id(mark):
+        last = records[-1].get("id") if records and isinstance(records[-1], dict) else None
+        return last + 1 if _is_id(last) and last >= mark else mark
+    max_id = 0
+    for record in records:
+        record_id = record.get("id") if isinstance(record, dict) else None
+        if _is_id(record_id) and record_id > max_id:
+            max_id = record_id
+    return max_id + 1
@@ -0,0 +1,74 @@
+"""Bulk import: parse JSON-lines / CSV rows and turn them into validated task drafts."""
+from __future__ import annotations
+import csv
+import json
+from typing import IO, Iterable, Iterator, List, NamedTuple, Tuple
+
+from src.models.task import TaskDraft
+from src.models.status import ALLOWED_STATUSES, is_valid_status
+
+FORMATS = ("jsonl", "csv")
+
+
+class ImportRow(NamedTuple):
+    """One parsed input row, before validation (fields hold whatever the input had)."""
+
+    line: int
+    title: object
+    description: object
+    status: object
+
+
+def parse_rows(stream: IO[str], fmt: str) -> Iterator[ImportRow]:
+    """Yield rows from `stream` in `fmt` ("jsonl" or "csv").
+
+    CSV input needs a header row with a `title` column (`description` and
+    `status` are optional). Blank JSON lines are skipped.
+    Raises ValueError for an unknown format or a line that is not a JSON object.
+    """
+    if fmt == "jsonl":
+        return _parse_jsonl(stream)
+    if fmt == "csv":
+        return _parse_csv(stream)
+    raise ValueError(f"Unknown import format '{fmt}'. Allowed: {', '.join(FORMATS)}")
+
+
+def _parse_jsonl(stream: IO[str]) -> Iterator[ImportRow]:
+    for line_no, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"Line {line_no}: invalid JSON ({e})")
+        if not isinstance(item, dict):
+            raise ValueError(f"Line {line_no}: expected a JSON object")
+        yield ImportRow(line_no, item.get("title"), item.get("description"), item.get("status"))
+
+
+def _parse_csv(stream: IO[str]) -> Iterator[ImportRow]:
+    reader = csv.DictReader(stream)
+    for row in reader:
+        yield ImportRow(reader.line_num, row.get("title"), row.get("description") or None, row.get("status") or None)
+
+
+def build_drafts(rows: Iterable[ImportRow]) -> Tuple[List[TaskDraft], List[str]]:
+    """Validate every row in one pass; ids are assigned by the repository on save.
+
+    Returns (drafts, errors); when `errors` is non-empty the batch must not be saved.
+    """
+    drafts: List[TaskDraft] = []
+    errors: List[str] = []
+    for row in rows:
+        title, status = row.title, row.status or "todo"
+        if not isinstance(title, str) or not title.strip():
+            errors.append(f"Line {row.line}: Title cannot be blank")
+            continue
+        if not is_valid_status(status):
+            errors.append(f"Line {row.line}: Invalid status '{status}'. Allowed: {', '.join(ALLOWED_STATUSES)}")
+            continue
+        if row.description is not None and not isinstance(row.description, str):
+            errors.append(f"Line {row.line}: Description must be a string")
+            continue
+        drafts.append(TaskDraft(title.strip(), row.description, status))
+    return drafts, errors
@@ -0,0 +1,109 @@
+"""Limit/offset/cursor paging shared by the services, repositories and CLI.
+
+A cursor is an opaque token naming the last task of a page; the next page
+holds the matches with a larger id. Every store returns matches in id order
+(ids are allocated increasingly and stores keep them in that order), so
+following cursors visits each match exactly once even while tasks are added.
+"""
+from __future__ import annotations
+from itertools import islice
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, NamedTuple, Optional
+
+from src.models.task import Task
+
+if TYPE_CHECKING:
+    from src.models.task_table import TaskTable
+
+_CURSOR_PREFIX = b"id:"
+
+
+class Page(NamedTuple):
+    """Which slice of the matches to return: skip ids up to `after_id`, then
+    `offset` matches, then at most `limit` (all when None)."""
+
+    limit: Optional[int] = None
+    offset: int = 0
+    after_id: Optional[int] = None
+
+    def with_lookahead(self) -> "Page":
+        """The same page plus one extra match, to tell whether another page follows."""
+        return self if self.limit is None else self._replace(limit=self.limit + 1)
+
+
+def paginate(tasks: Iterable[Task], page: Optional[Page]) -> Iterator[Task]:
+    """Lazily apply `page` to `tasks`; stops pulling from `tasks` once the page is full."""
+    it = iter(tasks)
+    if page is None:
+        return it
+    if page.after_id is not None:
+        after_id = page.after_id
+        it = (t for t in it if t.id > after_id)
+    stop = None if page.limit is None else page.offset + page.limit
+    return islice(it, page.offset, stop)
+
+
+def table_page(table: TaskTable, select: Callable[[int], Iterable[int]], page: Optional[Page]) -> Iterator[Task]:
+    """Apply `page` to the rows `select(start)` yields, materializing only the kept rows.
+
+    `select` receives the first row to scan: rows up to `page.after_id` are
+    skipped by id (table rows are in id order) instead of being scanned.
+    """
+    if page is None:
+        return table.tasks(select(0))
+    start = 0 if page.after_id is None else table.first_row_after(page.after_id)
+    stop = None if page.limit is None else page.offset + page.limit
+    return table.tasks(islice(select(start), page.offset, stop))
+
+
+def encode_cursor(task_id: int) -> str:
+    from base64 import urlsafe_b64encode
+
+    return urlsafe_b64encode(_CURSOR_PREFIX + str(task_id).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """Task id named by `cursor`.
+
+    Raises ValueError if `cursor` was not produced by `encode_cursor`.
+    """
+    from base64 import urlsafe_b64decode
+    from binascii import Error as DecodeError
+
+    try:
+        raw = urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+    except (DecodeError, ValueError):
+        raw = b""
+    digits = raw[len(_CURSOR_PREFIX):]
+    if not raw.startswith(_CURSOR_PREFIX) or not digits.isdigit():
+        raise ValueError(f"Invalid cursor '{cursor}'")
+    return int(digits)
+
+
+class Paged:
+    """Iterable over one page of results that learns its `next_cursor`.
+
+    Wraps matches fetched with `Page.with_lookahead`: it yields at most `limit`
+    of them, and once iteration finishes `next_cursor` names the last task
+    yielded if the extra match showed that more follow (otherwise None).
+    """
+
+    def __init__(self, tasks: Iterable[Task], limit: Optional[int] = None, next_cursor: Optional[str] = None) -> None:
+        self._tasks = tasks
+        self.limit = limit
+        self.next_cursor = next_cursor
+
+    def __iter__(self) -> Iterator[Task]:
+        if self.limit is None:
+            yield from self._tasks
+            return
+        last: Optional[Task] = None
+        for n, task in enumerate(self._tasks):
+            if n == self.limit:
+                if last is not None:
+                    self.next_cursor = encode_cursor(last.id)
+                return
+            last = task
+            yield task
+
+
+__all__ = ["Page", "Paged", "paginate", "table_page", "encode_cursor", "decode_cursor"]
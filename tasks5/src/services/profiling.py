@@ -0,0 +1,130 @@
+"""Timing spans for the CLI's hot path (`--profile` / `TASKS_PROFILE=1`).
+
+Code marks phases with `with span("json.decode"):`. While profiling is off,
+`span` returns one shared no-op context manager, so a marked block costs a
+function call and an empty `with` (~0.4 us). Once `enable()`d, every span
+records its wall time; spans nest per thread and `report()` aggregates them
+by name into calls, total time and self time (total minus nested spans).
+
+Spans must open and close within one stretch of code: a span left open
+across a generator's `yield` would also time whatever the consumer does
+before resuming it. Streaming pipelines are therefore measured where they
+are consumed (`output.fetch` around each batch pulled from the repository)
+and around the non-yielding steps inside them (decoding a batch, building
+tasks).
+"""
+from __future__ import annotations
+import threading
+import time
+from typing import Dict, List, Optional
+
+ENV_VAR = "TASKS_PROFILE"
+
+_enabled = False
+_stats: Dict[str, List[float]] = {}  # name -> [calls, total seconds, self seconds]
+_local = threading.local()
+_started: Optional[float] = None
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+
+_NULL = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("name", "start", "nested")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.nested = 0.0
+
+    def __enter__(self) -> None:
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        stack.append(self)
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc) -> None:
+        elapsed = time.perf_counter() - self.start
+        stack = _local.stack
+        stack.pop()
+        if stack:
+            stack[-1].nested += elapsed
+        record(self.name, elapsed, elapsed - self.nested)
+
+
+def span(name: str):
+    """Context manager timing the enclosed block as `name` (a no-op while disabled)."""
+    return _Span(name) if _enabled else _NULL
+
+
+def record(name: str, seconds: float, self_seconds: Optional[float] = None) -> None:
+    """Add one call of `name` lasting `seconds` (e.g. for a phase timed before profiling started)."""
+    entry = _stats.get(name)
+    if entry is None:
+        entry = _stats[name] = [0, 0.0, 0.0]
+    entry[0] += 1
+    entry[1] += seconds
+    entry[2] += seconds if self_seconds is None else self_seconds
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def enable(started: Optional[float] = None) -> None:
+    """Start recording spans; `started` (a `time.perf_counter()` value, default now) begins the total."""
+    global _enabled, _started
+    _enabled = True
+    _started = time.perf_counter() if started is None else started
+
+
+def disable() -> None:
+    """Stop recording and forget what was recorded."""
+    global _enabled, _started
+    _enabled = False
+    _started = None
+    _stats.clear()
+
+
+def report() -> dict:
+    """Recorded spans, slowest first: `{"total_ms", "untracked_ms", "spans": [{"name",
+    "calls", "total_ms", "self_ms"}]}`; `untracked_ms` is the time outside every span."""
+    total = time.perf_counter() - _started if _started is not None else 0.0
+    spans = [
+        {"name": name, "calls": int(calls), "total_ms": round(seconds * 1000, 3), "self_ms": round(own * 1000, 3)}
+        for name, (calls, seconds, own) in _stats.items()
+    ]
+    spans.sort(key=lambda s: (-s["total_ms"], s["name"]))
+    untracked = total - sum(own for _, _, own in _stats.values())
+    return {"total_ms": round(total * 1000, 3), "untracked_ms": round(max(untracked, 0.0) * 1000, 3), "spans": spans}
+
+
+def format_report(data: dict) -> str:
+    """`report()` as an aligned table, with each span's share of the total self time."""
+    width = max([len(s["name"]) for s in data["spans"]] + [len("(untracked)")])
+    lines = [
+        f"profile: {data['total_ms']:.1f} ms",
+        f"{'span':<{width}}  {'calls':>7}  {'total ms':>10}  {'self ms':>10}  {'self %':>6}",
+    ]
+    total = data["total_ms"] or 1.0
+    for s in data["spans"]:
+        lines.append(
+            f"{s['name']:<{width}}  {s['calls']:>7}  {s['total_ms']:>10.1f}  {s['self_ms']:>10.1f}  "
+            f"{100 * s['self_ms'] / total:>5.1f}%"
+        )
+    lines.append(f"{'(untracked)':<{width}}  {'':>7}  {'':>10}  {data['untracked_ms']:>10.1f}  "
+                 f"{100 * data['untracked_ms'] / total:>5.1f}%")
+    return "\n".join(lines)
+
+
+__all__ = ["ENV_VAR", "disable", "enable", "enabled", "format_report", "record", "report", "span"]
@@ -0,0 +1,381 @@
+"""Search query language, parsed once into a plan and a compiled predicate.
+
+    status:todo AND (title:"deploy" OR desc:urgent) -blocked
+
+Grammar (`AND` binds tighter than `OR`; adjacent terms are ANDed; keywords
+are upper case so the words "and"/"or" can still be searched for):
+
+    query := and ("OR" and)*
+    and   := unary (["AND"] unary)*
+    unary := ("-" | "NOT") unary | "(" query ")" | term
+    term  := [field ":"] (word | "quoted string")
+
+Fields: `title`, `desc` (or `description`), `status` and `id`; a term without
+a field matches the title or the description. Text terms are case-insensitive
+substrings, exactly as in `services.search`. `id:` takes `N`, `N..M`, `N..`,
+`..M`, `>N`, `>=N`, `<N` or `<=N`. Inside quotes, `\\"` and `\\\\` escape.
+
+`parse_query` returns a `Query` holding the plan every match must satisfy
+(allowed statuses, id range, substrings), which stores use to narrow the
+candidates with their indexes first, and `predicate`: the whole query compiled
+into one Python function over raw (id, title, description, status) fields that
+re-checks each candidate.
+"""
+from __future__ import annotations
+import re
+from itertools import takewhile
+from typing import Callable, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from src.models.status import ALLOWED_STATUSES
+from src.models.task import Task
+from src.models.task_table import TaskTable
+from src.services.pagination import Page, paginate, table_page
+from src.services.profiling import span
+from src.services.trigram_index import TrigramIndex
+
+FIELDS = {"title": "title", "desc": "desc", "description": "desc", "status": "status", "id": "id"}
+_TOKEN = re.compile(
+    r'\s*(?:(?P<open>\()|(?P<close>\))|(?P<neg>-)(?=[^\s)])'
+    r'|(?:(?P<field>[A-Za-z]+):)?(?:"(?P<quoted>(?:[^"\\]|\\.)*)"|(?P<word>[^\s()"]+)))'
+)
+_ID_RANGE = re.compile(r"(?:(?P<op>[<>]=?)(?P<bound>\d+)|(?P<low>\d*)(?:(?P<dots>\.\.)(?P<high>\d*))?)\Z")
+_UNESCAPE = re.compile(r"\\(.)")
+
+Predicate = Callable[[object, object, object, object], bool]
+
+
+class QueryError(ValueError):
+    """Raised for a query that cannot be parsed."""
+
+
+class Text(NamedTuple):
+    field: str  # "any", "title" or "desc"
+    needle: str  # lowercased
+
+
+class Status(NamedTuple):
+    value: str
+
+
+class IdRange(NamedTuple):
+    low: Optional[int]  # inclusive bounds; None is open
+    high: Optional[int]
+
+
+class Not(NamedTuple):
+    node: "Node"
+
+
+class And(NamedTuple):
+    nodes: Tuple["Node", ...]
+
+
+class Or(NamedTuple):
+    nodes: Tuple["Node", ...]
+
+
+Node = Union[Text, Status, IdRange, Not, And, Or]
+
+
+class Query:
+    """A parsed query: its syntax tree, the plan derived from it and the compiled predicate.
+
+    Plan attributes (each a necessary condition for a match):
+    - `statuses`: allowed statuses, or None for any;
+    - `id_low` / `id_high`: inclusive id bounds, or None;
+    - `needles`: lowercased substrings every match has in its title or description.
+    """
+
+    __slots__ = ("text", "tree", "statuses", "id_low", "id_high", "needles", "predicate")
+
+    def __init__(self, text: str, tree: Node) -> None:
+        self.text = text
+        self.tree = tree
+        conjuncts = tree.nodes if isinstance(tree, And) else (tree,)
+        self.statuses: Optional[FrozenSet[str]] = None
+        self.id_low: Optional[int] = None
+        self.id_high: Optional[int] = None
+        needles, rest = [], []
+        for node in conjuncts:
+            allowed = _status_set(node)
+            if allowed is not None:
+                self.statuses = allowed if self.statuses is None else self.statuses & allowed
+            elif isinstance(node, IdRange):
+                if node.low is not None:
+                    self.id_low = node.low if self.id_low is None else max(self.id_low, node.low)
+                if node.high is not None:
+                    self.id_high = node.high if self.id_high is None else min(self.id_high, node.high)
+            else:
+                if isinstance(node, Text):
+                    needles.append(node.needle)
+                rest.append(node)
+        self.needles: Tuple[str, ...] = tuple(needles)
+        self.predicate: Predicate = _compile(self.statuses, self.id_low, self.id_high, rest)
+
+    def matches(self, task: Task) -> bool:
+        return self.predicate(task.id, task.title, task.description, task.status)
+
+    def record_matches(self, record: dict) -> bool:
+        """`predicate` over a raw stored record (fields of the wrong type never match)."""
+        return self.predicate(record.get("id"), record.get("title"), record.get("description"), record.get("status"))
+
+    def best_needle(self, ascii_only: bool = False) -> Optional[str]:
+        """The longest required substring (the most selective for an index), if any."""
+        needles = [n for n in self.needles if n.isascii()] if ascii_only else self.needles
+        return max(needles, key=len, default=None)
+
+    def positive_text(self) -> List[str]:
+        """Needles of every text term not under a negation (what a match may contain), for ranking."""
+        return list(_positive_needles(self.tree))
+
+    def __repr__(self) -> str:
+        return f"Query({self.text!r})"
+
+
+def parse_query(text: str) -> Query:
+    """Parse `text` into a `Query`.
+
+    Raises QueryError (a ValueError) if `text` is blank or not a valid query.
+    """
+    if not isinstance(text, str) or not text.strip():
+        raise QueryError("Search query cannot be blank")
+    tokens = _tokenize(text)
+    parser = _Parser(tokens)
+    tree = parser.parse_or()
+    if parser.pos < len(tokens):
+        raise QueryError(f"Unexpected '{tokens[parser.pos][1]}' in query")
+    return Query(text, tree)
+
+
+def select_tasks(
+    tasks: Iterable[Task], query: Query, index: Optional[TrigramIndex] = None, page: Optional[Page] = None
+) -> List[Task]:
+    """Tasks matching `query`, in one pass over `tasks`.
+
+    With `index`, tasks its trigrams rule out for the most selective required
+    substring are skipped before the predicate runs. A `TaskTable` is narrowed
+    by id range, then by status codes or a substring scan of its buffers, and
+    only the returned tasks are materialized.
+    """
+    with span("query"):
+        predicate = query.predicate
+        if isinstance(tasks, TaskTable):
+            return list(table_page(tasks, lambda start: table_rows(tasks, query, start), page))
+        needle = query.best_needle()
+        candidates = index.candidates(needle) if index is not None and needle is not None else None
+        if candidates is not None:
+            covered = index.ids
+            tasks = (t for t in tasks if t.id in candidates or t.id not in covered)
+        matches = (t for t in tasks if predicate(t.id, t.title, t.description, t.status))
+        return list(paginate(matches, page))
+
+
+def table_rows(table: TaskTable, query: Query, start: int) -> Iterable[int]:
+    """Rows from `start` on matching `query`, for `TaskTable` or another table
+    with its row interface (such as a `repository.snapshot.Snapshot`)."""
+    if query.id_low is not None:
+        start = max(start, table.first_row_after(query.id_low - 1))
+    needle = query.best_needle()
+    if needle is not None:
+        rows: Iterable[int] = table.rows_matching(needle, start)
+    elif query.statuses is not None and len(query.statuses) == 1:
+        rows = table.rows_with_status(next(iter(query.statuses)), start)
+    else:
+        rows = range(start, len(table))
+    if query.id_high is not None:
+        ids, high = table.ids, query.id_high
+        rows = takewhile(lambda row: ids[row] <= high, rows)
+    predicate, fields = query.predicate, table.fields
+    return (row for row in rows if predicate(*fields(row)))
+
+
+def _positive_needles(node: Node) -> Iterable[str]:
+    if isinstance(node, Text):
+        yield node.needle
+    elif isinstance(node, (And, Or)):
+        for child in node.nodes:
+            yield from _positive_needles(child)
+
+
+def _status_set(node: Node) -> Optional[FrozenSet[str]]:
+    """Statuses allowed by `node` if it only constrains the status."""
+    if isinstance(node, Status):
+        return frozenset((node.value,))
+    if isinstance(node, Or):
+        parts = [_status_set(n) for n in node.nodes]
+        if all(p is not None for p in parts):
+            return frozenset().union(*parts)
+    if isinstance(node, Not):
+        inner = _status_set(node.node)
+        if inner is not None:
+            return frozenset(ALLOWED_STATUSES) - inner
+    return None
+
+
+def _compile(
+    statuses: Optional[FrozenSet[str]], low: Optional[int], high: Optional[int], rest: List[Node]
+) -> Predicate:
+    """One function checking the plan's cheap conditions first, then lowercasing
+    the text once and evaluating the remaining terms with short-circuiting."""
+    lines = [
+        "def predicate(id, title, description, status):",
+        "    if type(id) is not int or type(title) is not str:",
+        "        return False",
+    ]
+    if statuses is not None:
+        lines.append(f"    if status not in {sorted(statuses)!r}:")
+        lines.append("        return False")
+    if low is not None or high is not None:
+        lines.append(f"    if not ({_id_test(low, high)}):")
+        lines.append("        return False")
+    if _uses_text(rest):
+        lines.append("    title = title.lower()")
+        lines.append("    description = description.lower() if type(description) is str else ''")
+    lines.append(f"    return {' and '.join(_expression(n) for n in rest) if rest else 'True'}")
+    namespace: dict = {}
+    exec(compile("\n".join(lines), "<query>", "exec"), {"__builtins__": {"type": type, "int": int, "str": str}}, namespace)
+    return namespace["predicate"]
+
+
+def _uses_text(nodes: Iterable[Node]) -> bool:
+    for node in nodes:
+        if isinstance(node, Text):
+            return True
+        if isinstance(node, Not) and _uses_text((node.node,)):
+            return True
+        if isinstance(node, (And, Or)) and _uses_text(node.nodes):
+            return True
+    return False
+
+
+def _expression(node: Node) -> str:
+    if isinstance(node, Text):
+        needle = repr(node.needle)
+        if node.field == "title":
+            return f"{needle} in title"
+        if node.field == "desc":
+            return f"{needle} in description"
+        return f"({needle} in title or {needle} in description)"
+    if isinstance(node, Status):
+        return f"status == {node.value!r}"
+    if isinstance(node, IdRange):
+        return f"({_id_test(node.low, node.high)})"
+    if isinstance(node, Not):
+        return f"not {_expression(node.node)}"
+    joiner = " and " if isinstance(node, And) else " or "
+    return "(" + joiner.join(_expression(n) for n in node.nodes) + ")"
+
+
+def _id_test(low: Optional[int], high: Optional[int]) -> str:
+    if low is not None and high is not None:
+        return f"{low} <= id <= {high}"
+    return f"id >= {low}" if low is not None else f"id <= {high}"
+
+
+def _tokenize(text: str) -> List[Tuple[str, object]]:
+    """(kind, value) pairs; kinds: open, close, neg, and, or, not, term."""
+    tokens, pos = [], 0
+    text = text.rstrip()
+    while pos < len(text):
+        m = _TOKEN.match(text, pos)
+        if m is None:  # everything else is a word, so this is an open quote
+            raise QueryError(f"Unterminated quote in query: {text[pos:].strip()}")
+        pos = m.end()
+        kind = m.lastgroup
+        if kind in ("open", "close", "neg"):
+            tokens.append((kind, m.group(kind)))
+        elif m.group("word") in ("AND", "OR", "NOT") and m.group("field") is None:
+            tokens.append((m.group("word").lower(), m.group("word")))
+        else:
+            tokens.append(("term", _term(m)))
+    return tokens
+
+
+def _term(m: "re.Match[str]") -> Node:
+    field = m.group("field")
+    quoted = m.group("quoted")
+    value = _UNESCAPE.sub(r"\1", quoted) if quoted is not None else m.group("word")
+    if field is None:
+        if quoted is None and value.endswith(":") and value[:-1].lower() in FIELDS:
+            raise QueryError(f"Missing value after '{value}'")
+        return _text("any", value)
+    name = FIELDS.get(field.lower())
+    if name is None:
+        raise QueryError(
+            f"Unknown field '{field}' (known: {', '.join(sorted(FIELDS))}); quote the term to search for it literally"
+        )
+    if name == "status":
+        return Status(value.lower())
+    if name == "id":
+        return _id_range(value)
+    return _text(name, value)
+
+
+def _text(field: str, value: str) -> Text:
+    if not value.strip():
+        raise QueryError("Empty search term")
+    return Text(field, value.lower())
+
+
+def _id_range(value: str) -> IdRange:
+    m = _ID_RANGE.match(value)
+    if m is None or not (m.group("bound") or m.group("low") or m.group("high")):
+        raise QueryError(f"Invalid id filter '{value}' (use N, N..M, >N, >=N, <N or <=N)")
+    if m.group("op"):
+        bound = int(m.group("bound"))
+        return {
+            ">": IdRange(bound + 1, None), ">=": IdRange(bound, None),
+            "<": IdRange(None, bound - 1), "<=": IdRange(None, bound),
+        }[m.group("op")]
+    low = int(m.group("low")) if m.group("low") else None
+    if not m.group("dots"):
+        return IdRange(low, low)
+    return IdRange(low, int(m.group("high")) if m.group("high") else None)
+
+
+class _Parser:
+    def __init__(self, tokens: List[Tuple[str, object]]) -> None:
+        self.tokens = tokens
+        self.pos = 0
+
+    def _peek(self) -> Optional[str]:
+        return self.tokens[self.pos][0] if self.pos < len(self.tokens) else None
+
+    def parse_or(self) -> Node:
+        nodes = [self.parse_and()]
+        while self._peek() == "or":
+            self.pos += 1
+            nodes.append(self.parse_and())
+        return nodes[0] if len(nodes) == 1 else Or(tuple(nodes))
+
+    def parse_and(self) -> Node:
+        nodes = [self.parse_unary()]
+        while self._peek() in ("and", "neg", "not", "open", "term"):
+            if self._peek() == "and":
+                self.pos += 1
+            nodes.append(self.parse_unary())
+        flat: List[Node] = []
+        for node in nodes:
+            flat.extend(node.nodes if isinstance(node, And) else (node,))
+        return flat[0] if len(flat) == 1 else And(tuple(flat))
+
+    def parse_unary(self) -> Node:
+        kind = self._peek()
+        if kind is None:
+            raise QueryError("Query ends where a term was expected")
+        value = self.tokens[self.pos][1]
+        self.pos += 1
+        if kind in ("neg", "not"):
+            return Not(self.parse_unary())
+        if kind == "open":
+            node = self.parse_or()
+            if self._peek() != "close":
+                raise QueryError("Missing ')' in query")
+            self.pos += 1
+            return node
+        if kind == "term":
+            return value
+        raise QueryError(f"Unexpected '{value}' in query")
+
+
+__all__ = ["Query", "QueryError", "parse_query", "select_tasks", "table_rows", "FIELDS"]
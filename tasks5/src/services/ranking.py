@@ -0,0 +1,152 @@
+"""Relevance ranking of search results: BM25 over title and description.
+
+Scores follow BM25F: a term's occurrences in the title count `TITLE_WEIGHT`
+times, document length is the weighted character count of both fields, and
+inverse document frequencies come from a `TermStats` table (documents per
+word plus corpus totals) that stores keep current as tasks are saved. Term
+frequencies are case-insensitive substring counts, consistent with
+`services.search`; a query word that never occurs as a whole word in the
+store counts as rare.
+
+`top_tasks` keeps only the best `k` candidates in a heap (`heapq.nlargest`),
+so ranking n matches costs O(n log k) and the full result set is never sorted.
+"""
+from __future__ import annotations
+import heapq
+import math
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from src.models.task import Task
+from src.services.profiling import span
+
+K1 = 1.2
+B = 0.75
+TITLE_WEIGHT = 2.0
+STATS_VERSION = 1
+_WORD = re.compile(r"\w+")
+
+
+def query_terms(text: str) -> List[str]:
+    """Distinct lowercased words of `text`, in order of first appearance."""
+    return list(dict.fromkeys(_WORD.findall(text.lower())))
+
+
+class TermStats:
+    """Corpus statistics for BM25: document count, total title and description
+    characters, and the number of documents containing each word.
+
+    `stamp` identifies the store state the table describes; the owning
+    repository compares it before trusting the table (as with `TrigramIndex`).
+    """
+
+    __slots__ = ("docs", "title_chars", "desc_chars", "df", "stamp")
+
+    def __init__(
+        self,
+        docs: int = 0,
+        title_chars: int = 0,
+        desc_chars: int = 0,
+        df: Optional[Dict[str, int]] = None,
+        stamp: Optional[Tuple[int, ...]] = None,
+    ) -> None:
+        self.docs = docs
+        self.title_chars = title_chars
+        self.desc_chars = desc_chars
+        self.df: Dict[str, int] = df if df is not None else {}
+        self.stamp = stamp
+
+    @classmethod
+    def build(cls, items: Iterable[Tuple[object, object]], stamp: Optional[Tuple[int, ...]] = None) -> "TermStats":
+        """Statistics of (title, description) pairs; pairs without a string title are skipped."""
+        stats = cls(stamp=stamp)
+        for title, description in items:
+            stats.add(title, description)
+        return stats
+
+    def add(self, title: object, description: object) -> None:
+        """Count one more document."""
+        if not isinstance(title, str):
+            return
+        description = description if isinstance(description, str) else ""
+        self.docs += 1
+        self.title_chars += len(title)
+        self.desc_chars += len(description)
+        df = self.df
+        for word in set(_WORD.findall(f"{title} {description}".lower())):
+            df[word] = df.get(word, 0) + 1
+
+    def remove(self, title: object, description: object) -> None:
+        """Uncount a document counted by `add` (updates remove the old version, then add the new)."""
+        if not isinstance(title, str):
+            return
+        description = description if isinstance(description, str) else ""
+        self.docs -= 1
+        self.title_chars -= len(title)
+        self.desc_chars -= len(description)
+        df = self.df
+        for word in set(_WORD.findall(f"{title} {description}".lower())):
+            left = df.get(word, 0) - 1
+            if left > 0:
+                df[word] = left
+            else:
+                df.pop(word, None)
+
+    @property
+    def average_length(self) -> float:
+        """Mean weighted document length (1.0 for an empty corpus)."""
+        if not self.docs:
+            return 1.0
+        return (TITLE_WEIGHT * self.title_chars + self.desc_chars) / self.docs or 1.0
+
+    def idf(self, term: str) -> float:
+        """BM25 inverse document frequency of `term` (always positive)."""
+        df = min(self.df.get(term, 0), self.docs)
+        return math.log(1.0 + (self.docs - df + 0.5) / (df + 0.5))
+
+    def to_dict(self) -> dict:
+        return {
+            "version": STATS_VERSION,
+            "stamp": list(self.stamp or ()),
+            "docs": self.docs,
+            "title_chars": self.title_chars,
+            "desc_chars": self.desc_chars,
+            "df": self.df,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TermStats":
+        """Rebuild from `to_dict` output.
+
+        Raises ValueError if the payload has an unknown version or shape.
+        """
+        if not isinstance(data, dict) or data.get("version") != STATS_VERSION:
+            raise ValueError("Unsupported term statistics format")
+        counts = [data.get(key) for key in ("docs", "title_chars", "desc_chars")]
+        if not all(isinstance(n, int) for n in counts) or not isinstance(data.get("df"), dict):
+            raise ValueError("Term statistics missing counts")
+        return cls(*counts, df=data["df"], stamp=tuple(data.get("stamp") or ()) or None)
+
+
+def score(title: str, description: Optional[str], weights: Sequence[Tuple[str, float]], average_length: float) -> float:
+    """BM25F score of one task for `weights` ((term, idf) pairs)."""
+    title = title.lower()
+    description = description.lower() if description else ""
+    norm = K1 * (1.0 - B + B * (TITLE_WEIGHT * len(title) + len(description)) / average_length)
+    total = 0.0
+    for term, idf in weights:
+        tf = TITLE_WEIGHT * title.count(term) + description.count(term)
+        if tf:
+            total += idf * tf * (K1 + 1.0) / (tf + norm)
+    return total
+
+
+def top_tasks(tasks: Iterable[Task], terms: Sequence[str], stats: TermStats, k: int) -> List[Task]:
+    """The `k` best-scoring of `tasks` for `terms`, best first; equal scores keep id order."""
+    with span("rank"):
+        weights = [(term, stats.idf(term)) for term in terms]
+        average = stats.average_length
+        return heapq.nlargest(k, tasks, key=lambda t: (score(t.title, t.description, weights, average), -t.id))
+
+
+__all__ = ["TermStats", "query_terms", "score", "top_tasks", "K1", "B", "TITLE_WEIGHT"]
@@ -1,22 +1,50 @@
 """Search service providing case-insensitive substring matching over tasks."""
 from __future__ import annotations
 
-from typing import Iterable, List
+from typing import TYPE_CHECKING, Iterable, List, Optional
 from src.models.task import Task
+from src.models.task_table import TaskTable
+from src.services.pagination import Page, paginate, table_page
+from src.services.profiling import span
 
+if TYPE_CHECKING:
+    from src.services.trigram_index import TrigramIndex
 
-def search_tasks(tasks: Iterable[Task], query: str) -> List[Task]:
+
+def text_matches(title, description, needle: str) -> bool:
+    """The search predicate on raw fields; `needle` must already be lowercased."""
+    if isinstance(title, str) and needle in title.lower():
+        return True
+    return isinstance(description, str) and bool(description) and needle in description.lower()
+
+
+def search_tasks(
+    tasks: Iterable[Task], query: str, index: Optional[TrigramIndex] = None, page: Optional[Page] = None
+) -> List[Task]:
     """Return tasks whose title or description contains the substring query (case-insensitive).
 
+    With `index`, tasks the index rules out are skipped without lowercasing any
+    text; results are identical to the unindexed scan. With `page`, only that
+    slice of the matches is returned and the scan stops once it is full. A
+    `TaskTable` is scanned in place (`index` is not needed) and only the
+    returned tasks are materialized.
+
     Raises ValueError if query is blank.
     """
-    if not isinstance(query, str) or not query.strip():
-        raise ValueError("Search query cannot be blank")
-    needle = query.lower()
-    results: List[Task] = []
-    for t in tasks:
-        if needle in t.title.lower() or (t.description and needle in t.description.lower()):
-            results.append(t)
-    return results
-
-__all__ = ["search_tasks"]
+    with span("search"):
+        if not isinstance(query, str) or not query.strip():
+            raise ValueError("Search query cannot be blank")
+        needle = query.lower()
+        if isinstance(tasks, TaskTable):
+            return list(table_page(tasks, lambda start: tasks.rows_matching(needle, start), page))
+        candidates = index.candidates(needle) if index is not None else None
+        if candidates is not None:
+            covered = index.ids
+            tasks = (t for t in tasks if t.id in candidates or t.id not in covered)
+        matches = (
+            t for t in tasks
+            if needle in t.title.lower() or (t.description and needle in t.description.lower())
+        )
+        return list(paginate(matches, page))
+
+__all__ = ["search_tasks", "text_matches"]
@@ -0,0 +1,274 @@
+"""Inverted trigram index narrowing substring search to candidate task ids.
+
+Every substring of a lowercased text contains only trigrams of that text, so
+intersecting the posting lists of the needle's trigrams yields a superset of
+the matching ids. Callers verify candidates with the exact substring
+predicate; needles shorter than `GRAM` characters cannot be narrowed and fall
+back to a scan.
+
+`TrigramIndex.encode` writes the index in a compact binary layout
+(little-endian) that `MappedTrigramIndex` reads in place, e.g. from a memory
+map, touching only the posting lists a needle needs:
+
+- header (`HEADER`): magic `TASKTGRM`, `INDEX_VERSION`, flags (`ORDERED`:
+  the store's records were in strictly increasing id order), the store stamp
+  it was built for, the number of records indexed and of distinct trigrams;
+- gram table (`ENTRY` x grams, sorted by key): the trigram as UTF-32-BE (so
+  byte order is code point order), offset, id count and byte size of its
+  posting list;
+- posting lists: sorted task ids as unsigned 32-bit integers, or, for dense
+  lists where that is strictly smaller, a bitmap (bit `id % 8` of byte
+  `id // 8` set for each id; the byte size tells the two apart).
+"""
+from __future__ import annotations
+import mmap
+import pathlib
+import struct
+from bisect import bisect_left
+from typing import Collection, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+GRAM = 3
+INDEX_VERSION = 2
+MAGIC = b"TASKTGRM"
+HEADER = struct.Struct("<8sIIQQQQ")  # magic, version, flags, stamp size, stamp mtime_ns, records, grams
+ENTRY = struct.Struct("<12sQII")  # trigram key, posting offset, id count, byte size
+ORDERED = 1
+_ID = struct.Struct("<I")
+
+
+def trigrams(text: str) -> Set[str]:
+    """Distinct 3-grams of `text` (already lowercased)."""
+    return {text[i:i + GRAM] for i in range(len(text) - GRAM + 1)}
+
+
+class TrigramIndex:
+    """Maps each trigram of lowercased title/description to a sorted id list.
+
+    `stamp` identifies the store state the index was built from; the owning
+    repository compares it before trusting the index.
+    """
+
+    def __init__(self, postings: Dict[str, List[int]] | None = None, stamp: Optional[Tuple[int, ...]] = None) -> None:
+        self.postings: Dict[str, List[int]] = postings or {}
+        self.stamp = stamp
+        self.ids: Set[int] = {i for ids in self.postings.values() for i in ids}
+
+    @classmethod
+    def build(cls, items: Iterable[Tuple[int, str, Optional[str]]], stamp: Optional[Tuple[int, ...]] = None) -> "TrigramIndex":
+        """Index (id, title, description) triples."""
+        index = cls(stamp=stamp)
+        for task_id, title, description in items:
+            index.add(task_id, title, description)
+        return index
+
+    def add(self, task_id: int, title: str, description: Optional[str]) -> None:
+        grams = trigrams(title.lower())
+        if description:
+            grams |= trigrams(description.lower())
+        for gram in grams:
+            ids = self.postings.setdefault(gram, [])
+            if not ids or ids[-1] < task_id:
+                ids.append(task_id)
+                continue
+            pos = bisect_left(ids, task_id)
+            if ids[pos] != task_id:
+                ids.insert(pos, task_id)
+        if grams:
+            self.ids.add(task_id)
+
+    def candidates(self, needle: str) -> Optional[Set[int]]:
+        """Ids that may contain `needle` (lowercased).
+
+        Returns None when the index cannot narrow the search: the needle is
+        shorter than a trigram, or even its rarest trigram occurs in at least
+        half of the indexed tasks (a scan is cheaper than intersecting).
+        """
+        grams = trigrams(needle)
+        if not grams:
+            return None
+        lists = sorted((self.postings.get(g, ()) for g in grams), key=len)
+        if not lists[0]:
+            return set()
+        if len(lists[0]) * 2 >= len(self.ids):
+            return None
+        result = set(lists[0])
+        for ids in lists[1:]:
+            result.intersection_update(ids)
+            if not result:
+                break
+        return result
+
+    def covers(self, task_id: int) -> bool:
+        """True if the task contributed grams, i.e. the index can rule it out."""
+        return task_id in self.ids
+
+    def encode(self, stamp: Tuple[int, int], records: int, ordered: bool) -> bytes:
+        """The index in the binary layout above, for a store at `stamp` holding
+        `records` records (`ordered` if their ids strictly increase).
+
+        Raises ValueError if an id does not fit the 32-bit posting format.
+        """
+        grams = sorted(self.postings)
+        header = HEADER.pack(MAGIC, INDEX_VERSION, ORDERED if ordered else 0, *stamp, records, len(grams))
+        table, lists = [], []
+        offset = HEADER.size + ENTRY.size * len(grams)
+        for gram in grams:
+            ids = self.postings[gram]
+            if ids and ids[-1] // 8 + 1 < _ID.size * len(ids):
+                bitmap = bytearray(ids[-1] // 8 + 1)
+                for task_id in ids:
+                    bitmap[task_id >> 3] |= 1 << (task_id & 7)
+                encoded = bytes(bitmap)
+            else:
+                try:
+                    encoded = struct.pack(f"<{len(ids)}I", *ids)
+                except struct.error:
+                    raise ValueError("Task id out of range for the trigram index")
+            table.append(ENTRY.pack(gram.encode("utf-32-be"), offset, len(ids), len(encoded)))
+            lists.append(encoded)
+            offset += len(encoded)
+        return b"".join([header, *table, *lists])
+
+
+class _Postings:
+    """Sequence view of one encoded posting list, for `bisect`."""
+
+    __slots__ = ("_buffer", "_offset", "_length")
+
+    def __init__(self, buffer, offset: int, length: int) -> None:
+        self._buffer = buffer
+        self._offset = offset
+        self._length = length
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, i: int) -> int:
+        return _ID.unpack_from(self._buffer, self._offset + i * _ID.size)[0]
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.all())
+
+    def __contains__(self, task_id: int) -> bool:
+        i = bisect_left(self, task_id)
+        return i < self._length and self[i] == task_id
+
+    def all(self) -> Tuple[int, ...]:
+        return struct.unpack_from(f"<{self._length}I", self._buffer, self._offset)
+
+
+class _Bitmap:
+    """View of one posting list encoded as a bitmap."""
+
+    __slots__ = ("_buffer", "_offset", "_size", "_length")
+
+    def __init__(self, buffer, offset: int, size: int, length: int) -> None:
+        self._buffer = buffer
+        self._offset = offset
+        self._size = size
+        self._length = length
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.all())
+
+    def __contains__(self, task_id: int) -> bool:
+        byte = task_id >> 3
+        return 0 <= byte < self._size and bool(self._buffer[self._offset + byte] >> (task_id & 7) & 1)
+
+    def all(self) -> Tuple[int, ...]:
+        bits = self._buffer[self._offset:self._offset + self._size]
+        return tuple(i * 8 + bit for i, byte in enumerate(bits) if byte for bit in range(8) if byte >> bit & 1)
+
+
+class MappedTrigramIndex:
+    """Read-only view of an encoded index (see the module docstring).
+
+    Opening one parses the header only; `candidates` binary-searches the gram
+    table and reads just the posting lists of the needle's trigrams.
+    Raises ValueError (from the constructor) if `buffer` is not an index of
+    this version or is shorter than its table claims.
+    """
+
+    __slots__ = ("buffer", "stamp", "ordered", "records", "grams", "_map")
+
+    def __init__(self, buffer, _map: Optional[mmap.mmap] = None) -> None:
+        if len(buffer) < HEADER.size:
+            raise ValueError("Truncated trigram index")
+        magic, version, flags, size, mtime_ns, self.records, self.grams = HEADER.unpack_from(buffer)
+        if magic != MAGIC or version != INDEX_VERSION:
+            raise ValueError("Unsupported trigram index format")
+        if len(buffer) < HEADER.size + ENTRY.size * self.grams:
+            raise ValueError("Truncated trigram index")
+        self.buffer = buffer
+        self.stamp = (size, mtime_ns)
+        self.ordered = bool(flags & ORDERED)
+        self._map = _map
+
+    @classmethod
+    def open(cls, path: pathlib.Path | str) -> "MappedTrigramIndex":
+        """Memory-map the index at `path` (close it, or use it as a context manager).
+
+        Raises OSError if the file cannot be opened and ValueError if it is
+        not an index this version reads.
+        """
+        with open(path, "rb") as fh:
+            mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)  # ValueError when empty
+        try:
+            return cls(mm, mm)
+        except ValueError:
+            mm.close()
+            raise
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+
+    def __enter__(self) -> "MappedTrigramIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def postings(self, gram: str) -> Collection[int]:
+        """Ids whose text contains `gram` (empty if none), iterated in order."""
+        key = gram.encode("utf-32-be")
+        lo, hi = 0, self.grams
+        while lo < hi:
+            mid = (lo + hi) // 2
+            found, offset, length, size = ENTRY.unpack_from(self.buffer, HEADER.size + mid * ENTRY.size)
+            if found == key:
+                if offset + size > len(self.buffer):
+                    raise ValueError("Truncated trigram index")
+                if size != _ID.size * length:
+                    return _Bitmap(self.buffer, offset, size, length)
+                return _Postings(self.buffer, offset, length)
+            if found < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return ()
+
+    def candidates(self, needle: str) -> Optional[Set[int]]:
+        """`TrigramIndex.candidates` read from the encoded lists.
+
+        Returns None when the needle is shorter than a trigram or even its
+        rarest trigram occurs in at least half of the indexed records.
+        Raises ValueError if a posting list lies outside the buffer.
+        """
+        grams = trigrams(needle)
+        if not grams:
+            return None
+        lists = sorted((self.postings(g) for g in grams), key=len)
+        if not lists[0]:
+            return set()
+        if len(lists[0]) * 2 >= self.records:
+            return None
+        result = set(lists[0].all())
+        for ids in lists[1:]:
+            result = {task_id for task_id in result if task_id in ids}
+            if not result:
+                break
+        return result
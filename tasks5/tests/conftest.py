@@ -0,0 +1,12 @@
+import pytest
+
+from src.repository import registry
+
+
+@pytest.fixture(autouse=True)
+def isolated_store(monkeypatch):
+    """Each test starts with no cached repositories and no store override from the environment."""
+    monkeypatch.delenv(registry.STORE_ENV_VAR, raising=False)
+    registry.clear_cache()
+    yield
+    registry.clear_cache()
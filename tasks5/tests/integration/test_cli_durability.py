@@ -0,0 +1,68 @@
+import os
+
+import pytest
+
+from src.cli.daemon_server import handle_request
+from src.cli.main import main
+from src.repository import durability, registry
+from src.repository.json_repository import JsonTaskRepository
+
+
+@pytest.fixture
+def fsync_count(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv(durability.ENV_VAR, raising=False)
+    calls = []
+    real_fsync = os.fsync
+    monkeypatch.setattr(os, "fsync", lambda fd: calls.append(fd) or real_fsync(fd))
+    yield calls
+    timer = durability._batch._timer
+    durability.flush()  # waits for a flush the timer already started
+    if timer is not None:
+        timer.join()
+
+
+def test_durability_flag_applies_to_one_command(fsync_count, capsys):
+    assert main(["--durability", "none", "create", "--title", "Fast"]) == 0
+    assert fsync_count == []
+    assert main(["create", "--title", "Safe"]) == 0  # default: full
+    assert len(fsync_count) == 2  # data file and directory
+    assert main(["--durability", "batch:60000", "update", "1", "--status", "done"]) == 0
+    assert len(fsync_count) == 3  # the data before it replaces the store; the directory waits
+    durability.flush()
+    assert len(fsync_count) == 4
+    assert "Fast" in capsys.readouterr().out
+
+
+def test_durability_from_env_and_store_uri(fsync_count, monkeypatch, capsys):
+    monkeypatch.setenv(durability.ENV_VAR, "none")
+    assert main(["create", "--title", "Env"]) == 0
+    assert fsync_count == []
+    monkeypatch.delenv(durability.ENV_VAR)
+    assert main(["--store", "json://tasks.json?durability=none", "create", "--title", "Uri"]) == 0
+    assert fsync_count == []
+    assert main(["--store", "json://tasks.json?durability=none", "--durability", "full", "list"]) == 0
+    assert "Uri" in capsys.readouterr().out
+    registry.clear_cache()
+
+
+def test_invalid_durability_is_a_usage_error(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(SystemExit) as exc:
+        main(["--durability", "sometimes", "list"])
+    assert exc.value.code == 2
+    assert "Invalid durability 'sometimes'" in capsys.readouterr().err
+    assert main(["--store", "json://tasks.json?durability=sometimes", "list"]) == 1
+    assert "Invalid durability" in capsys.readouterr().err
+
+
+def test_daemon_applies_the_forwarded_level(fsync_count):
+    repo = JsonTaskRepository("tasks.json")
+    key = registry.store_key("json://tasks.json")
+    request = {"command": "create", "args": {"title": "Quiet", "description": None, "status": "todo",
+                                             "durability": "none"}, "store": list(key)}
+    assert handle_request(request, key, repo)["exit_code"] == 0
+    assert fsync_count == []
+    request["args"]["durability"] = "sometimes"
+    response = handle_request(request, key, repo)
+    assert response["exit_code"] == 1 and "Malformed request" in response["result"]["error"]["message"]
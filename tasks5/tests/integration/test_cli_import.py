@@ -0,0 +1,59 @@
+import io
+import json
+import pathlib
+
+import pytest
+
+from src.cli.main import main
+from src.repository.json_repository import JsonTaskRepository
+
+
+def test_cli_import_jsonl_file_single_write(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    assert main(["create", "--title", "Existing"]) == 0
+    source = tmp_path / "batch.jsonl"
+    source.write_text("\n".join(json.dumps({"title": f"T{i}", "status": "done"}) for i in range(50)))
+    writes = []
+    original = JsonTaskRepository._write_atomic
+    monkeypatch.setattr(JsonTaskRepository, "_write_atomic", lambda self, data: writes.append(1) or original(self, data))
+    capsys.readouterr()
+    assert main(["import", str(source)]) == 0
+    assert capsys.readouterr().out == "Imported 50 tasks (ids 2-51)\n"
+    assert len(writes) == 1
+    data = json.loads(pathlib.Path("tasks.json").read_text())
+    assert [t["id"] for t in data["tasks"]] == list(range(1, 52))
+
+
+def test_cli_import_csv_stdin_json_output(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr("sys.stdin", io.StringIO("title,description,status\nA,desc,todo\nB,,done\n"))
+    assert main(["--json", "import", "--format", "csv"]) == 0
+    payload = json.loads(capsys.readouterr().out)
+    assert [(t["id"], t["title"], t["description"]) for t in payload["tasks"]] == [(1, "A", "desc"), (2, "B", None)]
+
+
+def test_cli_import_rejects_whole_batch(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    source = tmp_path / "bad.csv"
+    source.write_text("title,status\nGood,todo\n,todo\nAlso,nope\n")
+    assert main(["import", str(source)]) == 1
+    err = capsys.readouterr().err
+    assert "nothing saved" in err and "Line 3" in err and "Line 4" in err
+    assert JsonTaskRepository("tasks.json").load_all_tasks() == []
+
+
+@pytest.mark.parametrize("store", ["journal://tasks.json", "sqlite:///tasks.db", "memory://"])
+def test_cli_import_other_backends(tmp_path, monkeypatch, capsys, store):
+    monkeypatch.chdir(tmp_path)
+    source = tmp_path / "batch.jsonl"
+    source.write_text('{"title": "A"}\n{"title": "B"}\n')
+    assert main(["--store", store, "import", str(source)]) == 0
+    capsys.readouterr()
+    assert main(["--store", store, "--json", "list"]) == 0
+    assert [t["title"] for t in json.loads(capsys.readouterr().out)["tasks"]] == ["A", "B"]
+
+
+def test_cli_import_missing_file(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    assert main(["import", "missing.jsonl"]) == 1
+    assert "Cannot read import" in capsys.readouterr().err
@@ -40,4 +40,54 @@ def test_cli_list_json_empty(tmp_path, monkeypatch, capsys):
     rc = main(["--json", "list"])  # list when empty
     assert rc == 0
     data = json.loads(capsys.readouterr().out)
-    assert data["tasks"] == []
\ No newline at end of file
+    assert data["tasks"] == []
+
+
+def test_cli_list_jsonl(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    create("A")
+    create("B", "done")
+    capsys.readouterr()  # clear create outputs
+    rc = main(["list", "--jsonl"])
+    assert rc == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert [json.loads(line)["title"] for line in lines] == ["A", "B"]
+    rc = main(["list", "--jsonl", "--status", "blocked"])
+    assert rc == 0
+    assert capsys.readouterr().out == ""
+
+
+def test_cli_list_json_pages_with_cursor(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    for title in "ABCDE":
+        create(title)
+    capsys.readouterr()  # clear create outputs
+    assert main(["--json", "list", "--limit", "2"]) == 0
+    first = json.loads(capsys.readouterr().out)
+    assert [t["title"] for t in first["tasks"]] == ["A", "B"]
+    assert main(["--json", "list", "--limit", "3", "--cursor", first["next_cursor"]]) == 0
+    second = json.loads(capsys.readouterr().out)
+    assert [t["title"] for t in second["tasks"]] == ["C", "D", "E"]
+    assert second["next_cursor"] is None
+    assert main(["list", "--offset", "3", "--limit", "1"]) == 0
+    captured = capsys.readouterr()
+    assert captured.out == "[4] D (todo)\n"
+    assert "--cursor" in captured.err
+
+
+def test_cli_list_json_rejects_bad_cursor(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    assert main(["--json", "list", "--cursor", "nope"]) == 1
+    assert "Invalid cursor" in json.loads(capsys.readouterr().out)["error"]["message"]
+
+
+def test_cli_list_json_skips_wrongly_typed_fields(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    records = [
+        {"id": 1, "title": "ok", "description": None, "status": "todo"},
+        {"id": 2, "title": "numeric notes", "description": 5, "status": "todo"},
+        {"id": True, "title": "boolean id", "description": None, "status": "todo"},
+    ]
+    pathlib.Path("tasks.json").write_text(json.dumps({"schema_version": 1, "tasks": records}))
+    assert main(["--json", "list"]) == 0
+    assert [t["id"] for t in json.loads(capsys.readouterr().out)["tasks"]] == [1]
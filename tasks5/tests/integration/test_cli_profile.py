@@ -0,0 +1,40 @@
+import json
+import pstats
+
+from src.cli.main import main
+from src.services import profiling
+
+
+def test_profile_prints_a_breakdown_to_stderr(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    assert main(["create", "--title", "Profiled"]) == 0
+    capsys.readouterr()
+    assert main(["--profile", "list"]) == 0
+    out, err = capsys.readouterr()
+    assert "Profiled" in out and "profile:" not in out
+    assert err.startswith("profile: ")
+    names = [line.split()[0] for line in err.splitlines()[2:]]
+    assert {"cli.parse", "command", "store.open", "output.fetch", "(untracked)"} <= set(names)
+    assert not profiling.enabled()
+
+
+def test_profile_is_json_in_json_mode_and_enabled_by_env(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv(profiling.ENV_VAR, "1")
+    assert main(["--json", "create", "--title", "Env"]) == 0
+    out, err = capsys.readouterr()
+    assert json.loads(out)["task"]["title"] == "Env"
+    data = json.loads(err)["profile"]
+    assert {"total_ms", "untracked_ms", "spans"} <= data.keys()
+    assert "json.encode" in {s["name"] for s in data["spans"]}
+    monkeypatch.setenv(profiling.ENV_VAR, "0")
+    assert main(["list"]) == 0
+    assert capsys.readouterr().err == ""
+
+
+def test_profile_dump_writes_pstats(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    dump = tmp_path / "list.prof"
+    assert main(["--profile", "--profile-dump", str(dump), "search", "x"]) == 0
+    assert pstats.Stats(str(dump)).total_calls > 0
+    assert "command" in capsys.readouterr().err
@@ -1,4 +1,6 @@
 import json
+import pytest
+
 from src.cli.main import main
 
 
@@ -45,3 +47,47 @@ def test_cli_search_json_blank_query_error(tmp_path, monkeypatch, capsys):
     raw = capsys.readouterr().out
     data = json.loads(raw)
     assert data["error"]["message"].startswith("Search query cannot be blank")
+
+
+def test_cli_search_json_jobs_flag(tmp_path, monkeypatch, capsys):
+    from src.repository import parallel_scan
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(parallel_scan, "PARALLEL_MIN_BYTES", 0)
+    for i in range(6):
+        create(f"Deploy {i}" if i % 2 else f"Other {i}")
+    capsys.readouterr()
+    assert main(["--json", "search", "deploy", "--jobs", "2"]) == 0
+    assert [t["id"] for t in json.loads(capsys.readouterr().out)["tasks"]] == [2, 4, 6]
+    monkeypatch.setattr(parallel_scan, "search_records", lambda *a: pytest.fail("parallel scan by default"))
+    assert main(["--json", "search", "deploy"]) == 0
+    assert [t["id"] for t in json.loads(capsys.readouterr().out)["tasks"]] == [2, 4, 6]
+    with pytest.raises(SystemExit):
+        main(["search", "deploy", "--jobs", "0"])
+
+
+def test_cli_search_json_expr(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    create("Deploy api", "urgent")
+    create("Deploy docs", "blocked", "done")
+    create("Fix bug", "urgent deploy")
+    capsys.readouterr()
+    assert main(["--json", "search", "--expr", 'status:todo (title:"deploy" OR desc:urgent) -blocked']) == 0
+    assert [t["id"] for t in json.loads(capsys.readouterr().out)["tasks"]] == [1, 3]
+    assert main(["--json", "search", "--expr", "titel:deploy"]) == 1
+    assert json.loads(capsys.readouterr().out)["error"]["message"].startswith("Unknown field 'titel'")
+
+
+def test_cli_search_json_top(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    create("Fix bug", "deploy after review")
+    create("Deploy api", "urgent")
+    create("Deploy deploy docs")
+    create("Write spec")
+    capsys.readouterr()
+    assert main(["--json", "search", "deploy", "--top", "2"]) == 0
+    assert [t["id"] for t in json.loads(capsys.readouterr().out)["tasks"]] == [3, 2]
+    assert main(["--json", "search", "--expr", "deploy -docs", "--top", "5"]) == 0
+    assert [t["id"] for t in json.loads(capsys.readouterr().out)["tasks"]] == [2, 1]
+    assert main(["--json", "search", "deploy", "--top", "2", "--limit", "1"]) == 1
+    assert "--top" in json.loads(capsys.readouterr().out)["error"]["message"]
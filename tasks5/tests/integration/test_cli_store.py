@@ -0,0 +1,35 @@
+import json
+import pathlib
+
+from src.cli.main import main
+
+
+def test_cli_store_flag_sqlite(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    assert main(["--store", "sqlite:///tasks.db", "create", "--title", "Write spec"]) == 0
+    assert main(["--store", "sqlite:///tasks.db", "create", "--title", "Ship", "--status", "done"]) == 0
+    capsys.readouterr()
+    assert pathlib.Path("tasks.db").exists()
+    assert not pathlib.Path("tasks.json").exists()
+    assert main(["--json", "--store", "sqlite:///tasks.db", "list", "--status", "done"]) == 0
+    assert [t["title"] for t in json.loads(capsys.readouterr().out)["tasks"]] == ["Ship"]
+    assert main(["--json", "--store", "sqlite:///tasks.db", "search", "SPEC"]) == 0
+    assert [t["id"] for t in json.loads(capsys.readouterr().out)["tasks"]] == [1]
+
+
+def test_cli_store_env_journal(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("TASKS_STORE", "journal://tasks.json")
+    assert main(["create", "--title", "A"]) == 0
+    assert main(["create", "--title", "B"]) == 0
+    assert pathlib.Path("tasks.json.journal").exists()
+    capsys.readouterr()
+    assert main(["list"]) == 0
+    out = capsys.readouterr().out
+    assert "[1] A" in out and "[2] B" in out
+
+
+def test_cli_store_unknown_scheme(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    assert main(["--json", "--store", "neo4j://db", "list"]) == 1
+    assert "Unknown store scheme" in json.loads(capsys.readouterr().out)["error"]["message"]
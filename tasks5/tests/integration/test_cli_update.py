@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+from src.cli.main import main
+
+
+def create(title, status=None):
+    args = ["create", "--title", title]
+    if status:
+        args += ["--status", status]
+    assert main(args) == 0
+
+
+@pytest.mark.parametrize("store", [None, "journal://tasks.json", "sqlite:///tasks.db"])
+def test_cli_update_and_delete(tmp_path, monkeypatch, capsys, store):
+    monkeypatch.chdir(tmp_path)
+    prefix = [] if store is None else ["--store", store]
+    for title in ("Deploy api", "Fix bug", "Deploy docs"):
+        assert main(prefix + ["create", "--title", title]) == 0
+    capsys.readouterr()
+    assert main(prefix + ["update", "2", "--status", "done"]) == 0
+    assert capsys.readouterr().out.startswith("Updated [2] Fix bug (done)")
+    assert main(prefix + ["--json", "update", "--where", "deploy", "--status", "in-progress"]) == 0
+    assert json.loads(capsys.readouterr().out) == {"count": 2}
+    assert main(prefix + ["--json", "delete", "1"]) == 0
+    assert json.loads(capsys.readouterr().out)["task"]["title"] == "Deploy api"
+    assert main(prefix + ["--json", "list"]) == 0
+    assert [(t["id"], t["status"]) for t in json.loads(capsys.readouterr().out)["tasks"]] == [(2, "done"), (3, "in-progress")]
+
+
+def test_cli_update_errors(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    create("A")
+    capsys.readouterr()
+    assert main(["--json", "update", "9", "--status", "done"]) == 1
+    assert json.loads(capsys.readouterr().out)["error"]["message"] == "Task 9 not found"
+    assert main(["--json", "update", "1", "--status", "blocked"]) == 1
+    assert "Invalid status" in json.loads(capsys.readouterr().out)["error"]["message"]
+    assert main(["--json", "update", "1"]) == 1
+    assert json.loads(capsys.readouterr().out)["error"]["message"] == "No changes given"
+    assert main(["update", "1", "--where-status", "todo", "--status", "done"]) == 1
+    assert "either a task id" in capsys.readouterr().err
+    assert main(["--json", "update", "--where-status", "todo", "--status", "done"]) == 0
+    assert json.loads(capsys.readouterr().out) == {"count": 1}
+    assert main(["delete", "5"]) == 1
@@ -0,0 +1,34 @@
+import json
+import pathlib
+
+from src.cli.main import main
+
+
+def make_store(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    for title in ("first", "second", "third"):
+        assert main(["create", "--title", title]) == 0
+    data = json.loads(pathlib.Path("tasks.json").read_text())
+    data["tasks"][1]["status"] = "someday"
+    pathlib.Path("tasks.json").write_text(json.dumps(data))
+    capsys.readouterr()
+
+
+def test_verify_reports_invalid_records_and_fails(tmp_path, monkeypatch, capsys):
+    make_store(tmp_path, monkeypatch, capsys)
+    assert main(["list"]) == 0
+    assert "second" not in capsys.readouterr().out  # skipped silently by reads
+    assert main(["verify"]) == 1
+    out = capsys.readouterr().out.splitlines()
+    assert out[0] == "record 1 (id 2): Invalid status 'someday'. Allowed: todo, in-progress, done"
+    assert out[1] == "1 invalid of 3 records (run with --fix to remove them)"
+
+
+def test_verify_fix_removes_them(tmp_path, monkeypatch, capsys):
+    make_store(tmp_path, monkeypatch, capsys)
+    assert main(["--json", "verify", "--fix"]) == 0
+    payload = json.loads(capsys.readouterr().out)
+    assert payload["checked"] == 3 and payload["removed"] is True
+    assert [(bad["position"], bad["id"]) for bad in payload["invalid"]] == [(1, 2)]
+    assert main(["verify"]) == 0
+    assert capsys.readouterr().out == "Checked 2 records: all valid\n"
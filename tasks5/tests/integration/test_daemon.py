@@ -0,0 +1,190 @@
+import io
+import json
+import os
+import socket
+import threading
+
+import pytest
+
+from src.cli import daemon_client
+from src.cli.commands import serve as serve_cmd
+from src.cli.daemon_server import DaemonServer, handle_request
+from src.cli.main import main
+from src.repository import registry
+from src.repository.memory_repository import InMemoryTaskRepository
+from src.repository.resident_repository import ResidentTaskRepository
+
+
+@pytest.fixture
+def daemon(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    path = str(tmp_path / "d.sock")
+    monkeypatch.setenv(daemon_client.SOCKET_ENV_VAR, path)
+    repo = ResidentTaskRepository(registry.get_repository())
+    server = DaemonServer(path, registry.store_key(), repo)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield repo
+    server.shutdown()
+    server.server_close()
+
+
+def test_daemon_forwards_commands(daemon, monkeypatch, capsys):
+    assert main(["create", "--title", "Write spec", "--description", "MVP"]) == 0
+    assert main(["--json", "create", "--title", "Ship", "--status", "done"]) == 0
+    out = capsys.readouterr().out
+    assert out.startswith("Created [1] Write spec (todo) - MVP\n")
+    assert json.loads(out.split("\n", 1)[1]) == {"task": {"id": 2, "title": "Ship", "description": None, "status": "done"}}
+    # Local execution is not used while the daemon answers
+    monkeypatch.setattr("src.cli.main.dispatch", lambda args: pytest.fail("ran locally"))
+    assert main(["--json", "list", "--status", "done"]) == 0
+    assert [t["title"] for t in json.loads(capsys.readouterr().out)["tasks"]] == ["Ship"]
+    assert main(["search", "SPEC"]) == 0
+    assert capsys.readouterr().out == "[1] Write spec (todo) - MVP\n"
+    assert main(["search", ""]) == 1
+    assert "Search query cannot be blank" in capsys.readouterr().err
+
+
+def test_daemon_writes_through_to_store(daemon, tmp_path, capsys):
+    assert main(["create", "--title", "Persisted"]) == 0
+    capsys.readouterr()
+    assert main(["--no-daemon", "--json", "list"]) == 0
+    assert [t["title"] for t in json.loads(capsys.readouterr().out)["tasks"]] == ["Persisted"]
+    assert json.loads((tmp_path / "tasks.json").read_text())["tasks"][0]["title"] == "Persisted"
+    daemon.refresh()
+    assert [t.title for t in daemon.load_all_tasks()] == ["Persisted"]
+
+
+def test_daemon_sees_writes_made_outside_it(daemon, monkeypatch, capsys):
+    assert main(["create", "--title", "first"]) == 0
+    assert main(["--json", "list"]) == 0  # the daemon now holds task 1
+    assert main(["--no-daemon", "create", "--title", "second"]) == 0
+    capsys.readouterr()
+    assert main(["--json", "list"]) == 0
+    assert [t["id"] for t in json.loads(capsys.readouterr().out)["tasks"]] == [1, 2]
+    assert main(["create", "--title", "third"]) == 0
+    assert main(["--no-daemon", "update", "2", "--status", "done"]) == 0
+    capsys.readouterr()
+    monkeypatch.setattr("src.cli.main.dispatch", lambda args: pytest.fail("ran locally"))
+    assert main(["--json", "list"]) == 0
+    listed = json.loads(capsys.readouterr().out)["tasks"]
+    assert [(t["id"], t["status"]) for t in listed] == [(1, "todo"), (2, "done"), (3, "todo")]
+
+
+@pytest.mark.parametrize("uri", ["json:///{}/tasks.json", "journal:///{}/tasks.json", "sqlite:///{}/tasks.db",
+                                 "binary:///{}/tasks.bin"])
+def test_resident_copy_follows_other_writers(tmp_path, uri):
+    uri = uri.format(tmp_path)
+    resident, other = ResidentTaskRepository(registry.open_repository(uri)), registry.open_repository(uri)
+    resident.create_task("mine")
+    assert [t.title for t in resident.list_tasks()] == ["mine"]
+    other.create_task("theirs")
+    other.update_task(1, status="done")
+    assert [(t.id, t.status) for t in resident.list_tasks()] == [(1, "done"), (2, "todo")]
+    assert resident.create_task("mine again").id == 3
+    assert [t.title for t in other.list_tasks()] == ["mine", "theirs", "mine again"]
+    assert resident.term_stats().docs == 3
+    other.delete_task(2)
+    assert [t.id for t in resident.search_tasks("mine")] == [1, 3] and resident.term_stats().docs == 2
+    for repo in (resident.backing, other):
+        getattr(repo, "close", lambda: None)()
+
+
+def test_daemon_forwards_import_and_verify(daemon, tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr("sys.stdin", io.StringIO('{"title": "from stdin"}\n'))
+    (tmp_path / "rows.csv").write_text("title,status\nfrom csv,done\n")
+    assert main(["import", "missing.jsonl"]) == 1  # unreadable: left to the local run to report
+    assert "Cannot read import" in capsys.readouterr().err
+    monkeypatch.setattr("src.cli.main.dispatch", lambda args: pytest.fail("ran locally"))
+    assert main(["import"]) == 0
+    assert main(["import", "rows.csv"]) == 0
+    assert capsys.readouterr().out == "Imported 1 tasks (ids 1-1)\nImported 1 tasks (ids 2-2)\n"
+    assert main(["verify"]) == 0
+    assert capsys.readouterr().out == "Checked 2 records: all valid\n"
+    assert main(["--json", "verify"]) == 0
+    assert json.loads(capsys.readouterr().out) == {"checked": 2, "invalid": [], "removed": False}
+    assert [t.title for t in daemon.load_all_tasks()] == ["from stdin", "from csv"]
+
+
+def test_daemon_forwards_updates_and_deletes(daemon, monkeypatch, capsys):
+    assert main(["create", "--title", "Write spec"]) == 0
+    assert main(["create", "--title", "Ship"]) == 0
+    capsys.readouterr()
+    monkeypatch.setattr("src.cli.main.dispatch", lambda args: pytest.fail("ran locally"))
+    assert main(["update", "1", "--status", "done"]) == 0
+    assert capsys.readouterr().out == "Updated [1] Write spec (done)\n"
+    assert main(["--json", "update", "--where-status", "todo", "--status", "in-progress"]) == 0
+    assert json.loads(capsys.readouterr().out) == {"count": 1}
+    assert main(["delete", "1"]) == 0
+    assert capsys.readouterr().out == "Deleted [1] Write spec (done)\n"
+    assert main(["delete", "1"]) == 1
+    assert "Task 1 not found" in capsys.readouterr().err
+    assert [(t.id, t.status) for t in daemon.backing.load_all_tasks()] == [(2, "in-progress")]
+
+
+def test_daemon_other_store_runs_locally(daemon, tmp_path, capsys):
+    assert main(["--store", "memory://", "create", "--title", "Local"]) == 0
+    assert daemon.load_all_tasks() == []
+
+
+def test_stale_socket_falls_back_to_local(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / "stale.sock"
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(str(path))
+    sock.close()  # file remains, nobody listening
+    monkeypatch.setenv(daemon_client.SOCKET_ENV_VAR, str(path))
+    assert main(["create", "--title", "A"]) == 0
+    assert "Created [1] A" in capsys.readouterr().out
+
+
+def test_daemon_of_another_user_is_not_trusted(daemon, tmp_path, monkeypatch, capsys):
+    path = str(tmp_path / "d.sock")
+    real_getuid, owned_socket = os.getuid, daemon_client.owned_socket
+    monkeypatch.setattr(os, "getuid", lambda: real_getuid() + 1)  # the daemon now runs as someone else
+    # A socket file that looks like ours, served by another user's process
+    monkeypatch.setattr(daemon_client, "owned_socket", lambda path: True)
+    with pytest.raises(PermissionError):
+        daemon_client.roundtrip(path, {"command": "list"})
+    assert main(["create", "--title", "Local"]) == 0
+    assert "Created [1] Local" in capsys.readouterr().out
+    # Another user's socket file is not even connected to
+    monkeypatch.setattr(daemon_client, "owned_socket", owned_socket)
+    monkeypatch.setattr(daemon_client, "roundtrip", lambda *a: pytest.fail("forwarded"))
+    assert not daemon_client.owned_socket(path)
+    assert main(["create", "--title", "Also local"]) == 0
+    assert "Created [2] Also local" in capsys.readouterr().out
+    assert not daemon_client.owned_socket(str(tmp_path / "missing.sock"))
+    assert not daemon_client.owned_socket(str(tmp_path / "tasks.json"))  # not a socket
+
+
+def test_handle_request_errors():
+    key = ("memory", "")
+    repo = InMemoryTaskRepository()
+    assert handle_request({"command": "list", "store": ["json", "/x"]}, key, repo) == {"handled": False}
+    response = handle_request({"command": "nope", "store": list(key)}, key, repo)
+    assert response["exit_code"] == 1 and "Unknown command" in response["result"]["error"]["message"]
+    response = handle_request({"command": "search", "args": {}, "store": list(key)}, key, repo)
+    assert "Malformed request" in response["result"]["error"]["message"]
+
+
+def test_serve_command_lifecycle(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    path = str(tmp_path / "s.sock")
+
+    def fake_serve_forever(self):
+        assert daemon_client.daemon_alive(path)
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(DaemonServer, "serve_forever", fake_serve_forever)
+    assert main(["--store", "memory://", "serve", "--socket", path]) == 0
+    assert "Serving memory:// on" in capsys.readouterr().out
+    assert not (tmp_path / "s.sock").exists()
+    assert main(["--store", str(tmp_path / "tasks.json"), "serve", "--socket", path]) == 0
+    printed = capsys.readouterr().out.split()[1]
+    assert registry.store_key(printed) == ("json", str(tmp_path / "tasks.json"))  # pasteable into --store
+
+
+def test_serve_refuses_when_daemon_running(daemon, monkeypatch, capsys):
+    assert main(["serve"]) == 1
+    assert "already listening" in capsys.readouterr().err
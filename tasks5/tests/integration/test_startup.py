@@ -0,0 +1,79 @@
+import pathlib
+import re
+import subprocess
+import sys
+
+import pytest
+
+from src.repository.json_repository import JsonTaskRepository
+
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+# Modules the read-only fast path must not pay for
+HEAVY = {"logging", "socket", "dataclasses", "shutil", "inspect", "uuid", "sqlite3"}
+OTHER_COMMANDS = {
+    "src.cli.commands.create", "src.cli.commands.import_", "src.cli.commands.serve",
+    "src.cli.daemon_server", "src.repository.sql_repository", "src.repository.journal_repository",
+}
+# Only writes sync files; read commands must not import the durability machinery
+WRITE_ONLY = {"src.repository.durability"}
+# Only searches need the search services and the trigram index
+SEARCH_ONLY = {"src.services.search", "src.services.trigram_index", "src.repository.parallel_scan", "struct"}
+# What every CLI start imports whatever the command: `-m` and the parser
+REFERENCE = "import runpy, argparse"
+# Import time of everything a command loads beyond `REFERENCE`, stdlib
+# included, as the best of `RUNS` runs to absorb scheduler noise (single runs
+# vary 20-80 ms here). Before the start-up work `list` spent 34-40 ms here on
+# a 1-CPU VM (best-median); now 22-26 ms
+IMPORT_BUDGET_US = 32_000
+RUNS = 5
+
+
+def _import_times(tmp_path, *args):
+    return _run_import_times(
+        "-m", "src.cli.main", "--store", str(tmp_path / "tasks.json"), "--no-daemon", *args
+    )
+
+
+def _run_import_times(*args):
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args], cwd=ROOT, capture_output=True, text=True, timeout=60,
+    )
+    assert proc.returncode == 0, proc.stderr
+    times = {}
+    for line in proc.stderr.splitlines():
+        m = re.match(r"import time:\s+(\d+) \|\s+\d+ \|\s*(\S+)", line)
+        if m:
+            times[m.group(2)] = int(m.group(1))
+    return times
+
+
+@pytest.mark.parametrize("args", [["list"], ["--json", "search", "x"]])
+def test_read_commands_skip_heavy_imports(tmp_path, args):
+    JsonTaskRepository(tmp_path / "tasks.json").create_task("seed")  # a missing store is created on first read
+    extra = []
+    for _ in range(RUNS):
+        times, reference = _import_times(tmp_path, *args), _run_import_times("-c", REFERENCE)
+        extra.append(sum(times.values()) - sum(reference.values()))
+    assert "src.repository.json_repository" in times
+    assert not HEAVY & times.keys()
+    assert not OTHER_COMMANDS & times.keys()
+    assert not WRITE_ONLY & times.keys()
+    if args == ["list"]:
+        assert not SEARCH_ONLY & times.keys()
+    assert min(extra) < IMPORT_BUDGET_US
+
+
+def test_import_skips_dataclasses(tmp_path):
+    rows = tmp_path / "rows.jsonl"
+    rows.write_text('{"title": "imported"}\n', encoding="utf-8")
+    times = _import_times(tmp_path, "import", str(rows))
+    assert "src.services.importer" in times and "dataclasses" not in times
+
+
+def test_help_still_lists_every_command():
+    proc = subprocess.run(
+        [sys.executable, "-m", "src.cli.main", "--help"], cwd=ROOT, capture_output=True, text=True, timeout=60,
+    )
+    assert proc.returncode == 0
+    for command in ("create", "list", "search", "import", "serve"):
+        assert command in proc.stdout
@@ -0,0 +1,193 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.models.task import Task, TaskDraft
+from src.repository.async_repository import AsyncTaskRepository, ExecutorTaskRepository, open_async_repository
+from src.repository.binary_repository import BinaryTaskRepository
+from src.repository.errors import TaskNotFoundError
+from src.repository.json_repository import JsonTaskRepository
+from src.repository.memory_repository import InMemoryTaskRepository
+from src.repository.sql_repository import SqlTaskRepository
+from src.services.pagination import Page
+from src.services.query import parse_query
+
+
+class CountingRepository(InMemoryTaskRepository):
+    """Memory store counting calls, whose loads and writes block until `gate` is set."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls = []
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def load_all_tasks(self):
+        self.calls.append("load_all_tasks")
+        self.gate.wait(5)
+        return super().load_all_tasks()
+
+    def create_many(self, drafts):
+        self.calls.append(("create_many", len(drafts)))
+        self.gate.wait(5)
+        return super().create_many(drafts)
+
+    def save_many(self, tasks):
+        self.calls.append(("save_many", len(tasks)))
+        stored = {t.id for t in super().load_all_tasks()}
+        if any(t.id in stored for t in tasks):  # like the file and SQL stores
+            raise ValueError("Task id already exists")
+        return super().save_many(tasks)
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_concurrent_creates_are_coalesced_into_one_write():
+    repo = CountingRepository()
+
+    async def scenario():
+        async with ExecutorTaskRepository(repo) as tasks:
+            return await asyncio.gather(*(tasks.create_task(f"task {i}") for i in range(20)))
+    created = run(scenario())
+    assert [t.id for t in created] == list(range(1, 21))
+    assert [t.title for t in created] == [f"task {i}" for i in range(20)]
+    assert repo.calls == [("create_many", 20)]
+
+
+def test_writes_queued_behind_an_inflight_write_go_out_together():
+    repo = CountingRepository()
+
+    async def scenario():
+        tasks = ExecutorTaskRepository(repo)
+        repo.gate.clear()
+        first = asyncio.ensure_future(tasks.create_task("first"))
+        while not repo.calls:
+            await asyncio.sleep(0.001)
+        rest = [asyncio.ensure_future(tasks.create_task(f"queued {i}")) for i in range(5)]
+        saved = asyncio.ensure_future(tasks.save_new_task(Task(100, "explicit", None, "todo")))
+        await asyncio.sleep(0.01)
+        repo.gate.set()
+        results = await asyncio.gather(first, *rest, saved)
+        await tasks.aclose()
+        return results
+    results = run(scenario())
+    assert [t.id for t in results[:-1]] == [1, 2, 3, 4, 5, 6] and results[-1] is None
+    assert repo.calls == [("create_many", 1), ("create_many", 5), ("save_many", 1)]
+
+
+def test_a_failing_request_does_not_fail_the_others_in_its_write():
+    repo = CountingRepository()
+    repo.save_many([Task(2, "taken", None, "todo")])
+
+    async def scenario():
+        async with ExecutorTaskRepository(repo) as tasks:
+            return await asyncio.gather(
+                tasks.save_new_task(Task(1, "one", None, "todo")),
+                tasks.save_new_task(Task(2, "duplicate", None, "todo")),
+                tasks.save_many([Task(3, "three", None, "todo")]),
+                return_exceptions=True,
+            )
+    one, duplicate, three = run(scenario())
+    assert one is None and three is None and isinstance(duplicate, ValueError)
+    assert sorted(t.title for t in repo.load_all_tasks()) == ["one", "taken", "three"]
+    with pytest.raises(ValueError):
+        run(ExecutorTaskRepository(repo).create_task("   "))
+
+
+def test_concurrent_reads_share_one_load_until_a_write_lands():
+    repo = CountingRepository()
+    repo.create_task("seed")
+
+    async def scenario():
+        tasks = ExecutorTaskRepository(repo)
+        repo.gate.clear()
+        readers = [asyncio.ensure_future(tasks.load_all_tasks()) for _ in range(10)]
+        await asyncio.sleep(0.01)
+        repo.gate.set()
+        loaded = await asyncio.gather(*readers)
+        await tasks.create_task("later")
+        after = await asyncio.gather(tasks.load_all_tasks(), tasks.load_all_tasks())
+        await tasks.aclose()
+        return loaded, after
+    loaded, after = run(scenario())
+    assert all(result == [Task(1, "seed", None, "todo")] for result in loaded)
+    assert loaded[0] is not loaded[1]  # each caller gets its own list
+    assert [t.title for t in after[0]] == ["seed", "later"] == [t.title for t in after[1]]
+    assert repo.calls.count("load_all_tasks") == 2
+
+
+@pytest.mark.parametrize("make", [
+    lambda path: JsonTaskRepository(path / "tasks.json"),
+    lambda path: SqlTaskRepository(path / "tasks.db"),
+    lambda path: BinaryTaskRepository(path / "tasks.bin"),
+])
+def test_backends_through_the_async_api(tmp_path, monkeypatch, make):
+    monkeypatch.setattr("src.repository.async_repository.ITER_BATCH", 7)
+    repo = make(tmp_path)
+
+    async def scenario():
+        async with ExecutorTaskRepository(repo, max_workers=2) as tasks:
+            await asyncio.gather(*(tasks.create_task(f"task {i}", status=("todo", "done")[i % 2]) for i in range(30)))
+            streamed = [t.id async for t in tasks.iter_tasks("done")]
+            searched = [t.id async for t in tasks.iter_search("TASK 2", Page(limit=5))]
+            updated = await tasks.update_task(1, title="renamed")
+            deleted = await tasks.delete_task(2)
+            with pytest.raises(TaskNotFoundError):
+                await tasks.delete_task(2)
+            count = await tasks.update_where({"status": "in-progress"}, status="todo")
+            return (streamed, searched, updated, deleted, count, await tasks.get_task(1), await tasks.next_id(),
+                    await tasks.list_tasks("in-progress", Page(limit=3)), await tasks.search_tasks("renamed"))
+    streamed, searched, updated, deleted, count, first, next_id, listed, found = run(scenario())
+    assert streamed == list(range(2, 31, 2))
+    assert searched == [3, 21, 22, 23, 24]
+    assert updated.title == "renamed" and deleted.id == 2 and count == 15
+    assert first == Task(1, "renamed", None, "in-progress") and next_id == 31
+    assert [t.id for t in listed] == [1, 3, 5] and [t.id for t in found] == [1]
+    getattr(repo, "close", lambda: None)()
+
+
+def test_open_async_repository_and_invalid_pool_size(tmp_path):
+    tasks = open_async_repository(f"json:///{tmp_path / 'tasks.json'}")
+    assert isinstance(tasks.repo, JsonTaskRepository)
+    with pytest.raises(ValueError):
+        ExecutorTaskRepository(tasks.repo, max_workers=0)
+
+
+class ListRepository(AsyncTaskRepository):
+    """Minimal implementation: only the two required calls."""
+
+    def __init__(self) -> None:
+        self.tasks = []
+
+    async def load_all_tasks(self):
+        return list(self.tasks)
+
+    async def save_new_task(self, task):
+        self.tasks.append(task)
+
+
+def test_interface_defaults_build_on_load_and_save():
+    async def scenario():
+        async with ListRepository() as tasks:
+            await tasks.create_many([TaskDraft("alpha", "first", "done"), TaskDraft("beta", None, "todo")])
+            query = parse_query("status:done alpha")
+            return (await tasks.create_task("gamma"), await tasks.get_task(2), await tasks.get_task(9),
+                    [t.id async for t in tasks.iter_tasks("todo")], [t.id async for t in tasks.iter_search("A")],
+                    [t.id async for t in tasks.iter_query(query)])
+    gamma, beta, missing, todo, searched, queried = run(scenario())
+    assert gamma == Task(3, "gamma", None, "todo") and beta.title == "beta" and missing is None
+    assert todo == [2, 3] and searched == [1, 2, 3] and queried == [1]
+
+
+def test_iter_query_streams_from_the_wrapped_store():
+    repo = InMemoryTaskRepository([Task(i, f"task {i}", None, "todo") for i in range(1, 6)])
+
+    async def scenario():
+        async with ExecutorTaskRepository(repo) as tasks:
+            return ([t.id async for t in tasks.iter_query(parse_query("id:2..4"))],
+                    await tasks.query_tasks(parse_query("task 5")))
+    streamed, queried = run(scenario())
+    assert streamed == [2, 3, 4] and [t.id for t in queried] == [5]
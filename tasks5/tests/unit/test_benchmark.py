@@ -0,0 +1,54 @@
+import pytest
+
+from scripts.benchmark import compare, parse_args, percentile, run_size, summarize, synthetic_records
+
+
+def test_percentile_nearest_rank():
+    samples = [float(i) for i in range(1, 101)]
+    assert percentile(samples, 50) == 50.0
+    assert percentile(samples, 95) == 95.0
+    assert percentile(samples, 99) == 99.0
+    assert percentile([3.0], 99) == 3.0
+
+
+def test_summarize_reports_median_and_tails():
+    stats = summarize([1.0, 2.0, 3.0, 4.0, 100.0])
+    assert stats["median_ms"] == 3.0
+    assert stats["p95_ms"] == stats["p99_ms"] == stats["max_ms"] == 100.0
+    assert stats["n"] == 5
+
+
+def test_compare_flags_only_real_slowdowns():
+    baseline = {"results": [
+        {"store": "json", "size": 1000, "case": "search_hit", "median_ms": 10.0},
+        {"store": "json", "size": 1000, "case": "list_all", "median_ms": 0.1},
+    ]}
+    current = [
+        {"store": "json", "size": 1000, "case": "search_hit", "median_ms": 20.0},
+        {"store": "json", "size": 1000, "case": "list_all", "median_ms": 0.3},  # below min delta
+        {"store": "json", "size": 5000, "case": "search_hit", "median_ms": 99.0},  # no baseline
+    ]
+    regressions = compare(current, baseline, tolerance=0.25, min_delta_ms=0.5)
+    assert len(regressions) == 1
+    assert regressions[0].startswith("json/1000/search_hit")
+
+
+def test_synthetic_records_plant_hit_word():
+    records = synthetic_records(300)
+    assert [r["id"] for r in records] == list(range(1, 301))
+    assert sum("kestrel" in r["title"] for r in records) == 3
+
+
+def test_run_size_smoke_uses_temp_store(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    run = run_size(50, "journal", ["cold_load", "create", "search_hit", "json_output"], iterations=2, cli_iterations=1)
+    assert [r["case"] for r in run["results"]] == ["cold_load", "create", "search_hit", "json_output"]
+    assert all(r["n"] == 2 for r in run["results"])
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_parse_args_rejects_bad_sizes_and_cases():
+    with pytest.raises(SystemExit):
+        parse_args(["--sizes", "0"])
+    with pytest.raises(SystemExit):
+        parse_args(["--cases", "nope"])
@@ -0,0 +1,117 @@
+import json
+
+import pytest
+
+from src.models.task import Task, TaskDraft
+from src.repository.binary_repository import BinaryTaskRepository
+from src.repository.errors import CorruptDataError
+from src.repository.json_repository import JsonTaskRepository
+from src.repository.migration import export_binary_to_json, migrate_json_to_binary
+from src.repository.registry import open_repository
+from src.repository.schema import base_document, document_to_snapshot, snapshot_to_document, with_header
+from src.repository.snapshot import ENTRY, HEADER, Snapshot, SnapshotFormatError, encode_snapshot
+from src.services.pagination import Page
+from src.services.query import parse_query
+
+TASKS = [
+    Task(i, f"Ünï task {i}" if i % 7 == 0 else f"task {i}", None if i % 3 else f"notes {i}",
+         ("todo", "in-progress", "done")[i % 3])
+    for i in range(1, 3001)
+]
+
+
+def test_layout_is_header_index_heap():
+    raw = encode_snapshot(TASKS[1:3], next_id=10, generation=4)
+    snapshot = Snapshot(raw)
+    assert (len(snapshot), snapshot.next_id, snapshot.generation) == (2, 10, 4)
+    assert snapshot.heap_start == HEADER.size + 2 * ENTRY.size
+    assert raw[snapshot.heap_start:] == b"task 2task 3notes 3"
+    assert snapshot.entry(1) == (3, 6, 6, 7, 0)
+    assert snapshot.status_codes() == bytes([2, 0])
+    with pytest.raises(SnapshotFormatError):
+        Snapshot(b"NOTASNAP" + raw[8:])
+    with pytest.raises(SnapshotFormatError):
+        Snapshot(raw[:HEADER.size + 1])
+
+
+def test_rows_are_found_by_id_with_and_without_gaps():
+    snapshot = Snapshot(encode_snapshot(TASKS))
+    assert snapshot.task(snapshot.row_of(1234)) == TASKS[1233]
+    gappy = Snapshot(encode_snapshot(TASKS[::2]))
+    assert gappy.task(gappy.row_of(2001)) == TASKS[2000]
+    assert gappy.row_of(2000) is None and gappy.row_of(99999) is None
+    assert Snapshot(encode_snapshot([])).row_of(1) is None
+
+
+def test_reads_match_the_json_store(tmp_path):
+    binary = BinaryTaskRepository(tmp_path / "tasks.bin")
+    json_repo = JsonTaskRepository(tmp_path / "tasks.json")
+    for repo in (binary, json_repo):
+        repo.save_many(TASKS)
+    assert binary.load_all_tasks() == json_repo.load_all_tasks()
+    for status in ("done", "todo", "bogus", None):
+        assert binary.list_tasks(status, Page(limit=5, offset=2, after_id=100)) == \
+            json_repo.list_tasks(status, Page(limit=5, offset=2, after_id=100))
+    for needle in ("TASK 29", "notes 3", "ünï", "missing"):
+        assert binary.search_tasks(needle) == json_repo.search_tasks(needle)
+    query = parse_query("status:done id:10..400 notes")
+    assert binary.query_tasks(query) == json_repo.query_tasks(query)
+    with pytest.raises(ValueError):
+        binary.search_tasks("  ")
+
+
+def test_missing_store_is_empty_and_corrupt_store_is_backed_up(tmp_path):
+    repo = BinaryTaskRepository(tmp_path / "tasks.bin")
+    assert repo.load_all_tasks() == [] and repo.next_id() == 1 and repo.get_task(1) is None
+    repo.path.write_bytes(b"{}")
+    assert repo.load_all_tasks() == []
+    assert not repo.path.exists() and list(tmp_path.glob("tasks.bin.bak-*"))
+    repo.path.write_bytes(b"")
+    with pytest.raises(CorruptDataError):
+        repo.list_tasks()
+    assert repo.create_task("fresh").id == 1
+
+
+def test_out_of_order_saves_merge_and_duplicates_are_rejected(tmp_path):
+    repo = BinaryTaskRepository(tmp_path / "tasks.bin")
+    repo.save_many([TASKS[4], TASKS[1]])
+    repo.save_new_task(TASKS[2])
+    assert [t.id for t in repo.load_all_tasks()] == [2, 3, 5]
+    with pytest.raises(ValueError):
+        repo.save_new_task(TASKS[1])
+    assert repo.next_id() == 6
+
+
+def test_replaced_text_is_reclaimed(tmp_path):
+    repo = BinaryTaskRepository(tmp_path / "tasks.bin")
+    repo.create_many([TaskDraft("x" * 100, None, "todo"), TaskDraft("keep", None, "todo")])
+    for n in range(5):
+        repo.update_task(1, title=f"title {n}")
+        with Snapshot.open(repo.path) as snapshot:
+            assert 2 * snapshot.dead <= len(snapshot.buffer) - snapshot.heap_start
+    repo.update_task(2, status="done")  # status only: no new text
+    assert repo.load_all_tasks() == [Task(1, "title 4", None, "todo"), Task(2, "keep", None, "done")]
+
+
+def test_converters_round_trip_the_json_schema(tmp_path):
+    doc = with_header({"generation": 6}, [{"id": 1, "title": "a", "description": None, "status": "done"},
+                                          {"id": "bad"}, {"id": 3, "title": "c", "description": "d", "status": "todo"}], 9)
+    snapshot = Snapshot(document_to_snapshot(doc))
+    assert (len(snapshot), snapshot.next_id, snapshot.generation) == (2, 9, 7)
+    back = snapshot_to_document(snapshot.buffer)
+    assert back["tasks"] == [doc["tasks"][0], doc["tasks"][2]]
+    assert (back["next_id"], back["generation"]) == (9, 8)
+    assert snapshot_to_document(document_to_snapshot(base_document()))["tasks"] == []
+
+
+def test_migration_between_json_and_binary_stores(tmp_path):
+    json_path, bin_path = tmp_path / "tasks.json", tmp_path / "tasks.bin"
+    JsonTaskRepository(json_path).save_many(TASKS[:50])
+    assert migrate_json_to_binary(json_path, bin_path) == 50
+    binary = open_repository(f"binary:///{bin_path}")
+    assert isinstance(binary, BinaryTaskRepository) and binary.load_all_tasks() == TASKS[:50]
+    binary.delete_task(50)
+    out = tmp_path / "out.json"
+    assert export_binary_to_json(bin_path, out) == 49
+    assert json.loads(out.read_text())["next_id"] == 51
+    assert JsonTaskRepository(out).load_all_tasks() == TASKS[:49]
@@ -0,0 +1,73 @@
+import importlib.util
+import json
+
+import pytest
+
+from src.models.task import Task
+from src.repository import codec
+from src.repository.journal_repository import JournalTaskRepository
+from src.repository.json_repository import JsonTaskRepository
+
+DOC = {"schema_version": 1, "tasks": [
+    {"id": 1, "title": 'Ünï "q" \\ {x}', "description": None, "status": "todo"},
+    {"id": 2, "title": "emoji 🚀", "description": "tab\there", "status": "done"},
+]}
+INSTALLED = ["json"] + [name for name in ("msgspec", "orjson") if importlib.util.find_spec(name)]
+
+
+@pytest.fixture(autouse=True)
+def fresh_codec(monkeypatch):
+    monkeypatch.delenv(codec.CODEC_ENV_VAR, raising=False)
+    monkeypatch.setattr(codec, "_codec", None)
+    monkeypatch.setattr(codec, "_stdlib_bytes_left", codec.FAST_AFTER_BYTES)
+
+
+@pytest.mark.parametrize("name", INSTALLED)
+def test_backends_round_trip_compact_utf8(name):
+    _, loads, dumps = codec.load_backend(name)
+    encoded = dumps(DOC)
+    assert loads(encoded) == loads(encoded.decode("utf-8")) == DOC
+    assert encoded == json.dumps(DOC, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    with pytest.raises(ValueError):
+        loads(b'{"tasks": [')
+
+
+@pytest.mark.parametrize("name", INSTALLED)
+def test_inputs_a_fast_backend_rejects_fall_back_to_the_stdlib(name):
+    _, loads, dumps = codec.load_backend(name)
+    assert loads(b'["\\ud800", NaN]')[0] == "\ud800"
+    assert json.loads(dumps({"id": 1 << 70})) == {"id": 1 << 70}
+
+
+def test_small_work_stays_on_the_stdlib_until_it_adds_up(monkeypatch):
+    monkeypatch.setattr(codec, "_stdlib_bytes_left", 100)
+    assert codec.loads(b'{"a": 1}') == {"a": 1}
+    assert codec.dumps({"a": 1}) == b'{"a":1}'
+    assert codec._codec is None
+    codec.loads(b"[" + b"0," * 60 + b"0]")  # one large payload selects a backend for itself
+    assert codec._codec is not None and codec.backend() == INSTALLED[-1]
+
+
+def test_backend_can_be_forced(monkeypatch):
+    monkeypatch.setenv(codec.CODEC_ENV_VAR, "json")
+    assert codec.dumps([1]) == b"[1]"
+    assert codec.backend() == "json"
+    with pytest.raises(ValueError):
+        codec.use("yaml")
+
+
+@pytest.mark.parametrize("name", INSTALLED)
+def test_stores_written_by_one_backend_read_with_another(tmp_path, name):
+    path = tmp_path / "tasks.json"
+    codec.use("json")
+    JsonTaskRepository(path).save_many([Task(1, "Spaced {title}", None, "todo")])
+    journal = JournalTaskRepository(path, background=False)
+    journal.create_task("journal entry")
+    codec.use(name)
+    journal.update_task(1, status="done")
+    for reader in (JournalTaskRepository(path, background=False), journal):
+        assert [t.id for t in reader.search_tasks("title")] == [1]
+        assert reader.get_task(1).status == "done" and reader.get_task(2).title == "journal entry"
+    journal.compact()
+    codec.use("json")
+    assert [t.id for t in JsonTaskRepository(path).list_tasks("done")] == [1]
@@ -0,0 +1,129 @@
+import json
+import multiprocessing
+import threading
+import time
+
+import pytest
+
+from src.models.task import Task, TaskDraft
+from src.repository.group_commit import CommitQueue
+from src.repository.journal_repository import JournalTaskRepository
+from src.repository.json_repository import JsonTaskRepository
+from src.repository.locking import FileLock, fcntl
+
+pytestmark = pytest.mark.skipif(
+    fcntl is None or "fork" not in multiprocessing.get_all_start_methods(),
+    reason="needs fcntl and fork",
+)
+
+
+def _create_worker(path, worker, count, journal=False):
+    if journal:
+        repo = JournalTaskRepository(path=path, compact_threshold=2048, background=False)
+    else:
+        repo = JsonTaskRepository(path=path)
+    for i in range(count):
+        repo.create_task(f"w{worker}-{i}")
+
+
+def _run_workers(path, workers, count, journal=False):
+    ctx = multiprocessing.get_context("fork")
+    procs = [ctx.Process(target=_create_worker, args=(str(path), w, count, journal)) for w in range(workers)]
+    for proc in procs:
+        proc.start()
+    for proc in procs:
+        proc.join(120)
+        assert proc.exitcode == 0
+    return procs
+
+
+@pytest.mark.parametrize("journal", [False, True])
+def test_concurrent_processes_lose_no_tasks(tmp_path, journal):
+    data_file = tmp_path / "tasks.json"
+    _run_workers(data_file, workers=4, count=15, journal=journal)
+    repo = JournalTaskRepository(path=data_file) if journal else JsonTaskRepository(path=data_file)
+    tasks = repo.load_all_tasks()
+    assert sorted(t.title for t in tasks) == sorted(f"w{w}-{i}" for w in range(4) for i in range(15))
+    assert sorted(t.id for t in tasks) == list(range(1, 61))
+
+
+def test_writers_queued_behind_the_lock_share_one_rewrite(tmp_path):
+    data_file = tmp_path / "tasks.json"
+    JsonTaskRepository(path=data_file).create_task("first")
+    # Children are forked while the parent holds the lock; they must not inherit it
+    holder = FileLock(tmp_path / "tasks.json.lock")
+    holder.acquire()
+    ctx = multiprocessing.get_context("fork")
+    procs = [ctx.Process(target=_create_worker, args=(str(data_file), w, 1)) for w in range(4)]
+    for proc in procs:
+        proc.start()
+    pending = tmp_path / "tasks.json.pending"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if pending.exists() and len(pending.read_bytes().splitlines()) == 4:
+            break
+        time.sleep(0.01)
+    holder.release()
+    for proc in procs:
+        proc.join(60)
+        assert proc.exitcode == 0
+    data = json.loads(data_file.read_text())
+    assert data["generation"] == 2  # one rewrite for the four queued creates
+    assert sorted(t["id"] for t in data["tasks"]) == [1, 2, 3, 4, 5]
+    assert data["next_id"] == 6
+    assert json.loads((tmp_path / "tasks.json.done").read_text()) == {}
+
+
+def test_threads_sharing_a_repository_group_commit(tmp_path):
+    repo = JsonTaskRepository(path=tmp_path / "tasks.json")
+    threads = [threading.Thread(target=lambda i=i: repo.save_many([Task(i, f"t{i}", None, "todo")])) for i in range(1, 21)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(t.id for t in repo.load_all_tasks()) == list(range(1, 21))
+
+
+def test_waiter_recommits_when_leader_died_before_writing(tmp_path):
+    data_file = tmp_path / "tasks.json"
+    repo = JsonTaskRepository(path=data_file)
+    repo.create_task("a")
+    # A leader drained this waiter's request and published its result, then crashed
+    queue = CommitQueue(data_file)
+    queue.settle({"lost": [2]}, generation=1)
+    assert queue.take("lost", generation=1) is None
+    repo.create_task("b")  # next leader discards the result the document never reached
+    assert json.loads((tmp_path / "tasks.json.done").read_text()) == {}
+    assert [t.title for t in repo.load_all_tasks()] == ["a", "b"]
+
+
+def test_queue_skips_garbled_and_invalid_requests(tmp_path):
+    data_file = tmp_path / "tasks.json"
+    repo = JsonTaskRepository(path=data_file)
+    queue = CommitQueue(data_file)
+    queue.enqueue({"ticket": "bad", "kind": "create", "items": [["", None, "todo"]]})
+    queue.enqueue({"ticket": "ok", "kind": "create", "items": [["queued", None, "todo"]]})
+    with open(queue.pending_path, "ab") as fh:
+        fh.write(b'{"ticket": "torn')
+    created = repo.create_task("own")
+    assert [t.title for t in repo.load_all_tasks()] == ["queued", "own"]
+    assert created.id == 2
+    assert json.loads(queue.done_path.read_text()) == {"ok": {"generation": 1, "ids": [1]}}
+
+
+def test_create_many_validates_before_queueing(tmp_path):
+    repo = JsonTaskRepository(path=tmp_path / "tasks.json")
+    with pytest.raises(ValueError):
+        repo.create_many([TaskDraft(" ")])
+    assert not (tmp_path / "tasks.json.pending").exists()
+
+
+def test_file_lock_non_blocking_and_reentrant(tmp_path):
+    lock = FileLock(tmp_path / "x.lock")
+    other = FileLock(tmp_path / "x.lock")
+    with lock:
+        with lock:
+            assert other.acquire(blocking=False) is False
+        assert other.acquire(blocking=False) is False
+    assert other.acquire(blocking=False) is True
+    other.release()
@@ -0,0 +1,174 @@
+import os
+import threading
+import time
+
+import pytest
+
+from src.models.task import Task, TaskDraft
+from src.repository import durability, registry
+from src.repository.binary_repository import BinaryTaskRepository
+from src.repository.durability import Durability, parse, requested, resolve
+from src.repository.errors import RepositoryError
+from src.repository.journal_repository import JournalTaskRepository
+from src.repository.json_repository import JsonTaskRepository
+from src.repository.sql_repository import SqlTaskRepository
+
+
+@pytest.fixture
+def fsyncs(monkeypatch):
+    """Record the path of every descriptor passed to os.fsync."""
+    synced = []
+    real_fsync = os.fsync
+
+    def tracking_fsync(fd):
+        synced.append(os.readlink(f"/proc/self/fd/{fd}") if os.path.exists("/proc/self/fd") else fd)
+        return real_fsync(fd)
+
+    monkeypatch.setattr(os, "fsync", tracking_fsync)
+    monkeypatch.delenv(durability.ENV_VAR, raising=False)
+    yield synced
+    timer = durability._batch._timer
+    durability.flush()  # waits for a flush the timer already started
+    if timer is not None:
+        timer.join()
+
+
+@pytest.mark.parametrize("spec, expected", [
+    ("none", Durability("none")),
+    (" FULL ", Durability("full")),
+    ("batch", Durability("batch", 0.05, 64)),
+    ("batch:20", Durability("batch", 0.02, 64)),
+    ("batch:0,1", Durability("batch", 0.0, 1)),
+    (None, None),
+])
+def test_parse(spec, expected):
+    assert parse(spec) == expected
+    if expected is not None:
+        assert parse(str(expected)) == expected
+
+
+@pytest.mark.parametrize("spec", ["sometimes", "full:10", "batch:x", "batch:-1", "batch:10,0", "batch:10,x"])
+def test_parse_rejects_invalid_levels(spec):
+    with pytest.raises(ValueError):
+        parse(spec)
+
+
+def test_resolve_prefers_requested_then_own_then_env(monkeypatch):
+    monkeypatch.delenv(durability.ENV_VAR, raising=False)
+    assert resolve() == Durability("full")
+    monkeypatch.setenv(durability.ENV_VAR, "batch:10")
+    assert resolve() == Durability("batch", 0.01, 64)
+    assert resolve(Durability("none")) == Durability("none")
+    with requested("full"):
+        assert resolve(Durability("none")) == Durability("full")
+        with requested(None):  # no override: the outer one stays
+            assert resolve(Durability("none")) == Durability("full")
+    assert resolve(Durability("none")) == Durability("none")
+    monkeypatch.setenv(durability.ENV_VAR, "bogus")
+    assert resolve() == Durability("full")
+
+
+def test_full_syncs_data_and_directory_none_syncs_nothing(tmp_path, fsyncs):
+    repo = JsonTaskRepository(tmp_path / "tasks.json", durability="none")
+    repo.create_task("quiet")
+    assert fsyncs == []
+    repo.durability = parse("full")
+    repo.create_task("durable")
+    assert str(tmp_path / "tasks.json.tmp") in fsyncs and str(tmp_path) in fsyncs
+    assert [t.title for t in JsonTaskRepository(tmp_path / "tasks.json").load_all_tasks()] == ["quiet", "durable"]
+
+
+def test_batch_syncs_once_per_group_of_writes(tmp_path, fsyncs):
+    repo = BinaryTaskRepository(tmp_path / "tasks.bin", durability="batch:60000,3")
+    data = str(tmp_path / "tasks.bin.tmp")
+    repo.create_task("a")
+    repo.create_task("b")
+    assert fsyncs == [data, data]  # the data before each replace; the directory waits
+    repo.create_task("c")  # third write: the group is synced
+    assert fsyncs == [data, data, data, str(tmp_path)]
+    repo.create_task("d")
+    durability.flush()
+    assert fsyncs[4:] == [data, str(tmp_path)]
+    durability.flush()  # nothing pending
+    assert len(fsyncs) == 6
+
+
+def test_batch_syncs_rewritten_data_before_it_replaces_the_store(tmp_path, fsyncs, monkeypatch):
+    real_replace = os.replace
+    monkeypatch.setattr(os, "replace", lambda src, dst: (fsyncs.append(f"replace {dst}"), real_replace(src, dst)))
+    store = tmp_path / "tasks.json"
+    JsonTaskRepository(store, durability="batch:60000,1000").create_task("a")
+    synced = fsyncs.index(f"{store}.tmp")
+    assert synced < fsyncs.index(f"replace {store}")  # a power loss never sees an empty store
+    assert str(tmp_path) not in fsyncs
+    durability.flush()
+    assert fsyncs[-1] == str(tmp_path)
+
+
+def test_batch_syncs_when_the_interval_passes(tmp_path, fsyncs):
+    repo = JsonTaskRepository(tmp_path / "tasks.json", durability="batch:10,1000")
+    repo.create_task("a")
+    deadline = time.monotonic() + 5
+    while str(tmp_path) not in fsyncs and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert str(tmp_path) in fsyncs
+
+
+def test_flush_waits_for_a_flush_already_syncing(tmp_path, monkeypatch):
+    syncing, release = threading.Event(), threading.Event()
+    real_fsync = os.fsync
+
+    def slow_fsync(fd):
+        syncing.set()
+        release.wait(5)
+        return real_fsync(fd)
+
+    monkeypatch.setattr(os, "fsync", slow_fsync)
+    BinaryTaskRepository(tmp_path / "tasks.bin", durability="batch:1,1000").create_task("a")
+    assert syncing.wait(5)  # the timer's flush is inside fsync
+    flushed = threading.Thread(target=durability.flush)
+    flushed.start()
+    flushed.join(0.1)
+    assert flushed.is_alive()  # at-exit style flush must not return before the data is synced
+    release.set()
+    flushed.join(5)
+    assert not flushed.is_alive()
+
+
+def test_journal_appends_follow_the_level(tmp_path, fsyncs):
+    repo = JournalTaskRepository(tmp_path / "tasks.json", background=False, durability="none")
+    repo.create_task("a")
+    assert fsyncs == []
+    with requested("full"):
+        repo.create_task("b")
+    assert fsyncs == [str(repo.journal_path)]
+
+
+def test_sqlite_sets_synchronous_per_write(tmp_path, monkeypatch):
+    monkeypatch.delenv(durability.ENV_VAR, raising=False)
+    repo = SqlTaskRepository(tmp_path / "tasks.db", durability="batch")
+    pragma = lambda: repo._connection().execute("PRAGMA synchronous").fetchone()[0]
+    repo.create_task("a")
+    assert pragma() == 1  # NORMAL
+    with requested("none"):
+        repo.create_many([TaskDraft("b", None, "todo")])
+        assert pragma() == 0  # OFF
+    repo.save_many([Task(3, "c", None, "todo")])
+    assert pragma() == 1
+    repo.close()
+
+
+def test_store_uri_sets_the_level(tmp_path):
+    registry.clear_cache()
+    uri = f"json:///{tmp_path / 'tasks.json'}"
+    plain = registry.get_repository(uri)
+    batched = registry.get_repository(uri + "?durability=batch:5")
+    assert plain.durability is None and batched.durability == Durability("batch", 0.005, 64)
+    assert registry.get_repository(uri + "?durability=batch:5") is batched
+    assert registry.store_key(uri + "?durability=none") == registry.store_key(uri)
+    assert registry.open_repository(uri + "?durability=none").durability == Durability("none")
+    with pytest.raises(RepositoryError):
+        registry.get_repository(uri + "?durability=sometimes")
+    with pytest.raises(RepositoryError):
+        registry.get_repository(uri + "?cache=1")
+    registry.clear_cache()
@@ -1,7 +1,17 @@
+import json
+
+import pytest
+
 from src.cli.formatting import (
+    STREAM_BATCH,
     format_tasks_human,
     format_tasks_json,
     format_error_json,
+    iter_tasks_human,
+    iter_tasks_json,
+    iter_tasks_jsonl,
+    task_to_json,
+    task_to_json_dict,
 )
 from src.models.task import Task
 
@@ -26,4 +36,31 @@ def test_format_tasks_json():
 
 def test_format_error_json():
     err = format_error_json("Bad", "validation")
-    assert '"error"' in err and '"validation"' in err and '"Bad"' in err
\ No newline at end of file
+    assert '"error"' in err and '"validation"' in err and '"Bad"' in err
+
+
+@pytest.mark.parametrize("count", [0, 1, STREAM_BATCH, STREAM_BATCH + 1])
+def test_streamed_output_matches_whole_string_formatting(count):
+    tasks = [Task(id=i, title=f"T{i}", description="d" if i % 2 else None, status="todo") for i in range(1, count + 1)]
+    assert "".join(iter_tasks_json(tasks)) == format_tasks_json(tasks)
+    assert "".join(iter_tasks_human(tasks)) == format_tasks_human(tasks) + "\n"
+    lines = "".join(iter_tasks_jsonl(tasks)).splitlines()
+    assert [json.loads(line) for line in lines] == json.loads(format_tasks_json(tasks))["tasks"]
+
+
+def test_streamed_output_starts_before_input_is_exhausted():
+    def endless():
+        i = 0
+        while True:
+            i += 1
+            yield Task(id=i, title="x", description=None, status="todo")
+
+    chunks = iter_tasks_json(endless())
+    assert next(chunks) == '{"tasks": ['
+    assert next(chunks).count('"id"') == STREAM_BATCH
+
+
+def test_task_to_json_matches_json_dumps():
+    for task in (Task(id=7, title='Ünï "q" \\ \t</', description=None, status="todo"),
+                 Task(id=8, title="x", description="emoji 🚀\n", status="in-progress")):
+        assert task_to_json(task) == json.dumps(task_to_json_dict(task))
@@ -1,5 +1,15 @@
-from src.services.id_allocator import next_id
-from src.models.task import Task
+import json
+
+import pytest
+
+from src.services.id_allocator import next_id, next_id_from_document
+from src.models.task import Task, TaskDraft
+from src.repository.journal_repository import JournalTaskRepository
+from src.repository.json_repository import JsonTaskRepository
+from src.repository.memory_repository import InMemoryTaskRepository
+from src.repository.resident_repository import ResidentTaskRepository
+from src.repository.sql_repository import SqlTaskRepository
+from src.services.seeder import seed
 
 
 def test_next_id_empty():
@@ -8,4 +18,88 @@ def test_next_id_empty():
 
 def test_next_id_sequence():
     tasks = [Task(id=1, title="A", description=None, status="todo"), Task(id=3, title="B", description=None, status="todo")]
-    assert next_id(tasks) == 4
\ No newline at end of file
+    assert next_id(tasks) == 4
+
+
+def test_next_id_from_document_uses_header():
+    assert next_id_from_document({"next_id": 10, "tasks": [{"id": 2}]}) == 10
+
+
+def test_next_id_from_document_scans_legacy_document():
+    assert next_id_from_document({"schema_version": 1, "tasks": [{"id": 5}, {"id": 2}, "junk"]}) == 6
+
+
+def test_next_id_from_document_bumps_past_external_append():
+    assert next_id_from_document({"next_id": 3, "tasks": [{"id": 1}, {"id": 7}]}) == 8
+
+
+def _repos(tmp_path):
+    return [
+        JsonTaskRepository(path=tmp_path / "a.json"),
+        JournalTaskRepository(path=tmp_path / "b.json", background=False),
+        SqlTaskRepository(path=tmp_path / "c.db"),
+        InMemoryTaskRepository(),
+        ResidentTaskRepository(InMemoryTaskRepository()),
+    ]
+
+
+def test_create_many_allocates_consecutive_ids_on_every_backend(tmp_path):
+    for repo in _repos(tmp_path):
+        first = repo.create_task("one")
+        batch = repo.create_many([TaskDraft("two", "d", "done"), TaskDraft("three")])
+        assert first.id == 1
+        assert [t.id for t in batch] == [2, 3]
+        assert [t.id for t in repo.load_all_tasks()] == [1, 2, 3]
+        assert repo.next_id() == 4
+
+
+def test_create_many_rejects_invalid_draft_without_saving(tmp_path):
+    for repo in _repos(tmp_path):
+        with pytest.raises(ValueError):
+            repo.create_many([TaskDraft("ok"), TaskDraft("bad", None, "nope")])
+        assert repo.load_all_tasks() == []
+
+
+def test_json_header_persists_high_water_mark(tmp_path):
+    data_file = tmp_path / "tasks.json"
+    repo = JsonTaskRepository(path=data_file)
+    repo.create_many([TaskDraft("a"), TaskDraft("b")])
+    data = json.loads(data_file.read_text())
+    assert list(data) == ["schema_version", "next_id", "generation", "tasks"]
+    assert data["next_id"] == 3
+    # Ids are not reused even if records disappear (e.g. edited out by hand)
+    data["tasks"] = data["tasks"][:1]
+    data_file.write_text(json.dumps(data))
+    assert repo.create_task("c").id == 3
+
+
+def test_json_legacy_store_without_counter_is_upgraded(tmp_path):
+    data_file = tmp_path / "tasks.json"
+    data_file.write_text(json.dumps({"schema_version": 1, "tasks": [{"id": 4, "title": "x", "description": None, "status": "todo"}]}))
+    repo = JsonTaskRepository(path=data_file)
+    assert repo.create_task("y").id == 5
+    assert json.loads(data_file.read_text())["next_id"] == 6
+
+
+def test_journal_counter_survives_compaction(tmp_path):
+    data_file = tmp_path / "tasks.json"
+    repo = JournalTaskRepository(path=data_file, background=False)
+    repo.create_many([TaskDraft("a"), TaskDraft("b")])
+    repo.compact()
+    assert json.loads(data_file.read_text())["next_id"] == 3
+    assert repo.create_task("c").id == 3
+    assert JournalTaskRepository(path=data_file, background=False).next_id() == 4
+
+
+def test_journal_scans_legacy_snapshot(tmp_path):
+    data_file = tmp_path / "tasks.json"
+    data_file.write_text(json.dumps({"schema_version": 1, "tasks": [{"id": 9, "title": "x", "description": None, "status": "todo"}]}))
+    repo = JournalTaskRepository(path=data_file, background=False)
+    assert repo.create_task("y").id == 10
+    assert repo.next_id() == 11
+
+
+def test_seed_adds_samples_after_existing_tasks(tmp_path):
+    repo = InMemoryTaskRepository([Task(id=5, title="x", description=None, status="todo")])
+    assert seed(repo) == 3
+    assert [t.id for t in repo.load_all_tasks()] == [5, 6, 7, 8]
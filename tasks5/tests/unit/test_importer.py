@@ -0,0 +1,34 @@
+import io
+
+import pytest
+
+from src.services.importer import build_drafts, parse_rows
+
+
+def test_parse_jsonl_and_build():
+    stream = io.StringIO('{"title": "A"}\n\n{"title": " B ", "description": "d", "status": "done"}\n')
+    drafts, errors = build_drafts(parse_rows(stream, "jsonl"))
+    assert errors == []
+    assert [tuple(d) for d in drafts] == [("A", None, "todo"), ("B", "d", "done")]
+
+
+def test_parse_csv_and_build():
+    stream = io.StringIO('title,description,status\nA,,\nB,"has, comma",in-progress\n')
+    drafts, errors = build_drafts(parse_rows(stream, "csv"))
+    assert errors == []
+    assert [tuple(d) for d in drafts] == [("A", None, "todo"), ("B", "has, comma", "in-progress")]
+
+
+def test_build_collects_all_errors_in_one_pass():
+    stream = io.StringIO('{"title": ""}\n{"title": "ok"}\n{"title": "x", "status": "bad"}\n{"title": "y", "description": 5}\n')
+    drafts, errors = build_drafts(parse_rows(stream, "jsonl"))
+    assert len(errors) == 3
+    assert errors[0].startswith("Line 1: Title cannot be blank")
+    assert errors[1].startswith("Line 3: Invalid status 'bad'")
+    assert errors[2] == "Line 4: Description must be a string"
+
+
+@pytest.mark.parametrize("content,fmt", [("not json\n", "jsonl"), ("[1]\n", "jsonl"), ("", "xml")])
+def test_parse_rows_errors(content, fmt):
+    with pytest.raises(ValueError):
+        list(parse_rows(io.StringIO(content), fmt))
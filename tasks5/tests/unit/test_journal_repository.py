@@ -0,0 +1,81 @@
+import json
+
+from src.repository.journal_repository import JournalTaskRepository
+from src.repository.json_repository import JsonTaskRepository
+from src.models.task import Task
+
+
+def make_task(i, status="todo"):
+    return Task(id=i, title=f"T{i}", description=None, status=status)
+
+
+def test_journal_save_appends_without_rewriting_snapshot(tmp_path):
+    data_file = tmp_path / "tasks.json"
+    repo = JournalTaskRepository(path=data_file, background=False)
+    repo.save_new_task(make_task(1))
+    repo.save_new_task(make_task(2, "done"))
+    assert not data_file.exists()
+    lines = (tmp_path / "tasks.json.journal").read_text().splitlines()
+    assert [json.loads(line)["id"] for line in lines] == [1, 2]
+    tasks = repo.load_all_tasks()
+    assert [t.id for t in tasks] == [1, 2]
+    assert tasks[1].status == "done"
+
+
+def test_journal_merges_with_existing_snapshot(tmp_path):
+    data_file = tmp_path / "tasks.json"
+    JsonTaskRepository(path=data_file).save_new_task(make_task(1))
+    repo = JournalTaskRepository(path=data_file, background=False)
+    repo.save_new_task(make_task(2))
+    assert [t.id for t in repo.load_all_tasks()] == [1, 2]
+    # Plain JSON reader only sees the snapshot until compaction
+    assert [t.id for t in JsonTaskRepository(path=data_file).load_all_tasks()] == [1]
+
+
+def test_journal_compacts_past_threshold(tmp_path):
+    data_file = tmp_path / "tasks.json"
+    repo = JournalTaskRepository(path=data_file, compact_threshold=1, background=False)
+    repo.save_new_task(make_task(1))
+    assert not (tmp_path / "tasks.json.journal").exists()
+    data = json.loads(data_file.read_text())
+    assert data["schema_version"] == 1
+    assert [t["id"] for t in data["tasks"]] == [1]
+
+
+def test_journal_background_compaction(tmp_path):
+    data_file = tmp_path / "tasks.json"
+    repo = JournalTaskRepository(path=data_file, compact_threshold=1)
+    repo.save_new_task(make_task(1))
+    repo.wait_for_compaction()
+    assert [t["id"] for t in json.loads(data_file.read_text())["tasks"]] == [1]
+    assert [t.id for t in repo.load_all_tasks()] == [1]
+
+
+def test_journal_ignores_torn_line_and_fences_next_append(tmp_path):
+    data_file = tmp_path / "tasks.json"
+    repo = JournalTaskRepository(path=data_file, background=False)
+    repo.save_new_task(make_task(1))
+    with open(repo.journal_path, "ab") as fh:
+        fh.write(b'{"id": 2, "title": "tor')  # simulated crash mid-append
+    assert [t.id for t in repo.load_all_tasks()] == [1]
+    repo.save_new_task(make_task(3))
+    assert [t.id for t in repo.load_all_tasks()] == [1, 3]
+
+
+def test_journal_entries_already_in_snapshot_are_not_duplicated(tmp_path):
+    # Simulates a crash after the compaction snapshot write but before journal removal
+    data_file = tmp_path / "tasks.json"
+    repo = JournalTaskRepository(path=data_file, background=False)
+    repo.save_new_task(make_task(1))
+    JsonTaskRepository(path=data_file).save_new_task(make_task(1))
+    assert [t.id for t in repo.load_all_tasks()] == [1]
+    repo.compact()
+    assert [t["id"] for t in json.loads(data_file.read_text())["tasks"]] == [1]
+    assert not repo.journal_path.exists()
+
+
+def test_journal_compact_without_journal_is_noop(tmp_path):
+    repo = JournalTaskRepository(path=tmp_path / "tasks.json", background=False)
+    repo.compact()
+    repo.wait_for_compaction()
+    assert not (tmp_path / "tasks.json").exists()
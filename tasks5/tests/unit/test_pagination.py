@@ -0,0 +1,90 @@
+import pytest
+
+from src.models.task import Task
+from src.repository.journal_repository import JournalTaskRepository
+from src.repository.json_repository import JsonTaskRepository
+from src.repository.memory_repository import InMemoryTaskRepository
+from src.repository.sql_repository import SqlTaskRepository
+from src.services.filtering import filter_by_status
+from src.services.pagination import Page, Paged, decode_cursor, encode_cursor, paginate
+from src.services.search import search_tasks
+
+TASKS = [
+    Task(id=i, title=f"Task {i}" + (" deploy" if i % 3 == 0 else ""), description=None,
+         status="done" if i % 2 else "todo")
+    for i in range(1, 31)
+]
+
+
+def make_repo(kind, tmp_path):
+    if kind == "json":
+        repo = JsonTaskRepository(path=tmp_path / "tasks.json")
+    elif kind == "journal":
+        repo = JournalTaskRepository(path=tmp_path / "tasks.json", background=False)
+    elif kind == "sqlite":
+        repo = SqlTaskRepository(path=tmp_path / "tasks.db")
+    else:
+        repo = InMemoryTaskRepository()
+    repo.save_many(TASKS)
+    return repo
+
+
+def test_cursor_roundtrip_and_rejects_garbage():
+    assert decode_cursor(encode_cursor(12345)) == 12345
+    for bad in ("", "zz", "!!!", encode_cursor(1)[:-1] + "*", "aWQ6"):
+        with pytest.raises(ValueError):
+            decode_cursor(bad)
+
+
+def test_paginate_stops_pulling_once_page_is_full():
+    pulled = []
+
+    def source():
+        for t in TASKS:
+            pulled.append(t.id)
+            yield t
+
+    page = list(paginate(source(), Page(limit=3, offset=2, after_id=10)))
+    assert [t.id for t in page] == [13, 14, 15]
+    assert pulled[-1] == 15
+
+
+def test_paged_reports_next_cursor_only_when_more_follow():
+    more = Paged(TASKS[:4], limit=3)
+    assert [t.id for t in more] == [1, 2, 3]
+    assert decode_cursor(more.next_cursor) == 3
+    last = Paged(TASKS[:3], limit=3)
+    assert len(list(last)) == 3 and last.next_cursor is None
+
+
+def test_services_accept_pages():
+    page = Page(limit=2, offset=1)
+    assert [t.id for t in filter_by_status(TASKS, "done", page)] == [3, 5]
+    assert [t.id for t in search_tasks(TASKS, "deploy", page=Page(limit=2, after_id=6))] == [9, 12]
+
+
+@pytest.mark.parametrize("kind", ["json", "journal", "sqlite", "memory"])
+def test_backends_page_like_the_services(kind, tmp_path):
+    repo = make_repo(kind, tmp_path)
+    pages = [Page(limit=4), Page(limit=4, offset=3), Page(after_id=25), Page(limit=2, offset=1, after_id=7), Page(offset=28)]
+    for page in pages:
+        for status in (None, "done", "blocked"):
+            assert repo.list_tasks(status, page) == filter_by_status(TASKS, status, page)
+            assert list(repo.iter_tasks(status, page)) == filter_by_status(TASKS, status, page)
+        for query in ("deploy", "task 1", "zz"):
+            assert repo.search_tasks(query, page) == search_tasks(TASKS, query, page=page)
+            assert list(repo.iter_search(query, page)) == search_tasks(TASKS, query, page=page)
+
+
+@pytest.mark.parametrize("kind", ["json", "sqlite"])
+def test_following_cursors_visits_every_match_once(kind, tmp_path):
+    repo = make_repo(kind, tmp_path)
+    seen, cursor = [], None
+    while True:
+        page = Page(limit=4, after_id=None if cursor is None else decode_cursor(cursor))
+        paged = Paged(repo.iter_search("deploy", page.with_lookahead()), page.limit)
+        seen.extend(t.id for t in paged)
+        cursor = paged.next_cursor
+        if cursor is None:
+            break
+    assert seen == [t.id for t in TASKS if "deploy" in t.title]
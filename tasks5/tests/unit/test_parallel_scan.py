@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+from src.models.task import Task
+from src.repository import parallel_scan
+from src.repository.journal_repository import JournalTaskRepository
+from src.repository.json_repository import JsonTaskRepository
+from src.repository.streaming import iter_task_records, record_spans
+from src.services.pagination import Page
+from src.services.search import search_tasks
+
+TASKS = [
+    Task(id=i, title=f"Task {i} " + ("{\"id\": 1}, {" if i % 7 == 0 else "deploy" if i % 3 == 0 else "plain"),
+         description=None if i % 2 else f"Kelvin K notes {i}", status="todo")
+    for i in range(1, 301)
+]
+
+
+@pytest.fixture
+def parallel(monkeypatch):
+    monkeypatch.setattr(parallel_scan, "PARALLEL_MIN_BYTES", 0)
+
+
+@pytest.mark.parametrize("dump_kwargs", [{}, {"ensure_ascii": False}, {"indent": 2}])
+def test_spans_cover_every_record_once(tmp_path, dump_kwargs):
+    path = tmp_path / "tasks.json"
+    records = [{"id": t.id, "title": t.title, "description": t.description, "status": t.status} for t in TASKS]
+    path.write_text(json.dumps({"schema_version": 1, "tasks": records}, **dump_kwargs), encoding="utf-8")
+    for count in (1, 2, 5, 64, 1000):
+        spans = record_spans(path, count)
+        assert 1 <= len(spans) <= count
+        assert [r for span in spans for r in iter_task_records(path, span=span)] == records
+
+
+@pytest.mark.parametrize("kind", ["json", "journal"])
+def test_parallel_search_matches_serial(tmp_path, parallel, kind):
+    if kind == "json":
+        repo = JsonTaskRepository(tmp_path / "tasks.json")
+    else:
+        repo = JournalTaskRepository(tmp_path / "tasks.json", background=False, compact_threshold=1 << 30)
+    repo.save_many(TASKS[:200])
+    repo.save_many(TASKS[200:])  # journal: these stay in the journal file
+    for query in ("deploy", "{\"id\"", "k", "notes 1", "zz"):
+        expected = search_tasks(TASKS, query)
+        assert repo.search_tasks(query, jobs=3) == expected
+        assert list(repo.iter_search(query, Page(offset=2, after_id=50), jobs=3)) == search_tasks(
+            TASKS, query, page=Page(offset=2, after_id=50))
+
+
+def test_small_stores_and_limited_pages_stay_serial(tmp_path, monkeypatch):
+    repo = JsonTaskRepository(tmp_path / "tasks.json")
+    repo.save_many(TASKS)
+    monkeypatch.setattr(parallel_scan, "search_records", lambda *a: pytest.fail("parallel scan used"))
+    assert repo.search_tasks("deploy", jobs=4) == search_tasks(TASKS, "deploy")
+    monkeypatch.setattr(parallel_scan, "PARALLEL_MIN_BYTES", 0)
+    assert repo.search_tasks("deploy", Page(limit=2), jobs=4) == search_tasks(TASKS, "deploy", page=Page(limit=2))
+    assert repo.search_tasks("deploy", jobs=1) == search_tasks(TASKS, "deploy")
@@ -0,0 +1,60 @@
+import time
+
+import pytest
+
+from src.services import profiling
+
+
+@pytest.fixture(autouse=True)
+def reset():
+    yield
+    profiling.disable()
+
+
+def test_spans_are_noops_while_disabled():
+    assert not profiling.enabled()
+    with profiling.span("a"):
+        pass
+    assert profiling.span("a") is profiling.span("b")
+    profiling.enable()
+    assert profiling.report()["spans"] == []
+
+
+def test_nested_spans_split_total_and_self_time():
+    profiling.enable()
+    for _ in range(2):
+        with profiling.span("outer"):
+            time.sleep(0.002)
+            with profiling.span("inner"):
+                time.sleep(0.005)
+    profiling.record("setup", 0.001)
+    data = profiling.report()
+    spans = {s["name"]: s for s in data["spans"]}
+    assert [s["name"] for s in data["spans"]] == ["outer", "inner", "setup"]
+    assert spans["outer"]["calls"] == spans["inner"]["calls"] == 2
+    assert spans["inner"]["total_ms"] >= 10 and spans["inner"]["self_ms"] == spans["inner"]["total_ms"]
+    assert spans["outer"]["self_ms"] == pytest.approx(spans["outer"]["total_ms"] - spans["inner"]["total_ms"], abs=0.01)
+    assert spans["outer"]["self_ms"] >= 4
+    assert data["total_ms"] >= spans["outer"]["total_ms"] and data["untracked_ms"] >= 0
+
+
+def test_span_closes_when_its_block_raises():
+    profiling.enable()
+    with pytest.raises(KeyError):
+        with profiling.span("failing"):
+            raise KeyError("x")
+    with profiling.span("after"):
+        pass
+    assert {s["name"]: s["calls"] for s in profiling.report()["spans"]} == {"failing": 1, "after": 1}
+
+
+def test_format_report_lists_spans_and_untracked_time():
+    data = {"total_ms": 200.0, "untracked_ms": 50.0, "spans": [
+        {"name": "json.decode", "calls": 3, "total_ms": 150.0, "self_ms": 150.0},
+    ]}
+    lines = profiling.format_report(data).splitlines()
+    assert lines[0] == "profile: 200.0 ms"
+    assert lines[2].split() == ["json.decode", "3", "150.0", "150.0", "75.0%"]
+    assert lines[3].split() == ["(untracked)", "50.0", "25.0%"]
+    profiling.disable()
+    assert "(untracked)" in profiling.format_report(profiling.report())
@@ -0,0 +1,125 @@
+import pytest
+
+from src.models.task import Task
+from src.models.task_table import TaskTable
+from src.repository.journal_repository import JournalTaskRepository
+from src.repository.json_repository import JsonTaskRepository
+from src.repository.memory_repository import InMemoryTaskRepository
+from src.repository.resident_repository import ResidentTaskRepository
+from src.repository.sql_repository import SqlTaskRepository
+from src.services.pagination import Page
+from src.services.query import And, IdRange, Not, Or, QueryError, Status, Text, parse_query, select_tasks
+from src.services.trigram_index import TrigramIndex
+
+WORDS = ("Deploy api", "urgent fix", "blocked on review", "Kelvin K notes", "write docs", "AND or NOT")
+TASKS = [
+    Task(id=i, title=f"{WORDS[i % len(WORDS)]} {i}",
+         description=None if i % 5 == 0 else WORDS[(i * 7) % len(WORDS)],
+         status=("todo", "in-progress", "done")[i % 3])
+    for i in range(1, 121)
+]
+QUERIES = [
+    'status:todo AND (title:"deploy" OR desc:urgent) -blocked',
+    "deploy",
+    "fix 1",
+    '"fix 1"',
+    "id:10..40 -status:done",
+    "id:>100 OR id:<3",
+    "NOT (status:todo OR status:done) docs",
+    "status:in-progress status:done",
+    "k desc:notes",
+    '"and" "not"',
+    "title:zz OR zz",
+]
+
+
+def expected(query):
+    return [t for t in TASKS if query.matches(t)]
+
+
+def test_parse_builds_the_tree_and_plan():
+    query = parse_query('status:todo AND (title:"deploy" OR desc:urgent) -blocked id:>5')
+    assert query.tree == And((
+        Status("todo"), Or((Text("title", "deploy"), Text("desc", "urgent"))),
+        Not(Text("any", "blocked")), IdRange(6, None),
+    ))
+    assert query.statuses == {"todo"} and (query.id_low, query.id_high) == (6, None)
+    plan = parse_query("Fix bug -status:done id:3..9")
+    assert plan.needles == ("fix", "bug") and plan.statuses == {"todo", "in-progress"}
+    assert (plan.id_low, plan.id_high) == (3, 9)
+    assert parse_query('title:"say \\"hi\\""').tree == Text("title", 'say "hi"')
+    assert parse_query("a OR b c").tree == Or((Text("any", "a"), And((Text("any", "b"), Text("any", "c")))))
+
+
+@pytest.mark.parametrize("text", ["", "   ", "(a", "a)", "AND a", "a OR", "titel:x", "title:", "id:x", '"open', 'title:""'])
+def test_invalid_queries_raise(text):
+    with pytest.raises(QueryError):
+        parse_query(text)
+
+
+def test_predicate_semantics():
+    query = parse_query('status:todo AND (title:"deploy" OR desc:urgent) -blocked')
+    assert query.matches(Task(1, "Deploy x", "urgent", "todo"))
+    assert query.matches(Task(1, "x", "URGENT", "todo"))
+    assert not query.matches(Task(1, "Deploy x", "blocked", "todo"))
+    assert not query.matches(Task(1, "Deploy x", None, "done"))
+    assert not query.record_matches({"id": "1", "title": "Deploy", "status": "todo"})
+
+
+def evaluate(node, task):
+    """Reference interpreter for the syntax tree."""
+    if isinstance(node, Text):
+        title, description = task.title.lower(), (task.description or "").lower()
+        return node.needle in {"title": title, "desc": description}.get(node.field, title + "\0" + description)
+    if isinstance(node, Status):
+        return task.status == node.value
+    if isinstance(node, IdRange):
+        return (node.low is None or task.id >= node.low) and (node.high is None or task.id <= node.high)
+    if isinstance(node, Not):
+        return not evaluate(node.node, task)
+    results = [evaluate(n, task) for n in node.nodes]
+    return all(results) if isinstance(node, And) else any(results)
+
+
+@pytest.mark.parametrize("text", QUERIES)
+def test_compiled_predicate_matches_the_tree(text):
+    query = parse_query(text)
+    assert expected(query) == [t for t in TASKS if evaluate(query.tree, t)]
+
+
+def test_single_term_matches_substring_search():
+    from src.services.search import search_tasks
+
+    assert select_tasks(TASKS, parse_query('"fix 1"')) == search_tasks(TASKS, "fix 1")
+
+
+@pytest.mark.parametrize("text", QUERIES)
+def test_lists_tables_and_indexes_agree(text):
+    query = parse_query(text)
+    index = TrigramIndex.build((t.id, t.title, t.description) for t in TASKS)
+    table = TaskTable(TASKS)
+    for page in (None, Page(limit=3), Page(limit=2, offset=1, after_id=30)):
+        want = select_tasks(expected(query), parse_query("id:>0"), page=page)
+        assert select_tasks(TASKS, query, page=page) == want
+        assert select_tasks(TASKS, query, index=index, page=page) == want
+        assert select_tasks(table, query, page=page) == want
+
+
+@pytest.mark.parametrize("kind", ["json", "journal", "sqlite", "memory", "resident"])
+def test_backends_agree(kind, tmp_path):
+    if kind == "json":
+        repo = JsonTaskRepository(tmp_path / "tasks.json")
+    elif kind == "journal":
+        repo = JournalTaskRepository(tmp_path / "tasks.json", background=False)
+    elif kind == "sqlite":
+        repo = SqlTaskRepository(tmp_path / "tasks.db")
+    elif kind == "memory":
+        repo = InMemoryTaskRepository()
+    else:
+        repo = ResidentTaskRepository(InMemoryTaskRepository())
+    repo.save_many(TASKS)
+    for text in QUERIES:
+        query = parse_query(text)
+        assert repo.query_tasks(query) == expected(query), text
+        page = Page(limit=2, offset=1, after_id=20)
+        assert list(repo.iter_query(query, page)) == select_tasks(expected(query), query, page=page), text
@@ -0,0 +1,102 @@
+import json
+
+import pytest
+
+from src.models.task import Task
+from src.repository.journal_repository import JournalTaskRepository
+from src.repository.json_repository import JsonTaskRepository
+from src.repository.memory_repository import InMemoryTaskRepository
+from src.repository.resident_repository import ResidentTaskRepository
+from src.repository.sql_repository import SqlTaskRepository
+from src.services.ranking import TermStats, query_terms, score, top_tasks
+
+WORDS = ("deploy api", "fix login bug", "write docs", "review deploy plan", "bug triage")
+TASKS = [
+    Task(id=i, title=f"{WORDS[i % len(WORDS)]} {i}",
+         description=None if i % 4 == 0 else WORDS[(i * 3) % len(WORDS)],
+         status="todo")
+    for i in range(1, 41)
+]
+
+
+def stats_of(tasks):
+    return TermStats.build((t.title, t.description) for t in tasks)
+
+
+def test_query_terms_are_distinct_lowercase_words():
+    assert query_terms("Deploy the API, deploy!") == ["deploy", "the", "api"]
+    assert query_terms("  ") == []
+
+
+def test_stats_count_documents_and_words():
+    stats = stats_of([Task(1, "Deploy deploy", None, "todo"), Task(2, "fix", "deploy later", "done")])
+    assert (stats.docs, stats.title_chars, stats.desc_chars) == (2, 16, 12)
+    assert stats.df == {"deploy": 2, "fix": 1, "later": 1}
+    assert stats.idf("later") > stats.idf("deploy") > 0
+    assert TermStats.from_dict(json.loads(json.dumps(stats.to_dict()))).df == stats.df
+    with pytest.raises(ValueError):
+        TermStats.from_dict({"version": 0})
+
+
+def test_title_matches_outrank_description_matches():
+    in_title = Task(1, "deploy", "something else entirely", "todo")
+    in_description = Task(2, "something else", "deploy entirely", "todo")
+    stats = stats_of([in_title, in_description])
+    weights = [("deploy", stats.idf("deploy"))]
+    assert score("deploy", "something else entirely", weights, stats.average_length) > \
+        score("something else", "deploy entirely", weights, stats.average_length)
+    assert top_tasks([in_description, in_title], ["deploy"], stats, 2) == [in_title, in_description]
+
+
+def test_top_tasks_matches_a_full_sort():
+    stats = stats_of(TASKS)
+    terms = query_terms("deploy bug")
+    weights = [(term, stats.idf(term)) for term in terms]
+    ranked = sorted(TASKS, key=lambda t: (-score(t.title, t.description, weights, stats.average_length), t.id))
+    for k in (1, 5, 40, 100):
+        assert top_tasks(TASKS, terms, stats, k) == ranked[:k]
+    # Equal scores keep id order
+    assert top_tasks(TASKS, [], stats, 3) == TASKS[:3]
+
+
+@pytest.mark.parametrize("kind", ["json", "journal", "sqlite", "resident"])
+def test_store_statistics_follow_saves(tmp_path, kind):
+    if kind == "json":
+        repo = JsonTaskRepository(tmp_path / "tasks.json")
+    elif kind == "journal":
+        repo = JournalTaskRepository(tmp_path / "tasks.json", background=False)
+    elif kind == "sqlite":
+        repo = SqlTaskRepository(tmp_path / "tasks.db")
+    else:
+        repo = ResidentTaskRepository(InMemoryTaskRepository())
+    repo.save_many(TASKS[:20])
+    terms = ["deploy", "bug", "docs", "missing"]
+    repo.term_stats(terms)  # built (and persisted) here, then kept current
+    for task in TASKS[20:30]:
+        repo.save_new_task(task)
+    repo.save_many(TASKS[30:])
+    stats, expected = repo.term_stats(terms), stats_of(TASKS)
+    assert (stats.docs, stats.title_chars, stats.desc_chars) == (expected.docs, expected.title_chars, expected.desc_chars)
+    assert {t: stats.df.get(t, 0) for t in terms} == {t: expected.df.get(t, 0) for t in terms}
+
+
+def test_json_statistics_are_persisted_lazily(tmp_path):
+    path, stats_path = tmp_path / "tasks.json", tmp_path / "tasks.json.stats"
+    repo = JsonTaskRepository(path)
+    repo.save_many(TASKS[:10])
+    repo.term_stats()
+    repo.save_new_task(TASKS[10])
+    assert json.loads(stats_path.read_text())["docs"] == 10  # saves leave the file alone
+    repo._iter_raw_records = None
+    assert repo.term_stats().docs == 11  # kept in memory by the save, written out now
+    assert json.loads(stats_path.read_text())["docs"] == 11
+    # A fresh instance trusts the persisted table without rescanning
+    fresh = JsonTaskRepository(path)
+    fresh._iter_raw_records = None
+    assert fresh.term_stats().df == stats_of(TASKS[:11]).df
+    # ...and its saves do not read or rewrite it; the next ranked search rebuilds it
+    before = stats_path.read_bytes()
+    JsonTaskRepository(path).save_new_task(TASKS[11])
+    assert stats_path.read_bytes() == before
+    assert JsonTaskRepository(path).term_stats().df == stats_of(TASKS[:12]).df
+    assert json.loads(stats_path.read_text())["docs"] == 12
@@ -0,0 +1,70 @@
+import pytest
+
+from src.repository import registry
+from src.repository.errors import RepositoryError
+from src.repository.json_repository import JsonTaskRepository
+from src.repository.journal_repository import JournalTaskRepository
+from src.repository.sql_repository import SqlTaskRepository
+from src.repository.memory_repository import InMemoryTaskRepository
+from src.models.task import Task
+
+
+@pytest.mark.parametrize("uri,scheme,path", [
+    ("sqlite:///tasks.db", "sqlite", "tasks.db"),
+    ("sqlite:////var/tasks.db", "sqlite", "/var/tasks.db"),
+    ("json://data/tasks.json", "json", "data/tasks.json"),
+    ("journal://tasks.json", "journal", "tasks.json"),
+    ("memory://", "memory", ""),
+    ("store.sqlite", "sqlite", "store.sqlite"),
+    ("tasks.json", "json", "tasks.json"),
+])
+def test_parse_store_uri(uri, scheme, path):
+    assert registry.parse_store_uri(uri) == (scheme, path)
+
+
+@pytest.mark.parametrize("scheme,path", [
+    ("json", "/tmp/dm/tasks.json"), ("sqlite", "relative/tasks.db"), ("binary", "/var/tasks.bin"), ("memory", ""),
+])
+def test_store_uri_round_trips(scheme, path):
+    assert registry.parse_store_uri(registry.store_uri(scheme, path)) == (scheme, path)
+
+
+def test_parse_unknown_scheme_raises():
+    with pytest.raises(RepositoryError):
+        registry.parse_store_uri("neo4j://localhost")
+
+
+@pytest.mark.parametrize("uri,cls", [
+    ("json://tasks.json", JsonTaskRepository),
+    ("journal://tasks.json", JournalTaskRepository),
+    ("sqlite:///tasks.db", SqlTaskRepository),
+    ("memory://", InMemoryTaskRepository),
+])
+def test_get_repository_selects_backend(tmp_path, monkeypatch, uri, cls):
+    monkeypatch.chdir(tmp_path)
+    assert isinstance(registry.get_repository(uri), cls)
+
+
+def test_get_repository_caches_per_absolute_path(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    repo = registry.get_repository("json://tasks.json")
+    assert registry.get_repository(f"json:///{tmp_path / 'tasks.json'}") is repo
+    assert repo.path == tmp_path / "tasks.json"
+    (tmp_path / "other").mkdir()
+    monkeypatch.chdir(tmp_path / "other")
+    assert registry.get_repository("json://tasks.json") is not repo
+
+
+def test_get_repository_env_and_default(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert isinstance(registry.get_repository(), JsonTaskRepository)
+    monkeypatch.setenv(registry.STORE_ENV_VAR, "memory://")
+    assert isinstance(registry.get_repository(), InMemoryTaskRepository)
+    assert isinstance(registry.get_repository("sqlite:///x.db"), SqlTaskRepository)
+
+
+def test_register_backend(monkeypatch):
+    monkeypatch.setitem(registry._BACKENDS, "custom", lambda path: InMemoryTaskRepository())
+    repo = registry.get_repository("custom://anything")
+    repo.save_new_task(Task(id=1, title="A", description=None, status="todo"))
+    assert registry.get_repository("custom://anything").load_all_tasks()[0].title == "A"
@@ -1,4 +1,5 @@
 import json
+import os
 import pathlib
 import pytest
 import time
@@ -23,17 +24,16 @@ def test_repository_atomic_write(tmp_path, monkeypatch):
     data_file = tmp_path / "tasks.json"
     repo = JsonTaskRepository(path=data_file)
 
-    wrote_temp = False
-    original_write_text = pathlib.Path.write_text
+    replaced = []
+    original_replace = os.replace
 
-    def tracking_write(self, content, *args, **kwargs):  # noqa: D401
-        nonlocal wrote_temp
-        if self.name.endswith(".tmp"):
-            wrote_temp = True
-        return original_write_text(self, content, *args, **kwargs)
+    def tracking_replace(src, dst, *args, **kwargs):
+        replaced.append((pathlib.Path(src).name, pathlib.Path(dst).name))
+        return original_replace(src, dst, *args, **kwargs)
 
-    monkeypatch.setattr(pathlib.Path, "write_text", tracking_write)
+    monkeypatch.setattr(os, "replace", tracking_replace)
     repo.save_new_task(Task(id=1, title="A", description=None, status="todo"))
+    wrote_temp = ("tasks.json.tmp", "tasks.json") in replaced
     assert wrote_temp, "Expected atomic temp write before replace"
 
 
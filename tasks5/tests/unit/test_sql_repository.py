@@ -0,0 +1,85 @@
+import json
+
+import pytest
+
+from src.repository.json_repository import JsonTaskRepository
+from src.repository.sql_repository import SqlTaskRepository
+from src.repository.migration import migrate_json_to_sqlite, export_sqlite_to_json
+from src.repository.errors import RepositoryError
+from src.services.search import search_tasks
+from src.models.task import Task
+
+
+def sample_tasks():
+    return [
+        Task(id=1, title="Write spec", description="Initial MVP", status="todo"),
+        Task(id=2, title="Refactor code", description="Improve clarity", status="in-progress"),
+        Task(id=3, title="Test Search", description=None, status="done"),
+        Task(id=4, title="Déjà vu", description="Ünïcode text", status="done"),
+    ]
+
+
+@pytest.fixture
+def repo(tmp_path):
+    r = SqlTaskRepository(path=tmp_path / "tasks.db")
+    for t in sample_tasks():
+        r.save_new_task(t)
+    yield r
+    r.close()
+
+
+def test_sql_roundtrip_and_wal(repo):
+    assert repo.load_all_tasks() == sample_tasks()
+    mode = repo._connection().execute("PRAGMA journal_mode").fetchone()[0]
+    assert mode == "wal"
+
+
+def test_sql_duplicate_id_raises(repo):
+    with pytest.raises(RepositoryError):
+        repo.save_new_task(Task(id=1, title="Dup", description=None, status="todo"))
+
+
+def test_sql_list_uses_status_index(repo):
+    assert [t.id for t in repo.list_tasks("done")] == [3, 4]
+    assert repo.list_tasks("bad") == []
+    assert len(repo.list_tasks(None)) == 4
+    plan = repo._connection().execute(
+        "EXPLAIN QUERY PLAN SELECT id FROM tasks WHERE status = 'done'"
+    ).fetchall()
+    assert any("idx_tasks_status" in row[-1] for row in plan)
+
+
+@pytest.mark.parametrize("query", ["spec", "SPEC", "clar", "r co", "ty", "x", "ÜNÏ", "déjà", 'a"b', "zzz"])
+def test_sql_search_matches_service_semantics(repo, query):
+    assert repo.search_tasks(query) == search_tasks(sample_tasks(), query)
+
+
+def test_sql_search_blank_query_raises(repo):
+    with pytest.raises(ValueError):
+        repo.search_tasks("  ")
+
+
+def test_migration_roundtrip(tmp_path):
+    json_path = tmp_path / "tasks.json"
+    records = [{"id": t.id, "title": t.title, "description": t.description, "status": t.status} for t in sample_tasks()]
+    json_path.write_text(json.dumps({"schema_version": 1, "tasks": records}))
+    db_path = tmp_path / "tasks.db"
+    assert migrate_json_to_sqlite(json_path, db_path) == 4
+    assert migrate_json_to_sqlite(json_path, db_path) == 4  # idempotent
+    out_path = tmp_path / "export.json"
+    assert export_sqlite_to_json(db_path, out_path) == 4
+    assert json.loads(out_path.read_text()) == {"schema_version": 1, "next_id": 5, "generation": 1, "tasks": records}
+
+
+def test_migration_keeps_the_id_of_a_deleted_top_task_used(tmp_path):
+    json_path, db_path, out_path = tmp_path / "tasks.json", tmp_path / "tasks.db", tmp_path / "export.json"
+    source = JsonTaskRepository(json_path)
+    source.save_many(sample_tasks())
+    source.delete_task(4)
+    assert migrate_json_to_sqlite(json_path, db_path) == 3
+    repo = SqlTaskRepository(db_path)
+    assert repo.next_id() == 5
+    repo.delete_task(3)
+    repo.close()
+    assert export_sqlite_to_json(db_path, out_path) == 2
+    assert JsonTaskRepository(out_path).next_id() == 5
@@ -0,0 +1,173 @@
+import json
+import random
+
+import pytest
+
+from src.models.task import Task
+from src.repository.errors import CorruptDataError
+from src.repository.json_repository import JsonTaskRepository
+from src.repository.journal_repository import JournalTaskRepository
+from src.repository.streaming import (
+    DECODE_BATCH,
+    StreamFormatError,
+    find_record,
+    iter_task_records,
+    status_prefilter,
+    substring_prefilter,
+)
+from src.services.filtering import filter_by_status
+from src.services.search import search_tasks
+
+RECORDS = [
+    {"id": 1, "title": "Braces {in} [title]", "description": "quote \" and \\ slash", "status": "todo"},
+    {"id": 2, "title": "Ünïcode Kelvin K", "description": None, "status": "done"},
+    {"id": 3, "title": "", "description": None, "status": "done"},  # invalid, skipped
+    {"id": 4, "title": "Plain", "description": "tasks\": [", "status": "in-progress"},
+]
+
+
+def write_doc(path, records, **dump_kwargs):
+    path.write_text(json.dumps({"schema_version": 1, "tasks": records}, **dump_kwargs), encoding="utf-8")
+
+
+@pytest.mark.parametrize("dump_kwargs", [{}, {"ensure_ascii": False}, {"indent": 2}])
+def test_iter_task_records_roundtrip(tmp_path, dump_kwargs):
+    data_file = tmp_path / "tasks.json"
+    write_doc(data_file, RECORDS, **dump_kwargs)
+    assert list(iter_task_records(data_file)) == RECORDS
+
+
+def test_iter_task_records_empty_array(tmp_path):
+    data_file = tmp_path / "tasks.json"
+    write_doc(data_file, [])
+    assert list(iter_task_records(data_file)) == []
+
+
+@pytest.mark.parametrize("content", [
+    "",
+    '{"schema_version": 1, "tasks": [{"id": 1, "nested": {"x": 1}}]}',
+    '{"schema_version": 1, "tasks": [{"id": 1}, {"id": 2}',
+    '{"tasks": [{"id": 1}]}',
+    '{"schema_version": 1, "tasks": [{"id": 1} {"id": 2}]}',
+    '{"schema_version": 1, "tasks": [{"id": tru}]}',
+])
+def test_iter_task_records_rejects_unexpected_shapes(tmp_path, content):
+    data_file = tmp_path / "tasks.json"
+    data_file.write_text(content)
+    with pytest.raises(StreamFormatError):
+        list(iter_task_records(data_file))
+
+
+def test_prefilters_never_reject_matches():
+    rng = random.Random(3)
+    alphabet = ['a', 'B', 'k', 'K', '"', '\\', ' ', 'İ', 'é']
+    for _ in range(300):
+        title = "".join(rng.choices(alphabet, k=6))
+        record = {"id": 1, "title": title, "description": None, "status": rng.choice(["todo", "done"])}
+        for ensure_ascii in (True, False):
+            raw = json.dumps(record, ensure_ascii=ensure_ascii).encode("utf-8")
+            needle = "".join(rng.choices(alphabet, k=2)).lower()
+            screen = substring_prefilter(needle)
+            if needle in title.lower() and screen is not None:
+                assert screen(raw)
+            assert status_prefilter(record["status"])(raw)
+
+
+def test_repository_streaming_matches_full_load(tmp_path):
+    data_file = tmp_path / "tasks.json"
+    write_doc(data_file, RECORDS, ensure_ascii=False)
+    repo = JsonTaskRepository(path=data_file, trigram_index=False)
+    tasks = repo.load_all_tasks()
+    for status in ("todo", "done", "in-progress", "bad", None):
+        assert repo.list_tasks(status) == filter_by_status(tasks, status)
+    for query in ("brace", "\\", "\"", "k", "kelvin", "ünï", "tasks", "zzz"):
+        assert repo.search_tasks(query) == search_tasks(tasks, query)
+
+
+def test_repository_streaming_does_not_build_unmatched_tasks(tmp_path, monkeypatch):
+    data_file = tmp_path / "tasks.json"
+    write_doc(data_file, RECORDS)
+    repo = JsonTaskRepository(path=data_file, trigram_index=False)
+    built = []
+    original = JsonTaskRepository._task_from_record
+    monkeypatch.setattr(JsonTaskRepository, "_task_from_record",
+                        staticmethod(lambda record: built.append(record) or original(record)))
+    assert [t.id for t in repo.list_tasks("in-progress")] == [4]
+    assert [r["id"] for r in built] == [4]
+
+
+def test_iter_tasks_and_iter_search_match_list_variants(tmp_path):
+    data_file = tmp_path / "tasks.json"
+    write_doc(data_file, RECORDS)
+    repo = JsonTaskRepository(path=data_file)
+    for status in ("todo", "done", "bad", None):
+        assert list(repo.iter_tasks(status)) == repo.list_tasks(status)
+    for query in ("brace", "kelvin", "zzz"):
+        assert list(repo.iter_search(query)) == repo.search_tasks(query)
+    with pytest.raises(ValueError):
+        repo.iter_search(" ")
+
+
+def test_iter_tasks_fails_loudly_once_output_started(tmp_path):
+    data_file = tmp_path / "tasks.json"
+    records = [{"id": i, "title": "A", "description": None, "status": "todo"} for i in range(1, DECODE_BATCH + 2)]
+    data_file.write_text(json.dumps({"schema_version": 1, "tasks": records})[:-2] + ", 7]}")
+    stream = JsonTaskRepository(path=data_file).iter_tasks()
+    assert next(stream).id == 1
+    with pytest.raises(CorruptDataError):
+        list(stream)
+
+
+def test_repository_streaming_falls_back_on_corrupt_file(tmp_path):
+    data_file = tmp_path / "tasks.json"
+    data_file.write_text("{ not json")
+    repo = JsonTaskRepository(path=data_file)
+    assert repo.list_tasks("todo") == []
+    assert list(tmp_path.glob("tasks.json.bak-*"))
+    assert repo.search_tasks("abc") == []
+
+
+def test_journal_streaming_merges_tail(tmp_path):
+    data_file = tmp_path / "tasks.json"
+    write_doc(data_file, RECORDS)
+    repo = JournalTaskRepository(path=data_file, background=False)
+    repo.save_new_task(Task(id=5, title="Tail done", description=None, status="done"))
+    repo.save_new_task(Task(id=4, title="Plain", description="tasks\": [", status="in-progress"))  # duplicate id
+    assert [t.id for t in repo.list_tasks("done")] == [2, 5]
+    assert [t.id for t in repo.list_tasks("in-progress")] == [4]
+    assert [t.id for t in repo.search_tasks("tail")] == [5]
+
+
+@pytest.mark.parametrize("dump_kwargs", [{}, {"indent": 2}, {"separators": (",", ":")}])
+def test_find_record_binary_search(tmp_path, dump_kwargs):
+    path = tmp_path / "tasks.json"
+    records = [dict(r, id=i) for i in range(1, 400, 3) for r in RECORDS[:1]]
+    write_doc(path, records, **dump_kwargs)
+    assert all(find_record(path, r["id"]) == r for r in records)
+    assert [find_record(path, i) for i in (0, 2, 401)] == [None, None, None]
+    write_doc(path, [], **dump_kwargs)
+    assert find_record(path, 1) is None
+
+
+def test_get_task_falls_back_to_a_scan_when_out_of_order(tmp_path):
+    path = tmp_path / "tasks.json"
+    write_doc(path, list(reversed(RECORDS)))
+    repo = JsonTaskRepository(path)
+    assert repo.get_task(2) == Task(**RECORDS[1])
+    assert repo.get_task(3) is None and repo.get_task(9) is None
+
+
+@pytest.mark.filterwarnings("error::pytest.PytestUnraisableExceptionWarning")
+def test_abandoned_stream_releases_the_map(tmp_path):
+    path = tmp_path / "tasks.json"
+    write_doc(path, [{"id": i, "title": f"t{i}", "description": None, "status": "todo"} for i in range(1, 2000)])
+    for prefilter in (None, status_prefilter("todo")):
+        records = iter_task_records(path, prefilter)
+        assert next(records)["id"] == 1
+        records.close()  # raised BufferError while the scanner still held the map
+    records = iter_task_records(path)
+    next(records)
+    del records  # garbage-collected mid-stream: must not warn either
+    tasks = JsonTaskRepository(path).iter_tasks("todo")
+    assert next(tasks).id == 1
+    del tasks
@@ -0,0 +1,84 @@
+import pytest
+
+from src.models.task import Task, TaskDraft
+from src.repository.json_repository import JsonTaskRepository
+from src.repository.task_cache import TASK_OVERHEAD, TaskCache, file_identity
+
+
+@pytest.fixture
+def parses(monkeypatch):
+    """Counts full document parses."""
+    count = []
+    original = JsonTaskRepository._ensure_loaded
+    monkeypatch.setattr(JsonTaskRepository, "_ensure_loaded", lambda self: count.append(1) or original(self))
+    return count
+
+
+def seeded(path, cache, n=3):
+    repo = JsonTaskRepository(path=path, cache=cache)
+    repo.create_many([TaskDraft(f"task {i}", "spec" if i % 2 else None) for i in range(n)])
+    return repo
+
+
+def test_unchanged_file_is_parsed_once(tmp_path, parses):
+    repo = seeded(tmp_path / "tasks.json", cache=True)
+    first = repo.load_all_tasks()
+    parses.clear()
+    assert repo.load_all_tasks() == first
+    assert repo.list_tasks("todo") == first
+    assert [t.title for t in repo.search_tasks("task 1")] == ["task 1"]
+    assert parses == []
+
+
+def test_own_writes_extend_the_cache(tmp_path, parses):
+    repo = seeded(tmp_path / "tasks.json", cache=True)
+    repo.load_all_tasks()
+    parses.clear()
+    created = repo.create_task("later")
+    assert repo.load_all_tasks()[-1] == created
+    assert parses == []
+
+
+def test_other_writers_invalidate_the_cache(tmp_path):
+    data_file = tmp_path / "tasks.json"
+    repo = seeded(data_file, cache=True)
+    assert len(repo.load_all_tasks()) == 3
+    JsonTaskRepository(path=data_file).create_task("from elsewhere")
+    assert [t.title for t in repo.load_all_tasks()][-1] == "from elsewhere"
+    assert [t.title for t in repo.list_tasks("todo", None)][-1] == "from elsewhere"
+
+
+def test_cached_results_match_uncached(tmp_path):
+    data_file = tmp_path / "tasks.json"
+    cached = seeded(data_file, cache=True, n=20)
+    plain = JsonTaskRepository(path=data_file)
+    for status in (None, "todo", "done", "bad"):
+        assert cached.list_tasks(status) == plain.list_tasks(status)
+        assert list(cached.iter_tasks(status)) == list(plain.iter_tasks(status))
+    for query in ("spec", "task 1", "zz"):
+        assert cached.search_tasks(query) == plain.search_tasks(query)
+
+
+def test_cache_evicts_least_recently_used_and_skips_oversized(tmp_path):
+    tasks = [Task(id=1, title="x" * 10, description=None, status="todo")]
+    size = TASK_OVERHEAD + 10
+    cache = TaskCache(max_bytes=2 * size)
+    cache.put("a", (1, 1, 1), tasks)
+    cache.put("b", (1, 1, 1), tasks)
+    assert cache.get("a", (1, 1, 1)) is not None  # "b" is now least recently used
+    cache.put("c", (1, 1, 1), tasks)
+    assert cache.get("b", (1, 1, 1)) is None
+    assert cache.get("a", (1, 1, 1)) == tuple(tasks)
+    assert cache.bytes_used == 2 * size
+    cache.put("big", (1, 1, 1), tasks * 3)
+    assert cache.get("big", (1, 1, 1)) is None
+    assert cache.get("a", (2, 1, 1)) is None  # different file identity
+
+
+def test_document_larger_than_cap_streams_instead(tmp_path, parses):
+    data_file = tmp_path / "tasks.json"
+    repo = seeded(data_file, cache=TaskCache(max_bytes=16))
+    parses.clear()
+    assert [t.title for t in repo.list_tasks("todo")] == ["task 0", "task 1", "task 2"]
+    assert parses == []  # answered by the streaming reader
+    assert file_identity(data_file) is not None and file_identity(tmp_path / "missing") is None
@@ -23,4 +23,16 @@ def test_create_task_bad_status_raises():
     assert bad not in ALLOWED_STATUSES
     with pytest.raises(ValueError) as exc:
         Task(id=1, title="X", description=None, status=bad)
-    assert "status" in str(exc.value).lower()
\ No newline at end of file
+    assert "status" in str(exc.value).lower()
+
+@pytest.mark.parametrize("bad_description", [5, ["notes"], {"text": "x"}])
+def test_create_task_non_string_description_raises(bad_description):
+    with pytest.raises(ValueError) as exc:
+        Task(id=1, title="X", description=bad_description, status="todo")
+    assert "description" in str(exc.value).lower()
+
+
+@pytest.mark.parametrize("bad_id", [True, 0, "1", 1.0])
+def test_create_task_bad_id_raises(bad_id):
+    with pytest.raises(ValueError):
+        Task(id=bad_id, title="X", description=None, status="todo")
@@ -0,0 +1,111 @@
+import pytest
+
+from src.models.task import Task
+from src.models.task_table import SCAN_CHUNK, TaskTable
+from src.repository.memory_repository import InMemoryTaskRepository
+from src.repository.resident_repository import ResidentTaskRepository
+from src.services.filtering import filter_by_status
+from src.services.pagination import Page
+from src.services.search import search_tasks
+
+STATUSES = ("todo", "in-progress", "done")
+WORDS = ("deploy", "Review", "fix bug", "Kelvin K", "İstanbul", "café", "spec")
+
+
+def make_tasks(count):
+    return [
+        Task(
+            id=i,
+            title=f"{WORDS[i % len(WORDS)]} {i}",
+            description=None if i % 4 == 0 else ("" if i % 4 == 1 else f"{WORDS[(i * 3) % len(WORDS)]} notes"),
+            status=STATUSES[i % 3],
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def test_roundtrip_keeps_every_field():
+    tasks = make_tasks(50)
+    table = TaskTable(tasks)
+    assert len(table) == 50
+    assert list(table) == tasks
+    assert table.task(3).description is None and table.task(0).description == ""
+    table.append(Task(id=51, title="last", description="x", status="done"))
+    assert table.task(50) == Task(id=51, title="last", description="x", status="done")
+
+
+def test_ids_widen_past_32_bits():
+    table = TaskTable(make_tasks(3))
+    big = Task(id=1 << 40, title="big", description=None, status="todo")
+    table.append(big)
+    assert table.task(3) == big and table.task(0).id == 1
+
+
+@pytest.mark.parametrize("query", ["deploy", "DEPLOY", "k", "K", "İ", "i̇", "café", "notes", "1 notes", "zz", "3"])
+def test_scan_matches_the_list_search(query):
+    tasks = make_tasks(3 * SCAN_CHUNK + 7)
+    table = TaskTable(tasks)
+    assert search_tasks(table, query) == search_tasks(tasks, query)
+
+
+def test_match_never_spans_title_and_description():
+    tasks = [Task(id=1, title="dep", description="loy", status="todo"),
+             Task(id=2, title="nul\0byte", description="loy", status="todo")]
+    table = TaskTable(tasks)
+    assert search_tasks(table, "deploy") == []
+    assert search_tasks(table, "loy") == tasks
+    assert search_tasks(table, "l\0b") == search_tasks(table, "byte") == tasks[1:]
+
+
+def test_status_filter_and_pages_match_the_list_services():
+    tasks = make_tasks(2 * SCAN_CHUNK)
+    table = TaskTable(tasks)
+    pages = [None, Page(limit=5), Page(limit=3, offset=4), Page(after_id=1500), Page(limit=2, offset=1, after_id=700)]
+    for page in pages:
+        for status in (None, "done", "blocked"):
+            assert filter_by_status(table, status, page) == filter_by_status(tasks, status, page)
+        assert search_tasks(table, "review", page=page) == search_tasks(tasks, "review", page=page)
+
+
+def test_rows_can_be_replaced_and_deleted_in_place():
+    tasks = make_tasks(2 * SCAN_CHUNK)
+    table = TaskTable(tasks)
+    changes = [(5, {"status": "done"}), (9, {"title": "a much longer title"}), (700, {"description": None}),
+               (1500, {"description": "İstanbul now"}), (2047, {"title": "x", "status": "todo"})]
+    for row, change in changes:
+        tasks[row] = tasks[row].replace(**change)
+        table.replace(row, tasks[row])
+    for row in (2047, 1000, 0):
+        del tasks[row]
+        table.delete(row)
+    assert list(table) == tasks
+    assert table.row_of(tasks[10].id) == 10 and table.row_of(1) is None
+    for query in ("longer", "istanbul", "İ", "deploy"):
+        assert search_tasks(table, query) == search_tasks(tasks, query)
+    assert filter_by_status(table, "done") == filter_by_status(tasks, "done")
+
+
+def test_only_returned_tasks_are_materialized(monkeypatch):
+    table = TaskTable(make_tasks(SCAN_CHUNK))
+    built = []
+    original = TaskTable.task
+    monkeypatch.setattr(TaskTable, "task", lambda self, row: built.append(row) or original(self, row))
+    assert len(search_tasks(table, "spec", page=Page(limit=2))) == 2
+    assert len(built) == 2
+
+
+def test_table_is_smaller_than_task_objects():
+    table = TaskTable(make_tasks(1000))
+    # ids, codes, offsets and the text itself: well under the ~200 bytes a Task object costs
+    assert table.nbytes < 1000 * 40
+
+
+def test_resident_repository_answers_from_the_table():
+    backing = InMemoryTaskRepository()
+    backing.save_many(make_tasks(20))
+    resident = ResidentTaskRepository(backing)
+    resident.save_many([Task(id=21, title="late deploy", description=None, status="done")])
+    tasks = backing.load_all_tasks()
+    assert resident.load_all_tasks() == tasks
+    assert resident.search_tasks("deploy") == search_tasks(tasks, "deploy")
+    assert resident.list_tasks("done", Page(limit=3)) == filter_by_status(tasks, "done", Page(limit=3))
@@ -0,0 +1,184 @@
+import json
+import random
+
+import pytest
+
+from src.models.task import Task
+from src.repository.json_repository import JsonTaskRepository
+from src.repository.journal_repository import JournalTaskRepository
+from src.services.search import search_tasks
+from src.services.pagination import Page
+from src.services.query import parse_query
+from src.services.trigram_index import MappedTrigramIndex, TrigramIndex, trigrams
+
+
+def sample_tasks():
+    return [
+        Task(id=1, title="Write spec", description="Initial MVP", status="todo"),
+        Task(id=2, title="Refactor code", description="Improve clarity", status="in-progress"),
+        Task(id=3, title="Test Search", description=None, status="done"),
+        Task(id=4, title="ab", description=None, status="todo"),
+        Task(id=5, title="İstanbul ß", description="KELVIN K", status="todo"),
+    ]
+
+
+def build(tasks):
+    return TrigramIndex.build((t.id, t.title, t.description) for t in tasks)
+
+
+def test_trigrams():
+    assert trigrams("abcd") == {"abc", "bcd"}
+    assert trigrams("ab") == set()
+
+
+def test_candidates_intersect_posting_lists():
+    index = build(sample_tasks())
+    assert index.candidates("spec") == {1}
+    assert index.candidates("zzz") == set()
+    assert index.candidates("ab") is None
+    assert index.postings["ref"] == [2]
+
+
+def test_candidates_not_selective_returns_none():
+    index = build([Task(id=i, title="common", description=None, status="todo") for i in (1, 2, 3)])
+    assert index.candidates("common") is None
+
+
+def test_add_keeps_posting_lists_sorted():
+    index = TrigramIndex()
+    for task_id in (5, 2, 9, 2):
+        index.add(task_id, "same", None)
+    assert index.postings["sam"] == [2, 5, 9]
+
+
+@pytest.mark.parametrize("query", ["spec", "SPEC", "clar", "r co", "ab", "b", "zzz", "İst", "i̇st", "k", "vin k", "ss"])
+def test_indexed_search_matches_scan(query):
+    tasks = sample_tasks()
+    assert search_tasks(tasks, query, index=build(tasks)) == search_tasks(tasks, query)
+
+
+def test_indexed_search_matches_scan_randomized():
+    rng = random.Random(7)
+    alphabet = "abcAB ç"
+    tasks = [
+        Task(id=i, title="a" + "".join(rng.choices(alphabet, k=rng.randint(0, 8))),
+             description=rng.choice([None, "".join(rng.choices(alphabet, k=6))]), status="todo")
+        for i in range(1, 200)
+    ]
+    index = build(tasks[:150])  # tail not covered, as with a journal
+    mapped = MappedTrigramIndex(index.encode((0, 0), 150, True))  # dense lists are stored as bitmaps
+    for _ in range(200):
+        query = "".join(rng.choices(alphabet, k=rng.randint(1, 4)))
+        if query.strip():
+            assert search_tasks(tasks, query, index=index) == search_tasks(tasks, query)
+            assert mapped.candidates(query) in (None, index.candidates(query))
+    assert all(list(mapped.postings(gram)) == ids for gram, ids in index.postings.items())
+
+
+def test_encoded_index_answers_like_the_original():
+    tasks = sample_tasks()
+    index = build(tasks)
+    mapped = MappedTrigramIndex(index.encode((10, 20), len(tasks), True))
+    assert (mapped.stamp, mapped.records, mapped.ordered) == ((10, 20), 5, True)
+    assert list(mapped.postings("ref")) == [2] and 2 in mapped.postings("ref")
+    assert mapped.postings("zzz") == ()
+    for query in ("spec", "clar", "r co", "zzz", "ab", "i̇st", "vin k"):
+        assert mapped.candidates(query) == index.candidates(query)
+    with pytest.raises(ValueError):
+        build([Task(id=1 << 40, title="big", description=None, status="todo")]).encode((0, 0), 1, True)
+
+
+def test_mapped_index_rejects_foreign_data():
+    header = TrigramIndex().encode((0, 0), 0, True)
+    for data in (b"", b"x" * len(header), header[:-8] + (9).to_bytes(8, "little")):  # last: 9 grams missing
+        with pytest.raises(ValueError):
+            MappedTrigramIndex(data)
+
+
+def test_repository_builds_the_index_on_search_and_logs_saves(tmp_path):
+    data_file = tmp_path / "tasks.json"
+    repo = JsonTaskRepository(path=data_file)
+    repo.save_many(sample_tasks())
+    assert not (tmp_path / "tasks.json.trigram").exists()  # saves do not build it
+    assert [t.id for t in repo.search_tasks("CLAR")] == [2]
+    with MappedTrigramIndex.open(tmp_path / "tasks.json.trigram") as index:
+        st = data_file.stat()
+        assert index.stamp == (st.st_size, st.st_mtime_ns) and index.ordered
+    index_bytes = (tmp_path / "tasks.json.trigram").read_bytes()
+    repo.create_task("Second spec")
+    repo.update_task(3, description="spec later")
+    assert (tmp_path / "tasks.json.trigram").read_bytes() == index_bytes  # logged, not rewritten
+    log = (tmp_path / "tasks.json.trigram-log").read_text().splitlines()
+    assert [json.loads(line)["ids"] for line in log] == [[6], [3]]
+    fresh = JsonTaskRepository(path=data_file)
+    fresh._iter_raw_records = None  # answered from the index and fetched records only
+    assert [t.id for t in fresh.search_tasks("spec")] == [1, 3, 6]
+    assert [t.id for t in fresh.query_tasks(parse_query("spec -status:done"))] == [1, 6]
+
+
+def test_repository_rebuilds_stale_index(tmp_path):
+    data_file = tmp_path / "tasks.json"
+    repo = JsonTaskRepository(path=data_file)
+    repo.save_new_task(sample_tasks()[0])
+    # External writer bypasses the index
+    doc = json.loads(data_file.read_text())
+    doc["tasks"].append({"id": 2, "title": "Spectacle", "description": None, "status": "todo"})
+    data_file.write_text(json.dumps(doc))
+    assert [t.id for t in JsonTaskRepository(path=data_file).search_tasks("spec")] == [1, 2]
+    assert [t.id for t in repo.search_tasks("spec")] == [1, 2]
+
+
+def test_writes_the_log_cannot_describe_leave_the_index_stale(tmp_path, monkeypatch):
+    data_file, index_file = tmp_path / "tasks.json", tmp_path / "tasks.json.trigram"
+    repo = JsonTaskRepository(path=data_file)
+    repo.save_many(sample_tasks())
+    assert [t.id for t in repo.search_tasks("spec", Page(limit=1))] == [1]
+    assert not index_file.exists()  # a limited page does not build it...
+    repo.search_tasks("spec")
+    assert [t.id for t in repo.search_tasks("spec", Page(limit=1))] == [1]  # ...but uses one
+    with (tmp_path / "tasks.json.trigram-log").open("ab") as fh:
+        fh.write(b'{"from": [1')  # torn by a crash: stale, rebuilt by the next search
+    assert [t.id for t in repo.search_tasks("spec")] == [1]
+    assert index_file.exists() and not (tmp_path / "tasks.json.trigram-log").exists()
+    repo.save_new_task(Task(id=9, title="nine", description=None, status="todo"))
+    repo.save_new_task(Task(id=8, title="Spec eight", description=None, status="todo"))  # out of id order
+    assert not index_file.exists()
+    assert [t.id for t in repo.search_tasks("spec")] == [1, 8]  # built, but not fetched by id
+    with MappedTrigramIndex.open(index_file) as index:
+        assert not index.ordered
+    monkeypatch.setattr("src.repository.json_repository.INDEX_LOG_MAX_BYTES", 0)
+    repo.create_task("ten")
+    repo.create_task("eleven")  # the log passed its cap: the index is dropped
+    assert not index_file.exists()
+
+
+def test_repository_index_disabled(tmp_path):
+    repo = JsonTaskRepository(path=tmp_path / "tasks.json", trigram_index=False)
+    repo.save_new_task(sample_tasks()[0])
+    assert not (tmp_path / "tasks.json.trigram").exists()
+    assert [t.id for t in repo.search_tasks("spec")] == [1]
+
+
+def test_journal_search_covers_unindexed_tail(tmp_path):
+    data_file = tmp_path / "tasks.json"
+    JsonTaskRepository(path=data_file).save_new_task(sample_tasks()[0])
+    repo = JournalTaskRepository(path=data_file, background=False)
+    repo.save_new_task(Task(id=2, title="Spec two", description=None, status="todo"))
+    assert [t.id for t in repo.search_tasks("spec")] == [1, 2]
+    repo.save_new_task(Task(id=3, title="Spec three", description=None, status="todo"))
+    assert [t.id for t in repo.search_tasks("spec")] == [1, 2, 3]
+
+
+def test_journal_search_scans_instead_of_using_the_index(tmp_path, monkeypatch):
+    data_file = tmp_path / "tasks.json"
+    snapshot = JsonTaskRepository(path=data_file)
+    snapshot.save_many(sample_tasks())
+    assert [t.id for t in snapshot.search_tasks("clar")] == [2]  # builds the index of the snapshot
+    repo = JournalTaskRepository(path=data_file, background=False)
+    repo.save_new_task(Task(id=6, title="Clarify scope", description=None, status="todo"))
+    repo.update_task(2, description="Done")
+    # Journal entries are not in the snapshot the index covers: searches never read it
+    monkeypatch.setattr(MappedTrigramIndex, "open", lambda path: pytest.fail("index used"))
+    assert [t.id for t in repo.search_tasks("clar")] == [6]
+    assert [t.id for t in repo.query_tasks(parse_query("clar"))] == [6]
+    assert not (tmp_path / "tasks.json.trigram-log").exists()
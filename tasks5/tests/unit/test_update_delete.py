@@ -0,0 +1,154 @@
+import json
+
+import pytest
+
+from src.models.task import Task, TaskDraft
+from src.repository.binary_repository import BinaryTaskRepository
+from src.repository.errors import TaskNotFoundError
+from src.repository.journal_repository import JournalTaskRepository
+from src.repository.json_repository import JsonTaskRepository
+from src.repository.memory_repository import InMemoryTaskRepository
+from src.repository.resident_repository import ResidentTaskRepository
+from src.repository.sql_repository import SqlTaskRepository
+from src.services.query import parse_query
+from src.services.ranking import TermStats
+
+KINDS = ["json", "journal", "sqlite", "binary", "memory", "resident"]
+DRAFTS = [TaskDraft(f"deploy {i}" if i % 2 else f"fix {i}", None if i % 3 else "notes", "todo") for i in range(1, 13)]
+
+
+def make_repo(kind, tmp_path):
+    if kind == "json":
+        return JsonTaskRepository(tmp_path / "tasks.json")
+    if kind == "journal":
+        return JournalTaskRepository(tmp_path / "tasks.json", background=False)
+    if kind == "sqlite":
+        return SqlTaskRepository(tmp_path / "tasks.db")
+    if kind == "binary":
+        return BinaryTaskRepository(tmp_path / "tasks.bin")
+    if kind == "memory":
+        return InMemoryTaskRepository()
+    return ResidentTaskRepository(JsonTaskRepository(tmp_path / "tasks.json"))
+
+
+@pytest.fixture(params=KINDS)
+def repo(request, tmp_path):
+    repo = make_repo(request.param, tmp_path)
+    repo.create_many(DRAFTS)
+    return repo
+
+
+def test_update_task_changes_only_that_task(repo):
+    before = repo.load_all_tasks()
+    updated = repo.update_task(3, status="done", description=None)
+    assert updated == Task(3, "deploy 3", None, "done")
+    assert repo.get_task(3) == updated
+    assert repo.load_all_tasks() == [updated if t.id == 3 else t for t in before]
+    assert repo.list_tasks("done") == [updated]
+    renamed = repo.update_task(4, title="Release notes")
+    assert repo.search_tasks("release") == [renamed]
+    assert repo.search_tasks("fix 4") == []
+
+
+def test_update_task_rejects_missing_ids_and_invalid_changes(repo):
+    before = repo.load_all_tasks()
+    with pytest.raises(TaskNotFoundError):
+        repo.update_task(99, status="done")
+    for changes in ({"status": "blocked"}, {"title": "  "}, {"id": 7}, {}):
+        with pytest.raises(ValueError):
+            repo.update_task(2, **changes)
+    assert repo.load_all_tasks() == before
+
+
+def test_delete_task_removes_it_and_keeps_its_id_used(repo):
+    last = repo.delete_task(12)
+    assert last.id == 12 and repo.get_task(12) is None
+    repo.delete_task(5)
+    assert [t.id for t in repo.load_all_tasks()] == [1, 2, 3, 4, 6, 7, 8, 9, 10, 11]
+    assert repo.search_tasks("deploy") == [t for t in repo.load_all_tasks() if "deploy" in t.title]
+    with pytest.raises(TaskNotFoundError):
+        repo.delete_task(5)
+    assert repo.create_task("after delete").id == 13
+
+
+def test_update_where_by_status_and_query(repo):
+    assert repo.update_where({"status": "in-progress"}, status="todo", query=parse_query("deploy")) == 6
+    assert [t.id for t in repo.list_tasks("in-progress")] == [1, 3, 5, 7, 9, 11]
+    assert repo.update_where({"status": "done"}, status="todo") == 6
+    assert repo.list_tasks("todo") == []
+    assert repo.update_where({"status": "todo"}, status="todo") == 0
+    with pytest.raises(ValueError):
+        repo.update_where({"status": "blocked"}, status="done")
+    assert len(repo.list_tasks("done")) == 6
+
+
+def test_statistics_follow_updates_and_deletes(repo):
+    repo.term_stats(["deploy"])
+    repo.update_task(1, title="renamed task")
+    repo.delete_task(2)
+    repo.update_where({"description": "deploy notes"}, query=parse_query("fix"))
+    tasks = repo.load_all_tasks()
+    expected = TermStats.build((t.title, t.description) for t in tasks)
+    stats = repo.term_stats(["deploy", "fix", "renamed", "notes"])
+    assert (stats.docs, stats.title_chars, stats.desc_chars) == (expected.docs, expected.title_chars, expected.desc_chars)
+    for term in ("deploy", "fix", "renamed", "notes"):
+        assert stats.df.get(term, 0) == expected.df.get(term, 0)
+
+
+def test_json_update_keeps_the_trigram_index_usable(tmp_path):
+    repo = JsonTaskRepository(tmp_path / "tasks.json")
+    repo.create_many(DRAFTS)
+    assert len(repo.search_tasks("deploy")) == 6  # builds and persists the index
+    repo.update_task(2, title="Deploy hotfix")
+    fresh = JsonTaskRepository(tmp_path / "tasks.json")
+    assert [t.id for t in fresh.search_tasks("hotfix")] == [2]
+    assert len(fresh.search_tasks("deploy")) == 7
+
+
+def test_journal_appends_patches_without_touching_the_snapshot(tmp_path):
+    repo = JournalTaskRepository(tmp_path / "tasks.json", background=False)
+    repo.create_many(DRAFTS)
+    repo.compact()
+    snapshot = repo.path.read_bytes()
+    repo.search_tasks("deploy")  # trigram index for the snapshot, kept in memory
+    repo.update_task(2, status="done")
+    repo.update_task(4, title="Deploy hotfix")
+    repo.delete_task(1)
+    assert repo.path.read_bytes() == snapshot
+    entries = [json.loads(line) for line in repo.journal_path.read_text().splitlines()]
+    assert entries == [
+        {"op": "patch", "id": 2, "status": "done"},
+        {"op": "patch", "id": 4, "title": "Deploy hotfix"},
+        {"op": "delete", "id": 1},
+    ]
+    # Replayed by streaming reads (past byte prefilters and the index) and by a fresh instance
+    for reader in (repo, JournalTaskRepository(tmp_path / "tasks.json", background=False)):
+        assert [t.id for t in reader.list_tasks("done")] == [2]
+        assert [t.id for t in reader.search_tasks("deploy")] == [3, 4, 5, 7, 9, 11]
+        assert [t.id for t in reader.query_tasks(parse_query("status:done OR hotfix"))] == [2, 4]
+    expected = repo.load_all_tasks()
+    repo.compact()
+    assert not repo.journal_path.exists()
+    assert repo.load_all_tasks() == expected and repo.next_id() == 13
+
+
+def test_journal_patches_tasks_still_in_the_journal(tmp_path):
+    repo = JournalTaskRepository(tmp_path / "tasks.json", background=False)
+    repo.create_many(DRAFTS[:3])
+    repo.update_task(3, status="done")
+    repo.delete_task(1)
+    assert repo.load_all_tasks() == [Task(2, "fix 2", None, "todo"), Task(3, "deploy 3", "notes", "done")]
+    repo.compact()
+    assert repo.load_all_tasks() == [Task(2, "fix 2", None, "todo"), Task(3, "deploy 3", "notes", "done")]
+    assert repo.create_task("next").id == 4
+
+
+def test_resident_mirrors_changes_in_its_table(tmp_path):
+    backing = JournalTaskRepository(tmp_path / "tasks.json", background=False)
+    resident = ResidentTaskRepository(backing)
+    resident.create_many(DRAFTS)
+    resident.update_task(6, title="a much longer title than before", description="x")
+    resident.delete_task(2)
+    resident.update_where({"status": "done"}, query=parse_query("deploy"))
+    assert resident.load_all_tasks() == backing.load_all_tasks()
+    assert resident.search_tasks("longer") == [backing.get_task(6)]
@@ -0,0 +1,162 @@
+import json
+
+import pytest
+
+from src.models.task import Task, TaskDraft, record_error, trusted_task
+from src.models.task_table import TaskTable
+from src.repository import json_repository
+from src.repository.base import BadRecord
+from src.repository.binary_repository import BinaryTaskRepository
+from src.repository.journal_repository import JournalTaskRepository
+from src.repository.json_repository import JsonTaskRepository
+from src.repository.memory_repository import InMemoryTaskRepository
+from src.repository.resident_repository import ResidentTaskRepository
+from src.repository.snapshot import ENTRY, HEADER, STATUS_FIELD, encode_snapshot
+from src.repository.sql_repository import SqlTaskRepository
+from src.services.pagination import Page
+
+DRAFTS = [TaskDraft(f"task {i}", None if i % 2 else "notes", "todo") for i in range(1, 6)]
+
+
+def test_trusted_task_matches_a_validated_one():
+    task = trusted_task(3, "title", None, "done")
+    assert task == Task(3, "title", None, "done") and hash(task) == hash(Task(3, "title", None, "done"))
+    assert TaskTable([task]).task(0) == task
+    with pytest.raises(AttributeError):
+        task.title = "changed"
+
+
+def test_record_error_explains_invalid_records():
+    assert record_error({"id": 1, "title": "ok", "description": None, "status": "todo"}) is None
+    assert record_error({"id": 1, "title": " ", "description": None, "status": "todo"}) == "Task title cannot be blank"
+    assert record_error({"id": 1}).startswith("missing 3 required")
+    assert record_error(["not", "a", "dict"]) == "record is a list, not an object"
+    assert record_error({"id": 1, "title": "ok", "description": 5, "status": "todo"}) == \
+        "Task description must be a string"
+
+
+def test_wrongly_typed_description_is_reported_not_stamped(tmp_path):
+    repo = JsonTaskRepository(tmp_path / "tasks.json")
+    repo.create_many(DRAFTS)
+    data = json.loads(repo.path.read_text())
+    data["tasks"][2]["description"] = 5
+    repo.path.write_text(json.dumps(data))
+    result = repo.verify()
+    assert result.invalid == [BadRecord(2, 3, "Task description must be a string")]
+    assert not repo._document_trusted() and [t.id for t in repo.load_all_tasks()] == [1, 2, 4, 5]
+    assert repo.verify(fix=True).removed and repo._document_trusted()
+
+
+def test_stamps_from_older_validation_rules_are_ignored(tmp_path):
+    repo = JsonTaskRepository(tmp_path / "tasks.json")
+    repo.create_many(DRAFTS)
+    assert repo._document_trusted()
+    stamp = json.loads(repo.verified_path.read_text())
+    del stamp["rules"]  # written before descriptions were type-checked
+    repo.verified_path.write_text(json.dumps(stamp))
+    assert not repo._document_trusted()
+
+
+def corrupt(path, **fields):
+    """Edit the second record of a JSON store by hand (the validation stamp goes stale)."""
+    data = json.loads(path.read_text())
+    data["tasks"][1].update(fields)
+    data["tasks"].append("junk")
+    path.write_text(json.dumps(data))
+
+
+def count_trusted(monkeypatch):
+    calls = []
+    real = json_repository.trusted_task
+    monkeypatch.setattr(json_repository, "trusted_task", lambda *fields: calls.append(fields) or real(*fields))
+    return calls
+
+
+def test_json_writes_stamp_the_document_and_reads_trust_it(tmp_path, monkeypatch):
+    repo = JsonTaskRepository(tmp_path / "tasks.json")
+    repo.create_many(DRAFTS)
+    assert repo.verified_path.exists() and repo._document_trusted()
+    calls = count_trusted(monkeypatch)
+    assert len(repo.load_all_tasks()) == 5 and len(calls) == 5
+    assert [t.id for t in repo.list_tasks("todo", Page(limit=2))] == [1, 2] and len(calls) == 7
+    repo.update_task(2, status="done")
+    assert repo._document_trusted() and repo.get_task(2).status == "done"
+
+
+def test_hand_edits_are_validated_and_reported(tmp_path, monkeypatch):
+    repo = JsonTaskRepository(tmp_path / "tasks.json")
+    repo.create_many(DRAFTS)
+    corrupt(repo.path, title="   ")
+    calls = count_trusted(monkeypatch)
+    assert [t.id for t in repo.load_all_tasks()] == [1, 3, 4, 5] and calls == []
+    repo.create_task("after the edit")  # writes from an unchecked document stay unstamped
+    assert not repo._document_trusted()
+    result = repo.verify()
+    assert result.checked == 7 and not result.removed
+    assert result.invalid == [BadRecord(1, 2, "Task title cannot be blank"),
+                              BadRecord(5, None, "record is a str, not an object")]
+    assert not repo._document_trusted()
+    fixed = repo.verify(fix=True)
+    assert fixed.removed and fixed.invalid == result.invalid
+    assert repo._document_trusted() and len(json.loads(repo.path.read_text())["tasks"]) == 5
+    assert repo.next_id() == 7 and repo.verify().invalid == []
+
+
+def test_valid_unstamped_documents_are_stamped_by_verify(tmp_path):
+    repo = JsonTaskRepository(tmp_path / "tasks.json")
+    repo.create_many(DRAFTS)
+    repo.verified_path.unlink()
+    assert not repo._document_trusted() and len(repo.load_all_tasks()) == 5
+    assert repo.verify() == (5, [], False)
+    assert repo._document_trusted()
+
+
+def test_journal_entries_are_not_trusted_until_checked(tmp_path):
+    repo = JournalTaskRepository(tmp_path / "tasks.json", background=False)
+    repo.create_many(DRAFTS)
+    assert not repo._records_trusted()
+    with repo.journal_path.open("a") as fh:
+        fh.write(json.dumps({"id": 9, "title": "", "description": None, "status": "todo"}) + "\n")
+    assert [t.id for t in repo.list_tasks()] == [1, 2, 3, 4, 5]
+    result = repo.verify()
+    assert result.invalid == [BadRecord(5, 9, "Task title cannot be blank")]
+    assert not repo.journal_path.exists() and not repo._document_trusted()
+    repo.verify(fix=True)
+    assert repo._records_trusted() and len(repo.load_all_tasks()) == 5
+
+
+def test_sqlite_rows_are_checked_and_fixed(tmp_path):
+    repo = SqlTaskRepository(tmp_path / "tasks.db")
+    repo.create_many(DRAFTS)
+    conn = repo._connection()
+    with conn:
+        conn.execute("UPDATE tasks SET status = 'later' WHERE id = 5")
+    result = repo.verify()
+    assert result.invalid == [BadRecord(4, 5, "Invalid status 'later'. Allowed: todo, in-progress, done")]
+    assert repo.verify(fix=True).removed
+    assert repo.verify() == (4, [], False) and repo.next_id() == 6
+
+
+def test_binary_records_are_checked_and_fixed(tmp_path):
+    repo = BinaryTaskRepository(tmp_path / "tasks.bin")
+    assert repo.verify() == (0, [], False)
+    tasks = [trusted_task(1, "ok", None, "todo"), trusted_task(2, "", None, "todo"), trusted_task(3, "ok", "x", "done")]
+    raw = bytearray(encode_snapshot(tasks, next_id=4))
+    raw[HEADER.size + 2 * ENTRY.size + STATUS_FIELD] = 9  # unknown status code for task 3
+    repo.path.write_bytes(bytes(raw))
+    result = repo.verify()
+    assert [(bad.position, bad.id) for bad in result.invalid] == [(1, 2), (2, 3)]
+    assert result.invalid[1].reason.startswith("undecodable record")
+    assert repo.verify(fix=True).removed
+    assert repo.load_all_tasks() == [Task(1, "ok", None, "todo")] and repo.verify().invalid == []
+    assert repo.verify(fix=True) == (1, [], False)
+
+
+def test_in_memory_backends_have_nothing_to_report(tmp_path):
+    memory = InMemoryTaskRepository()
+    memory.create_many(DRAFTS)
+    assert memory.verify() == (5, [], False)
+    resident = ResidentTaskRepository(JsonTaskRepository(tmp_path / "tasks.json"))
+    resident.create_many(DRAFTS)
+    corrupt(resident.backing.path, status="someday")
+    assert [bad.id for bad in resident.verify(fix=True).invalid] == [2, None]